@@ -6,6 +6,12 @@ from stacks.db_stack import DBStack
 
 app = cdk.App()
 db_stack = DBStack(app, "DBStack")
-api_stack = APIStack(app, "APIStack", db_stack.table)
+api_stack = APIStack(
+    app,
+    "APIStack",
+    db_stack.table,
+    hot_threads=app.node.try_get_context("hot_threads") or "",
+    post_bucket_days=int(days) if (days := app.node.try_get_context("post_bucket_days")) else None,
+)
 
 app.synth()
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING, TypedDict
 from aws_cdk import Stack
 from aws_cdk import aws_apigateway as apigateway
 from aws_cdk import aws_lambda as lambda_
+from aws_cdk import aws_lambda_event_sources as event_sources
 from aws_cdk import aws_lambda_python_alpha as python
 
 if TYPE_CHECKING:
@@ -26,15 +27,55 @@ class APIStack(Stack):
     """API stack."""
 
     lambda_: python.PythonFunction
+    change_stream_lambda: python.PythonFunction
+    streaming_lambda: python.PythonFunction
+    streaming_url: lambda_.FunctionUrl
     apigateway: apigateway.RestApi
 
-    def __init__(self, scope: Construct, construct_id: str, table: Table) -> None:
-        """Initialize the API stack."""
+    def __init__(  # noqa: PLR0913
+        self,
+        scope: Construct,
+        construct_id: str,
+        table: Table,
+        *,
+        hot_threads: str = "",
+        post_bucket_days: int | None = None,
+    ) -> None:
+        """Initialize the API stack.
+
+        Args:
+            scope: The parent construct.
+            construct_id: The ID of the stack.
+            table: The DynamoDB table.
+            hot_threads: The write shards of the hot threads, in the format of HOT_THREADS, e.g. "{thread_id}:4".
+            post_bucket_days: The number of days of the time buckets of the posts, if bucketed.
+        """
         super().__init__(scope, construct_id)
+        self._hot_threads = hot_threads
+        self._post_bucket_days = post_bucket_days
 
         lambda_function = self.create_lambda("Chat", table)
+        self.create_change_stream_lambda("Chat", table)
+        self.create_streaming_lambda("Chat", table)
         self.create_api_gateway(lambda_function)
 
+    def _environment(self, service_name: str, table: Table) -> dict[str, str]:
+        """Return the environment of the Lambda functions.
+
+        Every function gets the partition layout of the posts, so they all read and write the
+        posts in the same partitions.
+
+        Args:
+            service_name: The name of the service.
+            table: The DynamoDB table.
+        """
+        environment = {"TABLE_NAME": table.table_name, "SERVICE_NAME": service_name}
+        if self._hot_threads:
+            environment["HOT_THREADS"] = self._hot_threads
+        if self._post_bucket_days:
+            environment["POST_BUCKET_DAYS"] = str(self._post_bucket_days)
+        return environment
+
     def create_lambda(self, service_name: str, table: Table) -> python.PythonFunction:
         """Create the Lambda function.
 
@@ -48,12 +89,87 @@ class APIStack(Stack):
             "Lambda",
             entry=src_dir.as_posix(),
             runtime=lambda_.Runtime.PYTHON_3_12,
-            environment={"TABLE_NAME": table.table_name, "SERVICE_NAME": service_name},
+            environment=self._environment(service_name, table),
+            tracing=lambda_.Tracing.ACTIVE,
         )
         table.grant_read_write_data(self.lambda_)
 
         return self.lambda_
 
+    def create_change_stream_lambda(self, service_name: str, table: Table) -> python.PythonFunction:
+        """Create the Lambda function that maintains the read views from the stream of the table.
+
+        Only the records of threads and posts are delivered. A batch is retried from the first
+        record that fails, so the changes of an item are projected in order.
+
+        Args:
+            service_name: The name of the service.
+            table: The DynamoDB table.
+        """
+        src_dir = Path(__file__).parent.parent.parent / "src"
+        self.change_stream_lambda = python.PythonFunction(
+            self,
+            "ChangeStreamLambda",
+            entry=src_dir.as_posix(),
+            index="index.py",
+            handler="change_stream_handler",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            environment=self._environment(service_name, table),
+            tracing=lambda_.Tracing.ACTIVE,
+        )
+        table.grant_read_write_data(self.change_stream_lambda)
+        self.change_stream_lambda.add_event_source(
+            event_sources.DynamoEventSource(
+                table,
+                starting_position=lambda_.StartingPosition.TRIM_HORIZON,
+                batch_size=100,
+                report_batch_item_failures=True,
+                retry_attempts=3,
+                filters=[
+                    lambda_.FilterCriteria.filter(
+                        {"dynamodb": {image: {"category": {"S": lambda_.FilterRule.or_("Thread", "Post")}}}}
+                    )
+                    for image in ("NewImage", "OldImage")
+                ],
+            )
+        )
+
+        return self.change_stream_lambda
+
+    def create_streaming_lambda(self, service_name: str, table: Table) -> python.PythonFunction:
+        """Create the Lambda function that streams GET /threads/{thread_id}/posts through a function URL.
+
+        The runtime interface client of the managed Python runtime cannot stream, so the exec
+        wrapper replaces it with the Runtime API client of `streaming_runtime.py`. The function URL
+        is not behind the API Gateway, so it requires IAM authentication: the callers sign their
+        requests with SigV4 and need the `lambda:InvokeFunctionUrl` permission.
+
+        Args:
+            service_name: The name of the service.
+            table: The DynamoDB table.
+        """
+        src_dir = Path(__file__).parent.parent.parent / "src"
+        self.streaming_lambda = python.PythonFunction(
+            self,
+            "StreamingLambda",
+            entry=src_dir.as_posix(),
+            index="index.py",
+            handler="stream_handler",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            environment={
+                **self._environment(service_name, table),
+                "AWS_LAMBDA_EXEC_WRAPPER": "/var/task/streaming_runtime.sh",
+            },
+            tracing=lambda_.Tracing.ACTIVE,
+        )
+        table.grant_read_data(self.streaming_lambda)
+        self.streaming_url = self.streaming_lambda.add_function_url(
+            auth_type=lambda_.FunctionUrlAuthType.AWS_IAM,
+            invoke_mode=lambda_.InvokeMode.RESPONSE_STREAM,
+        )
+
+        return self.streaming_lambda
+
     def _add_resources(self, target: apigateway.Resource, resources: Resource) -> None:
         for method in resources["methods"]:
             target.add_method(method)
@@ -68,9 +184,30 @@ class APIStack(Stack):
         Args:
             lambda_function: The Lambda function for handler.
         """
-        self.apigateway = apigateway.LambdaRestApi(self, "API", handler=lambda_function)
+        self.apigateway = apigateway.LambdaRestApi(
+            self,
+            "API",
+            handler=lambda_function,
+            deploy_options=apigateway.StageOptions(tracing_enabled=True),
+        )
 
-        resources: Resource = {"methods": [], "resources": {"threads": {"methods": ["POST", "GET"], "resources": {}}}}
+        post: Resource = {"methods": ["DELETE"], "resources": {}}
+        posts: Resource = {"methods": ["GET", "POST"], "resources": {"{post_id}": post}}
+        thread: Resource = {"methods": ["GET", "PATCH", "DELETE"], "resources": {"posts": posts}}
+        threads: Resource = {"methods": ["POST", "GET"], "resources": {"{thread_id}": thread}}
+        batch: Resource = {"methods": ["POST"], "resources": {}}
+        search: Resource = {
+            "methods": [],
+            "resources": {
+                "posts": {"methods": ["GET"], "resources": {}},
+                "threads": {"methods": ["GET"], "resources": {}},
+            },
+        }
+        feed: Resource = {"methods": ["GET"], "resources": {}}
+        resources: Resource = {
+            "methods": [],
+            "resources": {"threads": threads, "batch": batch, "search": search, "feed": feed},
+        }
         self._add_resources(self.apigateway.root, resources)
 
         return self.apigateway
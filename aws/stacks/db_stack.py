@@ -31,6 +31,8 @@ class DBStack(Stack):
             "Table",
             partition_key=dynamodb.Attribute(name="thread_id", type=dynamodb.AttributeType.STRING),
             sort_key=dynamodb.Attribute(name="post_id", type=dynamodb.AttributeType.STRING),
+            time_to_live_attribute="expires_at",
+            dynamo_stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
             global_secondary_indexes=[
                 dynamodb.GlobalSecondaryIndexPropsV2(
                     index_name="by_category",
@@ -0,0 +1,16 @@
+"""Benchmarks of the use cases and the repositories.
+
+The use cases run against each backend at each scale, and their throughput, latency
+percentiles, allocations (in total, and per item for the listings) and consumed capacity are
+measured. The allocations and the consumed capacity do not depend on the machine, so only they
+are stored in the baseline and compared with it by default; the latencies are stored and compared
+only with `--compare-latency`, in a baseline of the same machine:
+
+    PYTHONPATH=src python -m benchmarks
+    PYTHONPATH=src python -m benchmarks --update
+    PYTHONPATH=src python -m benchmarks --baseline local.json --compare-latency --update
+    PYTHONPATH=src python -m benchmarks --baseline local.json --compare-latency
+
+The baselines are committed, so a change that makes a use case allocate more or consume more
+capacity shows up as a diff of `benchmarks/baselines/baseline.json`.
+"""
@@ -0,0 +1,62 @@
+"""Command line interface of the benchmarks."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.backends import BACKENDS
+from benchmarks.runner import compare, load, run, save, to_baseline
+from benchmarks.scenarios import SCALES, Scale
+
+BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks and compare them with the baseline.
+
+    Args:
+        argv: The command line arguments.
+
+    Returns:
+        The exit status: 1 if a metric regressed beyond the tolerance, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--backend", choices=list(BACKENDS), action="append", help="default: all of them")
+    parser.add_argument("--scale", choices=list(SCALES), action="append", help="default: small and medium")
+    parser.add_argument(
+        "--custom", type=int, nargs=3, metavar=("THREADS", "POSTS", "SIZE"), help="run at a custom scale instead"
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed growth of a metric, as a ratio")
+    parser.add_argument(
+        "--compare-latency",
+        action="store_true",
+        help="compare the latencies too, with a baseline measured on this machine; with --update, store them",
+    )
+    parser.add_argument("--update", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    if args.custom:
+        threads, posts, size = args.custom
+        scales = {"custom": Scale(threads=threads, posts_per_thread=posts, message_size=size)}
+    else:
+        scales = {name: SCALES[name] for name in args.scale or ["small", "medium"]}
+    results = run(args.backend or list(BACKENDS), scales, args.iterations)
+
+    if args.update:
+        baseline = load(args.baseline) if args.baseline.exists() else {}
+        save(args.baseline, baseline | to_baseline(results, latencies=args.compare_latency))
+        return 0
+    if not args.baseline.exists():
+        return 0
+    regressions = compare(results, load(args.baseline), args.tolerance, latencies=args.compare_latency)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
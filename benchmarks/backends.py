@@ -0,0 +1,115 @@
+"""Backends that the benchmarks run against."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import boto3
+from chat.infrastructure import (
+    DynamoDBPostRepository,
+    DynamoDBPostSearchIndex,
+    DynamoDBThreadRepository,
+    InMemoryPostRepository,
+    InMemoryPostSearchIndex,
+    InMemoryThreadRepository,
+    SQLiteDatabase,
+    SQLitePostRepository,
+    SQLitePostSearchIndex,
+    SQLiteThreadRepository,
+)
+from chat.infrastructure.metering import CapacityMeter, MeteredTable
+from moto import mock_aws
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from contextlib import AbstractContextManager
+
+    from chat.domain.post import AbstractPostRepository
+    from chat.domain.search import AbstractPostSearchIndex
+    from chat.domain.thread import AbstractThreadRepository
+    from mypy_boto3_dynamodb.service_resource import Table
+
+TABLE_NAME = "benchmark"
+
+
+@dataclass
+class Backend:
+    """The repositories of a backend.
+
+    Attributes:
+        thread_repository: The thread repository.
+        post_repository: The post repository.
+        search_index: The post search index.
+        meter: The meter of the requests of the repositories, if they send any.
+    """
+
+    thread_repository: AbstractThreadRepository
+    post_repository: AbstractPostRepository
+    search_index: AbstractPostSearchIndex
+    meter: CapacityMeter | None = None
+
+
+@contextmanager
+def in_memory() -> Iterator[Backend]:
+    """Create a backend of the in-memory repositories."""
+    yield Backend(InMemoryThreadRepository(), InMemoryPostRepository(), InMemoryPostSearchIndex())
+
+
+@contextmanager
+def sqlite() -> Iterator[Backend]:
+    """Create a backend of the SQLite repositories, on a database in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        database = SQLiteDatabase(Path(directory) / "benchmark.db")
+        try:
+            yield Backend(
+                SQLiteThreadRepository(database), SQLitePostRepository(database), SQLitePostSearchIndex(database)
+            )
+        finally:
+            database.close()
+
+
+@contextmanager
+def dynamodb() -> Iterator[Backend]:
+    """Create a backend of the DynamoDB repositories, on a table mocked by moto."""
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SECURITY_TOKEN", "AWS_SESSION_TOKEN"):
+        os.environ.setdefault(name, "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    with mock_aws():
+        boto3.client("dynamodb").create_table(
+            AttributeDefinitions=[
+                {"AttributeName": "thread_id", "AttributeType": "S"},
+                {"AttributeName": "post_id", "AttributeType": "S"},
+                {"AttributeName": "category", "AttributeType": "S"},
+            ],
+            TableName=TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "thread_id", "KeyType": "HASH"},
+                {"AttributeName": "post_id", "KeyType": "RANGE"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "by_category",
+                    "KeySchema": [{"AttributeName": "category", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        meter = CapacityMeter()
+        table = cast("Table", MeteredTable(boto3.resource("dynamodb").Table(TABLE_NAME), meter))
+        yield Backend(
+            DynamoDBThreadRepository(table), DynamoDBPostRepository(table), DynamoDBPostSearchIndex(table), meter
+        )
+
+
+BACKENDS: dict[str, Callable[[], AbstractContextManager[Backend]]] = {
+    "memory": in_memory,
+    "sqlite": sqlite,
+    "dynamodb": dynamodb,
+}
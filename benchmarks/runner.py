@@ -0,0 +1,210 @@
+"""Measurement of the workloads and comparison with the baselines."""
+
+from __future__ import annotations
+
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from chat.infrastructure.metering import Usage
+
+from benchmarks.backends import BACKENDS
+from benchmarks.scenarios import WORKLOADS, seed
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+
+    from chat.infrastructure.metering import CapacityMeter
+
+    from benchmarks.scenarios import Scale
+
+ALLOCATION_SAMPLES = 10
+# The metrics compared with the baseline, which do not depend on the machine the benchmarks run on.
+COMPARED = ("allocated_kib", "allocated_per_item_bytes", "read_capacity", "write_capacity")
+# The latencies, compared only if asked for, since they depend on the machine. Throughput is derived
+# from the latencies.
+LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+# The metrics that a backend cannot measure for a workload, which are left out of the baselines:
+# moto reports no consumed capacity for the transactions that the threads are written with.
+UNMEASURED = {("dynamodb", "CreateThread"): frozenset({"write_capacity"})}
+
+# The stored metrics of each result, keyed like the results.
+Baseline = dict[str, dict[str, float]]
+
+
+@dataclass(frozen=True)
+class Result:
+    """The measurements of a workload.
+
+    Attributes:
+        ops_per_second: The throughput, in calls per second.
+        p50_ms: The median latency, in milliseconds.
+        p95_ms: The 95th percentile of the latency, in milliseconds.
+        p99_ms: The 99th percentile of the latency, in milliseconds.
+        allocated_kib: The mean peak of the memory allocated by a call, in KiB.
+        allocated_per_item_bytes: The mean peak of the memory allocated by a call, per item it
+            returned, in bytes. Zero for the calls that do not return a list.
+        read_capacity: The mean read capacity units consumed by a call.
+        write_capacity: The mean write capacity units consumed by a call.
+    """
+
+    ops_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    allocated_kib: float
+    allocated_per_item_bytes: float = 0.0
+    read_capacity: float = 0.0
+    write_capacity: float = 0.0
+
+
+def measure(call: Callable[[], object], iterations: int, meter: CapacityMeter | None = None) -> Result:
+    """Measure the latencies, allocations and consumed capacity of the call.
+
+    The allocations are traced in separate calls, since tracing slows the calls down. For the calls
+    that return a list, such as the listings, they are also divided by the number of items listed.
+
+    Args:
+        call: The call to measure.
+        iterations: The number of timed calls.
+        meter: The meter of the DynamoDB requests of the call, if it sends any.
+
+    Returns:
+        The measurements.
+    """
+    call()  # Warm up the caches and the lazily created clients.
+    if meter:
+        meter.collect_usage()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    usage = sum(meter.collect_usage().values(), Usage()) if meter else Usage()
+
+    allocations = []
+    per_item = []
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOCATION_SAMPLES):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            returned = call()
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.append(peak - before)
+            if isinstance(returned, list) and returned:
+                per_item.append((peak - before) / len(returned))
+    finally:
+        tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return Result(
+        ops_per_second=round(iterations / sum(latencies), 1),
+        p50_ms=round(percentiles[49] * 1000, 3),
+        p95_ms=round(percentiles[94] * 1000, 3),
+        p99_ms=round(percentiles[98] * 1000, 3),
+        allocated_kib=round(statistics.fmean(allocations) / 1024, 1),
+        allocated_per_item_bytes=round(statistics.fmean(per_item), 1) if per_item else 0.0,
+        read_capacity=round(usage.read_capacity / iterations, 2),
+        write_capacity=round(usage.write_capacity / iterations, 2),
+    )
+
+
+def run(backends: Iterable[str], scales: dict[str, Scale], iterations: int) -> dict[str, Result]:
+    """Run every workload on every backend at every scale.
+
+    Each workload runs on freshly seeded data, so the workloads do not affect each other.
+
+    Args:
+        backends: The names of the backends.
+        scales: The scales by their names.
+        iterations: The number of timed calls of each workload.
+
+    Returns:
+        The results, keyed by "{backend}/{scale}/{workload}".
+    """
+    results = {}
+    for backend_name in backends:
+        for scale_name, scale in scales.items():
+            for workload_name, workload in WORKLOADS.items():
+                with BACKENDS[backend_name]() as backend:
+                    thread_ids = seed(backend, scale)
+                    result = measure(workload(backend, thread_ids, scale), iterations, backend.meter)
+                key = f"{backend_name}/{scale_name}/{workload_name}"
+                results[key] = result
+                print(f"{key:<32} {format_result(result)}")  # noqa: T201
+    return results
+
+
+def format_result(result: Result) -> str:
+    """Format the result as a line of the report."""
+    return (
+        f"{result.ops_per_second:>10.1f} ops/s"
+        f"  p50 {result.p50_ms:>8.3f} ms  p95 {result.p95_ms:>8.3f} ms  p99 {result.p99_ms:>8.3f} ms"
+        f"  {result.allocated_kib:>9.1f} KiB  {result.allocated_per_item_bytes:>8.1f} B/item"
+        f"  {result.read_capacity:>7.2f} RCU  {result.write_capacity:>7.2f} WCU"
+    )
+
+
+def _metrics(key: str, *, latencies: bool) -> list[str]:
+    """Return the metrics of the result with the key that can be compared with a baseline."""
+    backend, _, workload = key.split("/")
+    unmeasured = UNMEASURED.get((backend, workload), frozenset())
+    metrics = COMPARED + LATENCIES if latencies else COMPARED
+    return [metric for metric in metrics if metric not in unmeasured]
+
+
+def to_baseline(results: dict[str, Result], *, latencies: bool = False) -> Baseline:
+    """Select the metrics of the results to store as a baseline.
+
+    Args:
+        results: The results.
+        latencies: Whether to store the latencies too, for a baseline of this machine.
+
+    Returns:
+        The metrics to store, without those that depend on the machine unless asked for, or
+        that the backend cannot measure.
+    """
+    return {
+        key: {metric: getattr(result, metric) for metric in _metrics(key, latencies=latencies)}
+        for key, result in results.items()
+    }
+
+
+def load(path: Path) -> Baseline:
+    """Load the baseline stored in the file."""
+    data: Baseline = json.loads(path.read_text())
+    return data
+
+
+def save(path: Path, baseline: Baseline) -> None:
+    """Store the baseline in the file, sorted so the changes show up as small diffs."""
+    path.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+
+
+def compare(results: dict[str, Result], baseline: Baseline, tolerance: float, *, latencies: bool = False) -> list[str]:
+    """Find the metrics that regressed from the baseline.
+
+    Args:
+        results: The current results.
+        baseline: The baseline. The metrics it does not store are not compared.
+        tolerance: The ratio that a metric may grow by before it counts as a regression.
+        latencies: Whether to compare the latencies too, which is only meaningful if the baseline
+            was measured on the same machine.
+
+    Returns:
+        The descriptions of the regressions.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in _metrics(key, latencies=latencies):
+            current, previous = getattr(result, metric), baseline[key].get(metric)
+            if previous and current > previous * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {previous} -> {current} (+{current / previous - 1:.0%})")
+    return regressions
@@ -0,0 +1,139 @@
+"""Scales and workloads of the benchmarks."""
+
+from __future__ import annotations
+
+import itertools
+import random
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.use_case import (
+    CreatePost,
+    CreatePostCommand,
+    CreateThread,
+    CreateThreadCommand,
+    ListPosts,
+    ListPostsCommand,
+    ListThreads,
+)
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from benchmarks.backends import Backend
+
+WORDS = ["lambda", "dynamodb", "table", "thread", "post", "query", "index", "stream", "cache", "latency"]
+SEED_START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@dataclass(frozen=True)
+class Scale:
+    """The size of the data that a workload runs on.
+
+    Attributes:
+        threads: The number of threads stored before the workload runs.
+        posts_per_thread: The number of posts stored in each thread.
+        message_size: The length of the messages, in characters.
+    """
+
+    threads: int
+    posts_per_thread: int
+    message_size: int
+
+    def __str__(self) -> str:
+        """Format the scale as the key of its results."""
+        return f"{self.threads}x{self.posts_per_thread}x{self.message_size}"
+
+
+SCALES = {
+    "small": Scale(threads=10, posts_per_thread=10, message_size=100),
+    "medium": Scale(threads=100, posts_per_thread=20, message_size=1_000),
+    "large": Scale(threads=500, posts_per_thread=50, message_size=4_000),
+}
+
+
+def message(size: int, rng: random.Random) -> str:
+    """Create a message of random words.
+
+    Args:
+        size: The length of the message.
+        rng: The random number generator.
+    """
+    words: list[str] = []
+    length = 0
+    while length < size:
+        words.append(rng.choice(WORDS))
+        length += len(words[-1]) + 1
+    return " ".join(words)[:size]
+
+
+def seed(backend: Backend, scale: Scale) -> list[ULID]:
+    """Store the threads and posts of the scale in the backend.
+
+    The repositories are filled directly, so the seeding does not depend on the use cases
+    being measured.
+
+    Args:
+        backend: The backend to fill.
+        scale: The scale of the data.
+
+    Returns:
+        The IDs of the threads.
+    """
+    rng = random.Random(0)  # noqa: S311
+    thread_ids = []
+    for i in range(scale.threads):
+        created_at = SEED_START + timedelta(minutes=i)
+        thread = Thread(id_=ULID.from_datetime(created_at), name=f"Seed {i}", created_at=created_at)
+        backend.thread_repository.save(thread)
+        for j in range(scale.posts_per_thread):
+            posted_at = created_at + timedelta(seconds=j)
+            post = Post(
+                id_=ULID.from_datetime(posted_at),
+                thread_id=thread.id_,
+                message=message(scale.message_size, rng),
+                created_at=posted_at,
+            )
+            backend.post_repository.save(post)
+        thread_ids.append(thread.id_)
+    return thread_ids
+
+
+def create_thread(backend: Backend, thread_ids: list[ULID], scale: Scale) -> Callable[[], object]:  # noqa: ARG001
+    """Create threads with new names."""
+    use_case = CreateThread(backend.thread_repository)
+    counter = itertools.count()
+    return lambda: use_case.execute(CreateThreadCommand(name=f"Benchmark {next(counter)}"))
+
+
+def list_threads(backend: Backend, thread_ids: list[ULID], scale: Scale) -> Callable[[], object]:  # noqa: ARG001
+    """List all of the threads."""
+    use_case = ListThreads(backend.thread_repository)
+    return use_case.execute
+
+
+def create_post(backend: Backend, thread_ids: list[ULID], scale: Scale) -> Callable[[], object]:
+    """Create posts in the seeded threads in turn."""
+    use_case = CreatePost(backend.thread_repository, backend.post_repository, backend.search_index)
+    threads = itertools.cycle(thread_ids)
+    text = message(scale.message_size, random.Random(1))  # noqa: S311
+    return lambda: use_case.execute(CreatePostCommand(thread_id=next(threads), message=text))
+
+
+def list_posts(backend: Backend, thread_ids: list[ULID], scale: Scale) -> Callable[[], object]:  # noqa: ARG001
+    """List all of the posts of the seeded threads in turn."""
+    use_case = ListPosts(backend.post_repository)
+    threads = itertools.cycle(thread_ids)
+    return lambda: use_case.execute(ListPostsCommand(thread_id=next(threads)))
+
+
+WORKLOADS: dict[str, Callable[[Backend, list[ULID], Scale], Callable[[], object]]] = {
+    "CreateThread": create_thread,
+    "ListThreads": list_threads,
+    "CreatePost": create_post,
+    "ListPosts": list_posts,
+}
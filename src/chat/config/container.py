@@ -2,49 +2,307 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Literal, cast
 
 import boto3
+from botocore.config import Config
+from ulid import ULID
 
-from chat.infrastructure import DynamoDBPostRepository, DynamoDBThreadRepository
-from chat.use_case import CreatePost, CreateThread, DeletePost, DeleteThread, GetThread, ListPosts, ListThreads
+from chat.infrastructure import (
+    BufferedPostRepository,
+    DynamoDBIdempotencyStore,
+    DynamoDBPostRepository,
+    DynamoDBPostSearchIndex,
+    DynamoDBReadViews,
+    DynamoDBThreadRepository,
+    InMemoryIdempotencyStore,
+    InMemoryPostRepository,
+    InMemoryPostSearchIndex,
+    InMemoryReadViews,
+    InMemoryThreadRepository,
+    SQLiteDatabase,
+    SQLiteIdempotencyStore,
+    SQLitePostRepository,
+    SQLitePostSearchIndex,
+    SQLiteThreadRepository,
+)
+from chat.infrastructure.change_stream import ChangeStreamSimulator
+from chat.infrastructure.diagnostics import DiagnosedTable, QueryInspector
+from chat.infrastructure.metering import CapacityMeter, MeteredTable
+from chat.infrastructure.resilience import ResiliencePolicy, ResilientTable
+from chat.infrastructure.tracing import TracedTable
+from chat.shared.concurrency import SingleFlight
+from chat.use_case import (
+    CreatePost,
+    CreateThread,
+    DeletePost,
+    DeleteThread,
+    GetThread,
+    GetThreads,
+    ListPosts,
+    ListRecentPosts,
+    ListThreads,
+    ProjectChanges,
+    RenameThread,
+    SearchPosts,
+    SearchThreads,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import timedelta
+    from pathlib import Path
+
     from mypy_boto3_dynamodb.service_resource import Table
 
+    from chat.domain.idempotency import AbstractIdempotencyStore
+    from chat.domain.post import AbstractPostRepository
+    from chat.domain.search import AbstractPostSearchIndex
+    from chat.domain.thread import AbstractThreadRepository
+    from chat.domain.views import AbstractReadViews
+
+# The storage of the repositories: the DynamoDB table, the memory of the process, or an SQLite file.
+RepositoryBackend = Literal["dynamodb", "memory", "sqlite"]
+REPOSITORY_BACKENDS: tuple[RepositoryBackend, ...] = ("dynamodb", "memory", "sqlite")
+
+# The size of the connection pool of the DynamoDB client, the default of botocore.
+MAX_POOL_CONNECTIONS = 10
+
+
+def parse_hot_threads(value: str) -> dict[ULID, int]:
+    """Parse the hot thread configuration.
+
+    Args:
+        value: Comma-separated pairs of a thread ID and its number of write shards,
+            e.g. "01J0000000000000000000000A:8,01J0000000000000000000000B:4".
+
+    Returns:
+        The number of write shards of each hot thread.
+
+    Raises:
+        ValueError: If the value is malformed.
+    """
+    hot_threads = {}
+    for pair in filter(None, (pair.strip() for pair in value.split(","))):
+        thread_id, _, shards = pair.partition(":")
+        hot_threads[ULID.from_str(thread_id.strip())] = int(shards)
+    return hot_threads
+
 
 class Container:
     """Dependency container for the chat application."""
 
-    def __init__(self, table_name: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        table_name: str,
+        *,
+        hot_threads: Mapping[ULID, int] | None = None,
+        post_bucket_period: timedelta | None = None,
+        usage_dump_path: Path | None = None,
+        backend: RepositoryBackend = "dynamodb",
+        sqlite_path: Path | None = None,
+        post_buffer_size: int | None = None,
+        list_threads_from_views: bool = False,
+        local_change_stream: bool = False,
+    ) -> None:
         """Initialize the container.
 
         Args:
             table_name: The name of the DynamoDB table.
+            hot_threads: The number of write shards of each hot thread.
+            post_bucket_period: The length of the time buckets to store the posts in, if any.
+            usage_dump_path: The file to append the DynamoDB usage of each invocation to, if any.
+            backend: The storage of the repositories. "memory" keeps the records in the memory of
+                the process, for local development, tests and benchmarks; they are neither
+                persisted nor shared between instances. "sqlite" stores them in the SQLite file
+                at `sqlite_path`, for single-node and offline deployments.
+            sqlite_path: The path of the SQLite database file, for the "sqlite" backend.
+            post_buffer_size: The number of post saves to buffer and write in batches, if any.
+                The buffered posts are written when the buffer is full or `flush` is called,
+                so the handler must flush before it responds. If None, every save is written
+                before it returns.
+            list_threads_from_views: Whether to list the threads from the thread list of the read
+                views, which lags the writes by the delay of the change stream, instead of the
+                thread repository.
+            local_change_stream: Whether to record the changes of the table with a local stand-in
+                for its DynamoDB stream, to replay them to the change stream handler offline.
+
+        Raises:
+            ValueError: If the backend is unknown, or is "sqlite" without a path.
         """
+        if backend not in REPOSITORY_BACKENDS:
+            error_message = f"Unknown repository backend: {backend}"
+            raise ValueError(error_message)
+        if backend == "sqlite" and sqlite_path is None:
+            error_message = "The sqlite repository backend requires a database path."
+            raise ValueError(error_message)
+        self._backend = backend
+        self._sqlite_path = sqlite_path
         self._table_name = table_name
+        self._hot_threads = hot_threads
+        self._post_bucket_period = post_bucket_period
+        self._usage_dump_path = usage_dump_path
+        self._post_buffer_size = post_buffer_size
+        self._list_threads_from_views = list_threads_from_views
+        self._local_change_stream = local_change_stream
+
+    @property
+    def resilience(self) -> ResiliencePolicy:
+        """The retry and circuit breaking policy of the DynamoDB requests."""
+        if not hasattr(self, "_resilience"):
+            self._resilience = ResiliencePolicy()
+        return self._resilience
+
+    @property
+    def capacity_meter(self) -> CapacityMeter:
+        """The meter of the consumed capacity and latency of the DynamoDB requests."""
+        if not hasattr(self, "_capacity_meter"):
+            self._capacity_meter = CapacityMeter(dump_path=self._usage_dump_path)
+        return self._capacity_meter
+
+    @property
+    def query_inspector(self) -> QueryInspector:
+        """The inspector of the queries of the repositories."""
+        if not hasattr(self, "_query_inspector"):
+            self._query_inspector = QueryInspector()
+        return self._query_inspector
+
+    @property
+    def change_stream(self) -> ChangeStreamSimulator | None:
+        """The local stand-in for the DynamoDB stream of the table, if enabled."""
+        if self._local_change_stream and not hasattr(self, "_change_stream"):
+            self._change_stream = ChangeStreamSimulator()
+        return getattr(self, "_change_stream", None)
 
     @property
     def table(self) -> Table:
-        """The DynamoDB table instance."""
+        """The DynamoDB table instance, whose requests run under the resilience policy.
+
+        Every attempt of a request is recorded by the capacity meter, traced, and its query
+        metadata is added up by the query inspector. The changes that the requests make are
+        recorded by the local change stream, if enabled.
+        """
         if not hasattr(self, "_table"):
-            self._table = boto3.resource("dynamodb").Table(self._table_name)
+            # The requests are retried by the resilience policy instead of botocore.
+            config = Config(
+                retries={"mode": "standard", "total_max_attempts": 1}, max_pool_connections=MAX_POOL_CONNECTIONS
+            )
+            table = boto3.resource("dynamodb", config=config).Table(self._table_name)
+            if self.change_stream:
+                table = self.change_stream.wrap(table)
+            diagnosed = cast("Table", DiagnosedTable(table, self.query_inspector))
+            metered = cast("Table", MeteredTable(cast("Table", TracedTable(diagnosed)), self.capacity_meter))
+            self._table = cast("Table", ResilientTable(metered, self.resilience))
         return self._table
 
     @property
-    def thread_repository(self) -> DynamoDBThreadRepository:
+    def sqlite_database(self) -> SQLiteDatabase:
+        """The SQLite database of the repositories, for the "sqlite" backend."""
+        if not hasattr(self, "_sqlite_database"):
+            self._sqlite_database = SQLiteDatabase(cast("Path", self._sqlite_path))
+        return self._sqlite_database
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The executor shared by the concurrent DynamoDB requests.
+
+        It has as many workers as the DynamoDB client has connections in its pool,
+        so a request running on a worker never waits for a connection.
+        """
+        if not hasattr(self, "_executor"):
+            self._executor = ThreadPoolExecutor(max_workers=MAX_POOL_CONNECTIONS, thread_name_prefix="dynamodb")
+        return self._executor
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        """The group that coalesces the concurrent identical reads of the repositories."""
+        if not hasattr(self, "_single_flight"):
+            self._single_flight = SingleFlight()
+        return self._single_flight
+
+    @property
+    def thread_repository(self) -> AbstractThreadRepository:
         """The thread repository instance."""
         if not hasattr(self, "_thread_repository"):
-            self._thread_repository = DynamoDBThreadRepository(self.table)
+            self._thread_repository: AbstractThreadRepository
+            if self._backend == "memory":
+                self._thread_repository = InMemoryThreadRepository()
+            elif self._backend == "sqlite":
+                self._thread_repository = SQLiteThreadRepository(self.sqlite_database)
+            else:
+                self._thread_repository = DynamoDBThreadRepository(
+                    self.table, executor=self.executor, single_flight=self.single_flight
+                )
         return self._thread_repository
 
     @property
-    def post_repository(self) -> DynamoDBPostRepository:
+    def post_repository(self) -> AbstractPostRepository:
         """The post repository instance."""
         if not hasattr(self, "_post_repository"):
-            self._post_repository = DynamoDBPostRepository(self.table)
+            self._post_repository: AbstractPostRepository
+            if self._backend == "memory":
+                self._post_repository = InMemoryPostRepository()
+            elif self._backend == "sqlite":
+                self._post_repository = SQLitePostRepository(self.sqlite_database)
+            else:
+                self._post_repository = DynamoDBPostRepository(
+                    self.table,
+                    hot_threads=self._hot_threads,
+                    bucket_period=self._post_bucket_period,
+                    executor=self.executor,
+                    single_flight=self.single_flight,
+                )
+            if self._post_buffer_size:
+                self._post_repository = BufferedPostRepository(self._post_repository, max_size=self._post_buffer_size)
         return self._post_repository
 
+    def flush(self) -> None:
+        """Write the buffered post saves, if the post repository has been created."""
+        if hasattr(self, "_post_repository"):
+            self._post_repository.flush()
+
+    @property
+    def post_search_index(self) -> AbstractPostSearchIndex:
+        """The post search index instance."""
+        if not hasattr(self, "_post_search_index"):
+            self._post_search_index: AbstractPostSearchIndex
+            if self._backend == "memory":
+                self._post_search_index = InMemoryPostSearchIndex()
+            elif self._backend == "sqlite":
+                self._post_search_index = SQLitePostSearchIndex(self.sqlite_database)
+            else:
+                self._post_search_index = DynamoDBPostSearchIndex(self.table, executor=self.executor)
+        return self._post_search_index
+
+    @property
+    def idempotency_store(self) -> AbstractIdempotencyStore:
+        """The idempotency store instance."""
+        if not hasattr(self, "_idempotency_store"):
+            self._idempotency_store: AbstractIdempotencyStore
+            if self._backend == "memory":
+                self._idempotency_store = InMemoryIdempotencyStore()
+            elif self._backend == "sqlite":
+                self._idempotency_store = SQLiteIdempotencyStore(self.sqlite_database)
+            else:
+                self._idempotency_store = DynamoDBIdempotencyStore(self.table)
+        return self._idempotency_store
+
+    @property
+    def read_views(self) -> AbstractReadViews:
+        """The materialized read views instance.
+
+        The views are maintained by the change stream handler from the stream of the table, so
+        with the other backends, which have no stream, they are kept in memory and stay empty.
+        """
+        if not hasattr(self, "_read_views"):
+            self._read_views: AbstractReadViews
+            if self._backend == "dynamodb":
+                self._read_views = DynamoDBReadViews(self.table, executor=self.executor)
+            else:
+                self._read_views = InMemoryReadViews()
+        return self._read_views
+
     @property
     def create_thread(self) -> CreateThread:
         """The create thread use case instance."""
@@ -52,6 +310,13 @@ class Container:
             self._create_thread = CreateThread(self.thread_repository)
         return self._create_thread
 
+    @property
+    def rename_thread(self) -> RenameThread:
+        """The rename thread use case instance."""
+        if not hasattr(self, "_rename_thread"):
+            self._rename_thread = RenameThread(self.thread_repository)
+        return self._rename_thread
+
     @property
     def get_thread(self) -> GetThread:
         """The get thread use case instance."""
@@ -59,11 +324,20 @@ class Container:
             self._get_thread = GetThread(self.thread_repository)
         return self._get_thread
 
+    @property
+    def get_threads(self) -> GetThreads:
+        """The get threads use case instance."""
+        if not hasattr(self, "_get_threads"):
+            self._get_threads = GetThreads(self.thread_repository)
+        return self._get_threads
+
     @property
     def list_threads(self) -> ListThreads:
         """The list threads use case instance."""
         if not hasattr(self, "_list_threads"):
-            self._list_threads = ListThreads(self.thread_repository)
+            self._list_threads = ListThreads(
+                self.thread_repository, self.read_views if self._list_threads_from_views else None
+            )
         return self._list_threads
 
     @property
@@ -73,11 +347,18 @@ class Container:
             self._delete_thread = DeleteThread(self.thread_repository)
         return self._delete_thread
 
+    @property
+    def search_threads(self) -> SearchThreads:
+        """The search threads use case instance."""
+        if not hasattr(self, "_search_threads"):
+            self._search_threads = SearchThreads(self.thread_repository)
+        return self._search_threads
+
     @property
     def create_post(self) -> CreatePost:
         """The create post use case instance."""
         if not hasattr(self, "_create_post"):
-            self._create_post = CreatePost(self.thread_repository, self.post_repository)
+            self._create_post = CreatePost(self.thread_repository, self.post_repository, self.post_search_index)
         return self._create_post
 
     @property
@@ -91,5 +372,26 @@ class Container:
     def delete_post(self) -> DeletePost:
         """The delete post use case instance."""
         if not hasattr(self, "_delete_post"):
-            self._delete_post = DeletePost(self.post_repository)
+            self._delete_post = DeletePost(self.thread_repository, self.post_repository, self.post_search_index)
         return self._delete_post
+
+    @property
+    def search_posts(self) -> SearchPosts:
+        """The search posts use case instance."""
+        if not hasattr(self, "_search_posts"):
+            self._search_posts = SearchPosts(self.post_search_index)
+        return self._search_posts
+
+    @property
+    def list_recent_posts(self) -> ListRecentPosts:
+        """The list recent posts use case instance."""
+        if not hasattr(self, "_list_recent_posts"):
+            self._list_recent_posts = ListRecentPosts(self.read_views)
+        return self._list_recent_posts
+
+    @property
+    def project_changes(self) -> ProjectChanges:
+        """The project changes use case instance."""
+        if not hasattr(self, "_project_changes"):
+            self._project_changes = ProjectChanges(self.read_views)
+        return self._project_changes
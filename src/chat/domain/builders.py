@@ -33,10 +33,9 @@ class ThreadBuilder:
             The built Thread instance.
 
         Raises:
-            ThreadExistsError: If a thread with the given name already exists.
+            ThreadExistsError: If a thread with the given name already exists, ignoring case and width.
         """
-        threads = self._repository.list_all()
-        if any(thread.name == name for thread in threads):
+        if self._repository.find_by_name(name):
             raise ThreadExistsError(name)
 
         return Thread(id_=ULID(), name=name, created_at=datetime.now(tz=UTC))
@@ -0,0 +1,69 @@
+"""This module defines the idempotency records of retried requests."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from pydantic import BaseModel
+
+
+class IdempotencyRecord(BaseModel):
+    """The record of a request made with an idempotency key.
+
+    Attributes:
+        fingerprint: The hash of the request, to detect a key reused for another request.
+        status_code: The status code of the response. None while the request is in progress.
+        body: The body of the response. None while the request is in progress or if it had no body.
+    """
+
+    fingerprint: str
+    status_code: int | None = None
+    body: str | None = None
+
+    @property
+    def completed(self) -> bool:
+        """Whether the response of the request has been recorded."""
+        return self.status_code is not None
+
+
+class AbstractIdempotencyStore(ABC):
+    """Defines the interface for a store of idempotency records.
+
+    A record is started before the request runs and completed with its response, so a retry
+    either finds the request in progress or replays its response. The records expire after a
+    while, and an expired record is treated as absent.
+    """
+
+    @abstractmethod
+    def start(self, key: str, fingerprint: str) -> IdempotencyRecord | None:
+        """Start a record for the given key, unless there is one already.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+
+        Returns:
+            None if the record was started, or the existing record of the key.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, key: str, fingerprint: str, status_code: int, body: str | None) -> None:
+        """Record the response of the request started with the given key.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+            status_code: The status code of the response.
+            body: The body of the response.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Delete the record of the given key, so the request can be retried.
+
+        Args:
+            key: The idempotency key.
+        """
+        raise NotImplementedError
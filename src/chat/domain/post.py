@@ -4,10 +4,14 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime  # noqa: TCH003
+from typing import TYPE_CHECKING
 
 from pydantic import BaseModel, ConfigDict, field_validator
 from ulid import ULID  # noqa: TCH002
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
 
 class Post(BaseModel):
     """Post model.
@@ -48,22 +52,96 @@ class AbstractPostRepository(ABC):
         """
         raise NotImplementedError
 
+    def save_all(self, posts: Iterable[Post]) -> None:
+        """Save the given Post instances to the repository.
+
+        The posts are saved one by one by default. Repositories that can write several posts
+        in one request override it.
+
+        Args:
+            posts: The Post instances to be saved.
+        """
+        for post in posts:
+            self.save(post)
+
+    def save_with(
+        self,
+        post: Post,
+        *,
+        before: Callable[[], None] | None = None,
+        after: Callable[[], None] | None = None,
+    ) -> None:
+        """Save the given Post instance together with the writes that go with it.
+
+        By default, `before` runs first and the post is saved only if it succeeds, then `after`
+        runs. Repositories that defer their saves run both once the post is written instead, so
+        a write that fails leaves none of them behind.
+
+        Args:
+            post: The Post instance to be saved.
+            before: The writes that the post depends on, such as the counters of its thread.
+            after: The writes that depend on the post, such as its search index entries.
+        """
+        if before:
+            before()
+        self.save(post)
+        if after:
+            after()
+
+    def flush(self) -> None:
+        """Write the posts whose saves have been deferred, if any.
+
+        Saves are written before they return by default, so there is nothing to flush.
+        """
+        return
+
     @abstractmethod
-    def list_by_thread_id(self, thread_id: ULID, *, start: datetime | None = None) -> list[Post]:
+    def list_by_thread_id(  # noqa: PLR0913
+        self,
+        thread_id: ULID,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: ULID | None = None,
+        limit: int | None = None,
+    ) -> list[Post]:
         """List all posts with the specified thread ID.
 
         This method retrieves a list of Post instances that belong to the specified thread ID.
-        The posts are listed starting from the specified timestamp.
+        The posts are listed starting from the specified timestamp, or after the specified post,
+        in ascending order of their IDs.
 
         Args:
             thread_id: The ULID of the thread to find.
             start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+            after: The ID of the post to list posts after, exclusive. Used as a pagination cursor.
+            limit: The maximum number of posts to list.
 
         Returns:
             A list of Post instances with the specified thread ID.
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def iter_by_thread_id(
+        self, thread_id: ULID, *, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[Post]:
+        """Iterate over all posts with the specified thread ID.
+
+        Unlike `list_by_thread_id`, the posts are fetched lazily page by page, so only one page
+        is held in memory at a time. The posts are yielded in ascending order of their IDs.
+
+        Args:
+            thread_id: The ULID of the thread to find.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+
+        Yields:
+            The Post instances with the specified thread ID.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, thread_id: ULID, post_id: ULID) -> None:
         """Delete the Post with the given ID.
@@ -0,0 +1,90 @@
+"""This module defines the full-text search index of posts."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from ulid import ULID
+
+    from chat.domain.post import Post
+
+MAX_TERM_LENGTH = 64
+
+# Scripts written without spaces between words: Hiragana, Katakana, CJK ideographs and Hangul.
+_CJK = "぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+_TOKEN = re.compile(rf"[{_CJK}]+|[^\W{_CJK}]+")
+
+
+def tokenize(text: str) -> Counter[str]:
+    """Split a text into search terms.
+
+    The text is normalized with NFKC and case folding, so full-width and half-width forms and
+    letter cases match each other. Words are split on non-word characters. Runs of scripts
+    written without spaces are split into overlapping bigrams, so any substring of two or more
+    characters can be searched for.
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        The number of occurrences of each term.
+    """
+    terms: Counter[str] = Counter()
+    for token in _TOKEN.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if len(token) > 1 and re.match(f"[{_CJK}]", token):
+            terms.update(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            terms[token[:MAX_TERM_LENGTH]] += 1
+    return terms
+
+
+class AbstractPostSearchIndex(ABC):
+    """Defines the interface for a full-text search index of posts.
+
+    The index is an inverted index from the terms of the messages to the posts, maintained
+    incrementally as posts are created and deleted.
+    """
+
+    @abstractmethod
+    def add(self, post: Post) -> None:
+        """Index the given post.
+
+        Args:
+            post: The post to index.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, thread_id: ULID, post_id: ULID) -> None:
+        """Remove the post with the given ID from the index. Does nothing if it is not indexed.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to remove.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, terms: Sequence[str], *, thread_id: ULID | None = None, limit: int) -> list[Post]:
+        """Search for the posts that contain all of the given terms.
+
+        The posts are ranked by the total number of occurrences of the terms, and then by
+        recency. The cost of a search grows with the number of posts that contain the terms,
+        not with the number of posts indexed.
+
+        Args:
+            terms: The terms to search for, as returned by `tokenize`.
+            thread_id: The ID of the thread to search in. If None, all threads are searched.
+            limit: The maximum number of posts to return.
+
+        Returns:
+            The matching posts, best match first.
+        """
+        raise NotImplementedError
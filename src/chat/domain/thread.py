@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import unicodedata
 from abc import ABC, abstractmethod
 from datetime import datetime  # noqa: TCH003
+from typing import TYPE_CHECKING
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_validator
 from ulid import ULID  # noqa: TCH002
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
 
 class Thread(BaseModel):
     """Thread model.
@@ -16,6 +21,12 @@ class Thread(BaseModel):
         id_: The ID of the thread.
         name: The name of the thread.
         created_at: The timestamp when the thread was created, in UTC.
+        post_count: The number of posts in the thread.
+        last_post_at: The timestamp when the last post was created, in UTC.
+        version: The version of the stored thread, incremented by every write to it.
+            0 if the thread has never been saved.
+        stored_name: The name of the stored thread, as it was read or last saved, or None if the
+            thread has not been read from or saved to a repository. Not compared.
     """
 
     model_config = ConfigDict(extra="forbid", validate_assignment=True)
@@ -23,6 +34,25 @@ class Thread(BaseModel):
     id_: ULID
     name: str
     created_at: datetime
+    post_count: int = 0
+    last_post_at: datetime | None = None
+    version: int = 0
+    _stored_name: str | None = PrivateAttr(default=None)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the fields of the threads, whatever names they are stored with."""
+        if not isinstance(other, Thread):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    @property
+    def stored_name(self) -> str | None:
+        """The name of the stored thread, or None if the thread is not known to be stored."""
+        return self._stored_name
+
+    def mark_stored(self) -> None:
+        """Record that the thread is stored with its current name."""
+        self._stored_name = self.name
 
     @field_validator("name")
     @classmethod
@@ -44,6 +74,21 @@ class Thread(BaseModel):
         return name
 
 
+def normalize_name(name: str) -> str:
+    """Normalize a thread name for case-insensitive comparison.
+
+    The name is normalized with NFKC and case folding, so full-width and half-width forms
+    and letter cases of the same name compare equal.
+
+    Args:
+        name: The name to normalize.
+
+    Returns:
+        The normalized name.
+    """
+    return unicodedata.normalize("NFKC", name).casefold()
+
+
 class AbstractThreadRepository(ABC):
     """Defines the interface for a thread repository."""
 
@@ -51,8 +96,16 @@ class AbstractThreadRepository(ABC):
     def save(self, thread: Thread) -> None:
         """Save the given Thread instance to the repository.
 
+        The save only succeeds if the stored thread still has the version of the given one, that
+        is, if it has not been written since the given thread was read. The version of the given
+        thread is then advanced to the saved one.
+
         Args:
             thread: The Thread instance to be saved.
+
+        Raises:
+            ThreadExistsError: If another thread has the same normalized name.
+            ThreadVersionConflictError: If the stored thread has another version.
         """
         raise NotImplementedError
 
@@ -68,6 +121,44 @@ class AbstractThreadRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def find_by_ids(self, thread_ids: Sequence[ULID]) -> list[Thread]:
+        """Find Thread instances by their IDs.
+
+        Args:
+            thread_ids: The ULIDs of the threads to find.
+
+        Returns:
+            The Thread instances found, in the order of the given ULIDs.
+            The ULIDs without a corresponding thread are skipped.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_by_name(self, name: str) -> Thread | None:
+        """Find a Thread instance by its name, compared after `normalize_name`.
+
+        Args:
+            name: The name of the thread to find.
+
+        Returns:
+            The Thread instance with the given name, or None if not found.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_by_name(self, prefix: str, *, limit: int) -> list[Thread]:
+        """Find the threads whose names start with the given prefix, compared after `normalize_name`.
+
+        Args:
+            prefix: The prefix of the names.
+            limit: The maximum number of threads to return.
+
+        Returns:
+            The Thread instances found, in the order of their normalized names.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def list_all(self) -> list[Thread]:
         """Retrieves a list of all threads.
@@ -77,6 +168,35 @@ class AbstractThreadRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def increment_post_count(self, thread_id: ULID, last_post_at: datetime) -> None:
+        """Atomically record a new post in the activity counters of the thread.
+
+        The version of the thread is advanced, so a copy read before the update cannot be saved
+        over the new counters. The timestamp of the last post only moves forward, so a post
+        recorded out of order does not move it back.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            last_post_at: The timestamp when the post was created.
+
+        Raises:
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decrement_post_count(self, thread_id: ULID) -> None:
+        """Atomically record a deleted post in the activity counters of the thread.
+
+        The post count never goes below zero, and nothing happens if the thread does not exist.
+        Like `increment_post_count`, the update advances the version of the thread.
+
+        Args:
+            thread_id: The ID of the thread that the post belonged to.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, id_: ULID) -> None:
         """Delete the thread with the given ID.
@@ -0,0 +1,100 @@
+"""This module defines the materialized read views of threads and posts.
+
+The views are derived from the changes of the stored threads and posts, as delivered by the change
+stream of the table, rather than recomputed on every read. They are maintained incrementally, one
+change at a time, and lag the writes by the delay of the stream.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict
+
+from chat.domain.post import Post  # noqa: TCH001
+from chat.domain.thread import Thread  # noqa: TCH001
+
+if TYPE_CHECKING:
+    from ulid import ULID
+
+
+class Change(BaseModel):
+    """A change of a stored thread or post.
+
+    Attributes:
+        old: The record before the change. None if it was created.
+        new: The record after the change. None if it was deleted.
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    old: Thread | Post | None = None
+    new: Thread | Post | None = None
+
+
+class AbstractReadViews(ABC):
+    """Defines the interface for the materialized read views.
+
+    - The thread list holds a copy of every thread, with its counters, in the order of their IDs.
+    - The recent post feed holds the latest posts of all threads, newest first.
+
+    The updates are idempotent, so a change delivered twice is applied once.
+    """
+
+    @abstractmethod
+    def save_thread(self, thread: Thread) -> None:
+        """Put the thread into the thread list, unless a later version of it is there already.
+
+        Args:
+            thread: The thread as stored.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_thread(self, thread_id: ULID) -> None:
+        """Remove the thread from the thread list, and its posts from the recent post feed.
+
+        Args:
+            thread_id: The ID of the thread.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_threads(self) -> list[Thread]:
+        """List the threads of the thread list.
+
+        Returns:
+            The threads, in ascending order of their IDs.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_recent_post(self, post: Post) -> None:
+        """Put the post into the recent post feed.
+
+        Args:
+            post: The post as stored.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_recent_post(self, post: Post) -> None:
+        """Remove the post from the recent post feed. Does nothing if it is not there.
+
+        Args:
+            post: The post as stored.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_recent_posts(self, *, limit: int) -> list[Post]:
+        """List the latest posts of the recent post feed.
+
+        Args:
+            limit: The maximum number of posts to list.
+
+        Returns:
+            The posts, newest first.
+        """
+        raise NotImplementedError
@@ -1,6 +1,41 @@
 """Infrastructure layer."""
 
+from .buffered import BufferedPostRepository
+from .idempotency import DynamoDBIdempotencyStore
+from .in_memory import (
+    InMemoryIdempotencyStore,
+    InMemoryPostRepository,
+    InMemoryPostSearchIndex,
+    InMemoryReadViews,
+    InMemoryThreadRepository,
+)
 from .post import DynamoDBPostRepository
+from .search import DynamoDBPostSearchIndex
+from .sqlite import (
+    SQLiteDatabase,
+    SQLiteIdempotencyStore,
+    SQLitePostRepository,
+    SQLitePostSearchIndex,
+    SQLiteThreadRepository,
+)
 from .thread import DynamoDBThreadRepository
+from .views import DynamoDBReadViews
 
-__all__ = ["DynamoDBPostRepository", "DynamoDBThreadRepository"]
+__all__ = [
+    "BufferedPostRepository",
+    "DynamoDBIdempotencyStore",
+    "DynamoDBPostRepository",
+    "DynamoDBPostSearchIndex",
+    "DynamoDBReadViews",
+    "DynamoDBThreadRepository",
+    "InMemoryIdempotencyStore",
+    "InMemoryPostRepository",
+    "InMemoryPostSearchIndex",
+    "InMemoryReadViews",
+    "InMemoryThreadRepository",
+    "SQLiteDatabase",
+    "SQLiteIdempotencyStore",
+    "SQLitePostRepository",
+    "SQLitePostSearchIndex",
+    "SQLiteThreadRepository",
+]
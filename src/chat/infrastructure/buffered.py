@@ -0,0 +1,217 @@
+"""Write-behind buffering of the post saves.
+
+`BufferedPostRepository` wraps another post repository and defers its saves: the posts are held
+in memory and written together with `save_all` when the buffer is full, or when `flush` is
+called, which the handler does at the end of every request. A request that creates many posts,
+such as a batch request, then sends a few batch writes instead of one write per post.
+
+Durability is explicit:
+
+- A saved post is written once a `flush` that includes it returns. Until then it only lives in
+  the memory of the process, so the handler flushes before the response is sent, and before
+  the response of an idempotent request is recorded.
+- The writes that go with a post saved by `save_with`, such as the counters of its thread and
+  its search index entries, are deferred with it, and made once the posts are written.
+- If a flush raises, the error is surfaced to its caller, and the posts it held are dropped from
+  the buffer, some of them possibly written, along with the writes that go with them. They are
+  not retried by a later flush, whose caller would not expect them.
+- A read or a deletion in a thread flushes first if the thread has buffered posts, so it sees
+  them. The reads of the other threads do not wait for the buffer.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from chat.domain.post import AbstractPostRepository, Post
+from chat.shared.tracing import tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from datetime import datetime
+
+    from ulid import ULID
+
+# The number of posts buffered before they are written, four BatchWriteItem requests.
+DEFAULT_MAX_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedPostRepository(AbstractPostRepository):
+    """Post repository that buffers the saves of another one and writes them in batches."""
+
+    def __init__(self, repository: AbstractPostRepository, *, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Initialize the repository.
+
+        Args:
+            repository: The repository to write the posts to.
+            max_size: The number of buffered posts at which they are written.
+
+        Raises:
+            ValueError: If the size is not positive.
+        """
+        if max_size < 1:
+            error_message = "The buffer size must be positive."
+            raise ValueError(error_message)
+        self._repository = repository
+        self._max_size = max_size
+        self._lock = threading.RLock()
+        self._pending: dict[tuple[ULID, ULID], Post] = {}
+        self._pending_threads: set[ULID] = set()
+        self._pending_writes: list[Callable[[], None]] = []
+
+    @property
+    def pending(self) -> int:
+        """The number of posts waiting to be written."""
+        return len(self._pending)
+
+    def save(self, post: Post) -> None:
+        """Buffer the given Post instance, and write the buffer if it is full.
+
+        A post saved again before it is written is only written in its last version.
+
+        Args:
+            post: The Post instance to be saved.
+
+        Raises:
+            Exception: The error of the write, if the buffer is written and it fails.
+        """
+        self.save_all([post])
+
+    def save_all(self, posts: Iterable[Post]) -> None:
+        """Buffer the given Post instances, and write the buffer if it is full.
+
+        Args:
+            posts: The Post instances to be saved.
+
+        Raises:
+            Exception: The error of the write, if the buffer is written and it fails.
+        """
+        with self._lock:
+            for post in posts:
+                self._pending[post.thread_id, post.id_] = post.model_copy()
+                self._pending_threads.add(post.thread_id)
+            if len(self._pending) >= self._max_size:
+                self.flush()
+
+    def save_with(
+        self,
+        post: Post,
+        *,
+        before: Callable[[], None] | None = None,
+        after: Callable[[], None] | None = None,
+    ) -> None:
+        """Buffer the given Post instance, along with the writes that go with it.
+
+        Both `before` and `after` run once the post is written, so that if the post cannot be
+        written, neither are they. If `before` then fails, the post is written nonetheless.
+
+        Args:
+            post: The Post instance to be saved.
+            before: The writes that the post depends on, such as the counters of its thread.
+            after: The writes that depend on the post, such as its search index entries.
+
+        Raises:
+            Exception: The error of the write, if the buffer is written and it fails.
+        """
+        with self._lock:
+            self._pending_writes.extend(write for write in (before, after) if write)
+            self.save_all([post])
+
+    def flush(self) -> None:
+        """Write the buffered posts with a single `save_all`, then the writes that go with them.
+
+        Raises:
+            Exception: The error of the write. The buffered posts are dropped, and may be
+                partially written; the writes that go with them are dropped and not made. If a
+                write that goes with a post fails, the others are made, then its error is raised.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            posts = list(self._pending.values())
+            writes = self._pending_writes
+            self._pending.clear()
+            self._pending_threads.clear()
+            self._pending_writes = []
+            self._write(posts, writes)
+
+    @tracer.capture_method(capture_response=False)
+    def _write(self, posts: list[Post], writes: list[Callable[[], None]]) -> None:
+        try:
+            self._repository.save_all(posts)
+        except Exception:
+            logger.warning("Dropped %d buffered posts after a failed write", len(posts))
+            raise
+
+        error: Exception | None = None
+        for write in writes:
+            try:
+                write()
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Failed a write that goes with the buffered posts", exc_info=True)
+                error = error or e
+        if error:
+            raise error
+
+    def _flush_thread(self, thread_id: ULID) -> None:
+        """Write the buffer if it holds posts of the thread."""
+        with self._lock:
+            if thread_id in self._pending_threads:
+                self.flush()
+
+    def list_by_thread_id(  # noqa: PLR0913
+        self,
+        thread_id: ULID,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: ULID | None = None,
+        limit: int | None = None,
+    ) -> list[Post]:
+        """List all posts with the specified thread ID, including the buffered ones.
+
+        Args:
+            thread_id: The ULID of the thread to find.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+            after: The ID of the post to list posts after, exclusive.
+            limit: The maximum number of posts to list.
+
+        Returns:
+            A list of Post instances with the specified thread ID.
+        """
+        self._flush_thread(thread_id)
+        return self._repository.list_by_thread_id(thread_id, start=start, end=end, after=after, limit=limit)
+
+    def iter_by_thread_id(
+        self, thread_id: ULID, *, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[Post]:
+        """Iterate over all posts with the specified thread ID, including the buffered ones.
+
+        Args:
+            thread_id: The ULID of the thread to find.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+
+        Returns:
+            An iterator over the Post instances with the specified thread ID.
+        """
+        self._flush_thread(thread_id)
+        return self._repository.iter_by_thread_id(thread_id, start=start, end=end)
+
+    def delete(self, thread_id: ULID, post_id: ULID) -> None:
+        """Delete the Post with the given ID, buffered or not.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to delete.
+
+        Raises:
+            PostNotFoundError: If the post with the given ID does not exist.
+        """
+        self._flush_thread(thread_id)
+        self._repository.delete(thread_id, post_id)
@@ -0,0 +1,231 @@
+"""The change stream of the chat table, and a local stand-in for it.
+
+In AWS, the table has a DynamoDB stream of the new and old images of its items, which Lambda
+delivers to the change stream handler in batches. `to_change` turns the images of a stream record
+into the change of a thread or a post; the records of the other items, such as the search index
+and the read views themselves, are not changes of the model and are skipped.
+
+`ChangeStreamSimulator` stands in for the stream where there is none, such as with moto or
+DynamoDB Local. It is a `TableProxy` handler that reads the images of every item before and after
+each write sent through the proxy, and records the writes that changed an item as records shaped
+like those of DynamoDB Streams. `replay` then delivers them to a handler in batches, the way the
+event source mapping of Lambda does, so the whole pipeline runs offline.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from boto3.dynamodb.types import TypeSerializer
+
+from chat.domain.views import Change
+
+from .dynamodb import TableProxy
+from .post import PostData
+from .thread import ThreadData
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from mypy_boto3_dynamodb.service_resource import Table
+
+    from chat.domain.post import Post
+    from chat.domain.thread import Thread
+
+T = TypeVar("T")
+
+KEY_ATTRIBUTES = ("thread_id", "post_id")
+WRITE_OPERATIONS = frozenset({"put_item", "update_item", "delete_item", "batch_write_item", "transact_write_items"})
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+
+def _to_model(image: Mapping[str, Any] | None) -> Thread | Post | None:
+    if not image:
+        return None
+    if image.get("category") == "Thread":
+        return ThreadData.model_validate(image).to_model()
+    if image.get("category") == "Post":
+        return PostData.model_validate(image).to_model()
+    return None
+
+
+def to_change(old_image: Mapping[str, Any] | None, new_image: Mapping[str, Any] | None) -> Change | None:
+    """Convert the images of a stream record into the change of a thread or a post.
+
+    Args:
+        old_image: The item before the change, deserialized. None if it was created.
+        new_image: The item after the change, deserialized. None if it was deleted.
+
+    Returns:
+        The change, or None if the item is neither a thread nor a post.
+    """
+    old, new = _to_model(old_image), _to_model(new_image)
+    if old is None and new is None:
+        return None
+    return Change(old=old, new=new)
+
+
+def _written_keys(table_name: str, operation: str, kwargs: Mapping[str, Any]) -> list[tuple[str, str]]:
+    """Return the keys of the items that a write request may change."""
+    if operation == "put_item":
+        keys = [kwargs["Item"]]
+    elif operation in {"update_item", "delete_item"}:
+        keys = [kwargs["Key"]]
+    elif operation == "batch_write_item":
+        keys = [
+            request["PutRequest"]["Item"] if "PutRequest" in request else request["DeleteRequest"]["Key"]
+            for request in kwargs["RequestItems"].get(table_name, [])
+        ]
+    else:
+        keys = [
+            action.get("Item") or action["Key"]
+            for item in kwargs["TransactItems"]
+            for kind, action in item.items()
+            if kind in {"Put", "Update", "Delete"} and action["TableName"] == table_name
+        ]
+    return list(dict.fromkeys(tuple(key[name] for name in KEY_ATTRIBUTES) for key in keys))
+
+
+class ChangeStreamSimulator:
+    """Local stand-in for the DynamoDB stream of a table, with new and old images.
+
+    The writes sent through the proxy returned by `wrap` are serialized, so the images read around
+    a write are those of that write. The records are kept until they are replayed.
+
+    Attributes:
+        discarded: The records given up on after failing `max_attempts` times, like the records
+            that Lambda sends to the on-failure destination of an event source mapping.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the simulator."""
+        self._lock = threading.RLock()
+        self._table: Table | None = None
+        self._records: list[dict[str, Any]] = []
+        self._sequence_number = 0
+        self._serializer = TypeSerializer()
+        self.discarded: list[dict[str, Any]] = []
+
+    @property
+    def pending(self) -> int:
+        """The number of records waiting to be replayed."""
+        return len(self._records)
+
+    def wrap(self, table: Table) -> Table:
+        """Return a proxy of the table whose writes are recorded.
+
+        Args:
+            table: The DynamoDB table instance.
+
+        Returns:
+            The proxy of the table.
+        """
+        self._table = table
+        return cast("Table", TableProxy(table, self))
+
+    def call(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Send a request, and record the changes of the items if it is a write.
+
+        Args:
+            operation: The name of the operation.
+            fn: The function that sends the request.
+            *args: The positional arguments of the request.
+            **kwargs: The keyword arguments of the request.
+
+        Returns:
+            The response of the request.
+        """
+        if operation not in WRITE_OPERATIONS or self._table is None:
+            return fn(*args, **kwargs)
+
+        keys = _written_keys(self._table.name, operation, kwargs)
+        with self._lock:
+            old_images = [self._get(key) for key in keys]
+            response = fn(*args, **kwargs)
+            for key, old_image in zip(keys, old_images, strict=True):
+                new_image = self._get(key)
+                if new_image != old_image:
+                    self._record(key, old_image, new_image)
+        return response
+
+    def _get(self, key: tuple[str, str]) -> dict[str, Any] | None:
+        table = cast("Table", self._table)
+        return table.get_item(Key=dict(zip(KEY_ATTRIBUTES, key, strict=True)), ConsistentRead=True).get("Item")
+
+    def _record(self, key: tuple[str, str], old_image: dict[str, Any] | None, new_image: dict[str, Any] | None) -> None:
+        """Record a change of an item, in the format of the records of DynamoDB Streams."""
+        self._sequence_number += 1
+        sequence_number = str(self._sequence_number).zfill(21)
+        stream_record: dict[str, Any] = {
+            "ApproximateCreationDateTime": int(time.time()),
+            "Keys": {name: self._serializer.serialize(value) for name, value in zip(KEY_ATTRIBUTES, key, strict=True)},
+            "SequenceNumber": sequence_number,
+            "StreamViewType": "NEW_AND_OLD_IMAGES",
+        }
+        for name, image in (("OldImage", old_image), ("NewImage", new_image)):
+            if image is not None:
+                stream_record[name] = {
+                    attribute: self._serializer.serialize(value) for attribute, value in image.items()
+                }
+        stream_record["SizeBytes"] = len(json.dumps(stream_record))
+        table = cast("Table", self._table)
+        self._records.append(
+            {
+                "eventID": sequence_number,
+                "eventName": "INSERT" if old_image is None else "REMOVE" if new_image is None else "MODIFY",
+                "eventVersion": "1.1",
+                "eventSource": "aws:dynamodb",
+                "awsRegion": table.meta.client.meta.region_name,
+                "dynamodb": stream_record,
+                "eventSourceARN": f"arn:aws:dynamodb:local:000000000000:table/{table.name}/stream/local",
+            }
+        )
+
+    def replay(
+        self,
+        handler: Callable[[dict[str, Any], Any], Mapping[str, Any] | None],
+        context: Any = None,  # noqa: ANN401
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> int:
+        """Deliver the pending records to the handler in batches, in the order they were recorded.
+
+        Like the event source mapping of Lambda with `ReportBatchItemFailures`, a batch that
+        reports a failed record is retried from that record on. A record that still fails after
+        `max_attempts` deliveries is discarded, and the records after it are delivered. The
+        records of the writes that the handler makes are delivered too, until there are none left.
+
+        Args:
+            handler: The change stream handler.
+            context: The Lambda context to pass to the handler.
+            batch_size: The maximum number of records of a batch.
+            max_attempts: The number of times a failing record is delivered before it is discarded.
+
+        Returns:
+            The number of records processed successfully.
+        """
+        processed = attempts = 0
+        while batch := self._records[:batch_size]:
+            response = handler({"Records": batch}, context) or {}
+            failures = {failure["itemIdentifier"] for failure in response.get("batchItemFailures", [])}
+            done = next(
+                (i for i, record in enumerate(batch) if record["dynamodb"]["SequenceNumber"] in failures), len(batch)
+            )
+            processed += done
+            attempts = attempts + 1 if done < len(batch) else 0
+            if attempts >= max_attempts:
+                logger.warning("Discarded a change stream record after %d attempts", attempts)
+                self.discarded.append(batch[done])
+                done += 1
+                attempts = 0
+            with self._lock:
+                del self._records[:done]
+        return processed
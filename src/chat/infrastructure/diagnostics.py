@@ -0,0 +1,219 @@
+"""Diagnostics of the queries of the repositories.
+
+The repository methods that query the table wrap their queries in `diagnose`, and the table is
+wrapped in `DiagnosedTable`, a proxy of the boto3 table that adds up the metadata of every query
+page: the number of pages, the `Count` and `ScannedCount` of the items, and the
+`LastEvaluatedKey` that the method did not follow. Each call of a method is then summarized in
+a `QueryDiagnostics`, kept by the `QueryInspector` until the end of the invocation.
+
+The inspector warns about the calls whose result was truncated, i.e. that stopped with pages
+left unread without reaching their limit, and the calls that read many more items than they
+returned, e.g. because of a filter expression. The diagnostics can also be explained in a line,
+for a debug response header.
+
+The current call is a context variable, so the pages queried by the workers of the executor are
+added up on the call that submitted them.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from .dynamodb import PAGED_OPERATIONS, TableProxy, count_items
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from mypy_boto3_dynamodb.service_resource import Table
+
+T = TypeVar("T")
+
+DEFAULT_SCAN_RATIO = 4.0
+DEFAULT_MIN_SCANNED = 100
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[QueryDiagnostics | None] = ContextVar("query_diagnostics", default=None)
+
+
+def _key(key: dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in key.items()))
+
+
+@dataclass
+class QueryDiagnostics:
+    """The queries sent by a call of a repository method.
+
+    Attributes:
+        name: The name of the method.
+        limit: The maximum number of items the call asked for, if any.
+        index: The index queried, if any.
+        pages: The number of pages fetched.
+        items_returned: The number of items returned by the pages.
+        items_scanned: The number of items read to find them, before the filters.
+        duration_ms: The duration of the call, in milliseconds.
+        inspector: The inspector that recorded the pages, which the finished call is handed to.
+    """
+
+    name: str
+    limit: int | None = None
+    index: str | None = None
+    pages: int = 0
+    items_returned: int = 0
+    items_scanned: int = 0
+    duration_ms: float = 0.0
+    inspector: QueryInspector | None = field(default=None, repr=False)
+    _unread: set[tuple[tuple[str, str], ...]] = field(default_factory=set, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the call stopped with pages left unread."""
+        return bool(self._unread)
+
+    @property
+    def scan_ratio(self) -> float:
+        """The number of items read per item returned."""
+        return self.items_scanned / max(self.items_returned, 1)
+
+    def add_page(self, request: dict[str, Any], response: dict[str, Any], inspector: QueryInspector) -> None:
+        """Add up a page queried for the call.
+
+        Args:
+            request: The parameters of the query.
+            response: The response of the query.
+            inspector: The inspector that recorded the page.
+        """
+        returned, scanned = count_items("query", response)
+        with self._lock:
+            self.inspector = inspector
+            self.pages += 1
+            self.items_returned += returned
+            self.items_scanned += scanned
+            self.index = self.index or request.get("IndexName")
+            if start_key := request.get("ExclusiveStartKey"):
+                self._unread.discard(_key(start_key))
+            if last_key := response.get("LastEvaluatedKey"):
+                self._unread.add(_key(last_key))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the diagnostics to a JSON-serializable dictionary, for the log."""
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "index": self.index,
+            "pages": self.pages,
+            "items_returned": self.items_returned,
+            "items_scanned": self.items_scanned,
+            "truncated": self.truncated,
+            "duration_ms": round(self.duration_ms, 3),
+        }
+
+    def explain(self) -> str:
+        """Explain the diagnostics in a line, such as `thread.list_all(index=by_category pages=1 ...)`."""
+        details = [f"index={self.index}"] if self.index else []
+        details += [f"pages={self.pages}", f"returned={self.items_returned}", f"scanned={self.items_scanned}"]
+        if self.limit is not None:
+            details.append(f"limit={self.limit}")
+        if self.truncated:
+            details.append("truncated")
+        details.append(f"{self.duration_ms:.1f}ms")
+        return f"{self.name}({' '.join(details)})"
+
+
+@contextmanager
+def diagnose(name: str, *, limit: int | None = None) -> Iterator[QueryDiagnostics]:
+    """Record the queries sent within the block as a call of a repository method.
+
+    The queries are recorded only if they are sent through a `DiagnosedTable`.
+
+    Args:
+        name: The name of the method, such as `thread.list_all`.
+        limit: The maximum number of items the call asks for, if any. A call that stops with
+            pages left unread after reaching it is not reported as truncated.
+
+    Yields:
+        The diagnostics of the call.
+    """
+    diagnostics = QueryDiagnostics(name, limit)
+    token = _current.set(diagnostics)
+    started_at = time.perf_counter()
+    try:
+        yield diagnostics
+    finally:
+        _current.reset(token)
+        diagnostics.duration_ms = (time.perf_counter() - started_at) * 1000
+        if diagnostics.inspector:
+            diagnostics.inspector.finish(diagnostics)
+
+
+class QueryInspector:
+    """Collects the diagnostics of the calls of the repository methods, and warns about the poor ones."""
+
+    def __init__(self, *, scan_ratio: float = DEFAULT_SCAN_RATIO, min_scanned: int = DEFAULT_MIN_SCANNED) -> None:
+        """Initialize the inspector.
+
+        Args:
+            scan_ratio: The number of items read per item returned, above which a call is
+                reported as inefficient.
+            min_scanned: The number of items that a call must read to be reported as inefficient.
+        """
+        self._scan_ratio = scan_ratio
+        self._min_scanned = min_scanned
+        self._lock = threading.Lock()
+        self._calls: list[QueryDiagnostics] = []
+
+    def call(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Send a request, adding up its page on the current call if it is a query.
+
+        Args:
+            operation: The name of the operation.
+            fn: The function that sends the request.
+            *args: The positional arguments of the request.
+            **kwargs: The keyword arguments of the request.
+
+        Returns:
+            The response of the request.
+        """
+        response: Any = fn(*args, **kwargs)
+        if operation in PAGED_OPERATIONS and (diagnostics := _current.get()) is not None:
+            diagnostics.add_page(kwargs, response, self)
+        return response  # type: ignore[no-any-return]
+
+    def finish(self, diagnostics: QueryDiagnostics) -> None:
+        """Keep the diagnostics of a finished call, warning about it if it was poor.
+
+        Args:
+            diagnostics: The diagnostics of the call.
+        """
+        if diagnostics.truncated and (diagnostics.limit is None or diagnostics.items_returned < diagnostics.limit):
+            logger.warning("Query result truncated", extra={"query": diagnostics.to_dict()})
+        if diagnostics.items_scanned >= self._min_scanned and diagnostics.scan_ratio > self._scan_ratio:
+            logger.warning("Query read more items than it returned", extra={"query": diagnostics.to_dict()})
+        with self._lock:
+            self._calls.append(diagnostics)
+
+    def collect(self) -> list[QueryDiagnostics]:
+        """Return the diagnostics of the calls finished since the previous collection."""
+        with self._lock:
+            calls, self._calls = self._calls, []
+        return calls
+
+
+class DiagnosedTable(TableProxy):
+    """Proxy of a DynamoDB table whose queries are added up on the current call of a repository method."""
+
+    def __init__(self, table: Table, inspector: QueryInspector) -> None:
+        """Initialize the proxy.
+
+        Args:
+            table: The DynamoDB table instance.
+            inspector: The inspector to collect the diagnostics with.
+        """
+        super().__init__(table, inspector)
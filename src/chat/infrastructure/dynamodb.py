@@ -0,0 +1,195 @@
+"""Helpers shared by the DynamoDB repositories."""
+
+from __future__ import annotations
+
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
+
+from boto3.dynamodb.table import BatchWriter
+
+from chat.shared.exceptions import UnprocessedItemsError, UnprocessedKeysError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from mypy_boto3_dynamodb.client import DynamoDBClient
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_dynamodb.type_defs import KeysAndAttributesTypeDef, WriteRequestTypeDef
+
+T = TypeVar("T")
+
+BATCH_GET_LIMIT = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BACKOFF = 0.05
+BATCH_WRITE_LIMIT = 25
+BATCH_WRITE_MAX_ATTEMPTS = 5
+BATCH_WRITE_BACKOFF = 0.05
+
+# The data operations sent through the table, and through `table.meta.client`.
+TABLE_OPERATIONS = frozenset({"get_item", "query", "scan", "put_item", "update_item", "delete_item"})
+CLIENT_OPERATIONS = frozenset({"batch_get_item", "batch_write_item", "transact_write_items", "transact_get_items"})
+PAGED_OPERATIONS = frozenset({"query", "scan"})
+
+
+def batch_get_items(table: Table, keys: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Get up to `BATCH_GET_LIMIT` items with a single BatchGetItem request.
+
+    The keys that DynamoDB leaves unprocessed are retried with exponential backoff.
+    The items are returned in no particular order, and missing items are skipped.
+
+    Args:
+        table: The DynamoDB table instance.
+        keys: The primary keys of the items to get.
+
+    Returns:
+        The items found.
+
+    Raises:
+        UnprocessedKeysError: If some keys are still unprocessed after the last attempt.
+    """
+    items: list[dict[str, Any]] = []
+    request: dict[str, KeysAndAttributesTypeDef] = {table.name: {"Keys": keys}}
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(BATCH_GET_BACKOFF * 2 ** (attempt - 1))
+        # The client of a resource serializes and deserializes the attribute values like the resource does.
+        response = table.meta.client.batch_get_item(RequestItems=request)
+        items.extend(response["Responses"].get(table.name, []))
+        request = response.get("UnprocessedKeys", {})  # type: ignore[assignment]
+        if not request:
+            return items
+
+    raise UnprocessedKeysError(len(request[table.name]["Keys"]))
+
+
+def batch_write_items(table: Table, items: list[dict[str, Any]]) -> None:
+    """Put up to `BATCH_WRITE_LIMIT` items with a single BatchWriteItem request.
+
+    The items that DynamoDB leaves unprocessed are retried with exponential backoff. Unlike the
+    batch writer of boto3, which resends them for as long as it takes, the retries are bounded so
+    a caller that waits for the items to be written gets an error instead.
+
+    Args:
+        table: The DynamoDB table instance.
+        items: The items to put. No two of them may have the same primary key.
+
+    Raises:
+        UnprocessedItemsError: If some items are still unprocessed after the last attempt.
+    """
+    request: dict[str, list[WriteRequestTypeDef]] = {table.name: [{"PutRequest": {"Item": item}} for item in items]}
+    for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(BATCH_WRITE_BACKOFF * 2 ** (attempt - 1))
+        response = table.meta.client.batch_write_item(RequestItems=request)
+        request = response.get("UnprocessedItems", {})  # type: ignore[assignment]
+        if not request:
+            return
+
+    raise UnprocessedItemsError(len(request[table.name]))
+
+
+def count_items(operation: str, response: dict[str, Any]) -> tuple[int, int]:
+    """Count the items of the response of a request.
+
+    Args:
+        operation: The name of the operation.
+        response: The response of the request.
+
+    Returns:
+        The number of items returned, and the number of items read to find them.
+    """
+    if operation in PAGED_OPERATIONS:
+        return response.get("Count", 0), response.get("ScannedCount", 0)
+    if operation == "get_item":
+        found = int("Item" in response)
+        return found, found
+    if operation == "batch_get_item":
+        found = sum(len(items) for items in response.get("Responses", {}).values())
+        return found, found
+    if operation == "transact_get_items":
+        found = sum(1 for item in response.get("Responses", []) if item.get("Item"))
+        return found, found
+    return 0, 0
+
+
+class RequestHandler(Protocol):
+    """Sends the requests of a `TableProxy`."""
+
+    def call(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Send a request.
+
+        Args:
+            operation: The name of the operation.
+            fn: The function that sends the request.
+            *args: The positional arguments of the request.
+            **kwargs: The keyword arguments of the request.
+
+        Returns:
+            The response of the request.
+        """
+        ...
+
+
+class _ClientProxy:
+    """Proxy of a DynamoDB client whose data operations are sent through a handler."""
+
+    def __init__(self, client: DynamoDBClient, handler: RequestHandler) -> None:
+        self._client = client
+        self._handler = handler
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Return the attribute of the client, with the data operations wrapped."""
+        attribute = getattr(self._client, name)
+        if name in CLIENT_OPERATIONS:
+            return partial(self._handler.call, name, attribute)
+        return attribute
+
+
+class _MetaProxy:
+    """Proxy of the `meta` of a table, with the client replaced by its proxy."""
+
+    def __init__(self, meta: Any, client: _ClientProxy) -> None:  # noqa: ANN401
+        self._meta = meta
+        self.client = client
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Return the attribute of the table meta."""
+        return getattr(self._meta, name)
+
+
+class TableProxy:
+    """Proxy of a DynamoDB table whose data operations are sent through a handler.
+
+    It can be used wherever the repositories expect a table, including the requests they send
+    through `table.meta.client` and the batch writer. Proxies can be stacked.
+    """
+
+    def __init__(self, table: Table, handler: RequestHandler) -> None:
+        """Initialize the proxy.
+
+        Args:
+            table: The DynamoDB table instance, or another proxy of it.
+            handler: The handler to send the requests through.
+        """
+        self._table = table
+        self._handler = handler
+        self.meta = _MetaProxy(table.meta, _ClientProxy(table.meta.client, handler))
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Return the attribute of the table, with the data operations wrapped."""
+        attribute = getattr(self._table, name)
+        if name in TABLE_OPERATIONS:
+            return partial(self._handler.call, name, attribute)
+        return attribute
+
+    def batch_writer(self, overwrite_by_pkeys: list[str] | None = None) -> BatchWriter:
+        """Create a batch writer whose requests are sent through the handler.
+
+        Args:
+            overwrite_by_pkeys: The keys to deduplicate the buffered requests by.
+
+        Returns:
+            The batch writer.
+        """
+        return BatchWriter(self._table.name, self.meta.client, overwrite_by_pkeys=overwrite_by_pkeys)  # type: ignore[arg-type]
@@ -0,0 +1,153 @@
+"""Idempotency store implementation.
+
+The records are stored in the chat table under the partition "Idempotency#{key}" with the sort
+key "-". They have no category, so they stay out of the `by_category` index. The `expires_at`
+attribute holds the expiration time in epoch seconds and is the time to live attribute of the
+table; since DynamoDB deletes expired items lazily, an expired record is also overwritten when
+the key is used again.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Self
+
+from pydantic import BaseModel
+
+from chat.domain.idempotency import AbstractIdempotencyStore, IdempotencyRecord
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+IDEMPOTENCY_PREFIX = "Idempotency#"
+DEFAULT_TTL = timedelta(hours=1)
+# Longer than the API Gateway integration timeout, so a request cannot run twice concurrently.
+DEFAULT_IN_PROGRESS_TTL = timedelta(seconds=60)
+
+
+def _key(key: str) -> dict[str, str]:
+    return {"thread_id": f"{IDEMPOTENCY_PREFIX}{key}", "post_id": "-"}
+
+
+class IdempotencyData(BaseModel):
+    """Idempotency record data model for DynamoDB record.
+
+    Attributes:
+        thread_id: The partition key, "Idempotency#{key}".
+        post_id: The sort key. Always "-".
+        fingerprint: The hash of the request.
+        status_code: The status code of the response.
+        body: The body of the response.
+        expires_at: The expiration time of the record, in epoch seconds.
+    """
+
+    thread_id: str
+    post_id: str
+    fingerprint: str
+    status_code: int | None = None
+    body: str | None = None
+    expires_at: int
+
+    @classmethod
+    def from_model(cls, key: str, model: IdempotencyRecord, expires_at: datetime) -> Self:
+        """Create an IdempotencyData instance from an IdempotencyRecord model.
+
+        Args:
+            key: The idempotency key.
+            model: The IdempotencyRecord model to convert.
+            expires_at: The expiration time of the record.
+
+        Returns:
+            The converted IdempotencyData instance.
+        """
+        return cls(
+            **_key(key),
+            fingerprint=model.fingerprint,
+            status_code=model.status_code,
+            body=model.body,
+            expires_at=int(expires_at.timestamp()),
+        )
+
+    def to_model(self) -> IdempotencyRecord:
+        """Convert the IdempotencyData instance to an IdempotencyRecord model.
+
+        Returns:
+            The converted IdempotencyRecord model.
+        """
+        return IdempotencyRecord(fingerprint=self.fingerprint, status_code=self.status_code, body=self.body)
+
+
+class DynamoDBIdempotencyStore(AbstractIdempotencyStore):
+    """DynamoDB implementation of the idempotency store."""
+
+    def __init__(
+        self,
+        table: Table,
+        *,
+        ttl: timedelta = DEFAULT_TTL,
+        in_progress_ttl: timedelta = DEFAULT_IN_PROGRESS_TTL,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            table: The DynamoDB table instance.
+            ttl: How long the response of a request is replayed.
+            in_progress_ttl: How long a request in progress blocks its retries, in case it never completes.
+        """
+        self._table = table
+        self._ttl = ttl
+        self._in_progress_ttl = in_progress_ttl
+
+    def start(self, key: str, fingerprint: str) -> IdempotencyRecord | None:
+        """Start a record for the given key, unless there is one already.
+
+        The record is put conditionally, so of concurrent requests with the same key only one
+        starts it.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+
+        Returns:
+            None if the record was started, or the existing record of the key.
+        """
+        client = self._table.meta.client
+        while True:
+            now = datetime.now(UTC)
+            item = IdempotencyData.from_model(
+                key, IdempotencyRecord(fingerprint=fingerprint), now + self._in_progress_ttl
+            )
+            try:
+                self._table.put_item(
+                    Item=item.model_dump(exclude_none=True),
+                    ConditionExpression="attribute_not_exists(thread_id) OR expires_at < :now",
+                    ExpressionAttributeValues={":now": int(now.timestamp())},
+                )
+            except client.exceptions.ConditionalCheckFailedException:
+                existing = self._table.get_item(Key=_key(key), ConsistentRead=True).get("Item")
+                # The record may have been released in the meantime; if so, try again.
+                if existing:
+                    return IdempotencyData.model_validate(existing).to_model()
+            else:
+                return None
+
+    def complete(self, key: str, fingerprint: str, status_code: int, body: str | None) -> None:
+        """Record the response of the request started with the given key.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+            status_code: The status code of the response.
+            body: The body of the response.
+        """
+        record = IdempotencyRecord(fingerprint=fingerprint, status_code=status_code, body=body)
+        item = IdempotencyData.from_model(key, record, datetime.now(UTC) + self._ttl)
+        self._table.put_item(Item=item.model_dump(exclude_none=True))
+
+    def release(self, key: str) -> None:
+        """Delete the record of the given key, so the request can be retried.
+
+        Args:
+            key: The idempotency key.
+        """
+        self._table.delete_item(Key=_key(key))
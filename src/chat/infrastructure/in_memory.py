@@ -0,0 +1,561 @@
+"""In-memory implementations of the repositories, for local development, tests and benchmarks.
+
+The records are kept in the memory of the process, so they are lost when it exits and are not
+shared between instances of the function. Every structure is keyed the way the table is, so the
+repositories answer the same queries with the same results, in memory time:
+
+- the threads are kept sorted by their IDs, and their normalized names in a sorted name index
+  that makes the names unique and serves the lookups and prefix searches by bisection;
+- the posts of each thread are kept sorted by their IDs, which sort by creation time, so a
+  listing bisects to its first post and slices up to its limit;
+- the search index keeps the postings of each term, so a search reads the posts that contain
+  the terms only;
+- the read views keep the thread list sorted by the thread IDs, and the recent post feed sorted
+  by the post IDs, so the feed is read from its end.
+
+The stored models are copies of the saved ones, and the models returned are copies of the stored
+ones, so a caller cannot change the stored records without saving them. The repositories are
+safe to use from the workers of an executor.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from chat.domain.idempotency import AbstractIdempotencyStore, IdempotencyRecord
+from chat.domain.post import AbstractPostRepository, Post
+from chat.domain.search import AbstractPostSearchIndex, tokenize
+from chat.domain.thread import AbstractThreadRepository, Thread, normalize_name
+from chat.domain.views import AbstractReadViews
+from chat.shared.exceptions import (
+    PostNotFoundError,
+    ThreadExistsError,
+    ThreadNotFoundError,
+    ThreadVersionConflictError,
+)
+
+from .idempotency import DEFAULT_IN_PROGRESS_TTL, DEFAULT_TTL
+from .views import RECENT_POST_TTL
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from ulid import ULID
+
+# The number of posts copied out of a thread at a time while it is iterated.
+ITER_PAGE_SIZE = 100
+
+
+def _timestamp_bound(value: datetime) -> bytes:
+    """Return the 48-bit timestamp prefix that the IDs generated at the given time start with.
+
+    Every ID generated at or after the time sorts at or after the prefix, like `_lower_bound` of
+    the DynamoDB post repository.
+    """
+    return int(value.timestamp() * 1000).to_bytes(6, "big")
+
+
+class InMemoryThreadRepository(AbstractThreadRepository):
+    """In-memory implementation of the thread repository."""
+
+    def __init__(self) -> None:
+        """Initialize the repository."""
+        self._lock = threading.RLock()
+        self._threads: dict[ULID, Thread] = {}
+        self._ids: list[ULID] = []
+        # The sorted normalized names, and the thread that owns each of them.
+        self._names: list[str] = []
+        self._owners: dict[str, ULID] = {}
+
+    def save(self, thread: Thread) -> None:
+        """Save the given Thread instance to the repository.
+
+        Args:
+            thread: The Thread instance to be saved.
+
+        Raises:
+            ThreadExistsError: If another thread has the same normalized name.
+            ThreadVersionConflictError: If the stored thread has another version.
+        """
+        name = normalize_name(thread.name)
+        with self._lock:
+            stored = self._threads.get(thread.id_)
+            if (stored.version if stored else 0) != thread.version:
+                raise ThreadVersionConflictError(thread.id_)
+            if self._owners.get(name, thread.id_) != thread.id_:
+                raise ThreadExistsError(thread.name)
+
+            if stored is None:
+                insort(self._ids, thread.id_)
+            elif (previous := normalize_name(stored.name)) != name:
+                self._remove_name(previous)
+            if name not in self._owners:
+                insort(self._names, name)
+                self._owners[name] = thread.id_
+            thread.version += 1
+            self._threads[thread.id_] = thread.model_copy()
+
+    def _remove_name(self, name: str) -> None:
+        del self._names[bisect_left(self._names, name)]
+        del self._owners[name]
+
+    def find_by_id(self, thread_id: ULID) -> Thread | None:
+        """Find a Thread instance by its ID.
+
+        Args:
+            thread_id: The ULID of the thread to find.
+
+        Returns:
+            The Thread instance corresponding to the given ULID.
+        """
+        thread = self._threads.get(thread_id)
+        return thread.model_copy() if thread else None
+
+    def find_by_ids(self, thread_ids: Sequence[ULID]) -> list[Thread]:
+        """Find Thread instances by their IDs.
+
+        Args:
+            thread_ids: The ULIDs of the threads to find.
+
+        Returns:
+            The Thread instances found, in the order of the given ULIDs.
+        """
+        threads = (self._threads.get(thread_id) for thread_id in thread_ids)
+        return [thread.model_copy() for thread in threads if thread]
+
+    def find_by_name(self, name: str) -> Thread | None:
+        """Find a Thread instance by its name, compared after `normalize_name`.
+
+        Args:
+            name: The name of the thread to find.
+
+        Returns:
+            The Thread instance with the given name, or None if not found.
+        """
+        thread_id = self._owners.get(normalize_name(name))
+        return self.find_by_id(thread_id) if thread_id else None
+
+    def search_by_name(self, prefix: str, *, limit: int) -> list[Thread]:
+        """Find the threads whose names start with the given prefix, compared after `normalize_name`.
+
+        The name index is bisected to the first name with the prefix, and read up to the limit.
+
+        Args:
+            prefix: The prefix of the names.
+            limit: The maximum number of threads to return.
+
+        Returns:
+            The Thread instances found, in the order of their normalized names.
+        """
+        normalized = normalize_name(prefix)
+        if not normalized:
+            return []
+
+        with self._lock:
+            threads: list[Thread] = []
+            for name in self._names[bisect_left(self._names, normalized) :]:
+                if len(threads) >= limit or not name.startswith(normalized):
+                    break
+                threads.append(self._threads[self._owners[name]].model_copy())
+        return threads
+
+    def list_all(self) -> list[Thread]:
+        """Retrieves a list of all threads.
+
+        Returns:
+            The threads in ascending order of their IDs.
+        """
+        with self._lock:
+            return [self._threads[thread_id].model_copy() for thread_id in self._ids]
+
+    def increment_post_count(self, thread_id: ULID, last_post_at: datetime) -> None:
+        """Atomically record a new post in the activity counters of the thread.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            last_post_at: The timestamp when the post was created.
+
+        Raises:
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+        """
+        with self._lock:
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                raise ThreadNotFoundError(thread_id)
+            self._threads[thread_id] = thread.model_copy(
+                update={
+                    "post_count": thread.post_count + 1,
+                    "last_post_at": max(thread.last_post_at or last_post_at, last_post_at),
+                    "version": thread.version + 1,
+                }
+            )
+
+    def decrement_post_count(self, thread_id: ULID) -> None:
+        """Atomically record a deleted post in the activity counters of the thread.
+
+        Args:
+            thread_id: The ID of the thread that the post belonged to.
+        """
+        with self._lock:
+            thread = self._threads.get(thread_id)
+            if thread and thread.post_count > 0:
+                self._threads[thread_id] = thread.model_copy(
+                    update={"post_count": thread.post_count - 1, "version": thread.version + 1}
+                )
+
+    def delete(self, id_: ULID) -> None:
+        """Delete the thread with the given ID.
+
+        Args:
+            id_: The ID of the thread to delete.
+
+        Raises:
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+        """
+        with self._lock:
+            thread = self._threads.pop(id_, None)
+            if thread is None:
+                raise ThreadNotFoundError(id_)
+            del self._ids[bisect_left(self._ids, id_)]
+            self._remove_name(normalize_name(thread.name))
+
+
+class _PostPartition:
+    """The posts of a thread, with their IDs as bytes in ascending order."""
+
+    def __init__(self) -> None:
+        self.keys: list[bytes] = []
+        self.posts: dict[bytes, Post] = {}
+
+    def range(self, start: datetime | None, end: datetime | None, after: ULID | None) -> tuple[int, int]:
+        """Return the slice of `keys` of the posts in the range, found by bisection."""
+        lower = bisect_left(self.keys, _timestamp_bound(start)) if start else 0
+        if after:
+            lower = max(lower, bisect_right(self.keys, after.bytes))
+        upper = bisect_left(self.keys, _timestamp_bound(end)) if end else len(self.keys)
+        return lower, upper
+
+
+class InMemoryPostRepository(AbstractPostRepository):
+    """In-memory implementation of the post repository."""
+
+    def __init__(self) -> None:
+        """Initialize the repository."""
+        self._lock = threading.RLock()
+        self._partitions: dict[ULID, _PostPartition] = {}
+
+    def save(self, post: Post) -> None:
+        """Save the given Post instance to the repository.
+
+        Args:
+            post: The Post instance to be saved.
+        """
+        key = post.id_.bytes
+        with self._lock:
+            partition = self._partitions.setdefault(post.thread_id, _PostPartition())
+            if key not in partition.posts:
+                insort(partition.keys, key)
+            partition.posts[key] = post.model_copy()
+
+    def save_all(self, posts: Iterable[Post]) -> None:
+        """Save the given Post instances at once, so no listing sees only some of them.
+
+        Args:
+            posts: The Post instances to be saved.
+        """
+        with self._lock:
+            for post in posts:
+                self.save(post)
+
+    def list_by_thread_id(  # noqa: PLR0913
+        self,
+        thread_id: ULID,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: ULID | None = None,
+        limit: int | None = None,
+    ) -> list[Post]:
+        """List all posts with the specified thread ID.
+
+        Like the table, the posts are selected by the timestamp of their IDs, so the range is
+        found by bisection and only the posts returned are read.
+
+        Args:
+            thread_id: The ULID of the thread to find.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+            after: The ID of the post to list posts after, exclusive. Used as a pagination cursor.
+            limit: The maximum number of posts to list.
+
+        Returns:
+            A list of Post instances with the specified thread ID, in ascending order of their IDs.
+        """
+        with self._lock:
+            partition = self._partitions.get(thread_id)
+            if partition is None:
+                return []
+            lower, upper = partition.range(start, end, after)
+            if limit is not None:
+                upper = min(upper, lower + limit)
+            return [partition.posts[key].model_copy() for key in partition.keys[lower:upper]]
+
+    def iter_by_thread_id(
+        self, thread_id: ULID, *, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[Post]:
+        """Iterate over all posts with the specified thread ID.
+
+        The posts are copied out page by page, each page after the last post of the previous one,
+        so the posts saved or deleted during the iteration are seen as by a paginated query.
+
+        Args:
+            thread_id: The ULID of the thread to find.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+
+        Yields:
+            The Post instances with the specified thread ID, in ascending order of their IDs.
+        """
+        after = None
+        while page := self.list_by_thread_id(thread_id, start=start, end=end, after=after, limit=ITER_PAGE_SIZE):
+            yield from page
+            after = page[-1].id_
+
+    def delete(self, thread_id: ULID, post_id: ULID) -> None:
+        """Delete the Post with the given ID.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to delete.
+
+        Raises:
+            PostNotFoundError: If the post with the given ID does not exist.
+        """
+        key = post_id.bytes
+        with self._lock:
+            partition = self._partitions.get(thread_id)
+            if partition is None or partition.posts.pop(key, None) is None:
+                raise PostNotFoundError(post_id)
+            del partition.keys[bisect_left(partition.keys, key)]
+            if not partition.keys:
+                del self._partitions[thread_id]
+
+
+class InMemoryPostSearchIndex(AbstractPostSearchIndex):
+    """In-memory implementation of the post search index."""
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self._lock = threading.RLock()
+        self._posts: dict[ULID, Post] = {}
+        # The number of occurrences of each term in each post that contains it.
+        self._postings: dict[str, dict[ULID, int]] = {}
+
+    def add(self, post: Post) -> None:
+        """Index the given post.
+
+        Args:
+            post: The post to index.
+        """
+        with self._lock:
+            self._remove(post.id_)
+            self._posts[post.id_] = post.model_copy()
+            for term, count in tokenize(post.message).items():
+                self._postings.setdefault(term, {})[post.id_] = count
+
+    def remove(self, thread_id: ULID, post_id: ULID) -> None:  # noqa: ARG002
+        """Remove the post with the given ID from the index. Does nothing if it is not indexed.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to remove.
+        """
+        with self._lock:
+            self._remove(post_id)
+
+    def _remove(self, post_id: ULID) -> None:
+        post = self._posts.pop(post_id, None)
+        if post is None:
+            return
+        for term in tokenize(post.message):
+            postings = self._postings[term]
+            del postings[post_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, terms: Sequence[str], *, thread_id: ULID | None = None, limit: int) -> list[Post]:
+        """Search for the posts that contain all of the given terms.
+
+        The postings of the rarest term are intersected with the others, so a search reads the
+        posts that contain the rarest term only.
+
+        Args:
+            terms: The terms to search for, as returned by `tokenize`.
+            thread_id: The ID of the thread to search in. If None, all threads are searched.
+            limit: The maximum number of posts to return.
+
+        Returns:
+            The matching posts, best match first.
+        """
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in dict.fromkeys(terms)]
+            if not postings:
+                return []
+            postings.sort(key=len)
+            scores = {
+                post_id: sum(others[post_id] for others in postings)
+                for post_id in postings[0]
+                if all(post_id in others for others in postings[1:])
+                and (thread_id is None or self._posts[post_id].thread_id == thread_id)
+            }
+            # Post IDs sort by creation time, so the greater ID is the more recent post.
+            best = heapq.nlargest(limit, scores, key=lambda post_id: (scores[post_id], post_id))
+            return [self._posts[post_id].model_copy() for post_id in best]
+
+
+class InMemoryIdempotencyStore(AbstractIdempotencyStore):
+    """In-memory implementation of the idempotency store."""
+
+    def __init__(self, *, ttl: timedelta = DEFAULT_TTL, in_progress_ttl: timedelta = DEFAULT_IN_PROGRESS_TTL) -> None:
+        """Initialize the store.
+
+        Args:
+            ttl: How long the response of a request is replayed.
+            in_progress_ttl: How long a request in progress blocks its retries, in case it never completes.
+        """
+        self._ttl = ttl
+        self._in_progress_ttl = in_progress_ttl
+        self._lock = threading.Lock()
+        self._records: dict[str, tuple[IdempotencyRecord, datetime]] = {}
+
+    def start(self, key: str, fingerprint: str) -> IdempotencyRecord | None:
+        """Start a record for the given key, unless there is one already.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+
+        Returns:
+            None if the record was started, or the existing record of the key.
+        """
+        now = datetime.now(UTC)
+        with self._lock:
+            existing = self._records.get(key)
+            if existing and existing[1] >= now:
+                return existing[0].model_copy()
+            self._records[key] = (IdempotencyRecord(fingerprint=fingerprint), now + self._in_progress_ttl)
+        return None
+
+    def complete(self, key: str, fingerprint: str, status_code: int, body: str | None) -> None:
+        """Record the response of the request started with the given key.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+            status_code: The status code of the response.
+            body: The body of the response.
+        """
+        record = IdempotencyRecord(fingerprint=fingerprint, status_code=status_code, body=body)
+        with self._lock:
+            self._records[key] = (record, datetime.now(UTC) + self._ttl)
+
+    def release(self, key: str) -> None:
+        """Delete the record of the given key, so the request can be retried.
+
+        Args:
+            key: The idempotency key.
+        """
+        with self._lock:
+            self._records.pop(key, None)
+
+
+class InMemoryReadViews(AbstractReadViews):
+    """In-memory implementation of the materialized read views."""
+
+    def __init__(self) -> None:
+        """Initialize the views."""
+        self._lock = threading.RLock()
+        self._threads: dict[ULID, Thread] = {}
+        self._thread_ids: list[ULID] = []
+        self._posts: dict[bytes, Post] = {}
+        self._post_keys: list[bytes] = []
+        self._thread_posts: dict[ULID, set[bytes]] = {}
+
+    def save_thread(self, thread: Thread) -> None:
+        """Put the thread into the thread list, unless a later version of it is there already.
+
+        Args:
+            thread: The thread as stored.
+        """
+        with self._lock:
+            existing = self._threads.get(thread.id_)
+            if existing is None:
+                insort(self._thread_ids, thread.id_)
+            elif existing.version > thread.version:
+                return
+            self._threads[thread.id_] = thread.model_copy()
+
+    def delete_thread(self, thread_id: ULID) -> None:
+        """Remove the thread from the thread list, and its posts from the recent post feed.
+
+        Args:
+            thread_id: The ID of the thread.
+        """
+        with self._lock:
+            if self._threads.pop(thread_id, None) is not None:
+                del self._thread_ids[bisect_left(self._thread_ids, thread_id)]
+            for key in self._thread_posts.pop(thread_id, set()):
+                del self._posts[key]
+                del self._post_keys[bisect_left(self._post_keys, key)]
+
+    def list_threads(self) -> list[Thread]:
+        """List the threads of the thread list.
+
+        Returns:
+            The threads, in ascending order of their IDs.
+        """
+        with self._lock:
+            return [self._threads[thread_id].model_copy() for thread_id in self._thread_ids]
+
+    def save_recent_post(self, post: Post) -> None:
+        """Put the post into the recent post feed.
+
+        Args:
+            post: The post as stored.
+        """
+        key = post.id_.bytes
+        with self._lock:
+            if key not in self._posts:
+                insort(self._post_keys, key)
+            self._posts[key] = post.model_copy()
+            self._thread_posts.setdefault(post.thread_id, set()).add(key)
+
+    def delete_recent_post(self, post: Post) -> None:
+        """Remove the post from the recent post feed. Does nothing if it is not there.
+
+        Args:
+            post: The post as stored.
+        """
+        key = post.id_.bytes
+        with self._lock:
+            if self._posts.pop(key, None) is not None:
+                del self._post_keys[bisect_left(self._post_keys, key)]
+                self._thread_posts[post.thread_id].discard(key)
+
+    def list_recent_posts(self, *, limit: int) -> list[Post]:
+        """List the latest posts of the recent post feed, up to the TTL of the feed.
+
+        Args:
+            limit: The maximum number of posts to list.
+
+        Returns:
+            The posts, newest first.
+        """
+        with self._lock:
+            oldest = bisect_left(self._post_keys, _timestamp_bound(datetime.now(UTC) - RECENT_POST_TTL))
+            keys = self._post_keys[max(oldest, len(self._post_keys) - limit) :]
+            return [self._posts[key].model_copy() for key in reversed(keys)]
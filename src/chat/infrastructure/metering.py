@@ -0,0 +1,179 @@
+"""Accounting of the capacity and latency of the DynamoDB requests.
+
+The repositories send their requests through `MeteredTable`, a proxy of the boto3 table that asks
+DynamoDB for the consumed capacity of every request (`ReturnConsumedCapacity`) and times it. The
+usage is aggregated by scope, such as the endpoint being served, until it is collected at the end
+of the invocation. The scope is a context variable, so it follows the calls submitted to the
+executor and run with `asyncio.to_thread`.
+
+When a dump file is configured, every collection is also appended to it as a JSON line, so local
+runs can be checked for their capacity use.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, fields
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+
+from .dynamodb import PAGED_OPERATIONS, TableProxy, count_items
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from mypy_boto3_dynamodb.service_resource import Table
+
+T = TypeVar("T")
+
+READ_OPERATIONS = frozenset({"get_item", "query", "scan", "batch_get_item", "transact_get_items"})
+DEFAULT_SCOPE = "-"
+
+_scope: ContextVar[str] = ContextVar("dynamodb_usage_scope", default=DEFAULT_SCOPE)
+
+
+@dataclass
+class Usage:
+    """The usage of DynamoDB by a number of requests.
+
+    Attributes:
+        calls: The number of requests, including the failed ones.
+        read_capacity: The read capacity units consumed.
+        write_capacity: The write capacity units consumed.
+        items_returned: The number of items returned.
+        items_scanned: The number of items read to find them, before the filters.
+        pages: The number of query and scan pages fetched.
+        latency_ms: The total latency of the requests, in milliseconds.
+    """
+
+    calls: int = 0
+    read_capacity: float = 0.0
+    write_capacity: float = 0.0
+    items_returned: int = 0
+    items_scanned: int = 0
+    pages: int = 0
+    latency_ms: float = 0.0
+
+    def __add__(self, other: Usage) -> Self:
+        """Sum the usages."""
+        return type(self)(**{f.name: getattr(self, f.name) + getattr(other, f.name) for f in fields(self)})
+
+    def to_metrics(self) -> dict[str, float]:
+        """Return the usage as metrics, named as they are published."""
+        return {
+            "DynamoDBCalls": self.calls,
+            "ConsumedReadCapacity": self.read_capacity,
+            "ConsumedWriteCapacity": self.write_capacity,
+            "ItemsReturned": self.items_returned,
+            "ItemsScanned": self.items_scanned,
+            "PagesFetched": self.pages,
+            "DynamoDBLatency": round(self.latency_ms, 3),
+        }
+
+
+def _consumed_capacity(response: dict[str, Any]) -> float:
+    consumed = response.get("ConsumedCapacity", [])
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(float(capacity.get("CapacityUnits", 0)) for capacity in consumed)
+
+
+class CapacityMeter:
+    """Aggregates the usage of the DynamoDB requests by scope."""
+
+    def __init__(self, *, dump_path: Path | None = None, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Initialize the meter.
+
+        Args:
+            dump_path: The file to append the collected usage to. If None, it is not dumped.
+            clock: The clock to time the requests with, in seconds.
+        """
+        self._dump_path = dump_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._usage: defaultdict[str, Usage] = defaultdict(Usage)
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        """Attribute the requests sent within the block to the given scope.
+
+        Args:
+            name: The name of the scope, such as the endpoint being served.
+        """
+        token = _scope.set(name)
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    def call(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Send a request, recording its consumed capacity and latency.
+
+        Args:
+            operation: The name of the operation.
+            fn: The function that sends the request.
+            *args: The positional arguments of the request.
+            **kwargs: The keyword arguments of the request.
+
+        Returns:
+            The response of the request.
+        """
+        kwargs.setdefault("ReturnConsumedCapacity", "TOTAL")
+        usage = Usage(calls=1)
+        started_at = self._clock()
+        try:
+            response: Any = fn(*args, **kwargs)
+            capacity = _consumed_capacity(response)
+            if operation in READ_OPERATIONS:
+                usage.read_capacity = capacity
+            else:
+                usage.write_capacity = capacity
+            usage.items_returned, usage.items_scanned = count_items(operation, response)
+            usage.pages = int(operation in PAGED_OPERATIONS)
+            return response  # type: ignore[no-any-return]
+        finally:
+            usage.latency_ms = (self._clock() - started_at) * 1000
+            self._record(usage)
+
+    def _record(self, usage: Usage) -> None:
+        scope = _scope.get()
+        with self._lock:
+            self._usage[scope] = self._usage[scope] + usage
+
+    def collect_usage(self) -> dict[str, Usage]:
+        """Return the usage since the previous collection, by scope.
+
+        Returns:
+            The usage of each scope that sent requests.
+        """
+        with self._lock:
+            usage = dict(self._usage)
+            self._usage.clear()
+
+        if self._dump_path and usage:
+            line = {
+                "collected_at": datetime.now(UTC).isoformat(),
+                "usage": {scope: asdict(scope_usage) for scope, scope_usage in usage.items()},
+            }
+            with self._dump_path.open("a") as f:
+                f.write(json.dumps(line) + "\n")
+        return usage
+
+
+class MeteredTable(TableProxy):
+    """Proxy of a DynamoDB table whose requests are recorded by a meter."""
+
+    def __init__(self, table: Table, meter: CapacityMeter) -> None:
+        """Initialize the proxy.
+
+        Args:
+            table: The DynamoDB table instance.
+            meter: The meter to record the requests with.
+        """
+        super().__init__(table, meter)
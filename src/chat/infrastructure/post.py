@@ -1,26 +1,70 @@
-"""Post repository implementation."""
+"""Post repository implementation.
+
+All posts of a thread are stored under the thread ID as their partition key by default. Two
+optional layouts split the partition up, and can be combined:
+
+- Time buckets: each post is stored under "{thread_id}#{bucket}", where the bucket is the index of
+  the time period that the post ID was generated in, so the posts of a long-lived thread do not
+  pile up in one item collection. The buckets that hold posts are recorded in a bucket index
+  record of the thread, under the sort key "!buckets" of its partition, so a read only queries
+  the buckets of its time range that hold posts, rather than every bucket since the thread was
+  created.
+- Write shards: the posts of hot threads are stored under "{thread_id}#{shard}" (or
+  "{thread_id}#{bucket}#{shard}"), where the shard is derived from the random part of the post ID,
+  to get past the per-partition write limit of DynamoDB. The number of shards of a thread is a
+  power of two, and may only grow: the posts written with fewer shards are in the lower shards,
+  or in the unsharded partition, which are still read, and a post is deleted from the shard it
+  would have had under each smaller count in turn.
+
+The partitions are queried concurrently and the posts are merged back in the order of their IDs.
+The bucket period is a property of the stored data: changing it requires migrating the posts.
+"""
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
-from typing import TYPE_CHECKING
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from itertools import batched, chain, groupby, islice
+from operator import attrgetter, itemgetter
+from typing import TYPE_CHECKING, Any, cast
 
 from boto3.dynamodb.conditions import Key
 from pydantic import BaseModel
 from ulid import ULID
 
 from chat.domain.post import AbstractPostRepository, Post
+from chat.infrastructure.diagnostics import diagnose
+from chat.infrastructure.dynamodb import BATCH_WRITE_LIMIT, batch_write_items
+from chat.shared.concurrency import run_concurrently, submit
 from chat.shared.exceptions import PostNotFoundError
+from chat.shared.tracing import tracer
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from concurrent.futures import Executor, Future
+    from decimal import Decimal
+
+    from boto3.dynamodb.conditions import ConditionBase
     from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_dynamodb.type_defs import QueryInputTableQueryTypeDef
+
+    from chat.shared.concurrency import SingleFlight
+
+SEPARATOR = "#"
+# The sort key of the bucket index record of a thread, which sorts before the thread record.
+BUCKETS_SORT_KEY = "!buckets"
+MAX_CONCURRENCY = 8
+BUCKET_PREFETCH = 2
 
 
 class PostData(BaseModel):
     """Post data model for DynamoDB record.
 
     Attributes:
-        thread_id: The ID of the thread.
+        thread_id: The ID of the thread, followed by the bucket and shard suffixes if any.
         post_id: The ID of the post.
         category: The category of the record. Always "Post".
         message: The message of the post.
@@ -34,17 +78,18 @@ class PostData(BaseModel):
     created_at: int
 
     @classmethod
-    def from_model(cls, model: Post) -> PostData:
+    def from_model(cls, model: Post, partition_key: str | None = None) -> PostData:
         """Create a PostData instance from a Post model.
 
         Args:
             model: The Post model to convert.
+            partition_key: The partition to store the post in. Defaults to the thread ID.
 
         Returns:
             The converted PostData instance.
         """
         return cls(
-            thread_id=str(model.thread_id),
+            thread_id=partition_key or str(model.thread_id),
             post_id=str(model.id_),
             category="Post",
             message=model.message,
@@ -59,49 +104,331 @@ class PostData(BaseModel):
         """
         return Post(
             id_=ULID.from_str(self.post_id),
-            thread_id=ULID.from_str(self.thread_id),
+            thread_id=ULID.from_str(self.thread_id.split(SEPARATOR, 1)[0]),
             message=self.message,
             created_at=datetime.fromtimestamp(self.created_at / 1000000, tz=UTC),
         )
 
 
+def _partition_key(thread_id: ULID, bucket: int | None, shard: int | None) -> str:
+    return SEPARATOR.join(str(part) for part in (thread_id, bucket, shard) if part is not None)
+
+
+def _lower_bound(start: datetime | None, after: ULID | None) -> str:
+    """Return the exclusive lower bound of the post IDs to query.
+
+    The thread record shares the partition with its posts under the sort key "-", which sorts
+    before any ULID, so it is always excluded by the bound.
+
+    Args:
+        start: The timestamp to start listing posts from.
+        after: The ID of the post to list posts after.
+
+    Returns:
+        The greatest of the bounds.
+    """
+    bounds = ["-"]
+    if start:
+        bounds.append(str(ULID.from_datetime(start))[:10])
+    if after:
+        bounds.append(str(after))
+    return max(bounds)
+
+
+def _upper_bound(end: datetime | None) -> str | None:
+    """Return the exclusive upper bound of the post IDs to query.
+
+    Every post ID generated at or after the end shares or exceeds its timestamp prefix,
+    so comparing with the bare prefix excludes them.
+    """
+    return str(ULID.from_datetime(end))[:10] if end else None
+
+
 class DynamoDBPostRepository(AbstractPostRepository):
     """DynamoDB repository for Post entities."""
 
-    def __init__(self, table: Table) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        table: Table,
+        *,
+        page_size: int | None = None,
+        hot_threads: Mapping[ULID, int] | None = None,
+        bucket_period: timedelta | None = None,
+        executor: Executor | None = None,
+        single_flight: SingleFlight | None = None,
+    ) -> None:
         """Initialize the repository.
 
         Args:
             table: The DynamoDB table instance.
+            page_size: The maximum number of items to fetch per query page.
+                If None, the pages are only limited by the 1 MB limit of DynamoDB.
+            hot_threads: The number of write shards of each hot thread, a power of two that may
+                only grow. The posts of the other threads are not sharded.
+            bucket_period: The length of the time buckets to store the posts in.
+                If None, the posts are not bucketed.
+            executor: The executor to query the partitions on.
+                If None, a pool is created for each read that spans several partitions.
+            single_flight: The group to coalesce the concurrent identical listings in.
+                If None, every listing sends its own requests.
+
+        Raises:
+            ValueError: If the number of shards of a thread is not a power of two.
         """
+        if invalid := [str(thread_id) for thread_id, shards in (hot_threads or {}).items() if shards & (shards - 1)]:
+            msg = f"The number of shards must be a power of two: {', '.join(invalid)}"
+            raise ValueError(msg)
         self._table = table
+        self._page_size = page_size
+        self._hot_threads = dict(hot_threads or {})
+        self._bucket_ms = bucket_period // timedelta(milliseconds=1) if bucket_period else None
+        self._executor = executor
+        self._single_flight = single_flight
+        self._recorded_buckets: set[tuple[ULID, int]] = set()
+
+    def _bucket(self, milliseconds: int) -> int | None:
+        """Return the time bucket of a timestamp, or None if the posts are not bucketed."""
+        return milliseconds // self._bucket_ms if self._bucket_ms else None
+
+    def _buckets(self, thread_id: ULID, lower_bound: str, upper_bound: str | None) -> list[int | None]:
+        """Return the time buckets of the range of post IDs that hold posts, in ascending order.
+
+        No post of a thread predates the thread, and none is generated after the current time.
+        If the range spans several buckets, only those in the bucket index of the thread are kept.
+        """
+        if not self._bucket_ms:
+            return [None]
+
+        first = max(thread_id.milliseconds, _milliseconds(lower_bound))
+        last = int(datetime.now(UTC).timestamp() * 1000)
+        if upper_bound:
+            last = min(last, _milliseconds(upper_bound) - 1)
+        buckets = range(first // self._bucket_ms, last // self._bucket_ms + 1)
+        if len(buckets) <= 1:
+            return list(buckets)
+
+        # Read consistently, so the bucket of a post that was just written is found.
+        response = self._table.get_item(
+            Key={"thread_id": str(thread_id), "post_id": BUCKETS_SORT_KEY},
+            ProjectionExpression="buckets",
+            ConsistentRead=True,
+        )
+        recorded = {int(bucket) for bucket in cast("set[Decimal]", response.get("Item", {}).get("buckets", set()))}
+        return [bucket for bucket in buckets if bucket in recorded]
+
+    def _record_buckets(self, posts: Iterable[Post]) -> None:
+        """Add the time buckets of the posts to the bucket indexes of their threads.
 
+        The buckets are recorded before the posts are written, so a read never skips a written
+        post. The buckets recorded by the repository are remembered, so each is recorded once.
+        """
+        if not self._bucket_ms:
+            return
+
+        new = {(post.thread_id, post.id_.milliseconds // self._bucket_ms) for post in posts} - self._recorded_buckets
+        for thread_id, group in groupby(sorted(new), key=itemgetter(0)):
+            buckets = {bucket for _, bucket in group}
+            self._table.update_item(
+                Key={"thread_id": str(thread_id), "post_id": BUCKETS_SORT_KEY},
+                UpdateExpression="ADD buckets :buckets",
+                ExpressionAttributeValues={":buckets": buckets},
+            )
+            self._recorded_buckets.update((thread_id, bucket) for bucket in buckets)
+
+    def _shard(self, thread_id: ULID, post_id: ULID) -> int | None:
+        """Return the write shard of a post, or None if the thread is not sharded."""
+        shards = self._hot_threads.get(thread_id, 1)
+        if shards <= 1:
+            return None
+        return int.from_bytes(post_id.bytes[6:]) % shards
+
+    def _partition_keys(self, thread_id: ULID, bucket: int | None) -> list[str]:
+        """Return the partition keys to read the posts of a thread in a bucket from.
+
+        The unsharded partition is always included, so the posts written before the thread
+        was marked hot are still found.
+        """
+        shards = self._hot_threads.get(thread_id, 1)
+        keys = [_partition_key(thread_id, bucket, None)]
+        if shards > 1:
+            keys.extend(_partition_key(thread_id, bucket, shard) for shard in range(shards))
+        return keys
+
+    @tracer.capture_method(capture_response=False)
     def save(self, post: Post) -> None:
         """Save the given Post instance to the repository.
 
         Args:
             post: The Post instance to be saved.
         """
-        self._table.put_item(Item=PostData.from_model(post).model_dump(exclude_none=True))
+        self._record_buckets([post])
+        self._table.put_item(Item=self._item(post))
+
+    @tracer.capture_method(capture_response=False)
+    def save_all(self, posts: Iterable[Post]) -> None:
+        """Save the given Post instances with BatchWriteItem.
+
+        The posts are written in chunks of 25, the limit of BatchWriteItem, and the unprocessed
+        items are retried with exponential backoff. The chunks are written concurrently if the
+        repository has an executor. A post saved several times is only written in its last version.
+
+        Args:
+            posts: The Post instances to be saved.
+
+        Raises:
+            UnprocessedItemsError: If some posts are still unwritten after all retries. The other
+                chunks may have been written.
+        """
+        posts = list(posts)
+        self._record_buckets(posts)
+        items = {(item["thread_id"], item["post_id"]): item for item in map(self._item, posts)}
+        calls = [
+            partial(batch_write_items, self._table, list(chunk)) for chunk in batched(items.values(), BATCH_WRITE_LIMIT)
+        ]
+        if self._executor and len(calls) > 1:
+            run_concurrently(self._executor, calls, name="post_batch_write")
+        else:
+            for call in calls:
+                call()
 
-    def list_by_thread_id(self, thread_id: ULID, *, start: datetime | None = None) -> list[Post]:
+    def _item(self, post: Post) -> dict[str, Any]:
+        """Return the item of a post, in the partition of its bucket and shard."""
+        partition_key = _partition_key(
+            post.thread_id, self._bucket(post.id_.milliseconds), self._shard(post.thread_id, post.id_)
+        )
+        return PostData.from_model(post, partition_key).model_dump(exclude_none=True)
+
+    @tracer.capture_method(capture_response=False)
+    def list_by_thread_id(  # noqa: PLR0913
+        self,
+        thread_id: ULID,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: ULID | None = None,
+        limit: int | None = None,
+    ) -> list[Post]:
         """List all posts with the specified thread ID.
 
         Args:
             thread_id: The ID of the thread to find.
             start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+            after: The ID of the post to list posts after, exclusive.
+            limit: The maximum number of posts to list.
 
         Returns:
             A list of Post instances with the specified thread ID.
         """
-        key_condition = Key("thread_id").eq(str(thread_id))
-        if start:
-            key_condition = key_condition & Key("post_id").gt(str(ULID.from_datetime(start))[:10])  # type: ignore[assignment]
 
-        response = self._table.query(KeyConditionExpression=key_condition)
-        items = response.get("Items", [])
-        return [PostData.model_validate(item).to_model() for item in items]
+        def list_posts() -> list[Post]:
+            with diagnose("post.list_by_thread_id", limit=limit):
+                return list(islice(self._query(thread_id, _lower_bound(start, after), _upper_bound(end), limit), limit))
+
+        if self._single_flight:
+            key = ("post.list_by_thread_id", thread_id, start, end, after, limit)
+            return self._single_flight.do(key, list_posts, share=list)
+        return list_posts()
+
+    def iter_by_thread_id(
+        self, thread_id: ULID, *, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[Post]:
+        """Iterate over all posts with the specified thread ID.
+
+        The query is paginated with `LastEvaluatedKey`, and the next page is fetched only
+        when the previous one has been consumed.
+
+        Args:
+            thread_id: The ID of the thread to find.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+
+        Returns:
+            An iterator over the Post instances with the specified thread ID, in ascending order of their IDs.
+        """
+        return self._query(thread_id, _lower_bound(start, None), _upper_bound(end), None)
+
+    def _query(self, thread_id: ULID, lower_bound: str, upper_bound: str | None, limit: int | None) -> Iterator[Post]:
+        if upper_bound and lower_bound >= upper_bound:
+            return iter(())
 
+        buckets = self._buckets(thread_id, lower_bound, upper_bound)
+        groups = [self._partition_keys(thread_id, bucket) for bucket in buckets]
+        if not groups:
+            return iter(())
+        if len(groups) == 1 and len(groups[0]) == 1:
+            return chain.from_iterable(self._pages(groups[0][0], lower_bound, upper_bound, limit))
+        return self._merge(groups, lower_bound, upper_bound, limit)
+
+    def _merge(
+        self, groups: Sequence[Sequence[str]], lower_bound: str, upper_bound: str | None, limit: int | None
+    ) -> Iterator[Post]:
+        """Query the partitions concurrently and merge the posts in the order of their IDs.
+
+        The groups hold the partitions of consecutive time buckets, whose posts do not overlap, so
+        the groups are chained and only the partitions within a group are merged. The partitions of
+        the next few groups are queried ahead while the current one is consumed. The next page of a
+        partition is requested as soon as the previous one is handed over to the merge.
+        """
+        executor = self._executor or ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(groups) * len(groups[0])))
+        in_flight: set[Future[list[Post] | None]] = set()
+
+        def fetch(stream: Iterator[list[Post]]) -> Future[list[Post] | None]:
+            future = submit(executor, "post_partitions", next, stream, None)
+            in_flight.add(future)
+            return future
+
+        def drain(stream: Iterator[list[Post]], future: Future[list[Post] | None]) -> Iterator[Post]:
+            while (page := future.result()) is not None:
+                in_flight.discard(future)
+                future = fetch(stream)
+                yield from page
+
+        def query(keys: Sequence[str]) -> list[Iterator[Post]]:
+            streams = [self._pages(key, lower_bound, upper_bound, limit) for key in keys]
+            return [drain(stream, fetch(stream)) for stream in streams]
+
+        remaining = iter(groups)
+        pending = deque(map(query, islice(remaining, BUCKET_PREFETCH + 1)))
+        try:
+            while pending:
+                partitions = pending.popleft()
+                if (keys := next(remaining, None)) is not None:
+                    pending.append(query(keys))
+                yield from heapq.merge(*partitions, key=attrgetter("id_"))
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if executor is not self._executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pages(
+        self, partition_key: str, lower_bound: str, upper_bound: str | None, limit: int | None
+    ) -> Iterator[list[Post]]:
+        key_condition: ConditionBase = Key("thread_id").eq(partition_key)
+        if upper_bound:
+            # BETWEEN is inclusive, so a post ID equal to the lower bound is dropped below.
+            key_condition &= Key("post_id").between(lower_bound, upper_bound)
+        else:
+            key_condition &= Key("post_id").gt(lower_bound)
+        kwargs: QueryInputTableQueryTypeDef = {"KeyConditionExpression": key_condition}
+        page_size = min(filter(None, (self._page_size, limit)), default=None)
+        if page_size:
+            kwargs["Limit"] = page_size
+
+        while True:
+            response = self._table.query(**kwargs)
+            yield [
+                PostData.model_validate(item).to_model()
+                for item in response.get("Items", [])
+                if item["post_id"] != lower_bound
+            ]
+
+            if "LastEvaluatedKey" not in response:
+                return
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    @tracer.capture_method(capture_response=False)
     def delete(self, thread_id: ULID, post_id: ULID) -> None:
         """Delete the post with the specified ID.
 
@@ -109,9 +436,33 @@ class DynamoDBPostRepository(AbstractPostRepository):
             thread_id: The ID of the thread that the post belongs to.
             post_id: The ID of the post to delete.
         """
-        response = self._table.delete_item(
-            Key={"thread_id": str(thread_id), "post_id": str(post_id)}, ReturnValues="ALL_OLD"
-        )
+        bucket = self._bucket(post_id.milliseconds)
+        # The shard of the post under the current count of shards of the thread, then under each
+        # smaller one, down to the unsharded partition.
+        count = self._hot_threads.get(thread_id, 1)
+        shards: list[int | None] = [int.from_bytes(post_id.bytes[6:]) % n for n in _halvings(count)]
+        shards.append(None)
+
+        for shard in shards:
+            response = self._table.delete_item(
+                Key={"thread_id": _partition_key(thread_id, bucket, shard), "post_id": str(post_id)},
+                ReturnValues="ALL_OLD",
+            )
+            if response.get("Attributes"):
+                return
+
+        raise PostNotFoundError(post_id)
+
+
+def _halvings(count: int) -> Iterator[int]:
+    """Yield the power of two count of shards and each smaller one, down to 2."""
+    while count > 1:
+        yield count
+        count //= 2
+
 
-        if not response.get("Attributes"):
-            raise PostNotFoundError(post_id)
+def _milliseconds(bound: str) -> int:
+    """Return the timestamp in milliseconds that a post ID bound starts at."""
+    if bound == "-":
+        return 0
+    return int(ULID.from_str(bound[:10].ljust(26, "0")).milliseconds)
@@ -0,0 +1,315 @@
+"""Resilience of the DynamoDB requests against throttling and transient errors.
+
+The repositories send their requests through `ResilientTable`, a proxy of the boto3 table whose
+requests run under a `ResiliencePolicy`:
+
+- Throttling errors are retried with jittered exponential backoff, since a throttled request
+  is guaranteed not to have been applied.
+- Transient errors, such as 5xx responses and dropped connections, are retried the same way,
+  but only for the requests that are safe to repeat: reads and batch writes. A conditional or
+  counting write may have been applied before the error, so it is not repeated.
+- No retry is started if its delay would run past the deadline of the invocation.
+- Consecutive throttling opens a circuit breaker. While it is open the requests fail at once
+  with `ServiceUnavailableError`, instead of adding load to a table that is already throttling;
+  after a cool-down a single request is let through to probe it.
+
+The botocore retries are meant to be turned off on the client, so the retries happen here,
+where they are bounded by the deadline and visible to the breaker.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+
+from chat.shared.exceptions import ServiceUnavailableError
+
+from .dynamodb import TableProxy
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from mypy_boto3_dynamodb.service_resource import Table
+
+T = TypeVar("T")
+
+THROTTLING_ERROR_CODES = frozenset(
+    {
+        "ProvisionedThroughputExceededException",
+        "ThrottlingException",
+        "RequestLimitExceeded",
+        "ThrottlingError",
+    }
+)
+TRANSIENT_ERROR_CODES = frozenset({"InternalServerError", "ServiceUnavailable", "TransactionInProgressException"})
+
+# The operations that can be repeated after an error whose outcome is unknown.
+IDEMPOTENT_OPERATIONS = frozenset({"get_item", "query", "scan", "batch_get_item", "batch_write_item"})
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorKind(StrEnum):
+    """The kinds of errors the policy handles."""
+
+    THROTTLING = "throttling"
+    TRANSIENT = "transient"
+
+
+def classify(error: Exception) -> ErrorKind | None:
+    """Classify an error raised by a DynamoDB request.
+
+    Args:
+        error: The error to classify.
+
+    Returns:
+        The kind of the error, or None if it is not worth retrying.
+    """
+    if isinstance(error, BotocoreConnectionError | HTTPClientError):
+        return ErrorKind.TRANSIENT
+    if not isinstance(error, ClientError):
+        return None
+
+    code = error.response.get("Error", {}).get("Code", "")
+    if code == "TransactionCanceledException":
+        # A transaction is throttled as a whole, but reported with a reason per item.
+        reasons = {reason.get("Code") for reason in error.response.get("CancellationReasons", [])}
+        throttled = "ThrottlingError" in reasons and reasons <= {"None", "ThrottlingError"}
+        return ErrorKind.THROTTLING if throttled else None
+    if code in THROTTLING_ERROR_CODES:
+        return ErrorKind.THROTTLING
+    if code in TRANSIENT_ERROR_CODES or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500:  # noqa: PLR2004
+        return ErrorKind.TRANSIENT
+    return None
+
+
+class CircuitState(StrEnum):
+    """The states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker that opens under sustained throttling.
+
+    The breaker opens after a number of consecutive throttled requests. After the cool-down it
+    lets a single request through: if that request succeeds the breaker closes, and if it is
+    throttled the breaker opens again.
+    """
+
+    def __init__(
+        self, *, failure_threshold: int = 5, reset_timeout: float = 5.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: The number of consecutive throttled requests that opens the breaker.
+            reset_timeout: The number of seconds the breaker stays open before a request is let through.
+            clock: The monotonic clock, in seconds.
+        """
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of the breaker."""
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def allow(self) -> None:
+        """Check that a request may be sent.
+
+        Raises:
+            ServiceUnavailableError: If the breaker is open, or its probe request is in flight.
+        """
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return
+            remaining = self._opened_at + self._reset_timeout - self._clock()
+            if self._state == CircuitState.OPEN and remaining <= 0:
+                self._state = CircuitState.HALF_OPEN
+                return
+        raise ServiceUnavailableError(retry_after=max(remaining, 0))
+
+    def record_success(self) -> None:
+        """Record a request that was not throttled."""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info("Circuit breaker closed")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+
+    def record_throttling(self) -> None:
+        """Record a throttled request."""
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != CircuitState.OPEN:
+                    logger.warning("Circuit breaker opened", extra={"throttled_requests": self._failures})
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+
+
+class ResiliencePolicy:
+    """Retries and circuit breaking of the DynamoDB requests.
+
+    The policy is shared by the requests of all the repositories, across invocations, and
+    counts what it does for the metrics of each invocation.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        max_attempts: int = 4,
+        base_delay: float = 0.025,
+        max_delay: float = 1.0,
+        breaker: CircuitBreaker | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_attempts: The maximum number of attempts of a request.
+            base_delay: The cap of the first backoff delay, in seconds. The cap doubles with each retry.
+            max_delay: The maximum cap of the backoff delays, in seconds.
+            breaker: The circuit breaker. If None, a breaker with the default settings is used.
+            clock: The monotonic clock, in seconds.
+            sleep: The function to wait with.
+        """
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._breaker = breaker or CircuitBreaker(clock=clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._deadline: float | None = None
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("ThrottledRequests", "TransientErrors", "Retries", "RejectedRequests"), 0)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """The circuit breaker of the policy."""
+        return self._breaker
+
+    def set_deadline(self, remaining_time: float | None) -> None:
+        """Set the time left for the requests of the current invocation.
+
+        Args:
+            remaining_time: The number of seconds left, or None if there is no deadline.
+        """
+        self._deadline = None if remaining_time is None else self._clock() + remaining_time
+
+    def call(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Send a request under the policy.
+
+        Args:
+            operation: The name of the operation, to tell if it can be repeated.
+            fn: The function that sends the request.
+            *args: The positional arguments of the request.
+            **kwargs: The keyword arguments of the request.
+
+        Returns:
+            The response of the request.
+
+        Raises:
+            ServiceUnavailableError: If the breaker is open, or the request keeps being
+                throttled or failing transiently.
+        """
+        attempt = 1
+        while True:
+            try:
+                self._breaker.allow()
+            except ServiceUnavailableError:
+                self._count("RejectedRequests")
+                raise
+            try:
+                response = fn(*args, **kwargs)
+            except Exception as e:
+                kind = classify(e)
+                if kind is None:
+                    self._breaker.record_success()
+                    raise
+                self._record(kind)
+                if kind == ErrorKind.TRANSIENT and operation not in IDEMPOTENT_OPERATIONS:
+                    raise ServiceUnavailableError from e
+
+                delay = random.uniform(0, min(self._max_delay, self._base_delay * 2 ** (attempt - 1)))  # noqa: S311
+                # A request that has opened the breaker is not retried, like the ones after it.
+                if (
+                    attempt == self._max_attempts
+                    or not self._has_time_for(delay)
+                    or self._breaker.state == CircuitState.OPEN
+                ):
+                    raise ServiceUnavailableError(retry_after=delay) from e
+                logger.debug(
+                    "Retrying DynamoDB request",
+                    extra={"operation": operation, "error_kind": kind, "attempt": attempt, "delay": delay},
+                )
+                self._count("Retries")
+                self._sleep(delay)
+                attempt += 1
+            else:
+                self._breaker.record_success()
+                return response
+
+    def _record(self, kind: ErrorKind) -> None:
+        if kind == ErrorKind.THROTTLING:
+            self._count("ThrottledRequests")
+            self._breaker.record_throttling()
+        else:
+            self._count("TransientErrors")
+            # A transient error is not a sign of overload, so it does not count towards opening the breaker.
+            self._breaker.record_success()
+
+    def _has_time_for(self, delay: float) -> bool:
+        return self._deadline is None or self._clock() + delay < self._deadline
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def collect_metrics(self) -> dict[str, int]:
+        """Return the counters since the previous collection, and the state of the breaker.
+
+        Returns:
+            The number of throttled requests, transient errors, retries and requests rejected by
+            the open breaker, and whether the breaker is open (1) or not (0).
+        """
+        with self._lock:
+            counters = self._counters
+            self._counters = dict.fromkeys(counters, 0)
+        return {**counters, "CircuitOpen": int(self._breaker.state == CircuitState.OPEN)}
+
+
+class ResilientTable(TableProxy):
+    """Proxy of a DynamoDB table whose requests run under a policy.
+
+    It can be used wherever the repositories expect a table, including the requests they send
+    through `table.meta.client` and the batch writer.
+    """
+
+    def __init__(self, table: Table, policy: ResiliencePolicy) -> None:
+        """Initialize the proxy.
+
+        Args:
+            table: The DynamoDB table instance.
+            policy: The policy to run the requests under.
+        """
+        super().__init__(table, policy)
@@ -0,0 +1,206 @@
+"""Full-text search index implementation.
+
+The index is stored in the chat table as two kinds of items, neither of which has a category,
+so they stay out of the `by_category` index:
+
+- A posting per term and post, under the partition "Term#{term}" and the sort key
+  "{thread_id}#{post_id}", holding the number of occurrences of the term. A search queries
+  the postings of its terms, optionally narrowed down to a thread with `begins_with`.
+- A document per post, under the partition "Document#{post_id}", holding a copy of the post
+  and its terms, so the matches can be returned without touching the posts and the postings
+  can be found again when the post is removed.
+"""
+
+from __future__ import annotations
+
+import heapq
+from datetime import UTC, datetime
+from functools import partial
+from itertools import batched
+from typing import TYPE_CHECKING, Self
+
+from boto3.dynamodb.conditions import Key
+from pydantic import BaseModel
+from ulid import ULID
+
+from chat.domain.post import Post
+from chat.domain.search import AbstractPostSearchIndex, tokenize
+from chat.infrastructure.diagnostics import diagnose
+from chat.infrastructure.dynamodb import BATCH_GET_LIMIT, batch_get_items
+from chat.shared.concurrency import run_concurrently
+from chat.shared.tracing import tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from concurrent.futures import Executor
+
+    from boto3.dynamodb.conditions import ConditionBase
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_dynamodb.type_defs import QueryInputTableQueryTypeDef
+
+TERM_PREFIX = "Term#"
+DOCUMENT_PREFIX = "Document#"
+
+
+class DocumentData(BaseModel):
+    """Search document data model for DynamoDB record.
+
+    Attributes:
+        thread_id: The partition key, "Document#{post_id}".
+        post_id: The sort key. Always "-".
+        post_thread_id: The ID of the thread that the post belongs to.
+        message: The message of the post.
+        created_at: The timestamp when the post was created.
+        terms: The terms of the message.
+    """
+
+    thread_id: str
+    post_id: str
+    post_thread_id: str
+    message: str
+    created_at: int
+    terms: list[str]
+
+    @classmethod
+    def from_model(cls, model: Post, terms: Sequence[str]) -> Self:
+        """Create a DocumentData instance from a Post model.
+
+        Args:
+            model: The Post model to convert.
+            terms: The terms of the message.
+
+        Returns:
+            The converted DocumentData instance.
+        """
+        return cls(
+            thread_id=f"{DOCUMENT_PREFIX}{model.id_}",
+            post_id="-",
+            post_thread_id=str(model.thread_id),
+            message=model.message,
+            created_at=int(model.created_at.timestamp() * 1000000),
+            terms=list(terms),
+        )
+
+    def to_model(self) -> Post:
+        """Convert the DocumentData instance to a Post model.
+
+        Returns:
+            The converted Post model.
+        """
+        return Post(
+            id_=ULID.from_str(self.thread_id.removeprefix(DOCUMENT_PREFIX)),
+            thread_id=ULID.from_str(self.post_thread_id),
+            message=self.message,
+            created_at=datetime.fromtimestamp(self.created_at / 1000000, tz=UTC),
+        )
+
+
+class DynamoDBPostSearchIndex(AbstractPostSearchIndex):
+    """DynamoDB implementation of the post search index."""
+
+    def __init__(self, table: Table, *, executor: Executor | None = None) -> None:
+        """Initialize the index.
+
+        Args:
+            table: The DynamoDB table instance.
+            executor: The executor to query the postings of the terms on concurrently.
+                If None, they are queried one after another.
+        """
+        self._table = table
+        self._executor = executor
+
+    @tracer.capture_method(capture_response=False)
+    def add(self, post: Post) -> None:
+        """Index the given post.
+
+        Args:
+            post: The post to index.
+        """
+        terms = tokenize(post.message)
+        with self._table.batch_writer() as batch:
+            for term, count in terms.items():
+                batch.put_item(
+                    Item={
+                        "thread_id": f"{TERM_PREFIX}{term}",
+                        "post_id": f"{post.thread_id}#{post.id_}",
+                        "count": count,
+                    }
+                )
+            batch.put_item(Item=DocumentData.from_model(post, list(terms)).model_dump())
+
+    @tracer.capture_method(capture_response=False)
+    def remove(self, thread_id: ULID, post_id: ULID) -> None:
+        """Remove the post with the given ID from the index. Does nothing if it is not indexed.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to remove.
+        """
+        key = {"thread_id": f"{DOCUMENT_PREFIX}{post_id}", "post_id": "-"}
+        item = self._table.get_item(Key=key).get("Item")
+        if not item:
+            return
+
+        with self._table.batch_writer() as batch:
+            for term in DocumentData.model_validate(item).terms:
+                batch.delete_item(Key={"thread_id": f"{TERM_PREFIX}{term}", "post_id": f"{thread_id}#{post_id}"})
+            batch.delete_item(Key=key)
+
+    @tracer.capture_method(capture_response=False)
+    def search(self, terms: Sequence[str], *, thread_id: ULID | None = None, limit: int) -> list[Post]:
+        """Search for the posts that contain all of the given terms.
+
+        Args:
+            terms: The terms to search for, as returned by `tokenize`.
+            thread_id: The ID of the thread to search in. If None, all threads are searched.
+            limit: The maximum number of posts to return.
+
+        Returns:
+            The matching posts, best match first.
+        """
+        calls = [partial(self._postings, term, thread_id) for term in dict.fromkeys(terms)]
+        results: Iterable[dict[str, int]]
+        if self._executor and len(calls) > 1:
+            results = run_concurrently(self._executor, calls, name="search_postings")
+        else:
+            # Queried lazily, so no more terms are queried once the intersection is empty.
+            results = (call() for call in calls)
+
+        scores: dict[str, int] | None = None
+        for postings in results:
+            if scores is None:
+                scores = postings
+            else:
+                scores = {key: score + postings[key] for key, score in scores.items() if key in postings}
+            if not scores:
+                return []
+        if not scores:
+            return []
+
+        # Post IDs sort by creation time, so the greater key is the more recent post.
+        best = heapq.nlargest(limit, scores, key=lambda key: (scores[key], key.split("#")[1]))
+        post_ids = [key.split("#")[1] for key in best]
+        found: dict[str, Post] = {}
+        for chunk in batched(post_ids, BATCH_GET_LIMIT):
+            keys = [{"thread_id": f"{DOCUMENT_PREFIX}{id_}", "post_id": "-"} for id_ in chunk]
+            for item in batch_get_items(self._table, keys):
+                post = DocumentData.model_validate(item).to_model()
+                found[str(post.id_)] = post
+
+        return [found[id_] for id_ in post_ids if id_ in found]
+
+    def _postings(self, term: str, thread_id: ULID | None) -> dict[str, int]:
+        """Return the number of occurrences of the term in each post, keyed by "{thread_id}#{post_id}"."""
+        key_condition: ConditionBase = Key("thread_id").eq(f"{TERM_PREFIX}{term}")
+        if thread_id:
+            key_condition &= Key("post_id").begins_with(f"{thread_id}#")
+        kwargs: QueryInputTableQueryTypeDef = {"KeyConditionExpression": key_condition}
+
+        postings: dict[str, int] = {}
+        with diagnose("search.postings"):
+            while True:
+                response = self._table.query(**kwargs)
+                postings.update((str(item["post_id"]), int(str(item["count"]))) for item in response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    return postings
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
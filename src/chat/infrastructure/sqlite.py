@@ -0,0 +1,687 @@
+"""SQLite implementations of the repositories, for single-node and offline deployments.
+
+The records are stored in a single database file, in write-ahead log mode so that the readers
+never block the writer nor each other. Every thread gets its own connection to the file, and the
+connections compile each statement once and keep it in their statement cache, so the statements
+are written as constants and take their variable-length arguments, such as a list of IDs, as a
+JSON array.
+
+The tables are keyed the way the DynamoDB table is:
+
+- `threads` is keyed by the thread ID, and the unique index of the normalized names makes the
+  names unique and serves the lookups and prefix searches by name;
+- `posts` is keyed by `(thread_id, post_id)` without a rowid, so the posts of a thread are stored
+  in the order of their IDs and a listing is a range scan of the primary key;
+- `search_postings` is keyed by `(term, thread_id, post_id)`, like the postings of the DynamoDB
+  search index, and `search_documents` holds the posts found by a search;
+- `idempotency_records` is keyed by the idempotency key.
+
+The timestamps are stored in microseconds since the epoch, like in the DynamoDB table.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from itertools import batched
+from typing import TYPE_CHECKING, Any
+
+from ulid import ULID
+
+from chat.domain.idempotency import AbstractIdempotencyStore, IdempotencyRecord
+from chat.domain.post import AbstractPostRepository, Post
+from chat.domain.search import AbstractPostSearchIndex, tokenize
+from chat.domain.thread import AbstractThreadRepository, Thread, normalize_name
+from chat.shared.exceptions import (
+    PostNotFoundError,
+    ThreadExistsError,
+    ThreadNotFoundError,
+    ThreadVersionConflictError,
+)
+from chat.shared.tracing import tracer
+
+from .idempotency import DEFAULT_IN_PROGRESS_TTL, DEFAULT_TTL
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from pathlib import Path
+
+DEFAULT_PAGE_SIZE = 100
+# The number of statements kept compiled by each connection, more than the module uses.
+STATEMENT_CACHE_SIZE = 64
+BUSY_TIMEOUT = timedelta(seconds=5)
+# The number of IDs looked up by a statement, well below the limits of SQLite.
+LOOKUP_CHUNK_SIZE = 500
+# Sorts after every ULID, which are written with the digits and upper case letters only.
+_AFTER_ALL_IDS = "~"
+
+# The tables of the posts and the search postings are clustered by their primary keys, so their
+# range scans read the rows from the keys without a lookup. The index of the thread names only
+# holds the thread IDs besides the names: SQLite cannot add columns to a unique index without
+# making them part of the key, and the post counts it would have to hold change with every post.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    post_count INTEGER NOT NULL,
+    last_post_at INTEGER,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS threads_by_name ON threads (normalized_name);
+
+CREATE TABLE IF NOT EXISTS posts (
+    thread_id TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    PRIMARY KEY (thread_id, post_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS search_postings (
+    term TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (term, thread_id, post_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    post_id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS idempotency_records (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    status_code INTEGER,
+    body TEXT,
+    expires_at INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _to_timestamp(value: datetime) -> int:
+    return int(value.timestamp() * 1000000)
+
+
+def _from_timestamp(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000000, tz=UTC)
+
+
+class SQLiteDatabase:
+    """The database file of the repositories, with a connection per thread."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the database, creating the file and its tables if needed.
+
+        Args:
+            path: The path of the database file.
+        """
+        self._path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection of the current thread, opened on first use."""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit, so the reads see the latest commit and the writes open their own transactions.
+            connection = sqlite3.connect(
+                self._path,
+                timeout=BUSY_TIMEOUT.total_seconds(),
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            # Durable across crashes of the process, but not of the machine, in WAL mode.
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the block in a write transaction, committed unless the block raises.
+
+        The transaction takes the write lock up front, so its reads cannot be invalidated by
+        another writer before it writes.
+
+        Yields:
+            The connection of the current thread.
+        """
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+def _thread(row: tuple[Any, ...]) -> Thread:
+    thread_id, name, created_at, post_count, last_post_at, version = row
+    return Thread(
+        id_=ULID.from_str(thread_id),
+        name=name,
+        created_at=_from_timestamp(created_at),
+        post_count=post_count,
+        last_post_at=_from_timestamp(last_post_at) if last_post_at is not None else None,
+        version=version,
+    )
+
+
+def _post(row: tuple[Any, ...]) -> Post:
+    thread_id, post_id, message, created_at = row
+    return Post(
+        id_=ULID.from_str(post_id),
+        thread_id=ULID.from_str(thread_id),
+        message=message,
+        created_at=_from_timestamp(created_at),
+    )
+
+
+class SQLiteThreadRepository(AbstractThreadRepository):
+    """SQLite repository for Thread entities."""
+
+    def __init__(self, database: SQLiteDatabase) -> None:
+        """Initialize the repository.
+
+        Args:
+            database: The database to store the threads in.
+        """
+        self._database = database
+
+    @tracer.capture_method(capture_response=False)
+    def save(self, thread: Thread) -> None:
+        """Save the given Thread instance to the repository.
+
+        The version is checked and the thread written in a single transaction. The unique index
+        of the normalized names rejects a name taken by another thread.
+
+        Args:
+            thread: The Thread instance to be saved.
+
+        Raises:
+            ThreadExistsError: If another thread has the same normalized name.
+            ThreadVersionConflictError: If the stored thread has another version.
+        """
+        values = {
+            "thread_id": str(thread.id_),
+            "name": thread.name,
+            "normalized_name": normalize_name(thread.name),
+            "created_at": _to_timestamp(thread.created_at),
+            "post_count": thread.post_count,
+            "last_post_at": _to_timestamp(thread.last_post_at) if thread.last_post_at else None,
+            "version": thread.version + 1,
+        }
+        try:
+            with self._database.transaction() as connection:
+                row = connection.execute(
+                    "SELECT version FROM threads WHERE thread_id = ?", (values["thread_id"],)
+                ).fetchone()
+                if (row[0] if row else 0) != thread.version:
+                    raise ThreadVersionConflictError(thread.id_)
+                # Not INSERT OR REPLACE, which would delete the thread that has the name.
+                connection.execute(
+                    "INSERT INTO threads"
+                    " (thread_id, name, normalized_name, created_at, post_count, last_post_at, version)"
+                    " VALUES (:thread_id, :name, :normalized_name, :created_at, :post_count, :last_post_at, :version)"
+                    " ON CONFLICT (thread_id) DO UPDATE SET name = excluded.name,"
+                    " normalized_name = excluded.normalized_name, created_at = excluded.created_at,"
+                    " post_count = excluded.post_count, last_post_at = excluded.last_post_at,"
+                    " version = excluded.version",
+                    values,
+                )
+        except sqlite3.IntegrityError as e:
+            raise ThreadExistsError(thread.name) from e
+        thread.version += 1
+
+    @tracer.capture_method(capture_response=False)
+    def find_by_id(self, thread_id: ULID) -> Thread | None:
+        """Find a thread by its ID.
+
+        Args:
+            thread_id: The ID of the thread to find.
+
+        Returns:
+            The Thread instance with the given ID, or None if not found.
+        """
+        row = self._database.connection.execute(
+            "SELECT thread_id, name, created_at, post_count, last_post_at, version FROM threads WHERE thread_id = ?",
+            (str(thread_id),),
+        ).fetchone()
+        return _thread(row) if row else None
+
+    @tracer.capture_method(capture_response=False)
+    def find_by_ids(self, thread_ids: Sequence[ULID]) -> list[Thread]:
+        """Find threads by their IDs.
+
+        The IDs are passed as a JSON array, so a single prepared statement looks up any number of them.
+
+        Args:
+            thread_ids: The IDs of the threads to find.
+
+        Returns:
+            The Thread instances found, in the order of the given IDs.
+        """
+        found: dict[str, Thread] = {}
+        for chunk in batched(dict.fromkeys(map(str, thread_ids)), LOOKUP_CHUNK_SIZE):
+            rows = self._database.connection.execute(
+                "SELECT thread_id, name, created_at, post_count, last_post_at, version FROM threads"
+                " WHERE thread_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(chunk),),
+            )
+            found.update((row[0], _thread(row)) for row in rows)
+        return [found[id_] for id_ in map(str, thread_ids) if id_ in found]
+
+    @tracer.capture_method(capture_response=False)
+    def find_by_name(self, name: str) -> Thread | None:
+        """Find a thread by its name, ignoring case and width.
+
+        Args:
+            name: The name of the thread to find.
+
+        Returns:
+            The Thread instance with the given name, or None if not found.
+        """
+        row = self._database.connection.execute(
+            "SELECT thread_id, name, created_at, post_count, last_post_at, version FROM threads"
+            " WHERE normalized_name = ?",
+            (normalize_name(name),),
+        ).fetchone()
+        return _thread(row) if row else None
+
+    @tracer.capture_method(capture_response=False)
+    def search_by_name(self, prefix: str, *, limit: int) -> list[Thread]:
+        """Find the threads whose names start with the given prefix, ignoring case and width.
+
+        The prefix is turned into a range of the normalized names, so the search is a range scan
+        of their index.
+
+        Args:
+            prefix: The prefix of the names.
+            limit: The maximum number of threads to return.
+
+        Returns:
+            The Thread instances found, in the order of their normalized names.
+        """
+        normalized = normalize_name(prefix)
+        if not normalized:
+            return []
+
+        # The names compare by code point, so the names with the prefix sort before its successor.
+        successor = normalized[:-1] + chr(ord(normalized[-1]) + 1)
+        rows = self._database.connection.execute(
+            "SELECT thread_id, name, created_at, post_count, last_post_at, version FROM threads"
+            " WHERE normalized_name >= ? AND normalized_name < ? ORDER BY normalized_name LIMIT ?",
+            (normalized, successor, limit),
+        )
+        return [_thread(row) for row in rows]
+
+    @tracer.capture_method(capture_response=False)
+    def list_all(self) -> list[Thread]:
+        """List all threads.
+
+        Returns:
+            The threads in ascending order of their IDs.
+        """
+        rows = self._database.connection.execute(
+            "SELECT thread_id, name, created_at, post_count, last_post_at, version FROM threads ORDER BY thread_id"
+        )
+        return [_thread(row) for row in rows]
+
+    @tracer.capture_method(capture_response=False)
+    def increment_post_count(self, thread_id: ULID, last_post_at: datetime) -> None:
+        """Atomically record a new post in the activity counters of the thread.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            last_post_at: The timestamp when the post was created.
+
+        Raises:
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+        """
+        cursor = self._database.connection.execute(
+            "UPDATE threads SET post_count = post_count + 1, last_post_at = MAX(IFNULL(last_post_at, 0), ?),"
+            " version = version + 1 WHERE thread_id = ?",
+            (_to_timestamp(last_post_at), str(thread_id)),
+        )
+        if not cursor.rowcount:
+            raise ThreadNotFoundError(thread_id)
+
+    @tracer.capture_method(capture_response=False)
+    def decrement_post_count(self, thread_id: ULID) -> None:
+        """Atomically record a deleted post in the activity counters of the thread.
+
+        Args:
+            thread_id: The ID of the thread that the post belonged to.
+        """
+        self._database.connection.execute(
+            "UPDATE threads SET post_count = post_count - 1, version = version + 1"
+            " WHERE thread_id = ? AND post_count > 0",
+            (str(thread_id),),
+        )
+
+    @tracer.capture_method(capture_response=False)
+    def delete(self, id_: ULID) -> None:
+        """Delete the thread with the given ID, and release its name.
+
+        Args:
+            id_: The ID of the thread to delete.
+
+        Raises:
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+        """
+        cursor = self._database.connection.execute("DELETE FROM threads WHERE thread_id = ?", (str(id_),))
+        if not cursor.rowcount:
+            raise ThreadNotFoundError(id_)
+
+
+def _post_values(post: Post) -> tuple[str, str, str, int]:
+    return str(post.thread_id), str(post.id_), post.message, _to_timestamp(post.created_at)
+
+
+class SQLitePostRepository(AbstractPostRepository):
+    """SQLite repository for Post entities."""
+
+    def __init__(self, database: SQLiteDatabase, *, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        """Initialize the repository.
+
+        Args:
+            database: The database to store the posts in.
+            page_size: The number of posts read at a time by `iter_by_thread_id`.
+        """
+        self._database = database
+        self._page_size = page_size
+
+    @tracer.capture_method(capture_response=False)
+    def save(self, post: Post) -> None:
+        """Save the given Post instance to the repository.
+
+        Args:
+            post: The Post instance to be saved.
+        """
+        self._database.connection.execute(
+            "INSERT OR REPLACE INTO posts (thread_id, post_id, message, created_at) VALUES (?, ?, ?, ?)",
+            _post_values(post),
+        )
+
+    @tracer.capture_method(capture_response=False)
+    def save_all(self, posts: Iterable[Post]) -> None:
+        """Save the given Post instances in a single transaction, with a single prepared statement.
+
+        Args:
+            posts: The Post instances to be saved.
+        """
+        with self._database.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO posts (thread_id, post_id, message, created_at) VALUES (?, ?, ?, ?)",
+                map(_post_values, posts),
+            )
+
+    @tracer.capture_method(capture_response=False)
+    def list_by_thread_id(  # noqa: PLR0913
+        self,
+        thread_id: ULID,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: ULID | None = None,
+        limit: int | None = None,
+    ) -> list[Post]:
+        """List the posts of a thread with a range scan of the primary key.
+
+        Like the DynamoDB repository, the posts are selected by the timestamp of their IDs.
+
+        Args:
+            thread_id: The ID of the thread.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+            after: The ID of the post to list posts after, exclusive.
+            limit: The maximum number of posts to list.
+
+        Returns:
+            The posts of the thread, in ascending order of their IDs.
+        """
+        # A bare timestamp prefix sorts before every ID that starts with it, so it bounds them inclusively.
+        lower = str(ULID.from_datetime(start))[:10] if start else ""
+        rows = self._database.connection.execute(
+            "SELECT thread_id, post_id, message, created_at FROM posts"
+            " WHERE thread_id = ? AND post_id >= ? AND post_id > ? AND post_id < ? ORDER BY post_id LIMIT ?",
+            (
+                str(thread_id),
+                lower,
+                str(after) if after else "",
+                str(ULID.from_datetime(end))[:10] if end else _AFTER_ALL_IDS,
+                -1 if limit is None else limit,
+            ),
+        )
+        return [_post(row) for row in rows]
+
+    def iter_by_thread_id(
+        self, thread_id: ULID, *, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[Post]:
+        """Iterate over the posts of a thread, reading a page of posts at a time.
+
+        Args:
+            thread_id: The ID of the thread.
+            start: The timestamp to start listing posts from.
+            end: The timestamp to list posts until, exclusive.
+
+        Yields:
+            The posts of the thread, in ascending order of their IDs.
+        """
+        after = None
+        while page := self.list_by_thread_id(thread_id, start=start, end=end, after=after, limit=self._page_size):
+            yield from page
+            after = page[-1].id_
+
+    @tracer.capture_method(capture_response=False)
+    def delete(self, thread_id: ULID, post_id: ULID) -> None:
+        """Delete the Post with the given ID.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to delete.
+
+        Raises:
+            PostNotFoundError: If the post with the given ID does not exist.
+        """
+        cursor = self._database.connection.execute(
+            "DELETE FROM posts WHERE thread_id = ? AND post_id = ?", (str(thread_id), str(post_id))
+        )
+        if not cursor.rowcount:
+            raise PostNotFoundError(post_id)
+
+
+class SQLitePostSearchIndex(AbstractPostSearchIndex):
+    """SQLite implementation of the post search index."""
+
+    def __init__(self, database: SQLiteDatabase) -> None:
+        """Initialize the index.
+
+        Args:
+            database: The database to store the index in.
+        """
+        self._database = database
+
+    @tracer.capture_method(capture_response=False)
+    def add(self, post: Post) -> None:
+        """Index the given post, replacing the postings of its previous message if it was indexed.
+
+        Args:
+            post: The post to index.
+        """
+        with self._database.transaction() as connection:
+            self._remove(connection, str(post.id_))
+            connection.execute(
+                "INSERT INTO search_documents (thread_id, post_id, message, created_at) VALUES (?, ?, ?, ?)",
+                _post_values(post),
+            )
+            connection.executemany(
+                "INSERT INTO search_postings (term, thread_id, post_id, count) VALUES (?, ?, ?, ?)",
+                ((term, str(post.thread_id), str(post.id_), count) for term, count in tokenize(post.message).items()),
+            )
+
+    @tracer.capture_method(capture_response=False)
+    def remove(self, thread_id: ULID, post_id: ULID) -> None:  # noqa: ARG002
+        """Remove the post with the given ID from the index. Does nothing if it is not indexed.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            post_id: The ID of the post to remove.
+        """
+        with self._database.transaction() as connection:
+            self._remove(connection, str(post_id))
+
+    @staticmethod
+    def _remove(connection: sqlite3.Connection, post_id: str) -> None:
+        """Delete the document of the post, and its postings by their primary keys."""
+        row = connection.execute(
+            "DELETE FROM search_documents WHERE post_id = ? RETURNING thread_id, message", (post_id,)
+        ).fetchone()
+        if row:
+            thread_id, message = row
+            connection.executemany(
+                "DELETE FROM search_postings WHERE term = ? AND thread_id = ? AND post_id = ?",
+                ((term, thread_id, post_id) for term in tokenize(message)),
+            )
+
+    @tracer.capture_method(capture_response=False)
+    def search(self, terms: Sequence[str], *, thread_id: ULID | None = None, limit: int) -> list[Post]:
+        """Search for the posts that contain all of the given terms.
+
+        The postings of the terms are added up per post in a single query, which keeps the posts
+        that have a posting for every term.
+
+        Args:
+            terms: The terms to search for, as returned by `tokenize`.
+            thread_id: The ID of the thread to search in. If None, all threads are searched.
+            limit: The maximum number of posts to return.
+
+        Returns:
+            The matching posts, best match first.
+        """
+        unique_terms = list(dict.fromkeys(terms))
+        if not unique_terms:
+            return []
+
+        # Post IDs sort by creation time, so the greater ID is the more recent post.
+        rows = self._database.connection.execute(
+            "SELECT document.thread_id, document.post_id, document.message, document.created_at"
+            " FROM ("
+            "   SELECT post_id, SUM(count) AS score FROM search_postings"
+            "   WHERE term IN (SELECT value FROM json_each(:terms)) AND (:thread_id IS NULL OR thread_id = :thread_id)"
+            "   GROUP BY post_id HAVING COUNT(*) = :term_count"
+            "   ORDER BY score DESC, post_id DESC LIMIT :limit"
+            " ) AS best JOIN search_documents AS document USING (post_id)"
+            " ORDER BY best.score DESC, document.post_id DESC",
+            {
+                "terms": json.dumps(unique_terms),
+                "thread_id": str(thread_id) if thread_id else None,
+                "term_count": len(unique_terms),
+                "limit": limit,
+            },
+        )
+        return [_post(row) for row in rows]
+
+
+class SQLiteIdempotencyStore(AbstractIdempotencyStore):
+    """SQLite implementation of the idempotency store.
+
+    The `expires_at` column holds the expiration time in epoch seconds, and an expired record is
+    overwritten when the key is used again.
+    """
+
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        *,
+        ttl: timedelta = DEFAULT_TTL,
+        in_progress_ttl: timedelta = DEFAULT_IN_PROGRESS_TTL,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            database: The database to store the records in.
+            ttl: How long the response of a request is replayed.
+            in_progress_ttl: How long a request in progress blocks its retries, in case it never completes.
+        """
+        self._database = database
+        self._ttl = ttl
+        self._in_progress_ttl = in_progress_ttl
+
+    def start(self, key: str, fingerprint: str) -> IdempotencyRecord | None:
+        """Start a record for the given key, unless there is one already.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+
+        Returns:
+            None if the record was started, or the existing record of the key.
+        """
+        now = datetime.now(UTC)
+        with self._database.transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO idempotency_records (key, fingerprint, expires_at)"
+                " VALUES (:key, :fingerprint, :expires_at)"
+                " ON CONFLICT (key) DO UPDATE SET fingerprint = excluded.fingerprint, status_code = NULL, body = NULL,"
+                " expires_at = excluded.expires_at WHERE idempotency_records.expires_at < :now",
+                {
+                    "key": key,
+                    "fingerprint": fingerprint,
+                    "expires_at": int((now + self._in_progress_ttl).timestamp()),
+                    "now": int(now.timestamp()),
+                },
+            )
+            if cursor.rowcount:
+                return None
+            fingerprint, status_code, body = connection.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency_records WHERE key = ?", (key,)
+            ).fetchone()
+        return IdempotencyRecord(fingerprint=fingerprint, status_code=status_code, body=body)
+
+    def complete(self, key: str, fingerprint: str, status_code: int, body: str | None) -> None:
+        """Record the response of the request started with the given key.
+
+        Args:
+            key: The idempotency key.
+            fingerprint: The hash of the request.
+            status_code: The status code of the response.
+            body: The body of the response.
+        """
+        self._database.connection.execute(
+            "INSERT OR REPLACE INTO idempotency_records (key, fingerprint, status_code, body, expires_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, fingerprint, status_code, body, int((datetime.now(UTC) + self._ttl).timestamp())),
+        )
+
+    def release(self, key: str) -> None:
+        """Delete the record of the given key, so the request can be retried.
+
+        Args:
+            key: The idempotency key.
+        """
+        self._database.connection.execute("DELETE FROM idempotency_records WHERE key = ?", (key,))
@@ -1,19 +1,53 @@
-"""Repository implementation for Thread entities."""
+"""Repository implementation for Thread entities.
+
+Besides the thread record, each thread owns a name record under the partition
+"ThreadName#{first character}" and the sort key of its normalized name. The name records make
+the names unique regardless of case and width, and support lookups and prefix searches by name
+without scanning the threads. They have no category, so they stay out of the `by_category` index.
+"""
 
 from __future__ import annotations
 
+import contextlib
 from datetime import UTC, datetime
+from functools import partial
+from itertools import batched, chain
 from typing import TYPE_CHECKING, Self
 
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
 from pydantic import BaseModel
 from ulid import ULID
 
-from chat.domain.thread import AbstractThreadRepository, Thread
-from chat.shared.exceptions import ThreadNotFoundError
+from chat.domain.thread import AbstractThreadRepository, Thread, normalize_name
+from chat.infrastructure.diagnostics import diagnose
+from chat.infrastructure.dynamodb import BATCH_GET_LIMIT, batch_get_items
+from chat.shared.concurrency import run_concurrently
+from chat.shared.exceptions import ThreadExistsError, ThreadNotFoundError, ThreadVersionConflictError
+from chat.shared.tracing import tracer
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from concurrent.futures import Executor
+
     from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_dynamodb.type_defs import QueryInputTableQueryTypeDef, TransactWriteItemTypeDef
+
+    from chat.shared.concurrency import SingleFlight
+
+NAME_PREFIX = "ThreadName#"
+
+
+def _to_timestamp(value: datetime) -> int:
+    return int(value.timestamp() * 1000000)
+
+
+def _from_timestamp(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000000, tz=UTC)
+
+
+def _name_key(name: str) -> dict[str, str]:
+    normalized = normalize_name(name)
+    return {"thread_id": f"{NAME_PREFIX}{normalized[0]}", "post_id": normalized}
 
 
 class ThreadData(BaseModel):
@@ -25,6 +59,9 @@ class ThreadData(BaseModel):
         category: The category of the record. Always "Thread".
         name: The name of the thread.
         created_at: The timestamp when the thread was created.
+        post_count: The number of posts in the thread.
+        last_post_at: The timestamp when the last post was created.
+        version: The version of the record. Absent from the records written before versioning, read as 0.
     """
 
     thread_id: str
@@ -32,6 +69,9 @@ class ThreadData(BaseModel):
     category: str
     name: str
     created_at: int
+    post_count: int = 0
+    last_post_at: int | None = None
+    version: int = 0
 
     @classmethod
     def from_model(cls, model: Thread) -> Self:
@@ -48,41 +88,115 @@ class ThreadData(BaseModel):
             post_id="-",
             category="Thread",
             name=model.name,
-            created_at=int(model.created_at.timestamp() * 1000000),
+            created_at=_to_timestamp(model.created_at),
+            post_count=model.post_count,
+            last_post_at=_to_timestamp(model.last_post_at) if model.last_post_at else None,
+            version=model.version,
         )
 
     def to_model(self) -> Thread:
         """Convert the ThreadData instance to a Thread model.
 
         Returns:
-            The converted Thread model.
+            The converted Thread model, marked as stored.
         """
-        return Thread(
+        thread = Thread(
             id_=ULID.from_str(self.thread_id),
             name=self.name,
-            created_at=datetime.fromtimestamp(self.created_at / 1000000, tz=UTC),
+            created_at=_from_timestamp(self.created_at),
+            post_count=self.post_count,
+            last_post_at=_from_timestamp(self.last_post_at) if self.last_post_at else None,
+            version=self.version,
         )
+        thread.mark_stored()
+        return thread
 
 
 class DynamoDBThreadRepository(AbstractThreadRepository):
     """DynamoDB repository for Thread entities."""
 
-    def __init__(self, table: Table) -> None:
+    def __init__(
+        self, table: Table, *, executor: Executor | None = None, single_flight: SingleFlight | None = None
+    ) -> None:
         """Initialize the repository.
 
         Args:
             table: The DynamoDB table to use.
+            executor: The executor to run independent requests on concurrently.
+                If None, they run one after another.
+            single_flight: The group to coalesce the concurrent identical reads in.
+                If None, every read sends its own request.
         """
         self._table = table
+        self._executor = executor
+        self._single_flight = single_flight
 
+    @tracer.capture_method(capture_response=False)
     def save(self, thread: Thread) -> None:
         """Save the given Thread instance to the repository.
 
+        The thread record and its name record are written in a single transaction, conditional
+        on the version of the thread record, or on its absence for a thread that has never been
+        stored. When the thread is renamed, the record of its stored name is released in the same
+        transaction. The stored name and version are carried by the thread, so nothing is read.
+
         Args:
             thread: The Thread instance to be saved.
+
+        Raises:
+            ThreadExistsError: If another thread has the same normalized name.
+            ThreadVersionConflictError: If the stored thread has another version.
         """
-        self._table.put_item(Item=ThreadData.from_model(thread).model_dump(exclude_none=True))
+        item = ThreadData.from_model(thread).model_dump(exclude_none=True)
+        item["version"] = thread.version + 1
+        owner = {":thread_id": str(thread.id_)}
+
+        put_thread: TransactWriteItemTypeDef = {"Put": {"TableName": self._table.name, "Item": item}}
+        if thread.version:
+            put_thread["Put"]["ConditionExpression"] = "version = :version"
+            put_thread["Put"]["ExpressionAttributeValues"] = {":version": thread.version}
+        elif thread.stored_name is None:
+            put_thread["Put"]["ConditionExpression"] = "attribute_not_exists(thread_id)"
+        else:
+            # The records written before versioning have no version, and are read as version 0.
+            put_thread["Put"]["ConditionExpression"] = "attribute_exists(thread_id) AND attribute_not_exists(version)"
+        actions: list[TransactWriteItemTypeDef] = [
+            put_thread,
+            {
+                "Put": {
+                    "TableName": self._table.name,
+                    "Item": {**_name_key(thread.name), "name_thread_id": str(thread.id_)},
+                    "ConditionExpression": "attribute_not_exists(thread_id) OR name_thread_id = :thread_id",
+                    "ExpressionAttributeValues": owner,
+                }
+            },
+        ]
+        if thread.stored_name is not None and normalize_name(thread.stored_name) != normalize_name(thread.name):
+            actions.append(
+                {
+                    "Delete": {
+                        "TableName": self._table.name,
+                        "Key": _name_key(thread.stored_name),
+                        "ConditionExpression": "attribute_not_exists(thread_id) OR name_thread_id = :thread_id",
+                        "ExpressionAttributeValues": owner,
+                    }
+                }
+            )
+
+        client = self._table.meta.client
+        try:
+            client.transact_write_items(TransactItems=actions)
+        except client.exceptions.TransactionCanceledException as e:
+            reasons = [reason.get("Code") for reason in e.response.get("CancellationReasons", [])]
+            if reasons[:1] == ["ConditionalCheckFailed"]:
+                raise ThreadVersionConflictError(thread.id_) from e
+            if reasons[1:2] == ["ConditionalCheckFailed"]:
+                raise ThreadExistsError(thread.name) from e
+            raise
+        thread.version += 1
+        thread.mark_stored()
 
+    @tracer.capture_method(capture_response=False)
     def find_by_id(self, thread_id: ULID) -> Thread | None:
         """Find a thread by its ID.
 
@@ -92,22 +206,189 @@ class DynamoDBThreadRepository(AbstractThreadRepository):
         Returns:
             The Thread instance corresponding to the given ID, or None if not found.
         """
+        if self._single_flight:
+            # Every caller gets its own copy, since the thread may be modified and saved.
+            return self._single_flight.do(
+                ("thread.find_by_id", thread_id),
+                partial(self._find_by_id, thread_id),
+                share=lambda thread: thread.model_copy() if thread else None,
+            )
+        return self._find_by_id(thread_id)
+
+    def _find_by_id(self, thread_id: ULID) -> Thread | None:
         response = self._table.get_item(Key={"thread_id": str(thread_id), "post_id": "-"})
         item = response.get("Item")
         return ThreadData.model_validate(item).to_model() if item else None
 
+    @tracer.capture_method(capture_response=False)
+    def find_by_ids(self, thread_ids: Sequence[ULID]) -> list[Thread]:
+        """Find threads by their IDs with BatchGetItem.
+
+        The keys are requested in chunks of 100, the limit of BatchGetItem, and the unprocessed
+        keys are retried with exponential backoff. The chunks are requested concurrently if the
+        repository has an executor.
+
+        Args:
+            thread_ids: The IDs of the threads to find.
+
+        Returns:
+            The Thread instances found, in the order of the given IDs.
+
+        Raises:
+            UnprocessedKeysError: If some keys are still unprocessed after all retries.
+        """
+        calls = [
+            partial(batch_get_items, self._table, [{"thread_id": id_, "post_id": "-"} for id_ in chunk])
+            for chunk in batched(dict.fromkeys(map(str, thread_ids)), BATCH_GET_LIMIT)
+        ]
+        if self._executor and len(calls) > 1:
+            results = run_concurrently(self._executor, calls, name="thread_batch_get")
+        else:
+            results = [call() for call in calls]
+
+        found: dict[str, Thread] = {}
+        for item in chain.from_iterable(results):
+            thread = ThreadData.model_validate(item).to_model()
+            found[str(thread.id_)] = thread
+
+        return [found[id_] for id_ in map(str, thread_ids) if id_ in found]
+
+    @tracer.capture_method(capture_response=False)
+    def find_by_name(self, name: str) -> Thread | None:
+        """Find a thread by its name, ignoring case and width.
+
+        Args:
+            name: The name of the thread to find.
+
+        Returns:
+            The Thread instance with the given name, or None if not found.
+        """
+        if not normalize_name(name):
+            return None
+
+        item = self._table.get_item(Key=_name_key(name)).get("Item")
+        if not item:
+            return None
+
+        thread = self.find_by_id(ULID.from_str(str(item["name_thread_id"])))
+        if not thread or normalize_name(thread.name) != normalize_name(name):
+            return None
+        return thread
+
+    @tracer.capture_method(capture_response=False)
+    def search_by_name(self, prefix: str, *, limit: int) -> list[Thread]:
+        """Find the threads whose names start with the given prefix, ignoring case and width.
+
+        The name records of the prefix are read with a `begins_with` query on a single partition,
+        and the threads are then fetched with BatchGetItem. A name record whose thread is gone or
+        renamed since is dropped, so the query is continued until the limit is filled or the
+        records run out.
+
+        Args:
+            prefix: The prefix of the names.
+            limit: The maximum number of threads to return.
+
+        Returns:
+            The Thread instances found, in the order of their normalized names.
+        """
+        normalized = normalize_name(prefix)
+        if not normalized:
+            return []
+
+        kwargs: QueryInputTableQueryTypeDef = {
+            "KeyConditionExpression": Key("thread_id").eq(f"{NAME_PREFIX}{normalized[0]}")
+            & Key("post_id").begins_with(normalized)
+        }
+        threads: list[Thread] = []
+        with diagnose("thread.search_by_name", limit=limit):
+            while len(threads) < limit:
+                kwargs["Limit"] = limit - len(threads)
+                response = self._table.query(**kwargs)
+                items = response.get("Items", [])
+                found = {
+                    str(thread.id_): thread
+                    for thread in self.find_by_ids([ULID.from_str(str(item["name_thread_id"])) for item in items])
+                }
+                threads.extend(
+                    thread
+                    for item in items
+                    if (thread := found.get(str(item["name_thread_id"])))
+                    and normalize_name(thread.name) == item["post_id"]
+                )
+
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return threads
+
+    @tracer.capture_method(capture_response=False)
     def list_all(self) -> list[Thread]:
         """List all threads.
 
         Returns:
             The list of all threads.
         """
-        response = self._table.query(IndexName="by_category", KeyConditionExpression=Key("category").eq("Thread"))
+        with diagnose("thread.list_all"):
+            response = self._table.query(IndexName="by_category", KeyConditionExpression=Key("category").eq("Thread"))
         items = response.get("Items", [])
         return [ThreadData.model_validate(item).to_model() for item in items]
 
+    @tracer.capture_method(capture_response=False)
+    def increment_post_count(self, thread_id: ULID, last_post_at: datetime) -> None:
+        """Atomically record a new post in the activity counters of the thread.
+
+        The timestamp of the last post only moves forward: it is set by the same update as the
+        counter if it is absent or older, which is the case of the latest post. Otherwise, such as
+        for a post whose save was delayed, the update is conditional on it and fails, and only the
+        counter is updated instead.
+
+        Args:
+            thread_id: The ID of the thread that the post belongs to.
+            last_post_at: The timestamp when the post was created.
+
+        Raises:
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+        """
+        key = {"thread_id": str(thread_id), "post_id": "-"}
+        timestamp = _to_timestamp(last_post_at)
+        with contextlib.suppress(self._table.meta.client.exceptions.ConditionalCheckFailedException):
+            self._table.update_item(
+                Key=key,
+                UpdateExpression="ADD post_count :one, version :one SET last_post_at = :last_post_at",
+                ConditionExpression=Attr("thread_id").exists()
+                & (Attr("last_post_at").not_exists() | Attr("last_post_at").lt(timestamp)),
+                ExpressionAttributeValues={":one": 1, ":last_post_at": timestamp},
+            )
+            return
+
+        try:
+            self._table.update_item(
+                Key=key,
+                UpdateExpression="ADD post_count :one, version :one",
+                ConditionExpression=Attr("thread_id").exists(),
+                ExpressionAttributeValues={":one": 1},
+            )
+        except self._table.meta.client.exceptions.ConditionalCheckFailedException as e:
+            raise ThreadNotFoundError(thread_id) from e
+
+    @tracer.capture_method(capture_response=False)
+    def decrement_post_count(self, thread_id: ULID) -> None:
+        """Atomically record a deleted post in the activity counters of the thread.
+
+        Args:
+            thread_id: The ID of the thread that the post belonged to.
+        """
+        with contextlib.suppress(self._table.meta.client.exceptions.ConditionalCheckFailedException):
+            self._table.update_item(
+                Key={"thread_id": str(thread_id), "post_id": "-"},
+                UpdateExpression="ADD post_count :minus_one, version :one",
+                ConditionExpression=Attr("post_count").gt(0),
+                ExpressionAttributeValues={":minus_one": -1, ":one": 1},
+            )
+
+    @tracer.capture_method(capture_response=False)
     def delete(self, id_: ULID) -> None:
-        """Delete the thread with the given ID.
+        """Delete the thread with the given ID, and release its name.
 
         Args:
             id_: The ID of the thread to delete.
@@ -116,3 +397,9 @@ class DynamoDBThreadRepository(AbstractThreadRepository):
 
         if not response.get("Attributes"):
             raise ThreadNotFoundError(id_)
+
+        with contextlib.suppress(self._table.meta.client.exceptions.ConditionalCheckFailedException):
+            self._table.delete_item(
+                Key=_name_key(str(response["Attributes"]["name"])),
+                ConditionExpression=Attr("name_thread_id").eq(str(id_)),
+            )
@@ -0,0 +1,88 @@
+"""Tracing of the DynamoDB requests.
+
+The repositories send their requests through `TracedTable`, a proxy of the boto3 table that
+records every request as a span of the tracing provider of `tracer`, annotated with the table,
+the index, and the number of items and pages it read. The counts are also added up on the span of
+the repository method that sent the requests. In Lambda, the provider is the X-Ray recorder, so
+the requests are recorded as X-Ray subsegments and their annotations can be searched in X-Ray.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from chat.shared.tracing import LocalTracer, Span, current_span, tracer
+
+from .dynamodb import PAGED_OPERATIONS, TableProxy, count_items
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from numbers import Number
+
+    from aws_lambda_powertools.tracing.base import BaseProvider
+    from mypy_boto3_dynamodb.service_resource import Table
+
+T = TypeVar("T")
+
+# Guards the counting annotations of the X-Ray subsegments, which the concurrent requests add to.
+_lock = threading.Lock()
+
+
+def _current_span(provider: BaseProvider) -> Any:  # noqa: ANN401
+    """Return the span that the requests are sent from, if any.
+
+    It is the current span of the local tracer, or the current subsegment of the X-Ray recorder.
+    """
+    if isinstance(provider, LocalTracer):
+        return current_span()
+    return getattr(provider, "current_subsegment", lambda: None)()
+
+
+def _add_annotation(span: Any, key: str, value: int) -> None:  # noqa: ANN401
+    """Add the value to a counting annotation of the span."""
+    if isinstance(span, Span):
+        span.add_annotation(key, value)
+        return
+    with _lock:
+        span.put_annotation(key, span.annotations.get(key, 0) + value)
+
+
+class _RequestTracer:
+    """Records the requests sent to a table as spans."""
+
+    def __init__(self, table_name: str, provider: BaseProvider) -> None:
+        self._table_name = table_name
+        self._provider = provider
+
+    def call(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Send a request, recording it as a span."""
+        parent = _current_span(self._provider)
+        with self._provider.in_subsegment(f"## dynamodb.{operation}") as span:
+            span.put_annotation("table", self._table_name)
+            if index := kwargs.get("IndexName"):
+                span.put_annotation("index", index)
+            response: Any = fn(*args, **kwargs)
+            items, _ = count_items(operation, response)
+            pages = int(operation in PAGED_OPERATIONS)
+            # Powertools declares the values as `numbers.Number`, which type checkers do not support.
+            span.put_annotation("item_count", cast("Number", items))
+            span.put_annotation("page_count", cast("Number", pages))
+            if parent is not None:
+                _add_annotation(parent, "item_count", items)
+                _add_annotation(parent, "page_count", pages)
+            return response  # type: ignore[no-any-return]
+
+
+class TracedTable(TableProxy):
+    """Proxy of a DynamoDB table whose requests are recorded as spans."""
+
+    def __init__(self, table: Table, provider: BaseProvider | None = None) -> None:
+        """Initialize the proxy.
+
+        Args:
+            table: The DynamoDB table instance.
+            provider: The tracing provider to record the spans with. Defaults to the provider of
+                `tracer`.
+        """
+        super().__init__(table, _RequestTracer(table.name, provider or tracer.provider))
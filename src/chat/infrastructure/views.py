@@ -0,0 +1,330 @@
+"""Materialized read views implementation.
+
+The views are stored in the chat table as three kinds of items, none of which has a category, so
+they stay out of the `by_category` index:
+
+- A thread entry per thread, under the partition "View#threads#{shard}" and the thread ID as the
+  sort key, holding a copy of the thread with its counters. The thread list is a query of every
+  shard, merged in the order of the IDs.
+- A feed entry per recent post, under the partition "View#recent_posts#{shard}" and the post ID
+  as the sort key, holding a copy of the post. The feed is a query of every shard in descending
+  order, bounded by the timestamp prefix of the oldest post it keeps, merged newest first.
+- A thread post entry per recent post, under the partition "View#thread_posts#{thread_id}" and
+  the post ID as the sort key, so the feed entries of a thread are found by a key lookup when the
+  thread is deleted.
+
+The shard of an entry is derived from the random part of the thread or post ID, so the writes
+of the views are spread over `VIEW_SHARDS` partitions rather than bound by the write limit of
+one. The number of shards is a property of the stored views: changing it requires rebuilding
+them. The feed and thread post entries expire with the TTL of the table once they are past it.
+"""
+
+from __future__ import annotations
+
+import heapq
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, Self
+
+from boto3.dynamodb.conditions import Attr, Key
+from pydantic import BaseModel
+from ulid import ULID
+
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.domain.views import AbstractReadViews
+from chat.infrastructure.diagnostics import diagnose
+from chat.shared.concurrency import run_concurrently
+from chat.shared.tracing import tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from concurrent.futures import Executor
+
+    from boto3.dynamodb.conditions import ConditionBase
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_dynamodb.type_defs import QueryInputTableQueryTypeDef
+
+THREAD_LIST_KEY = "View#threads"
+RECENT_POSTS_KEY = "View#recent_posts"
+THREAD_POSTS_KEY = "View#thread_posts"
+# The number of partitions that each of the thread list and the feed is spread over.
+VIEW_SHARDS = 4
+# How long a post stays in the recent post feed.
+RECENT_POST_TTL = timedelta(days=7)
+
+
+def _to_timestamp(value: datetime) -> int:
+    return int(value.timestamp() * 1000000)
+
+
+def _from_timestamp(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000000, tz=UTC)
+
+
+def _shard_key(prefix: str, id_: ULID) -> str:
+    return f"{prefix}#{int.from_bytes(id_.bytes[6:]) % VIEW_SHARDS}"
+
+
+def _thread_posts_key(thread_id: ULID) -> str:
+    return f"{THREAD_POSTS_KEY}#{thread_id}"
+
+
+class ThreadEntryData(BaseModel):
+    """Thread list entry data model for DynamoDB record.
+
+    Attributes:
+        thread_id: The partition key, the shard of the thread list.
+        post_id: The sort key, the ID of the thread.
+        name: The name of the thread.
+        created_at: The timestamp when the thread was created.
+        post_count: The number of posts in the thread.
+        last_post_at: The timestamp when the last post was created.
+        version: The version of the thread record that the entry was copied from.
+    """
+
+    thread_id: str
+    post_id: str
+    name: str
+    created_at: int
+    post_count: int = 0
+    last_post_at: int | None = None
+    version: int = 0
+
+    @classmethod
+    def from_model(cls, model: Thread) -> Self:
+        """Create a ThreadEntryData instance from a Thread model.
+
+        Args:
+            model: The Thread model to convert.
+
+        Returns:
+            The converted ThreadEntryData instance.
+        """
+        return cls(
+            thread_id=_shard_key(THREAD_LIST_KEY, model.id_),
+            post_id=str(model.id_),
+            name=model.name,
+            created_at=_to_timestamp(model.created_at),
+            post_count=model.post_count,
+            last_post_at=_to_timestamp(model.last_post_at) if model.last_post_at else None,
+            version=model.version,
+        )
+
+    def to_model(self) -> Thread:
+        """Convert the ThreadEntryData instance to a Thread model.
+
+        Returns:
+            The converted Thread model.
+        """
+        return Thread(
+            id_=ULID.from_str(self.post_id),
+            name=self.name,
+            created_at=_from_timestamp(self.created_at),
+            post_count=self.post_count,
+            last_post_at=_from_timestamp(self.last_post_at) if self.last_post_at else None,
+            version=self.version,
+        )
+
+
+class RecentPostData(BaseModel):
+    """Recent post feed entry data model for DynamoDB record.
+
+    Attributes:
+        thread_id: The partition key, the shard of the feed.
+        post_id: The sort key, the ID of the post.
+        post_thread_id: The ID of the thread that the post belongs to.
+        message: The message of the post.
+        created_at: The timestamp when the post was created.
+        expires_at: The epoch second when the entry is deleted by the TTL of the table.
+    """
+
+    thread_id: str
+    post_id: str
+    post_thread_id: str
+    message: str
+    created_at: int
+    expires_at: int
+
+    @classmethod
+    def from_model(cls, model: Post) -> Self:
+        """Create a RecentPostData instance from a Post model.
+
+        Args:
+            model: The Post model to convert.
+
+        Returns:
+            The converted RecentPostData instance.
+        """
+        return cls(
+            thread_id=_shard_key(RECENT_POSTS_KEY, model.id_),
+            post_id=str(model.id_),
+            post_thread_id=str(model.thread_id),
+            message=model.message,
+            created_at=_to_timestamp(model.created_at),
+            expires_at=int((model.created_at + RECENT_POST_TTL).timestamp()),
+        )
+
+    def to_model(self) -> Post:
+        """Convert the RecentPostData instance to a Post model.
+
+        Returns:
+            The converted Post model.
+        """
+        return Post(
+            id_=ULID.from_str(self.post_id),
+            thread_id=ULID.from_str(self.post_thread_id),
+            message=self.message,
+            created_at=_from_timestamp(self.created_at),
+        )
+
+
+class DynamoDBReadViews(AbstractReadViews):
+    """DynamoDB implementation of the materialized read views."""
+
+    def __init__(self, table: Table, *, executor: Executor | None = None) -> None:
+        """Initialize the views.
+
+        Args:
+            table: The DynamoDB table instance.
+            executor: The executor to query the shards of a view on concurrently.
+                If None, they are queried one after another.
+        """
+        self._table = table
+        self._executor = executor
+
+    @tracer.capture_method(capture_response=False)
+    def save_thread(self, thread: Thread) -> None:
+        """Put the thread into the thread list, unless a later version of it is there already.
+
+        Args:
+            thread: The thread as stored.
+        """
+        try:
+            self._table.put_item(
+                Item=ThreadEntryData.from_model(thread).model_dump(exclude_none=True),
+                ConditionExpression=Attr("post_id").not_exists() | Attr("version").lte(thread.version),
+            )
+        except self._table.meta.client.exceptions.ConditionalCheckFailedException:
+            return
+
+    @tracer.capture_method(capture_response=False)
+    def delete_thread(self, thread_id: ULID) -> None:
+        """Remove the thread from the thread list, and its posts from the recent post feed.
+
+        The posts of the thread in the feed are found in its thread post entries.
+
+        Args:
+            thread_id: The ID of the thread.
+        """
+        self._table.delete_item(Key={"thread_id": _shard_key(THREAD_LIST_KEY, thread_id), "post_id": str(thread_id)})
+
+        kwargs: QueryInputTableQueryTypeDef = {
+            "KeyConditionExpression": Key("thread_id").eq(_thread_posts_key(thread_id)),
+            "ProjectionExpression": "post_id",
+        }
+        with diagnose("views.delete_thread"), self._table.batch_writer() as batch:
+            while True:
+                response = self._table.query(**kwargs)
+                for item in response.get("Items", []):
+                    post_id = ULID.from_str(str(item["post_id"]))
+                    batch.delete_item(Key={"thread_id": _shard_key(RECENT_POSTS_KEY, post_id), "post_id": str(post_id)})
+                    batch.delete_item(Key={"thread_id": _thread_posts_key(thread_id), "post_id": str(post_id)})
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    @tracer.capture_method(capture_response=False)
+    def list_threads(self) -> list[Thread]:
+        """List the threads of the thread list.
+
+        Returns:
+            The threads, in ascending order of their IDs.
+        """
+        with diagnose("views.list_threads"):
+            shards = self._query_shards(THREAD_LIST_KEY, None, limit=None, descending=False)
+        entries = heapq.merge(*shards, key=lambda item: str(item["post_id"]))
+        return [ThreadEntryData.model_validate(item).to_model() for item in entries]
+
+    @tracer.capture_method(capture_response=False)
+    def save_recent_post(self, post: Post) -> None:
+        """Put the post into the recent post feed.
+
+        Args:
+            post: The post as stored.
+        """
+        entry = RecentPostData.from_model(post)
+        with self._table.batch_writer() as batch:
+            batch.put_item(Item=entry.model_dump())
+            batch.put_item(
+                Item={
+                    "thread_id": _thread_posts_key(post.thread_id),
+                    "post_id": entry.post_id,
+                    "expires_at": entry.expires_at,
+                }
+            )
+
+    @tracer.capture_method(capture_response=False)
+    def delete_recent_post(self, post: Post) -> None:
+        """Remove the post from the recent post feed. Does nothing if it is not there.
+
+        Args:
+            post: The post as stored.
+        """
+        with self._table.batch_writer() as batch:
+            batch.delete_item(Key={"thread_id": _shard_key(RECENT_POSTS_KEY, post.id_), "post_id": str(post.id_)})
+            batch.delete_item(Key={"thread_id": _thread_posts_key(post.thread_id), "post_id": str(post.id_)})
+
+    @tracer.capture_method(capture_response=False)
+    def list_recent_posts(self, *, limit: int) -> list[Post]:
+        """List the latest posts of the recent post feed.
+
+        The entries past the TTL that the table has not deleted yet are excluded by the key
+        condition, rather than filtered out after they are read. Each shard is read up to the
+        limit, since the latest posts may all be in one of them.
+
+        Args:
+            limit: The maximum number of posts to list.
+
+        Returns:
+            The posts, newest first.
+        """
+        oldest = str(ULID.from_datetime(datetime.now(UTC) - RECENT_POST_TTL))[:10]
+        with diagnose("views.list_recent_posts", limit=limit):
+            shards = self._query_shards(RECENT_POSTS_KEY, Key("post_id").gt(oldest), limit=limit, descending=True)
+        entries = heapq.merge(*shards, key=lambda item: str(item["post_id"]), reverse=True)
+        return [RecentPostData.model_validate(item).to_model() for item in islice(entries, limit)]
+
+    def _query_shards(
+        self, prefix: str, sort_key_condition: ConditionBase | None, *, limit: int | None, descending: bool
+    ) -> list[list[dict[str, Any]]]:
+        """Query every shard of a view, each in the order of its sort keys."""
+        calls: list[Callable[[], list[dict[str, Any]]]] = [
+            partial(self._query_shard, f"{prefix}#{shard}", sort_key_condition, limit=limit, descending=descending)
+            for shard in range(VIEW_SHARDS)
+        ]
+        if self._executor:
+            return run_concurrently(self._executor, calls, name="view_shards")
+        return [call() for call in calls]
+
+    def _query_shard(
+        self, partition_key: str, sort_key_condition: ConditionBase | None, *, limit: int | None, descending: bool
+    ) -> list[dict[str, Any]]:
+        key_condition: ConditionBase = Key("thread_id").eq(partition_key)
+        if sort_key_condition is not None:
+            key_condition &= sort_key_condition
+        kwargs: QueryInputTableQueryTypeDef = {
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": not descending,
+        }
+        if limit is not None:
+            kwargs["Limit"] = limit
+
+        pages: list[Iterable[dict[str, Any]]] = []
+        while True:
+            response = self._table.query(**kwargs)
+            pages.append(response.get("Items", []))
+            if limit is not None or "LastEvaluatedKey" not in response:
+                return list(chain.from_iterable(pages))
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
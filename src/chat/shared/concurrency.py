@@ -0,0 +1,181 @@
+"""Helpers for running blocking calls concurrently on a shared executor.
+
+Every call is timed from its submission: the time it spends waiting for a worker (queue wait)
+is reported separately from the time it runs (execution), so a saturated pool can be told apart
+from slow DynamoDB calls.
+
+A call submitted from a worker of the same executor runs inline in that worker instead of
+being queued. Nested fan-outs, such as a batch sub-request that queries several partitions,
+would otherwise block workers on calls queued behind them and can deadlock a bounded pool.
+The calls run in a copy of the context of the submitter, so context variables follow them.
+
+`SingleFlight` coalesces concurrent identical calls, so they share a single request.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, Executor, Future, wait
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Sequence
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_worker = threading.local()
+
+
+def _timed(name: str, submitted_at: float, executor: Executor, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+    started_at = time.perf_counter()
+    previous, _worker.executor = getattr(_worker, "executor", None), executor
+    try:
+        return fn(*args)
+    finally:
+        _worker.executor = previous
+        finished_at = time.perf_counter()
+        logger.debug(
+            "Concurrent call finished",
+            extra={
+                "fan_out": name,
+                "queue_wait_ms": round((started_at - submitted_at) * 1000, 3),
+                "execution_ms": round((finished_at - started_at) * 1000, 3),
+            },
+        )
+
+
+def submit(executor: Executor, name: str, fn: Callable[..., T], *args: Any) -> Future[T]:  # noqa: ANN401
+    """Submit a call to the executor, timing its queue wait and execution.
+
+    Args:
+        executor: The executor to run the call on.
+        name: The name of the fan-out, for the instrumentation.
+        fn: The callable to run.
+        *args: The positional arguments of the call.
+
+    Returns:
+        The future of the call. If called from a worker of the executor, the call has already
+        run inline and the future is done.
+    """
+    submitted_at = time.perf_counter()
+    if getattr(_worker, "executor", None) is executor:
+        future: Future[T] = Future()
+        try:
+            future.set_result(_timed(name, submitted_at, executor, fn, *args))
+        except Exception as e:  # noqa: BLE001
+            future.set_exception(e)
+        return future
+    context = contextvars.copy_context()
+    return executor.submit(context.run, _timed, name, submitted_at, executor, fn, *args)
+
+
+def run_concurrently(
+    executor: Executor,
+    calls: Sequence[Callable[[], T]],
+    *,
+    name: str,
+    timeout: float | None = None,
+) -> list[T]:
+    """Run the calls concurrently and return their results in order.
+
+    If a call raises, or the deadline passes, the calls that have not started yet are
+    cancelled. The calls already running cannot be interrupted and finish in the background.
+
+    Args:
+        executor: The executor to run the calls on.
+        calls: The calls to run.
+        name: The name of the fan-out, for the instrumentation.
+        timeout: The number of seconds to wait for all the calls. If None, there is no deadline.
+
+    Returns:
+        The results of the calls, in the order of the calls.
+
+    Raises:
+        TimeoutError: If the calls do not finish before the deadline.
+        Exception: The exception of the first call that fails.
+    """
+    started_at = time.perf_counter()
+    futures = [submit(executor, name, call) for call in calls]
+    done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+    for future in pending:
+        future.cancel()
+
+    logger.debug(
+        "Fan-out finished",
+        extra={"fan_out": name, "calls": len(futures), "wall_ms": round((time.perf_counter() - started_at) * 1000, 3)},
+    )
+    for future in futures:
+        if future in done and (exception := future.exception()):
+            raise exception
+    if pending:
+        error_message = f"{name}: {len(pending)} of {len(futures)} calls did not finish in {timeout} seconds"
+        raise TimeoutError(error_message)
+    return [future.result() for future in futures]
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single call.
+
+    The first caller of a key runs the call; the callers that arrive while it is in flight wait
+    for it and share its result or exception. Nothing is cached: a call made after the previous
+    one with the same key has finished runs again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future[Any]] = {}
+        self._saved = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T], *, share: Callable[[T], T] | None = None) -> T:
+        """Run the call, or wait for the call in flight with the same key.
+
+        Args:
+            key: The key that identifies the call, e.g. the method name and its arguments.
+            fn: The call to run.
+            share: The function that copies the result for each caller, if the result may be
+                mutated by its callers. Every caller, the one that ran the call included, gets
+                its own copy of the result as it was returned, so none of them sees the changes
+                of another. If None, the callers share the same object.
+
+        Returns:
+            The result of the call.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+            else:
+                self._saved += 1
+
+        if not leader:
+            result: T = future.result()
+            return share(result) if share else result
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return share(result) if share else result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def collect_metrics(self) -> dict[str, int]:
+        """Return the number of calls saved since the previous collection.
+
+        Returns:
+            The number of calls that waited for a call in flight instead of running.
+        """
+        with self._lock:
+            saved, self._saved = self._saved, 0
+        return {"CoalescedCalls": saved}
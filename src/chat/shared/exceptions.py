@@ -7,9 +7,38 @@ class ThreadExistsError(Exception):
     """Raised when a thread with the same name already exists."""
 
 
+class ThreadVersionConflictError(Exception):
+    """Raised when a thread has been written since it was read."""
+
+
 class ThreadNotFoundError(Exception):
     """Raised when a thread is not found in the repository."""
 
 
 class PostNotFoundError(Exception):
     """Raised when a post is not found in the repository."""
+
+
+class UnprocessedKeysError(Exception):
+    """Raised when a batch read still has unprocessed keys after all retries."""
+
+
+class UnprocessedItemsError(Exception):
+    """Raised when a batch write still has unprocessed items after all retries."""
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when the data store is throttling or failing, and the request should be retried later.
+
+    Attributes:
+        retry_after: The number of seconds to wait before retrying.
+    """
+
+    def __init__(self, retry_after: float = 0) -> None:
+        """Initialize the error.
+
+        Args:
+            retry_after: The number of seconds to wait before retrying.
+        """
+        super().__init__(f"Retry after {retry_after:.3f} seconds")
+        self.retry_after = retry_after
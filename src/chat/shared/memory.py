@@ -0,0 +1,235 @@
+"""Opt-in tracking of the memory used by the invocations.
+
+`MemoryTracker` traces the allocations of a configurable fraction of the invocations with
+`tracemalloc`, to size the memory of the function from the real traffic rather than by guesswork.
+A tracked invocation is summarized in a `MemoryReport`:
+
+- the peak of the memory allocated during the invocation, and how much of it was still allocated
+  at its end;
+- the source lines that had allocated the most memory at the peak;
+- the number of live instances of each class of the service at the peak, such as `Post`,
+  `PostDTO` or the response models, so the cost of the copies of a large listing shows up.
+
+The peak is followed from a background thread, which also counts the objects and takes a snapshot
+of the allocation sites whenever the memory has grown enough since the last one. Counting walks
+every object tracked by the garbage collector, so tracking slows the invocation down noticeably
+and is meant to be enabled for a small fraction of them.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import random
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AllocationSite:
+    """A source line that allocated memory still in use.
+
+    Attributes:
+        location: The file and line number.
+        size_kib: The size of the memory allocated by the line, in KiB.
+        count: The number of memory blocks allocated by the line.
+    """
+
+    location: str
+    size_kib: float
+    count: int
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """The memory used by an invocation.
+
+    Attributes:
+        name: The name of the invocation.
+        peak_kib: The peak of the memory allocated during the invocation, in KiB.
+        retained_kib: The memory allocated during the invocation and still in use at its end, in KiB.
+        top_sites: The source lines that had allocated the most memory at the peak, largest first.
+        objects: The number of live instances of each class of the service at the peak, by
+            qualified class name, most numerous first.
+    """
+
+    name: str
+    peak_kib: float
+    retained_kib: float
+    top_sites: list[AllocationSite]
+    objects: dict[str, int]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary, for the log."""
+        return asdict(self)
+
+    def to_metrics(self) -> dict[str, float]:
+        """Convert the report to CloudWatch metric values, by metric name."""
+        return {"PeakMemory": self.peak_kib, "RetainedMemory": self.retained_kib}
+
+
+def _log_report(report: MemoryReport) -> None:
+    logger.info("Tracked the memory of the invocation", extra={"memory": report.to_dict()})
+
+
+class MemoryTracker:
+    """Tracks the memory used by a fraction of the invocations."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        sample_rate: float = 0.0,
+        *,
+        modules: Sequence[str] = ("chat", "models"),
+        interval: float = 0.01,
+        growth: float = 1.25,
+        top: int = 10,
+        on_report: Callable[[MemoryReport], None] = _log_report,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            sample_rate: The fraction of the invocations to track, from 0 to 1.
+            modules: The packages whose classes have their instances counted.
+            interval: The interval of the samples of the traced memory, in seconds.
+            growth: The ratio that the traced memory must grow by, since the last snapshot, for
+                the allocation sites and the objects at the peak to be taken again.
+            top: The number of allocation sites in the reports.
+            on_report: Called with the report of every tracked invocation. Defaults to logging it.
+        """
+        self._sample_rate = sample_rate
+        self._modules = frozenset(modules)
+        self._interval = interval
+        self._growth = growth
+        self._top = top
+        self._on_report = on_report
+
+    def should_track(self) -> bool:
+        """Decide whether to track an invocation, for the configured fraction of them."""
+        return self._sample_rate > 0 and random.random() < self._sample_rate  # noqa: S311
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Track the memory used by the block if the invocation is picked, and report it.
+
+        If the allocations are already traced, e.g. by a benchmark, the tracing is left running and
+        only the allocations made during the block count.
+
+        Args:
+            name: The name of the invocation, such as its endpoint.
+
+        Yields:
+            None.
+        """
+        if not self.should_track():
+            yield
+            return
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        sampler = _PeakSampler(self._modules, self._interval, self._growth)
+        sampler.start(compare=tracing)
+        try:
+            yield
+        finally:
+            sampler.stop()
+            current, _ = tracemalloc.get_traced_memory()
+            if not tracing:
+                tracemalloc.stop()
+            self._on_report(
+                MemoryReport(
+                    name=name,
+                    peak_kib=round((sampler.peak - sampler.baseline) / 1024, 1),
+                    retained_kib=round(max(current - sampler.baseline, 0) / 1024, 1),
+                    top_sites=sampler.top_sites(self._top),
+                    objects=dict(sampler.objects.most_common()),
+                )
+            )
+
+
+class _PeakSampler:
+    """Samples the traced memory, and takes the allocation sites and the objects at its peak.
+
+    The objects are counted and the snapshot is taken by C code that holds the GIL, so they are
+    consistent with each other. The memory the sampler allocates to do so is left out of the peak.
+    """
+
+    def __init__(self, modules: frozenset[str], interval: float, growth: float) -> None:
+        self._modules = modules
+        self._interval = interval
+        self._growth = growth
+        self.baseline = 0
+        self.peak = 0
+        self._snapshot_at = 0
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._before: tracemalloc.Snapshot | None = None
+        self.objects: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-tracker", daemon=True)
+
+    def start(self, *, compare: bool) -> None:
+        # The allocations made before the block are left out of the sites, if they were traced.
+        self._before = tracemalloc.take_snapshot() if compare else None
+        self.baseline, _ = tracemalloc.get_traced_memory()
+        self.peak = self.baseline
+        tracemalloc.reset_peak()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        # The block may have finished before the first sample, or at its peak.
+        self._sample(growth=1.0)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self._sample(self._growth)
+
+    def _sample(self, growth: float) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        used = current - self.baseline
+        if used <= 0 or used < self._snapshot_at * growth:
+            return
+        self._snapshot_at = used
+        types = Counter(map(type, gc.get_objects()))
+        self._snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self.objects = Counter(
+            {f"{cls.__module__}.{cls.__qualname__}": count for cls, count in types.items() if self._counts(cls)}
+        )
+
+    def _counts(self, cls: type) -> bool:
+        """Tell whether the instances of the class are counted."""
+        # Some classes, such as the C extension types, have a descriptor in place of their module.
+        module = cls.__dict__.get("__module__")
+        return isinstance(module, str) and module.split(".", 1)[0] in self._modules and module != __name__
+
+    def top_sites(self, top: int) -> list[AllocationSite]:
+        if self._snapshot is None:
+            return []
+        snapshot = _without_tracemalloc(self._snapshot)
+        if self._before is None:
+            stats = snapshot.statistics("lineno")
+            return [AllocationSite(str(stat.traceback), round(stat.size / 1024, 1), stat.count) for stat in stats[:top]]
+        diffs = [
+            diff for diff in snapshot.compare_to(_without_tracemalloc(self._before), "lineno") if diff.size_diff > 0
+        ]
+        return [
+            AllocationSite(str(diff.traceback), round(diff.size_diff / 1024, 1), diff.count_diff)
+            for diff in diffs[:top]
+        ]
+
+
+def _without_tracemalloc(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    """Leave the allocations of tracemalloc itself out of the snapshot."""
+    return snapshot.filter_traces([tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)])
@@ -0,0 +1,317 @@
+"""On-demand profiling of the invocations.
+
+`Profiler` profiles a configurable fraction of the invocations, or the ones explicitly asked for,
+so the hot spots of the real traffic can be found without deploying instrumented code. It has
+two modes:
+
+- `deterministic` runs the invocation under `cProfile` and writes a pstats file, which can be
+  opened with `python -m pstats` or snakeviz. Only the invoking thread is profiled.
+- `sampling` samples the wall-clock stacks of the invoking thread and of the busy workers of
+  the executor, and writes them as collapsed stacks (`frame;frame;frame count`), which can be
+  rendered as a flame graph. The sampling interval is bounded by the switch interval of the
+  interpreter, since the sampler needs the GIL to run.
+
+Every profile is summarized in a `ProfileReport`: the functions that took the most time
+themselves, and the time taken by each top-level package, so the share of pydantic, json or
+botocore in an invocation shows up at a glance. Only the latest profiles are kept in the output
+directory, so a warm execution environment does not fill up its `/tmp` storage.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from types import FrameType
+
+ProfileMode = Literal["deterministic", "sampling"]
+
+# The modules that an idle worker of the executor is waiting in.
+IDLE_MODULES = frozenset({"threading", "queue", "concurrent.futures.thread"})
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_CHARACTERS = re.compile(r"[^\w.-]")
+
+
+@dataclass(frozen=True)
+class HotSpot:
+    """A function that took time itself, excluding the functions it called.
+
+    Attributes:
+        function: The function, qualified by its module or file.
+        self_ms: The time spent in the function itself, in milliseconds. Estimated from the
+            number of samples in the sampling mode.
+        calls: The number of calls, or None in the sampling mode.
+    """
+
+    function: str
+    self_ms: float
+    calls: int | None = None
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """The summary of a profile.
+
+    Attributes:
+        name: The name of the profiled invocation.
+        mode: The profiling mode.
+        path: The file the profile was written to.
+        duration_ms: The wall-clock duration of the invocation, in milliseconds.
+        hot_spots: The functions that took the most time themselves, slowest first.
+        packages: The time spent in each top-level package, in milliseconds, slowest first.
+    """
+
+    name: str
+    mode: ProfileMode
+    path: Path
+    duration_ms: float
+    hot_spots: list[HotSpot]
+    packages: dict[str, float]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary, for the log."""
+        return {**asdict(self), "path": str(self.path)}
+
+
+def _log_report(report: ProfileReport) -> None:
+    logger.info("Profiled the invocation", extra={"profile": report.to_dict()})
+
+
+class Profiler:
+    """Profiles a fraction of the invocations."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        sample_rate: float = 0.0,
+        *,
+        mode: ProfileMode = "deterministic",
+        output_dir: Path | None = None,
+        interval: float = 0.001,
+        top: int = 10,
+        keep: int = 10,
+        on_report: Callable[[ProfileReport], None] = _log_report,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            sample_rate: The fraction of the invocations to profile, from 0 to 1.
+            mode: The profiling mode.
+            output_dir: The directory to write the profiles to. Defaults to the temporary
+                directory, which is `/tmp` on Lambda.
+            interval: The sampling interval, in seconds, in the sampling mode.
+            top: The number of hot spots in the reports.
+            keep: The number of profiles written by the profiler that are kept. The older ones
+                are removed when a profile is written.
+            on_report: Called with the report of every profile. Defaults to logging it.
+        """
+        self._sample_rate = sample_rate
+        self._mode = mode
+        self._output_dir = output_dir or Path(tempfile.gettempdir())
+        self._interval = interval
+        self._top = top
+        self._keep = keep
+        self._profiles: deque[Path] = deque()
+        self._on_report = on_report
+
+    def should_profile(self, *, force: bool = False) -> bool:
+        """Decide whether to profile an invocation.
+
+        Args:
+            force: Whether the invocation asked to be profiled.
+
+        Returns:
+            True if forced, or for the configured fraction of the invocations.
+        """
+        return force or (self._sample_rate > 0 and random.random() < self._sample_rate)  # noqa: S311
+
+    @contextmanager
+    def profile(self, name: str, *, force: bool = False) -> Iterator[None]:
+        """Profile the block if the invocation is picked, and report the profile.
+
+        Profiling never fails the invocation: if the profile cannot be taken or written, the
+        block runs unprofiled, or the profile is dropped, with a warning.
+
+        Args:
+            name: The name of the invocation, such as its request ID, used to name the file.
+            force: Whether the invocation asked to be profiled.
+
+        Yields:
+            None.
+        """
+        if not self.should_profile(force=force):
+            yield
+            return
+
+        collector = _Tracer() if self._mode == "deterministic" else _Sampler(self._interval)
+        try:
+            collector.start()
+        except ValueError:  # Another profiler is already active, e.g. a debugger.
+            logger.warning("Could not start the profiler", exc_info=True)
+            yield
+            return
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            collector.stop()
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            try:
+                report = self._report(name, collector, duration_ms)
+            except OSError:
+                logger.warning("Could not write the profile", exc_info=True)
+            else:
+                self._prune(report.path)
+                self._on_report(report)
+
+    def _prune(self, path: Path) -> None:
+        """Remember the profile written, and remove the oldest ones beyond the number kept."""
+        self._profiles.append(path)
+        while len(self._profiles) > self._keep:
+            try:
+                self._profiles.popleft().unlink(missing_ok=True)
+            except OSError:
+                logger.warning("Could not remove an old profile", exc_info=True)
+
+    def _report(self, name: str, collector: _Tracer | _Sampler, duration_ms: float) -> ProfileReport:
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"profile-{time.strftime('%Y%m%dT%H%M%S')}-{_UNSAFE_CHARACTERS.sub('_', name)}"
+        path = self._output_dir / f"{stem}{collector.suffix}"
+        collector.write(path)
+        functions = collector.functions()
+        packages: defaultdict[str, float] = defaultdict(float)
+        for (package, _), spot in functions.items():
+            packages[package] += spot.self_ms
+        hot_spots = sorted(functions.values(), key=lambda spot: spot.self_ms, reverse=True)[: self._top]
+        return ProfileReport(
+            name=name,
+            mode=self._mode,
+            path=path,
+            duration_ms=round(duration_ms, 3),
+            hot_spots=[HotSpot(spot.function, round(spot.self_ms, 3), spot.calls) for spot in hot_spots],
+            packages={package: round(ms, 3) for package, ms in sorted(packages.items(), key=lambda item: -item[1])},
+        )
+
+
+class _Tracer:
+    """Collects a deterministic profile of the current thread with cProfile."""
+
+    suffix = ".pstats"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def write(self, path: Path) -> None:
+        self._profile.dump_stats(path)
+
+    def functions(self) -> dict[tuple[str, str], HotSpot]:
+        stats: dict[tuple[str, int, str], tuple[int, int, float, float, Any]] = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+        functions = {}
+        for (filename, line, function), (_, calls, self_time, _, _) in stats.items():
+            package, location = _locate(filename)
+            name = function if location is None else f"{location}:{line}({function})"
+            functions[package, name] = HotSpot(name, self_time * 1000, calls)
+        return functions
+
+
+class _Sampler:
+    """Collects the wall-clock stacks of the busy threads at a regular interval."""
+
+    suffix = ".collapsed"
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._target = threading.get_ident()
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._rounds = 0
+        self._elapsed = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        started_at = time.perf_counter()
+        while not self._stopped.wait(self._interval):
+            self._sample()
+        self._elapsed = time.perf_counter() - started_at
+
+    def _sample(self) -> None:
+        self._rounds += 1
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():  # noqa: SLF001
+            if ident == self._thread.ident:
+                continue
+            stack = _stack(frame)
+            if ident != self._target and all(module in IDLE_MODULES for module, _ in stack):
+                continue
+            self._stacks[(names.get(ident, str(ident)), *(f"{module}.{function}" for module, function in stack))] += 1
+
+    def write(self, path: Path) -> None:
+        with path.open("w") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def functions(self) -> dict[tuple[str, str], HotSpot]:
+        # Every round took a sample of each busy thread, so a sample stands for the mean round.
+        sample_ms = self._elapsed * 1000 / self._rounds if self._rounds else 0.0
+        leaves: Counter[str] = Counter()
+        for stack, count in self._stacks.items():
+            if len(stack) > 1:
+                leaves[stack[-1]] += count
+        return {
+            (function.split(".", 1)[0], function): HotSpot(function, count * sample_ms)
+            for function, count in leaves.items()
+        }
+
+
+def _stack(frame: FrameType | None) -> list[tuple[str, str]]:
+    """Return the modules and functions of the stack of the frame, outermost first."""
+    stack = []
+    while frame is not None:
+        stack.append((frame.f_globals.get("__name__", "?"), frame.f_code.co_qualname))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _locate(filename: str) -> tuple[str, str | None]:
+    """Return the top-level package of the file, and its path relative to the import path.
+
+    The built-in functions, which have no file, are in the `builtins` package.
+    """
+    if filename == "~":
+        return "builtins", None
+    path = Path(filename)
+    for entry in sorted(sys.path, key=len, reverse=True):
+        if entry and path.is_relative_to(entry):
+            relative = path.relative_to(entry)
+            return relative.parts[0].removesuffix(".py"), relative.as_posix()
+    return path.stem, filename
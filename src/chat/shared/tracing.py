@@ -0,0 +1,291 @@
+"""Tracing of the handler, the use cases and the repositories.
+
+`tracer` is a Powertools `Tracer`, so the code is instrumented the Powertools way, e.g. with
+`@tracer.capture_method`. Its provider depends on where the code runs:
+
+- In Lambda, it is the default X-Ray provider of Powertools, which records the spans as
+  subsegments of the invocation traced by Lambda and the requests of botocore, unless the traces
+  are exported to a file with TRACE_EXPORT_FILE.
+- Anywhere else, it is `LocalTracer`, which records the spans in process and needs neither the
+  X-Ray SDK nor a daemon: each finished trace is handed to an exporter, such as
+  `InMemoryExporter` for tests or `FileExporter` to inspect traces offline. Without an exporter
+  nothing is recorded.
+
+The current span is a context variable, so the calls submitted to the executor and run with
+`asyncio.to_thread` are recorded as children of the span that submitted them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Protocol
+
+from aws_lambda_powertools import Tracer
+from aws_lambda_powertools.tracing.base import BaseProvider, BaseSegment
+
+if TYPE_CHECKING:
+    import numbers
+    import traceback
+    from collections.abc import AsyncIterator, Iterator, Sequence
+    from pathlib import Path
+
+# The annotation values; Powertools declares them as `numbers.Number`, which type checkers do not support.
+Annotation = str | int | float | bool
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Span(BaseSegment):
+    """A timed operation of a trace, with the operations it made as its subsegments."""
+
+    def __init__(self, name: str) -> None:
+        """Start the span.
+
+        Args:
+            name: The name of the operation.
+        """
+        self.id = secrets.token_hex(8)
+        self.name = name
+        self.start_time = time.time()
+        self.duration_ms: float | None = None
+        self.annotations: dict[str, Annotation | numbers.Number] = {}
+        self.metadata: dict[str, dict[str, Any]] = {}
+        self.subsegments: list[Span] = []
+        self.error: str | None = None
+        self._started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def close(self, end_time: int | None = None) -> None:  # noqa: ARG002
+        """End the span."""
+        self.duration_ms = (time.perf_counter() - self._started_at) * 1000
+
+    def add_subsegment(self, subsegment: Span) -> None:
+        """Add a child span."""
+        self.subsegments.append(subsegment)
+
+    def remove_subsegment(self, subsegment: Span) -> None:
+        """Remove a child span."""
+        self.subsegments.remove(subsegment)
+
+    def put_annotation(self, key: str, value: Annotation | numbers.Number) -> None:
+        """Annotate the span with a key-value pair."""
+        self.annotations[key] = value
+
+    def add_annotation(self, key: str, value: int) -> None:
+        """Add the value to a counting annotation of the span.
+
+        The children of the span may run concurrently, so this is safe to call from several threads.
+        """
+        with self._lock:
+            self.annotations[key] = self.annotations.get(key, 0) + value  # type: ignore[operator]
+
+    def put_metadata(self, key: str, value: Any, namespace: str = "default") -> None:  # noqa: ANN401
+        """Add metadata to the span."""
+        self.metadata.setdefault(namespace, {})[key] = value
+
+    def add_exception(
+        self,
+        exception: BaseException,
+        stack: list[traceback.StackSummary],  # noqa: ARG002
+        remote: bool = False,  # noqa: ARG002, FBT001, FBT002
+    ) -> None:
+        """Record the exception that the operation raised."""
+        self.error = f"{type(exception).__name__}: {exception}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the span and its subsegments to a JSON-serializable dictionary."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 3),
+            "annotations": self.annotations,
+            "metadata": {namespace: {k: repr(v) for k, v in data.items()} for namespace, data in self.metadata.items()},
+            "error": self.error,
+            "subsegments": [subsegment.to_dict() for subsegment in self.subsegments],
+        }
+
+
+class _NoopSpan(Span):
+    """The span yielded while nothing is recorded, which ignores everything."""
+
+    def __init__(self) -> None:
+        super().__init__("noop")
+
+    def add_subsegment(self, subsegment: Span) -> None:
+        """Ignore the child span."""
+
+    def put_annotation(self, key: str, value: Annotation | numbers.Number) -> None:
+        """Ignore the annotation."""
+
+    def add_annotation(self, key: str, value: int) -> None:
+        """Ignore the annotation."""
+
+    def put_metadata(self, key: str, value: Any, namespace: str = "default") -> None:  # noqa: ANN401
+        """Ignore the metadata."""
+
+    def add_exception(
+        self,
+        exception: BaseException,
+        stack: list[traceback.StackSummary],
+        remote: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Ignore the exception."""
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    """Receives the finished traces."""
+
+    def export(self, span: Span) -> None:
+        """Export a finished trace.
+
+        Args:
+            span: The root span of the trace.
+        """
+        ...
+
+
+class InMemoryExporter:
+    """Keeps the finished traces in memory."""
+
+    def __init__(self) -> None:
+        """Initialize the exporter."""
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        """Keep the trace.
+
+        Args:
+            span: The root span of the trace.
+        """
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        """Forget the traces kept so far."""
+        self.spans.clear()
+
+
+class FileExporter:
+    """Appends the finished traces to a file, one JSON line per trace."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the exporter.
+
+        Args:
+            path: The file to append the traces to.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Append the trace to the file.
+
+        Args:
+            span: The root span of the trace.
+        """
+        line = json.dumps(span.to_dict()) + "\n"
+        with self._lock, self._path.open("a") as f:
+            f.write(line)
+
+
+class LocalTracer(BaseProvider):
+    """Tracing provider that records the spans in process and hands the traces to an exporter."""
+
+    def __init__(self, exporter: SpanExporter | None = None) -> None:
+        """Initialize the provider.
+
+        Args:
+            exporter: The exporter of the finished traces. If None, nothing is recorded.
+        """
+        self.exporter = exporter
+
+    @contextmanager
+    def in_subsegment(self, name: str | None = None, **kwargs: Any) -> Iterator[Span]:  # noqa: ANN401, ARG002
+        """Record the block as a span, under the current span if there is one.
+
+        Args:
+            name: The name of the span.
+            **kwargs: Ignored, for compatibility with the X-Ray provider.
+
+        Yields:
+            The span.
+        """
+        exporter = self.exporter
+        if exporter is None:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current.get()
+        span = Span(name or "anonymous")
+        if parent is not None:
+            parent.add_subsegment(span)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.add_exception(e, [])
+            raise
+        finally:
+            _current.reset(token)
+            span.close()
+            if parent is None:
+                exporter.export(span)
+
+    @asynccontextmanager
+    async def in_subsegment_async(  # type: ignore[override]  # Powertools uses it with `async with`.
+        self,
+        name: str | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> AsyncIterator[Span]:
+        """Record the block as a span, under the current span if there is one.
+
+        Args:
+            name: The name of the span.
+            **kwargs: Ignored, for compatibility with the X-Ray provider.
+
+        Yields:
+            The span.
+        """
+        with self.in_subsegment(name, **kwargs) as span:
+            yield span
+
+    def put_annotation(self, key: str, value: Annotation | numbers.Number) -> None:
+        """Annotate the current span with a key-value pair."""
+        current_span().put_annotation(key, value)
+
+    def put_metadata(self, key: str, value: Any, namespace: str = "default") -> None:  # noqa: ANN401
+        """Add metadata to the current span."""
+        current_span().put_metadata(key, value, namespace)
+
+    def patch(self, modules: Sequence[str]) -> None:
+        """Do nothing, since the DynamoDB requests are traced by the table proxy."""
+
+    def patch_all(self) -> None:
+        """Do nothing, since the DynamoDB requests are traced by the table proxy."""
+
+
+def current_span() -> Span:
+    """Return the current span, or a span that ignores everything if there is none."""
+    return _current.get() or _NOOP_SPAN
+
+
+def _traced_by_xray() -> bool:
+    """Whether the traces are sent to X-Ray: in Lambda, unless they are exported to a file."""
+    return "AWS_LAMBDA_FUNCTION_NAME" in os.environ and "TRACE_EXPORT_FILE" not in os.environ
+
+
+local_tracer = LocalTracer()
+if _traced_by_xray():
+    tracer = Tracer(patch_modules=["botocore"])
+else:
+    # Tracing is enabled explicitly: the local provider works outside Lambda, unlike X-Ray.
+    tracer = Tracer(disabled=False, auto_patch=False, provider=local_tracer)
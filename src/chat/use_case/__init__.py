@@ -6,8 +6,15 @@ from .delete_post import DeletePost, DeletePostCommand
 from .delete_thread import DeleteThread, DeleteThreadCommand
 from .dto import PostDTO, ThreadDTO
 from .get_thread import GetThread, GetThreadCommand
+from .get_threads import GetThreads, GetThreadsCommand
 from .list_posts import ListPosts, ListPostsCommand
+from .list_recent_posts import ListRecentPosts, ListRecentPostsCommand
 from .list_threads import ListThreads
+from .project_changes import ProjectChanges
+from .rename_thread import RenameThread, RenameThreadCommand
+from .retry import retry_on_conflict
+from .search_posts import SearchPosts, SearchPostsCommand
+from .search_threads import SearchThreads, SearchThreadsCommand
 
 __all__ = [
     "CreatePost",
@@ -21,8 +28,20 @@ __all__ = [
     "PostDTO",
     "GetThread",
     "GetThreadCommand",
+    "GetThreads",
+    "GetThreadsCommand",
     "ThreadDTO",
     "ListPosts",
     "ListPostsCommand",
+    "ListRecentPosts",
+    "ListRecentPostsCommand",
     "ListThreads",
+    "ProjectChanges",
+    "RenameThread",
+    "RenameThreadCommand",
+    "SearchPosts",
+    "SearchPostsCommand",
+    "SearchThreads",
+    "SearchThreadsCommand",
+    "retry_on_conflict",
 ]
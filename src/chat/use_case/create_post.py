@@ -8,11 +8,13 @@ from pydantic import BaseModel, ConfigDict
 from ulid import ULID  # noqa: TCH002
 
 from chat.domain.builders import PostBuilder
+from chat.shared.tracing import tracer
 
 from .dto import PostDTO
 
 if TYPE_CHECKING:
-    from chat.domain.post import AbstractPostRepository
+    from chat.domain.post import AbstractPostRepository, Post
+    from chat.domain.search import AbstractPostSearchIndex
     from chat.domain.thread import AbstractThreadRepository
 
 
@@ -33,16 +35,24 @@ class CreatePostCommand(BaseModel):
 class CreatePost:
     """Use case for creating new posts."""
 
-    def __init__(self, thread_repository: AbstractThreadRepository, post_repository: AbstractPostRepository) -> None:
+    def __init__(
+        self,
+        thread_repository: AbstractThreadRepository,
+        post_repository: AbstractPostRepository,
+        search_index: AbstractPostSearchIndex | None = None,
+    ) -> None:
         """Initialize the use case.
 
         Args:
             thread_repository: The repository to use for thread operations.
             post_repository: The repository to use for post operations.
+            search_index: The search index to keep up to date with the posts, if any.
         """
         self._thread_repository = thread_repository
         self._post_repository = post_repository
+        self._search_index = search_index
 
+    @tracer.capture_method(capture_response=False)
     def execute(self, command: CreatePostCommand) -> PostDTO:
         """Execute the use case.
 
@@ -53,6 +63,20 @@ class CreatePost:
             ThreadNotFoundError: If the thread with the given ID does not exist.
         """
         post = PostBuilder(self._thread_repository).build(command.thread_id, command.message)
-        self._post_repository.save(post)
+        self._save(post)
 
         return PostDTO.from_model(post)
+
+    def _save(self, post: Post) -> None:
+        """Save the post along with the activity counters of its thread and the search index.
+
+        The counters and the index are written with the post, so if the repository defers the
+        save and the post is never written, neither are they.
+        """
+
+        def record_post() -> None:
+            self._thread_repository.increment_post_count(post.thread_id, post.created_at)
+            if self._search_index:
+                self._search_index.add(post)
+
+        self._post_repository.save_with(post, after=record_post)
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 from pydantic import BaseModel, ConfigDict
 
 from chat.domain.builders import ThreadBuilder
+from chat.shared.tracing import tracer
 
 from .dto import ThreadDTO
 
@@ -37,6 +38,7 @@ class CreateThread:
         """
         self._repository = repository
 
+    @tracer.capture_method(capture_response=False)
     def execute(self, command: CreateThreadCommand) -> ThreadDTO:
         """Execute the use case.
 
@@ -7,8 +7,12 @@ from typing import TYPE_CHECKING
 from pydantic import BaseModel, ConfigDict
 from ulid import ULID  # noqa: TCH002
 
+from chat.shared.tracing import tracer
+
 if TYPE_CHECKING:
     from chat.domain.post import AbstractPostRepository
+    from chat.domain.search import AbstractPostSearchIndex
+    from chat.domain.thread import AbstractThreadRepository
 
 
 class DeletePostCommand(BaseModel):
@@ -28,14 +32,24 @@ class DeletePostCommand(BaseModel):
 class DeletePost:
     """Use case for deleting posts."""
 
-    def __init__(self, repository: AbstractPostRepository) -> None:
+    def __init__(
+        self,
+        thread_repository: AbstractThreadRepository,
+        post_repository: AbstractPostRepository,
+        search_index: AbstractPostSearchIndex | None = None,
+    ) -> None:
         """Initialize the use case.
 
         Args:
-            repository: The repository to use for post operations.
+            thread_repository: The repository to use for thread operations.
+            post_repository: The repository to use for post operations.
+            search_index: The search index to keep up to date with the posts, if any.
         """
-        self._repository = repository
+        self._thread_repository = thread_repository
+        self._post_repository = post_repository
+        self._search_index = search_index
 
+    @tracer.capture_method(capture_response=False)
     def execute(self, command: DeletePostCommand) -> None:
         """Execute the use case.
 
@@ -45,4 +59,7 @@ class DeletePost:
         Raises:
             PostNotFoundError: If the post with the given ID does not exist.
         """
-        self._repository.delete(command.thread_id, command.post_id)
+        self._post_repository.delete(command.thread_id, command.post_id)
+        self._thread_repository.decrement_post_count(command.thread_id)
+        if self._search_index:
+            self._search_index.remove(command.thread_id, command.post_id)
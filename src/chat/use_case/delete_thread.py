@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING
 from pydantic import BaseModel, ConfigDict
 from ulid import ULID  # noqa: TCH002
 
+from chat.shared.tracing import tracer
+
 if TYPE_CHECKING:
     from chat.domain.thread import AbstractThreadRepository
 
@@ -34,6 +36,7 @@ class DeleteThread:
         """
         self._repository = repository
 
+    @tracer.capture_method(capture_response=False)
     def execute(self, command: DeleteThreadCommand) -> None:
         """Execute the use case.
 
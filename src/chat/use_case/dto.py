@@ -26,11 +26,15 @@ class ThreadDTO(DTOBase):
         id_: The ID of the thread.
         name: The name of the thread.
         created_at: The timestamp when the thread was created.
+        post_count: The number of posts in the thread.
+        last_post_at: The timestamp when the last post was created.
     """
 
     id_: ULID
     name: str
     created_at: datetime
+    post_count: int = 0
+    last_post_at: datetime | None = None
 
     @classmethod
     def from_model(cls, model: Thread) -> Self:
@@ -42,7 +46,13 @@ class ThreadDTO(DTOBase):
         Returns:
             The converted ThreadDTO instance.
         """
-        return cls(id_=model.id_, name=model.name, created_at=model.created_at)
+        return cls(
+            id_=model.id_,
+            name=model.name,
+            created_at=model.created_at,
+            post_count=model.post_count,
+            last_post_at=model.last_post_at,
+        )
 
 
 class PostDTO(DTOBase):
@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING
 from pydantic import BaseModel
 from ulid import ULID  # noqa: TCH002
 
+from chat.shared.tracing import tracer
+
 from .dto import ThreadDTO
 
 if TYPE_CHECKING:
@@ -34,6 +36,7 @@ class GetThread:
         """
         self._repository = repository
 
+    @tracer.capture_method(capture_response=False)
     def execute(self, command: GetThreadCommand) -> ThreadDTO | None:
         """Execute the use case.
 
@@ -0,0 +1,55 @@
+"""Use case for getting multiple threads by their IDs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict
+from ulid import ULID  # noqa: TCH002
+
+from chat.shared.tracing import tracer
+
+from .dto import ThreadDTO
+
+if TYPE_CHECKING:
+    from chat.domain.thread import AbstractThreadRepository
+
+
+class GetThreadsCommand(BaseModel):
+    """Command to get multiple threads.
+
+    Attributes:
+        thread_ids: The IDs of the threads to get.
+    """
+
+    model_config = ConfigDict(extra="forbid", validate_assignment=True)
+
+    thread_ids: list[ULID]
+
+
+class GetThreads:
+    """Use case for getting multiple threads by their IDs.
+
+    The threads are looked up in batches instead of one by one.
+    """
+
+    def __init__(self, repository: AbstractThreadRepository) -> None:
+        """Initialize the use case.
+
+        Args:
+            repository: The repository to use for thread operations.
+        """
+        self._repository = repository
+
+    @tracer.capture_method(capture_response=False)
+    def execute(self, command: GetThreadsCommand) -> list[ThreadDTO]:
+        """Execute the use case.
+
+        Args:
+            command: The command to execute.
+
+        Returns:
+            The threads found, in the order of the given IDs. The IDs of nonexistent threads are skipped.
+        """
+        threads = self._repository.find_by_ids(command.thread_ids)
+        return [ThreadDTO.from_model(thread) for thread in threads]
@@ -5,12 +5,16 @@ from __future__ import annotations
 from datetime import datetime  # noqa: TCH003
 from typing import TYPE_CHECKING
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PositiveInt
 from ulid import ULID  # noqa: TCH002
 
+from chat.shared.tracing import tracer
+
 from .dto import PostDTO
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from chat.domain.post import AbstractPostRepository
 
 
@@ -20,12 +24,18 @@ class ListPostsCommand(BaseModel):
     Attributes:
         thread_id: The ID of the thread to list posts from.
         start_time: The start time to list posts from.
+        end_time: The end time to list posts until, exclusive.
+        limit: The maximum number of posts to list.
+        cursor: The ID of the last post of the previous page. The posts after it are listed.
     """
 
     model_config = ConfigDict(extra="forbid", validate_assignment=True)
 
     thread_id: ULID
     start_time: datetime | None = None
+    end_time: datetime | None = None
+    limit: PositiveInt | None = None
+    cursor: ULID | None = None
 
 
 class ListPosts:
@@ -43,6 +53,7 @@ class ListPosts:
         """
         self._repository = repository
 
+    @tracer.capture_method(capture_response=False)
     def execute(self, command: ListPostsCommand) -> list[PostDTO]:
         """Execute the use case.
 
@@ -52,7 +63,30 @@ class ListPosts:
         Returns:
             The list of posts.
         """
-        posts = self._repository.list_by_thread_id(command.thread_id, start=command.start_time)
+        posts = self._repository.list_by_thread_id(
+            command.thread_id,
+            start=command.start_time,
+            end=command.end_time,
+            after=command.cursor,
+            limit=command.limit,
+        )
         posts.sort(key=lambda x: x.created_at)
 
         return [PostDTO.from_model(post) for post in posts]
+
+    def stream(self, command: ListPostsCommand) -> Iterator[PostDTO]:
+        """Execute the use case lazily.
+
+        The posts are yielded as they are fetched from the repository, so the memory usage does not
+        grow with the number of posts in the thread. The posts are yielded in the order of their IDs,
+        which is the order of their creation time.
+
+        Args:
+            command: The command to execute.
+
+        Yields:
+            The posts.
+        """
+        posts = self._repository.iter_by_thread_id(command.thread_id, start=command.start_time, end=command.end_time)
+        for post in posts:
+            yield PostDTO.from_model(post)
@@ -0,0 +1,56 @@
+"""Use case for listing the recent posts of all threads."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from chat.shared.tracing import tracer
+
+from .dto import PostDTO
+
+if TYPE_CHECKING:
+    from chat.domain.views import AbstractReadViews
+
+MAX_RECENT_POSTS_LIMIT = 100
+
+
+class ListRecentPostsCommand(BaseModel):
+    """Command to list the recent posts.
+
+    Attributes:
+        limit: The maximum number of posts to list.
+    """
+
+    model_config = ConfigDict(extra="forbid", validate_assignment=True)
+
+    limit: int = Field(default=20, gt=0, le=MAX_RECENT_POSTS_LIMIT)
+
+
+class ListRecentPosts:
+    """Use case for listing the recent posts of all threads.
+
+    The posts are read from the recent post feed, so the posts created in the last moments
+    may be missing until the change stream has delivered them.
+    """
+
+    def __init__(self, views: AbstractReadViews) -> None:
+        """Initialize the use case.
+
+        Args:
+            views: The read views.
+        """
+        self._views = views
+
+    @tracer.capture_method(capture_response=False)
+    def execute(self, command: ListRecentPostsCommand) -> list[PostDTO]:
+        """Execute the use case.
+
+        Args:
+            command: The command to execute.
+
+        Returns:
+            The recent posts, newest first.
+        """
+        return [PostDTO.from_model(post) for post in self._views.list_recent_posts(limit=command.limit)]
@@ -4,29 +4,39 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from chat.shared.tracing import tracer
+
 from .dto import ThreadDTO
 
 if TYPE_CHECKING:
     from chat.domain.thread import AbstractThreadRepository
+    from chat.domain.views import AbstractReadViews
 
 
 class ListThreads:
     """Use case for getting threads."""
 
-    def __init__(self, repository: AbstractThreadRepository) -> None:
+    def __init__(self, repository: AbstractThreadRepository, views: AbstractReadViews | None = None) -> None:
         """Initialize the use case.
 
         Args:
             repository: The repository to use for thread operations.
+            views: The read views to list the threads from, already sorted, if any. The thread
+                list of the views lags the writes by the delay of the change stream.
         """
         self._repository = repository
+        self._views = views
 
+    @tracer.capture_method(capture_response=False)
     def execute(self) -> list[ThreadDTO]:
         """Execute the use case.
 
         Returns:
             The list of threads.
         """
-        threads = self._repository.list_all()
-        threads.sort(key=lambda x: x.id_)
+        if self._views:
+            threads = self._views.list_threads()
+        else:
+            threads = self._repository.list_all()
+            threads.sort(key=lambda x: x.id_)
         return [ThreadDTO.from_model(thread) for thread in threads]
@@ -0,0 +1,51 @@
+"""Use case for projecting the changes of threads and posts onto the read views."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.shared.tracing import tracer
+
+if TYPE_CHECKING:
+    from chat.domain.views import AbstractReadViews, Change
+
+
+class ProjectChanges:
+    """Use case for projecting the changes of threads and posts onto the read views.
+
+    Each change updates the views it touches, without reading anything else:
+
+    - A created or updated thread is copied into the thread list, with the counters that its
+      record holds, so the list and the counters of a thread are only as fresh as its record.
+    - A deleted thread is removed from the thread list, and its posts from the recent post feed.
+    - A created or updated post is put into the recent post feed, and a deleted post removed.
+
+    The changes of a record must be projected in the order they were made. A change projected
+    again, as when a batch of the stream is retried, leaves the views as they were.
+    """
+
+    def __init__(self, views: AbstractReadViews) -> None:
+        """Initialize the use case.
+
+        Args:
+            views: The read views to maintain.
+        """
+        self._views = views
+
+    @tracer.capture_method(capture_response=False)
+    def execute(self, change: Change) -> None:
+        """Execute the use case.
+
+        Args:
+            change: The change to project.
+        """
+        if isinstance(change.new, Thread):
+            self._views.save_thread(change.new)
+        elif isinstance(change.new, Post):
+            self._views.save_recent_post(change.new)
+        elif isinstance(change.old, Thread):
+            self._views.delete_thread(change.old.id_)
+        elif isinstance(change.old, Post):
+            self._views.delete_recent_post(change.old)
@@ -0,0 +1,73 @@
+"""Use case for renaming threads."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict
+from ulid import ULID  # noqa: TCH002
+
+from chat.shared.exceptions import ThreadNotFoundError
+from chat.shared.tracing import tracer
+
+from .dto import ThreadDTO
+from .retry import retry_on_conflict
+
+if TYPE_CHECKING:
+    from chat.domain.thread import AbstractThreadRepository
+
+
+class RenameThreadCommand(BaseModel):
+    """Command to rename a thread.
+
+    Attributes:
+        thread_id: The ID of the thread to rename.
+        name: The new name of the thread.
+    """
+
+    model_config = ConfigDict(extra="forbid", validate_assignment=True)
+
+    thread_id: ULID
+    name: str
+
+
+class RenameThread:
+    """Use case for renaming threads."""
+
+    def __init__(self, repository: AbstractThreadRepository) -> None:
+        """Initialize the use case.
+
+        Args:
+            repository: The repository to use for thread operations.
+        """
+        self._repository = repository
+
+    @tracer.capture_method(capture_response=False)
+    def execute(self, command: RenameThreadCommand) -> ThreadDTO:
+        """Execute the use case.
+
+        The thread is read and saved again if another write to it lands in between, so a
+        concurrent rename or post never gets lost.
+
+        Args:
+            command: The command to execute.
+
+        Returns:
+            The renamed thread.
+
+        Raises:
+            ValueError: If the thread name is empty.
+            ThreadNotFoundError: If the thread with the given ID does not exist.
+            ThreadExistsError: If another thread has the same name.
+            ThreadVersionConflictError: If the thread keeps being written concurrently.
+        """
+
+        def rename() -> ThreadDTO:
+            thread = self._repository.find_by_id(command.thread_id)
+            if not thread:
+                raise ThreadNotFoundError(command.thread_id)
+            thread.name = command.name
+            self._repository.save(thread)
+            return ThreadDTO.from_model(thread)
+
+        return retry_on_conflict(rename)
@@ -0,0 +1,42 @@
+"""Retrying of the read-modify-write operations that lose an optimistic concurrency race."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, TypeVar
+
+from chat.shared.exceptions import ThreadVersionConflictError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+T = TypeVar("T")
+
+MAX_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+
+def retry_on_conflict(operation: Callable[[], T], *, max_attempts: int = MAX_ATTEMPTS) -> T:
+    """Run an operation, running it again while it fails with a version conflict.
+
+    The operation must read what it modifies on every attempt, so each attempt works on the
+    latest version. A conflict means another writer has just succeeded, so the attempts are
+    not delayed.
+
+    Args:
+        operation: The operation to run.
+        max_attempts: The maximum number of attempts.
+
+    Returns:
+        The result of the operation.
+
+    Raises:
+        ThreadVersionConflictError: If the last attempt still conflicts.
+    """
+    for attempt in range(1, max_attempts):
+        try:
+            return operation()
+        except ThreadVersionConflictError as e:
+            logger.info("Retrying after a version conflict", extra={"attempt": attempt, "thread_id": str(e)})
+    return operation()
@@ -0,0 +1,67 @@
+"""Use case for searching posts."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict, Field
+from ulid import ULID  # noqa: TCH002
+
+from chat.domain.search import tokenize
+from chat.shared.tracing import tracer
+
+from .dto import PostDTO
+
+if TYPE_CHECKING:
+    from chat.domain.search import AbstractPostSearchIndex
+
+MAX_SEARCH_LIMIT = 100
+
+
+class SearchPostsCommand(BaseModel):
+    """Command to search posts.
+
+    Attributes:
+        query: The text to search for.
+        thread_id: The ID of the thread to search in. If None, all threads are searched.
+        limit: The maximum number of posts to return.
+    """
+
+    model_config = ConfigDict(extra="forbid", validate_assignment=True)
+
+    query: str = Field(min_length=1)
+    thread_id: ULID | None = None
+    limit: int = Field(default=20, gt=0, le=MAX_SEARCH_LIMIT)
+
+
+class SearchPosts:
+    """Use case for searching posts.
+
+    The posts that contain every term of the query are returned, ranked by the number of
+    occurrences of the terms and then by recency.
+    """
+
+    def __init__(self, search_index: AbstractPostSearchIndex) -> None:
+        """Initialize the use case.
+
+        Args:
+            search_index: The search index of the posts.
+        """
+        self._search_index = search_index
+
+    @tracer.capture_method(capture_response=False)
+    def execute(self, command: SearchPostsCommand) -> list[PostDTO]:
+        """Execute the use case.
+
+        Args:
+            command: The command to execute.
+
+        Returns:
+            The matching posts, best match first.
+        """
+        terms = list(tokenize(command.query))
+        if not terms:
+            return []
+
+        posts = self._search_index.search(terms, thread_id=command.thread_id, limit=command.limit)
+        return [PostDTO.from_model(post) for post in posts]
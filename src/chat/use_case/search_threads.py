@@ -0,0 +1,55 @@
+"""Use case for searching threads by name."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from chat.shared.tracing import tracer
+
+from .dto import ThreadDTO
+
+if TYPE_CHECKING:
+    from chat.domain.thread import AbstractThreadRepository
+
+MAX_SEARCH_LIMIT = 100
+
+
+class SearchThreadsCommand(BaseModel):
+    """Command to search threads by name.
+
+    Attributes:
+        prefix: The prefix of the thread names, compared ignoring case and width.
+        limit: The maximum number of threads to return.
+    """
+
+    model_config = ConfigDict(extra="forbid", validate_assignment=True)
+
+    prefix: str = Field(min_length=1)
+    limit: int = Field(default=10, gt=0, le=MAX_SEARCH_LIMIT)
+
+
+class SearchThreads:
+    """Use case for searching threads by the prefix of their names."""
+
+    def __init__(self, repository: AbstractThreadRepository) -> None:
+        """Initialize the use case.
+
+        Args:
+            repository: The repository to use for thread operations.
+        """
+        self._repository = repository
+
+    @tracer.capture_method(capture_response=False)
+    def execute(self, command: SearchThreadsCommand) -> list[ThreadDTO]:
+        """Execute the use case.
+
+        Args:
+            command: The command to execute.
+
+        Returns:
+            The matching threads, in the order of their names.
+        """
+        threads = self._repository.search_by_name(command.prefix, limit=command.limit)
+        return [ThreadDTO.from_model(thread) for thread in threads]
@@ -1,25 +1,220 @@
 """Lambda function entrypoint."""  # noqa: INP001
 
+import json
+import math
 import os
-from typing import Any
+from collections.abc import Iterator
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, cast
 
-from aws_lambda_powertools import Logger
-from aws_lambda_powertools.event_handler import ApiGatewayResolver
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.event_handler import ApiGatewayResolver, Response
+from aws_lambda_powertools.event_handler.middlewares import NextMiddleware
 from aws_lambda_powertools.logging import correlation_paths
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+from aws_lambda_powertools.utilities.data_classes import DynamoDBStreamEvent, LambdaFunctionUrlEvent
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from chat.config.container import Container
-from routers import thread
+from chat.config.container import Container, RepositoryBackend, parse_hot_threads
+from chat.infrastructure.diagnostics import QueryDiagnostics
+from chat.infrastructure.metering import Usage
+from chat.shared.exceptions import ServiceUnavailableError
+from chat.shared.memory import MemoryReport, MemoryTracker
+from chat.shared.profiling import ProfileMode, Profiler
+from chat.shared.tracing import FileExporter, local_tracer, tracer
+from routers import batch, changes, feed, post, search, streaming, thread
 
 logger = Logger(service=os.environ["SERVICE_NAME"])
+metrics = Metrics(namespace=os.environ["SERVICE_NAME"], service=os.environ["SERVICE_NAME"])
 
 app = ApiGatewayResolver(enable_validation=True)
 app.include_router(thread.router, prefix="/threads")
+app.include_router(post.router, prefix="/threads")
+app.include_router(batch.router, prefix="/batch")
+app.include_router(search.router, prefix="/search")
+app.include_router(feed.router, prefix="/feed")
 
-container = Container(os.environ["TABLE_NAME"])
+container = Container(
+    os.environ["TABLE_NAME"],
+    hot_threads=parse_hot_threads(os.environ.get("HOT_THREADS", "")),
+    post_bucket_period=timedelta(days=int(days)) if (days := os.environ.get("POST_BUCKET_DAYS")) else None,
+    usage_dump_path=Path(path) if (path := os.environ.get("DYNAMODB_USAGE_FILE")) else None,
+    backend=cast("RepositoryBackend", os.environ.get("REPOSITORY_BACKEND", "dynamodb")),
+    sqlite_path=Path(path) if (path := os.environ.get("SQLITE_PATH")) else None,
+    post_buffer_size=int(size) if (size := os.environ.get("POST_BUFFER_SIZE")) else None,
+    list_threads_from_views=os.environ.get("LIST_THREADS_FROM_VIEWS", "").lower() == "true",
+    local_change_stream=os.environ.get("LOCAL_CHANGE_STREAM", "").lower() == "true",
+)
+if trace_path := os.environ.get("TRACE_EXPORT_FILE"):
+    local_tracer.exporter = FileExporter(Path(trace_path))
 
+# The debug header that explains the queries of the invocation, added if QUERY_DIAGNOSTICS_HEADER is set.
+QUERY_DIAGNOSTICS_HEADER = "X-Query-Diagnostics"
+QUERY_DIAGNOSTICS_HEADER_LIMIT = 4096
 
+# The header that asks for an invocation to be profiled, honored only if PROFILE_ALLOW_HEADER is set.
+PROFILE_HEADER = "x-profile"
+
+# The endpoint that the DynamoDB usage of the change stream handler is published under.
+CHANGE_STREAM_ENDPOINT = "DynamoDB stream"
+
+
+profiler = Profiler(
+    float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    mode=cast("ProfileMode", os.environ.get("PROFILE_MODE", "deterministic")),
+    output_dir=Path(path) if (path := os.environ.get("PROFILE_DIR")) else None,
+)
+
+
+def _profile_requested(event: dict[str, Any]) -> bool:
+    """Tell whether the request asks to be profiled, and is allowed to."""
+    if os.environ.get("PROFILE_ALLOW_HEADER", "").lower() != "true":
+        return False
+    headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+    return headers.get(PROFILE_HEADER, "").lower() in {"1", "true"}
+
+
+def _explain(queries: list[QueryDiagnostics]) -> str:
+    """Explain the queries of the invocation in the value of the debug header."""
+    value = ", ".join(query.explain() for query in queries)
+    if len(value) > QUERY_DIAGNOSTICS_HEADER_LIMIT:
+        value = value[: QUERY_DIAGNOSTICS_HEADER_LIMIT - 3] + "..."
+    return value
+
+
+def _set_deadline(context: LambdaContext) -> None:
+    remaining = context.get_remaining_time_in_millis()
+    container.resilience.set_deadline(remaining / 1000 if remaining > 0 else None)
+
+
+def _add_metrics(target: Metrics | EphemeralMetrics, values: dict[str, float]) -> None:
+    for name, value in values.items():
+        if name.endswith("Latency"):
+            unit = MetricUnit.Milliseconds
+        elif name.endswith("Memory"):
+            unit = MetricUnit.Kilobytes
+        else:
+            unit = MetricUnit.Count
+        target.add_metric(name=name, unit=unit, value=value)
+
+
+def _publish_by_endpoint(endpoint: str, values: dict[str, float]) -> None:
+    endpoint_metrics = EphemeralMetrics(namespace=os.environ["SERVICE_NAME"])
+    endpoint_metrics.add_dimension(name="Endpoint", value=endpoint)
+    _add_metrics(endpoint_metrics, values)
+    endpoint_metrics.flush_metrics()
+
+
+def _publish_usage() -> None:
+    """Publish the DynamoDB usage of the invocation, in total and by endpoint."""
+    usage = container.capacity_meter.collect_usage()
+    if not usage:
+        return
+    _add_metrics(metrics, sum(usage.values(), Usage()).to_metrics())
+    for endpoint, endpoint_usage in usage.items():
+        _publish_by_endpoint(endpoint, endpoint_usage.to_metrics())
+
+
+def _report_memory(report: MemoryReport) -> None:
+    logger.info("Tracked the memory of the invocation", extra={"memory": report.to_dict()})
+    _add_metrics(metrics, report.to_metrics())
+    _publish_by_endpoint(report.name, report.to_metrics())
+
+
+memory_tracker = MemoryTracker(float(os.environ.get("MEMORY_SAMPLE_RATE", "0")), on_report=_report_memory)
+
+
+def flush_writes(app: ApiGatewayResolver, next_middleware: NextMiddleware) -> Response[Any]:
+    """Write the buffered post saves before the response is sent.
+
+    The writes are flushed even if the route fails, like unbuffered writes would have been made.
+    If the flush fails, its error replaces the response, so the client never sees a success
+    for posts that were not written.
+    """
+    try:
+        return next_middleware(app)
+    finally:
+        container.flush()
+
+
+app.use(middlewares=[flush_writes])
+
+
+@app.exception_handler(ServiceUnavailableError)
+def handle_service_unavailable(e: ServiceUnavailableError) -> Response[str]:
+    """Respond with 503 when the table is throttling, so the client retries later."""
+    status = HTTPStatus.SERVICE_UNAVAILABLE
+    return Response(
+        status_code=status.value,
+        content_type="application/json",
+        body=json.dumps({"statusCode": status.value, "message": status.phrase}),
+        headers={"Retry-After": str(max(math.ceil(e.retry_after), 1))},
+    )
+
+
+@metrics.log_metrics
 @logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST, log_event=True)
 def handler(event: dict[str, Any], context: LambdaContext) -> dict[str, Any]:
     """Lambda function handler."""
     app.append_context(container=container)
-    return app.resolve(event, context)
+    _set_deadline(context)
+    endpoint = f"{event.get('httpMethod')} {event.get('resource', event.get('path'))}"
+    try:
+        with (
+            profiler.profile(context.aws_request_id, force=_profile_requested(event)),
+            memory_tracker.track(endpoint),
+            container.capacity_meter.scope(endpoint),
+            tracer.provider.in_subsegment("## app.resolve") as span,
+        ):
+            span.put_annotation("endpoint", endpoint)
+            response = app.resolve(event, context)
+            span.put_annotation("status_code", response["statusCode"])
+    finally:
+        if container.change_stream:
+            container.change_stream.replay(_project_changes, context)
+        queries = container.query_inspector.collect()
+        _add_metrics(metrics, {**container.resilience.collect_metrics(), **container.single_flight.collect_metrics()})
+        _publish_usage()
+    if queries and os.environ.get("QUERY_DIAGNOSTICS_HEADER", "").lower() == "true":
+        response.setdefault("multiValueHeaders", {})[QUERY_DIAGNOSTICS_HEADER] = [_explain(queries)]
+    return response
+
+
+def _project_changes(event: dict[str, Any], _context: LambdaContext | None = None) -> dict[str, Any]:
+    response, projected = changes.project_changes(DynamoDBStreamEvent(event), container)
+    _add_metrics(metrics, {"ProjectedChanges": projected})
+    return response
+
+
+@metrics.log_metrics
+@logger.inject_lambda_context
+def change_stream_handler(event: dict[str, Any], context: LambdaContext) -> dict[str, Any]:
+    """Lambda function handler of the DynamoDB stream of the table.
+
+    Projects the changes of the threads and posts onto the read views, and reports the first
+    record that fails in a partial batch response. With LOCAL_CHANGE_STREAM set, the API handler
+    replays the changes it made to this handler itself at the end of each invocation, since there
+    is no stream to deliver them.
+    """
+    try:
+        with container.capacity_meter.scope(CHANGE_STREAM_ENDPOINT):
+            return _project_changes(event, context)
+    finally:
+        container.query_inspector.collect()
+        _add_metrics(metrics, {**container.resilience.collect_metrics(), **container.single_flight.collect_metrics()})
+        _publish_usage()
+
+
+@logger.inject_lambda_context(correlation_id_path=correlation_paths.LAMBDA_FUNCTION_URL, log_event=True)
+def stream_handler(event: dict[str, Any], context: LambdaContext) -> Iterator[bytes]:
+    """Lambda function handler in response streaming mode.
+
+    Serves GET /threads/{thread_id}/posts from a function URL event. The response is returned as
+    an iterator of chunks in the HTTP integration response format (content type
+    `application/vnd.awslambda.http-integration-response`). The function runs behind a function
+    URL in the `RESPONSE_STREAM` invoke mode, and `streaming_runtime.py` writes the chunks to the
+    response stream as they are produced.
+    """
+    _set_deadline(context)
+    return streaming.stream_posts(LambdaFunctionUrlEvent(event), container)
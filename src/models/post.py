@@ -0,0 +1,50 @@
+"""Models for posts."""
+
+from __future__ import annotations
+
+from datetime import datetime  # noqa: TCH003
+from typing import TYPE_CHECKING, Self
+
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:
+    from chat.use_case import PostDTO
+
+
+class NewPostRequest(BaseModel):
+    """Request model for creating a new post."""
+
+    message: str
+
+
+class PostResponse(BaseModel):
+    """Response model for a post."""
+
+    id_: str = Field(alias="id")
+    thread_id: str
+    message: str
+    created_at: datetime
+
+    @classmethod
+    def from_dto(cls, dto: PostDTO) -> Self:
+        """Converts a DTO to a response model."""
+        return cls(id=str(dto.id_), thread_id=str(dto.thread_id), message=dto.message, created_at=dto.created_at)
+
+
+class PostListResponse(BaseModel):
+    """Response model for a page of posts."""
+
+    posts: list[PostResponse]
+    next_cursor: str | None = None
+
+
+class PostSearchResponse(BaseModel):
+    """Response model for the results of a post search."""
+
+    posts: list[PostResponse]
+
+
+class RecentPostsResponse(BaseModel):
+    """Response model for the recent posts of all threads."""
+
+    posts: list[PostResponse]
@@ -17,14 +17,34 @@ class NewThreadRequest(BaseModel):
     name: str
 
 
+class RenameThreadRequest(BaseModel):
+    """Request model for renaming a thread."""
+
+    name: str
+
+
 class ThreadResponse(BaseModel):
     """Response model for a thread."""
 
     id_: str = Field(alias="id")
     name: str
     created_at: datetime
+    post_count: int
+    last_post_at: datetime | None
 
     @classmethod
     def from_dto(cls, dto: ThreadDTO) -> Self:
         """Converts a DTO to a response model."""
-        return cls(id=str(dto.id_), name=dto.name, created_at=dto.created_at)
+        return cls(
+            id=str(dto.id_),
+            name=dto.name,
+            created_at=dto.created_at,
+            post_count=dto.post_count,
+            last_post_at=dto.last_post_at,
+        )
+
+
+class ThreadSearchResponse(BaseModel):
+    """Response model for the results of a thread search."""
+
+    threads: list[ThreadResponse]
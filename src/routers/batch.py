@@ -0,0 +1,231 @@
+"""Batch router module.
+
+POST /batch runs several sub-requests addressed to the other routes in a single API Gateway and
+Lambda round trip. Consecutive GET sub-requests are independent reads and run concurrently on the
+executor of the shared container, within the time left before the Lambda function times out; any
+other sub-request is a write and runs alone, in order, so it sees the effects of the sub-requests
+before it and the sub-requests after it see its effects.
+
+The sub-requests are dispatched directly to the route functions rather than through the resolver,
+since the resolver keeps the current event in shared state and cannot resolve events concurrently.
+Idempotency keys apply to the batch request as a whole, not to its sub-requests.
+"""
+
+import json
+import re
+from collections.abc import Callable, Mapping
+from functools import partial
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Literal
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler import Response
+from aws_lambda_powertools.event_handler.exceptions import ServiceError
+from aws_lambda_powertools.event_handler.openapi.encoders import jsonable_encoder
+from aws_lambda_powertools.event_handler.router import APIGatewayRouter
+from chat.shared.concurrency import run_concurrently
+from chat.shared.exceptions import ServiceUnavailableError
+from models.post import NewPostRequest
+from models.thread import NewThreadRequest, RenameThreadRequest
+from pydantic import BaseModel, Field, ValidationError
+
+from routers import feed, post, search, thread
+from routers.idempotency import run_idempotently
+
+if TYPE_CHECKING:
+    from chat.config.container import Container
+
+MAX_REQUESTS = 25
+# Seconds kept back from the remaining time of the function to build the response.
+DEADLINE_MARGIN = 1.0
+
+logger = Logger(child=True)
+router = APIGatewayRouter()
+
+Operation = Callable[[re.Match[str], Mapping[str, str], Any], Any]
+
+_ROUTES: list[tuple[str, re.Pattern[str], Operation]] = [
+    ("GET", re.compile(r"/threads/?"), lambda _, query, __: thread.list_threads(query)),
+    (
+        "POST",
+        re.compile(r"/threads/?"),
+        lambda _, __, body: thread.create_thread(NewThreadRequest.model_validate(body)),
+    ),
+    ("GET", re.compile(r"/threads/(?P<thread_id>[^/]+)"), lambda m, _, __: thread.get_thread(m["thread_id"])),
+    (
+        "PATCH",
+        re.compile(r"/threads/(?P<thread_id>[^/]+)"),
+        lambda m, _, body: thread.rename_thread(m["thread_id"], RenameThreadRequest.model_validate(body)),
+    ),
+    ("DELETE", re.compile(r"/threads/(?P<thread_id>[^/]+)"), lambda m, _, __: thread.delete_thread(m["thread_id"])),
+    (
+        "GET",
+        re.compile(r"/threads/(?P<thread_id>[^/]+)/posts/?"),
+        lambda m, query, _: post.list_posts(m["thread_id"], query),
+    ),
+    (
+        "POST",
+        re.compile(r"/threads/(?P<thread_id>[^/]+)/posts/?"),
+        lambda m, _, body: post.create_post(m["thread_id"], NewPostRequest.model_validate(body)),
+    ),
+    (
+        "DELETE",
+        re.compile(r"/threads/(?P<thread_id>[^/]+)/posts/(?P<post_id>[^/]+)"),
+        lambda m, _, __: post.delete_post(m["thread_id"], m["post_id"]),
+    ),
+    ("GET", re.compile(r"/search/posts/?"), lambda _, query, __: search.search_posts(query)),
+    ("GET", re.compile(r"/search/threads/?"), lambda _, query, __: search.search_threads(query)),
+    ("GET", re.compile(r"/feed/?"), lambda _, query, __: feed.list_recent_posts(query)),
+]
+
+
+_PATH_PARAMETER = re.compile(r"\(\?P<(\w+)>[^)]*\)")
+
+
+class SubRequest(BaseModel):
+    """A sub-request of a batch request."""
+
+    method: Literal["GET", "POST", "PATCH", "DELETE"]
+    path: str
+    query: dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    """Request model for a batch request."""
+
+    requests: list[SubRequest] = Field(min_length=1, max_length=MAX_REQUESTS)
+
+
+def _error(status_code: int, message: str | list[Any]) -> tuple[int, str]:
+    return status_code, json.dumps({"statusCode": status_code, "message": message})
+
+
+# The responses of the errors that a sub-request may raise, by the type of the error.
+_ERRORS: dict[type[Exception], Callable[[Any], tuple[int, str]]] = {
+    ServiceError: lambda e: _error(e.status_code, e.msg),
+    ValidationError: lambda e: _error(
+        HTTPStatus.UNPROCESSABLE_ENTITY.value, jsonable_encoder(e.errors(include_url=False))
+    ),
+    ServiceUnavailableError: lambda _: _error(
+        HTTPStatus.SERVICE_UNAVAILABLE.value, HTTPStatus.SERVICE_UNAVAILABLE.phrase
+    ),
+}
+
+
+def _endpoint(method: str, pattern: re.Pattern[str]) -> str:
+    """Return the endpoint of a route, named like its API Gateway resource, e.g. "GET /threads/{thread_id}"."""
+    return f"{method} {_PATH_PARAMETER.sub(r'{\1}', pattern.pattern).removesuffix('/?')}"
+
+
+def _route(request: SubRequest) -> tuple[str, Operation, re.Match[str]] | None:
+    """Return the endpoint, the operation and the path match of the route of a sub-request, if any."""
+    for method, pattern, operation in _ROUTES:
+        if method == request.method and (match := pattern.fullmatch(request.path)):
+            return _endpoint(method, pattern), operation, match
+    return None
+
+
+def _error_response(request: SubRequest, error: Exception) -> tuple[int, str]:
+    """Return the status code and JSON body of a sub-request that raised an error."""
+    for error_type in type(error).__mro__:
+        if response := _ERRORS.get(error_type):
+            return response(error)
+    logger.error("Sub-request failed", exc_info=error, extra={"method": request.method, "path": request.path})
+    return _error(HTTPStatus.INTERNAL_SERVER_ERROR.value, "Internal Server Error")
+
+
+def _dispatch(request: SubRequest) -> tuple[int, str | None]:
+    """Run a sub-request and return its status code and JSON body.
+
+    The DynamoDB usage of the sub-request is attributed to the endpoint it is addressed to.
+    """
+    if (route := _route(request)) is None:
+        return _error(HTTPStatus.NOT_FOUND.value, "Not found")
+    endpoint, operation, match = route
+
+    container: Container = router.context["container"]
+    try:
+        with container.capacity_meter.scope(endpoint):
+            result = operation(match, request.query, request.body)
+    except Exception as e:  # noqa: BLE001
+        return _error_response(request, e)
+
+    if isinstance(result, Response):
+        return result.status_code, result.body
+    return HTTPStatus.OK.value, json.dumps(jsonable_encoder(result))
+
+
+def _timeout() -> float | None:
+    """Return the number of seconds the reads may take, or None if the function has no deadline."""
+    remaining = router.lambda_context.get_remaining_time_in_millis()
+    if remaining <= 0:
+        return None
+    return max(remaining / 1000 - DEADLINE_MARGIN, 0)
+
+
+def _run(requests: list[SubRequest]) -> list[tuple[int, str | None]]:
+    """Run the sub-requests, overlapping consecutive reads."""
+    container: Container = router.context["container"]
+    results: list[tuple[int, str | None]] = []
+    reads: list[SubRequest] = []
+
+    def flush_reads() -> None:
+        if len(reads) > 1:
+            calls = [partial(_dispatch, read) for read in reads]
+            try:
+                results.extend(run_concurrently(container.executor, calls, name="batch", timeout=_timeout()))
+            except TimeoutError as e:
+                raise ServiceError(HTTPStatus.GATEWAY_TIMEOUT.value, "Batch request timed out") from e
+        else:
+            results.extend(map(_dispatch, reads))
+        reads.clear()
+
+    for request in requests:
+        if request.method == "GET":
+            reads.append(request)
+            continue
+        flush_reads()
+        results.append(_dispatch(request))
+    flush_reads()
+
+    return results
+
+
+@router.post("/")
+def post_batch(request: BatchRequest) -> Response[str]:
+    """POST /batch handler.
+
+    Returns the status code and body of each sub-request, in the order of the sub-requests.
+
+    Headers:
+        Idempotency-Key: The key to retry the batch request with, without running its
+            sub-requests twice.
+    """
+    container: Container = router.context["container"]
+    return run_idempotently(
+        router.current_event,
+        container.idempotency_store,
+        lambda: run_batch(request),
+        flush=container.flush,
+    )
+
+
+def run_batch(request: BatchRequest) -> Response[str]:
+    """Run the sub-requests of a batch request.
+
+    Args:
+        request: The batch request.
+
+    Returns:
+        The status code and body of each sub-request, in the order of the sub-requests.
+    """
+    responses = (
+        f'{{"status_code":{status_code},"body":{body if body is not None else "null"}}}'
+        for status_code, body in _run(request.requests)
+    )
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type="application/json",
+        body=f'{{"responses":[{",".join(responses)}]}}',
+    )
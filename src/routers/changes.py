@@ -0,0 +1,50 @@
+"""Change stream module.
+
+The function in this module processes a batch of the DynamoDB stream of the table, delivered by
+the event source mapping of the change stream handler, and projects the changes of the threads
+and posts onto the read views.
+
+The records of a batch are processed in order. Processing stops at the first record that fails,
+which is reported as the failed item of the batch: Lambda retries the batch from that record on,
+so the changes of an item are never projected out of order, and the records already projected
+are projected again harmlessly.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from aws_lambda_powertools import Logger
+from chat.infrastructure.change_stream import to_change
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.data_classes import DynamoDBStreamEvent
+    from chat.config.container import Container
+
+logger = Logger(child=True)
+
+
+def project_changes(event: DynamoDBStreamEvent, container: Container) -> tuple[dict[str, Any], int]:
+    """Project the changes of a batch of stream records onto the read views.
+
+    Args:
+        event: The batch of stream records.
+        container: The container of the application.
+
+    Returns:
+        The partial batch response, and the number of changes projected.
+    """
+    projected = 0
+    for record in event.records:
+        stream_record = record.dynamodb
+        if stream_record is None:
+            continue
+        try:
+            change = to_change(stream_record.old_image, stream_record.new_image)
+            if change is not None:
+                container.project_changes.execute(change)
+                projected += 1
+        except Exception:
+            logger.exception("Failed to project a change", extra={"sequence_number": stream_record.sequence_number})
+            return {"batchItemFailures": [{"itemIdentifier": stream_record.sequence_number}]}, projected
+    return {"batchItemFailures": []}, projected
@@ -0,0 +1,53 @@
+"""Feed router module.
+
+GET /feed lists the recent posts of all threads from the recent post feed, a read view
+maintained by the change stream handler, so it lags the post creations by the delay of the stream.
+"""
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler.router import APIGatewayRouter
+from chat.use_case import ListRecentPostsCommand
+from models.post import PostResponse, RecentPostsResponse
+from pydantic import ValidationError
+
+from routers.params import parse_positive_int
+
+if TYPE_CHECKING:
+    from chat.config.container import Container
+
+
+logger = Logger(child=True)
+router = APIGatewayRouter()
+
+
+@router.get("/")
+def get_feed() -> RecentPostsResponse:
+    """GET /feed handler.
+
+    Query parameters:
+        limit: The maximum number of posts to list.
+    """
+    return list_recent_posts(router.current_event.query_string_parameters or {})
+
+
+def list_recent_posts(query: Mapping[str, str]) -> RecentPostsResponse:
+    """List the recent posts with the given query parameters.
+
+    Args:
+        query: The query string parameters.
+
+    Returns:
+        The recent posts, newest first.
+    """
+    container: Container = router.context["container"]
+    limit = parse_positive_int(query.get("limit"), "limit")
+    try:
+        command = ListRecentPostsCommand(**({"limit": limit} if limit else {}))
+    except ValidationError as e:
+        raise BadRequestError(str(e)) from e
+    posts = container.list_recent_posts.execute(command)
+    return RecentPostsResponse(posts=[PostResponse.from_dto(post) for post in posts])
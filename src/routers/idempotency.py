@@ -0,0 +1,89 @@
+"""Idempotent handling of the requests that create resources.
+
+A client that retries a request after a timeout sends the same `Idempotency-Key` header with
+it. The first request with a key runs and its response is recorded; the retries replay that
+response, marked with the `Idempotent-Replayed` header, without running the request again.
+
+A key is bound to the method, path and body of its first request: reusing it for another
+request is rejected with 422. A retry that arrives while the first request is still running is
+rejected with 409 and can be retried later. If the request raises, its record is released, so
+a retry runs it again. Writes that the request buffered are flushed before its response is
+recorded, so a replayed response never refers to writes that were lost.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from aws_lambda_powertools.event_handler import Response
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError, ServiceError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from aws_lambda_powertools.utilities.data_classes.common import BaseProxyEvent
+    from chat.domain.idempotency import AbstractIdempotencyStore
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(event: BaseProxyEvent) -> str:
+    request = f"{event.http_method} {event.path}\n{event.body or ''}"
+    return hashlib.sha256(request.encode()).hexdigest()
+
+
+def run_idempotently(
+    event: BaseProxyEvent,
+    store: AbstractIdempotencyStore,
+    operation: Callable[[], Response[Any]],
+    *,
+    flush: Callable[[], None] | None = None,
+) -> Response[Any]:
+    """Run the operation once per idempotency key of the request.
+
+    Args:
+        event: The current request.
+        store: The store of the idempotency records.
+        operation: The operation that handles the request.
+        flush: Writes the buffered writes of the operation, if it may buffer any.
+
+    Returns:
+        The response of the operation, or the recorded response if the key was used before.
+        Without an idempotency key, the operation simply runs.
+
+    Raises:
+        BadRequestError: If the idempotency key is empty or too long.
+        ServiceError: If the key was used for another request (422), or the request with
+            the key is still in progress (409).
+    """
+    key = event.get_header_value(IDEMPOTENCY_KEY_HEADER)
+    if key is None:
+        return operation()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        error_message = f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters long"
+        raise BadRequestError(error_message)
+
+    fingerprint = _fingerprint(event)
+    record = store.start(key, fingerprint)
+    if record is not None:
+        if record.fingerprint != fingerprint:
+            error_message = f"{IDEMPOTENCY_KEY_HEADER} was already used for another request"
+            raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY.value, error_message)
+        if not record.completed:
+            error_message = f"A request with the same {IDEMPOTENCY_KEY_HEADER} is in progress"
+            raise ServiceError(HTTPStatus.CONFLICT.value, error_message)
+        return Response(status_code=record.status_code, body=record.body, headers={REPLAYED_HEADER: "true"})  # type: ignore[arg-type]
+
+    try:
+        response = operation()
+        if flush:
+            flush()
+    except BaseException:
+        store.release(key)
+        raise
+    store.complete(key, fingerprint, response.status_code, response.body)
+    return response
@@ -0,0 +1,77 @@
+"""Lightweight parsers for path and query parameters.
+
+The parameters are converted directly to the types expected by the use case commands,
+without building intermediate request models.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import cast
+
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from ulid import ULID
+
+
+def parse_ulid(value: str, name: str) -> ULID:
+    """Parse a ULID parameter.
+
+    Args:
+        value: The raw parameter value.
+        name: The name of the parameter, for the error message.
+
+    Returns:
+        The parsed ULID.
+
+    Raises:
+        BadRequestError: If the value is not a valid ULID.
+    """
+    try:
+        return cast("ULID", ULID.from_str(value))
+    except ValueError as e:
+        error_message = f"Invalid {name}: {value}"
+        raise BadRequestError(error_message) from e
+
+
+def parse_datetime(value: str | None, name: str) -> datetime | None:
+    """Parse an optional ISO 8601 datetime parameter.
+
+    Args:
+        value: The raw parameter value.
+        name: The name of the parameter, for the error message.
+
+    Returns:
+        The parsed datetime, or None if the value is not given.
+
+    Raises:
+        BadRequestError: If the value is not a valid ISO 8601 datetime.
+    """
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        error_message = f"Invalid {name}: {value}"
+        raise BadRequestError(error_message) from e
+
+
+def parse_positive_int(value: str | None, name: str) -> int | None:
+    """Parse an optional positive integer parameter.
+
+    Args:
+        value: The raw parameter value.
+        name: The name of the parameter, for the error message.
+
+    Returns:
+        The parsed integer, or None if the value is not given.
+
+    Raises:
+        BadRequestError: If the value is not a positive integer.
+    """
+    if value is None:
+        return None
+    # isdigit would also accept digits that int does not parse, such as superscripts.
+    if not (value.isascii() and value.isdecimal()) or int(value) < 1:
+        error_message = f"Invalid {name}: {value}"
+        raise BadRequestError(error_message)
+    return int(value)
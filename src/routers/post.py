@@ -0,0 +1,113 @@
+"""Post router module."""
+
+from collections.abc import Mapping
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler import Response
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError, NotFoundError
+from aws_lambda_powertools.event_handler.router import APIGatewayRouter
+from chat.shared.exceptions import PostNotFoundError, ThreadNotFoundError
+from chat.use_case import CreatePostCommand, DeletePostCommand, ListPostsCommand
+from models.post import NewPostRequest, PostListResponse, PostResponse
+from pydantic import ValidationError
+
+from routers.idempotency import run_idempotently
+from routers.params import parse_datetime, parse_positive_int, parse_ulid
+
+if TYPE_CHECKING:
+    from chat.config.container import Container
+
+
+logger = Logger(child=True)
+router = APIGatewayRouter()
+
+
+@router.post("/<thread_id>/posts")
+def post_posts(thread_id: str, request: NewPostRequest) -> Response[PostResponse]:
+    """POST /threads/{thread_id}/posts handler.
+
+    Headers:
+        Idempotency-Key: The key to retry the request with, without creating the post twice.
+    """
+    container: Container = router.context["container"]
+    return run_idempotently(
+        router.current_event,
+        container.idempotency_store,
+        lambda: create_post(thread_id, request),
+        flush=container.flush,
+    )
+
+
+def create_post(thread_id: str, request: NewPostRequest) -> Response[PostResponse]:
+    """Create a post in a thread.
+
+    Args:
+        thread_id: The ID of the thread.
+        request: The new post.
+
+    Returns:
+        The created post.
+    """
+    container: Container = router.context["container"]
+    try:
+        command = CreatePostCommand(thread_id=parse_ulid(thread_id, "thread_id"), message=request.message)
+        post = container.create_post.execute(command)
+    except ValidationError as e:
+        raise BadRequestError(str(e)) from e
+    except ThreadNotFoundError as e:
+        raise NotFoundError(thread_id) from e
+    return Response(
+        status_code=HTTPStatus.CREATED.value, body=PostResponse.from_dto(post).model_dump_json(by_alias=True)
+    )
+
+
+@router.get("/<thread_id>/posts")
+def get_posts(thread_id: str) -> PostListResponse:
+    """GET /threads/{thread_id}/posts handler.
+
+    Query parameters:
+        start_time: The ISO 8601 timestamp to list posts from.
+        end_time: The ISO 8601 timestamp to list posts until, exclusive.
+        limit: The maximum number of posts to list.
+        cursor: The `next_cursor` of the previous page.
+    """
+    return list_posts(thread_id, router.current_event.query_string_parameters or {})
+
+
+def list_posts(thread_id: str, query: Mapping[str, str]) -> PostListResponse:
+    """List the posts of a thread with the given query parameters.
+
+    Args:
+        thread_id: The thread ID path parameter.
+        query: The query string parameters.
+
+    Returns:
+        The page of posts.
+    """
+    container: Container = router.context["container"]
+    cursor = query.get("cursor")
+    limit = parse_positive_int(query.get("limit"), "limit")
+    command = ListPostsCommand(
+        thread_id=parse_ulid(thread_id, "thread_id"),
+        start_time=parse_datetime(query.get("start_time"), "start_time"),
+        end_time=parse_datetime(query.get("end_time"), "end_time"),
+        limit=limit,
+        cursor=parse_ulid(cursor, "cursor") if cursor else None,
+    )
+    posts = container.list_posts.execute(command)
+    next_cursor = str(posts[-1].id_) if limit and len(posts) == limit else None
+    return PostListResponse(posts=[PostResponse.from_dto(post) for post in posts], next_cursor=next_cursor)
+
+
+@router.delete("/<thread_id>/posts/<post_id>")
+def delete_post(thread_id: str, post_id: str) -> Response[None]:
+    """DELETE /threads/{thread_id}/posts/{post_id} handler."""
+    container: Container = router.context["container"]
+    command = DeletePostCommand(thread_id=parse_ulid(thread_id, "thread_id"), post_id=parse_ulid(post_id, "post_id"))
+    try:
+        container.delete_post.execute(command)
+    except PostNotFoundError as e:
+        raise NotFoundError(post_id) from e
+    return Response(status_code=HTTPStatus.NO_CONTENT.value)
@@ -0,0 +1,95 @@
+"""Search router module."""
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler.router import APIGatewayRouter
+from chat.use_case import SearchPostsCommand, SearchThreadsCommand
+from models.post import PostResponse, PostSearchResponse
+from models.thread import ThreadResponse, ThreadSearchResponse
+from pydantic import ValidationError
+
+from routers.params import parse_positive_int, parse_ulid
+
+if TYPE_CHECKING:
+    from chat.config.container import Container
+
+
+logger = Logger(child=True)
+router = APIGatewayRouter()
+
+
+@router.get("/posts")
+def get_posts() -> PostSearchResponse:
+    """GET /search/posts handler.
+
+    Query parameters:
+        q: The text to search for.
+        thread_id: The ID of the thread to search in. All threads are searched if omitted.
+        limit: The maximum number of posts to return.
+    """
+    return search_posts(router.current_event.query_string_parameters or {})
+
+
+def search_posts(query: Mapping[str, str]) -> PostSearchResponse:
+    """Search the posts with the given query parameters.
+
+    Args:
+        query: The query string parameters.
+
+    Returns:
+        The matching posts, best match first.
+    """
+    container: Container = router.context["container"]
+    text = query.get("q", "").strip()
+    if not text:
+        error_message = "Missing q"
+        raise BadRequestError(error_message)
+    thread_id = query.get("thread_id")
+    limit = parse_positive_int(query.get("limit"), "limit")
+    try:
+        command = SearchPostsCommand(
+            query=text,
+            thread_id=parse_ulid(thread_id, "thread_id") if thread_id else None,
+            **({"limit": limit} if limit else {}),
+        )
+    except ValidationError as e:
+        raise BadRequestError(str(e)) from e
+    posts = container.search_posts.execute(command)
+    return PostSearchResponse(posts=[PostResponse.from_dto(post) for post in posts])
+
+
+@router.get("/threads")
+def get_threads() -> ThreadSearchResponse:
+    """GET /search/threads handler.
+
+    Query parameters:
+        prefix: The prefix of the thread names, compared ignoring case and width.
+        limit: The maximum number of threads to return.
+    """
+    return search_threads(router.current_event.query_string_parameters or {})
+
+
+def search_threads(query: Mapping[str, str]) -> ThreadSearchResponse:
+    """Search the threads by name with the given query parameters.
+
+    Args:
+        query: The query string parameters.
+
+    Returns:
+        The matching threads, in the order of their names.
+    """
+    container: Container = router.context["container"]
+    prefix = query.get("prefix", "")
+    if not prefix:
+        error_message = "Missing prefix"
+        raise BadRequestError(error_message)
+    limit = parse_positive_int(query.get("limit"), "limit")
+    try:
+        command = SearchThreadsCommand(prefix=prefix, **({"limit": limit} if limit else {}))
+    except ValidationError as e:
+        raise BadRequestError(str(e)) from e
+    threads = container.search_threads.execute(command)
+    return ThreadSearchResponse(threads=[ThreadResponse.from_dto(thread) for thread in threads])
@@ -0,0 +1,114 @@
+"""Response streaming module.
+
+The functions in this module produce the body of a Lambda response stream chunk by chunk, so the
+whole response never has to be held in memory. The first chunk is the HTTP integration prelude
+(status code and headers followed by 8 null bytes), as expected by Lambda response streaming
+through function URLs.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from chat.use_case import ListPostsCommand
+from models.post import PostResponse
+
+from routers.params import parse_datetime, parse_ulid
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from aws_lambda_powertools.utilities.data_classes import LambdaFunctionUrlEvent
+    from chat.config.container import Container
+    from pydantic import BaseModel
+
+CONTENT_TYPE = "application/vnd.awslambda.http-integration-response"
+CHUNK_SIZE = 64 * 1024
+
+_PRELUDE_DELIMITER = b"\x00" * 8
+_POSTS_PATH = re.compile(r"^/threads/(?P<thread_id>[^/]+)/posts/?$")
+
+
+def prelude(status_code: int, headers: dict[str, str] | None = None) -> bytes:
+    """Encode the HTTP integration prelude of a response stream.
+
+    Args:
+        status_code: The HTTP status code of the response.
+        headers: The HTTP headers of the response.
+
+    Returns:
+        The encoded prelude.
+    """
+    metadata = {"statusCode": status_code, "headers": {"Content-Type": "application/json", **(headers or {})}}
+    return json.dumps(metadata).encode() + _PRELUDE_DELIMITER
+
+
+def error(status_code: HTTPStatus, message: str) -> Iterator[bytes]:
+    """Stream an error response.
+
+    Args:
+        status_code: The HTTP status code of the response.
+        message: The error message.
+
+    Yields:
+        The chunks of the response stream.
+    """
+    yield prelude(status_code.value)
+    yield json.dumps({"statusCode": status_code.value, "message": message}).encode()
+
+
+def encode_array(key: str, models: Iterable[BaseModel], *, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Encode models as a JSON object with a single array member, chunk by chunk.
+
+    Args:
+        key: The name of the array member.
+        models: The models to encode.
+        chunk_size: The minimum size of the chunks, except for the last one.
+
+    Yields:
+        The chunks of the encoded JSON object.
+    """
+    buffer = bytearray(b"{" + json.dumps(key).encode() + b":[")
+    for index, model in enumerate(models):
+        if index:
+            buffer += b","
+        buffer += model.model_dump_json(by_alias=True).encode()
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += b"]}"
+    yield bytes(buffer)
+
+
+def stream_posts(event: LambdaFunctionUrlEvent, container: Container) -> Iterator[bytes]:
+    """Stream the response of GET /threads/{thread_id}/posts.
+
+    Args:
+        event: The Lambda function URL event.
+        container: The dependency container.
+
+    Yields:
+        The chunks of the response stream.
+    """
+    match = _POSTS_PATH.match(event.path)
+    if event.http_method != "GET" or not match:
+        yield from error(HTTPStatus.NOT_FOUND, "Not found")
+        return
+
+    try:
+        command = ListPostsCommand(
+            thread_id=parse_ulid(match["thread_id"], "thread_id"),
+            start_time=parse_datetime(event.get_query_string_value("start_time"), "start_time"),
+            end_time=parse_datetime(event.get_query_string_value("end_time"), "end_time"),
+        )
+    except BadRequestError as e:
+        yield from error(HTTPStatus.BAD_REQUEST, e.msg)
+        return
+
+    yield prelude(HTTPStatus.OK.value)
+    yield from encode_array("posts", (PostResponse.from_dto(post) for post in container.list_posts.stream(command)))
@@ -1,33 +1,65 @@
 """Thread router module."""
 
+from collections.abc import Mapping
 from http import HTTPStatus
 from typing import TYPE_CHECKING
 
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.event_handler import Response
-from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError, NotFoundError, ServiceError
 from aws_lambda_powertools.event_handler.router import APIGatewayRouter
-from chat.use_case import CreateThreadCommand
-from models.thread import NewThreadRequest, ThreadResponse
+from chat.shared.exceptions import ThreadExistsError, ThreadNotFoundError, ThreadVersionConflictError
+from chat.use_case import (
+    CreateThreadCommand,
+    DeleteThreadCommand,
+    GetThreadCommand,
+    GetThreadsCommand,
+    RenameThreadCommand,
+)
+from models.thread import NewThreadRequest, RenameThreadRequest, ThreadResponse
 from pydantic import ValidationError
 
+from routers.idempotency import run_idempotently
+from routers.params import parse_ulid
+
 if TYPE_CHECKING:
     from chat.config.container import Container
 
 
+MAX_THREAD_IDS = 100
+
 logger = Logger(child=True)
 router = APIGatewayRouter()
 
 
 @router.post("/")
 def post_threads(request: NewThreadRequest) -> Response[ThreadResponse]:
-    """POST /threads handler."""
+    """POST /threads handler.
+
+    Headers:
+        Idempotency-Key: The key to retry the request with, without creating the thread twice.
+    """
+    container: Container = router.context["container"]
+    return run_idempotently(router.current_event, container.idempotency_store, lambda: create_thread(request))
+
+
+def create_thread(request: NewThreadRequest) -> Response[ThreadResponse]:
+    """Create a thread.
+
+    Args:
+        request: The new thread.
+
+    Returns:
+        The created thread.
+    """
     container: Container = router.context["container"]
     command = CreateThreadCommand(name=request.name)
     try:
         thread = container.create_thread.execute(command)
     except ValidationError as e:
         raise BadRequestError(str(e)) from e
+    except ThreadExistsError as e:
+        raise ServiceError(HTTPStatus.CONFLICT.value, f"Thread already exists: {e}") from e
     return Response(
         status_code=HTTPStatus.CREATED.value, body=ThreadResponse.from_dto(thread).model_dump_json(by_alias=True)
     )
@@ -35,7 +67,85 @@ def post_threads(request: NewThreadRequest) -> Response[ThreadResponse]:
 
 @router.get("/")
 def get_threads() -> dict[str, list[ThreadResponse]]:
-    """GET /threads handler."""
+    """GET /threads handler.
+
+    Query parameters:
+        ids: The comma-separated IDs of the threads to get. If not given, all threads are listed.
+    """
+    return list_threads(router.current_event.query_string_parameters or {})
+
+
+def list_threads(query: Mapping[str, str]) -> dict[str, list[ThreadResponse]]:
+    """List all threads, or the threads with the given IDs.
+
+    Args:
+        query: The query string parameters.
+
+    Returns:
+        The threads.
+    """
     container: Container = router.context["container"]
-    threads = container.list_threads.execute()
+    ids = query.get("ids")
+    if ids is None:
+        threads = container.list_threads.execute()
+    else:
+        thread_ids = [parse_ulid(id_, "ids") for id_ in ids.split(",") if id_]
+        if len(thread_ids) > MAX_THREAD_IDS:
+            error_message = f"Too many ids: at most {MAX_THREAD_IDS} are allowed"
+            raise BadRequestError(error_message)
+        threads = container.get_threads.execute(GetThreadsCommand(thread_ids=thread_ids))
     return {"threads": [ThreadResponse.from_dto(thread) for thread in threads]}
+
+
+@router.get("/<thread_id>")
+def get_thread(thread_id: str) -> ThreadResponse:
+    """GET /threads/{thread_id} handler."""
+    container: Container = router.context["container"]
+    command = GetThreadCommand(thread_id=parse_ulid(thread_id, "thread_id"))
+    thread = container.get_thread.execute(command)
+    if not thread:
+        raise NotFoundError(thread_id)
+    return ThreadResponse.from_dto(thread)
+
+
+@router.patch("/<thread_id>")
+def patch_thread(thread_id: str, request: RenameThreadRequest) -> ThreadResponse:
+    """PATCH /threads/{thread_id} handler."""
+    return rename_thread(thread_id, request)
+
+
+def rename_thread(thread_id: str, request: RenameThreadRequest) -> ThreadResponse:
+    """Rename a thread.
+
+    Args:
+        thread_id: The ID of the thread.
+        request: The new name of the thread.
+
+    Returns:
+        The renamed thread.
+    """
+    container: Container = router.context["container"]
+    try:
+        command = RenameThreadCommand(thread_id=parse_ulid(thread_id, "thread_id"), name=request.name)
+        thread = container.rename_thread.execute(command)
+    except ValidationError as e:
+        raise BadRequestError(str(e)) from e
+    except ThreadNotFoundError as e:
+        raise NotFoundError(thread_id) from e
+    except ThreadExistsError as e:
+        raise ServiceError(HTTPStatus.CONFLICT.value, f"Thread already exists: {e}") from e
+    except ThreadVersionConflictError as e:
+        raise ServiceError(HTTPStatus.CONFLICT.value, f"Thread is being modified concurrently: {e}") from e
+    return ThreadResponse.from_dto(thread)
+
+
+@router.delete("/<thread_id>")
+def delete_thread(thread_id: str) -> Response[None]:
+    """DELETE /threads/{thread_id} handler."""
+    container: Container = router.context["container"]
+    command = DeleteThreadCommand(thread_id=parse_ulid(thread_id, "thread_id"))
+    try:
+        container.delete_thread.execute(command)
+    except ThreadNotFoundError as e:
+        raise NotFoundError(thread_id) from e
+    return Response(status_code=HTTPStatus.NO_CONTENT.value)
@@ -0,0 +1,233 @@
+"""Lambda runtime that streams the responses of the response streaming handler.
+
+The runtime interface client of the managed Python runtime sends the result of a handler as a
+whole, so it cannot stream the chunks that `index.stream_handler` yields. This module is a
+minimal client of the Lambda Runtime API that can: it takes the invocations one at a time, calls
+the handler named by `_HANDLER`, and sends each chunk as soon as it is yielded, in the streaming
+response mode of the Runtime API. Only one chunk is held in memory at a time.
+
+It replaces the runtime interface client through the `streaming_runtime.sh` exec wrapper, so the
+function keeps the managed Python runtime and its deployment package.
+
+An error raised before the first chunk is reported as the error of the invocation. An error
+raised once the stream has started is reported in the trailers of the stream, since the status
+code of the response has already been sent.
+"""  # noqa: INP001
+
+from __future__ import annotations
+
+import base64
+import http.client
+import importlib
+import itertools
+import json
+import logging
+import os
+import time
+import traceback
+from typing import TYPE_CHECKING, Any
+
+from routers.streaming import CONTENT_TYPE
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from email.message import Message
+
+    # The handlers annotate their context as a Lambda context, which `InvocationContext` stands in for.
+    StreamHandler = Callable[[dict[str, Any], Any], Iterable[bytes]]
+
+RUNTIME_API_VERSION = "2018-06-01"
+ERROR_TYPE_TRAILER = "Lambda-Runtime-Function-Error-Type"
+ERROR_BODY_TRAILER = "Lambda-Runtime-Function-Error-Body"
+
+logger = logging.getLogger(__name__)
+
+
+class InvocationContext:
+    """The context of an invocation, with the attributes of the Lambda context.
+
+    Attributes:
+        aws_request_id: The ID of the invocation.
+        invoked_function_arn: The ARN used to invoke the function.
+        trace_id: The X-Ray trace header of the invocation, if any.
+        function_name: The name of the function.
+        function_version: The version of the function.
+        memory_limit_in_mb: The memory of the function.
+        log_group_name: The log group of the function.
+        log_stream_name: The log stream of the function instance.
+    """
+
+    def __init__(self, headers: Message) -> None:
+        """Initialize the context from the headers of the next invocation.
+
+        Args:
+            headers: The headers of the response of the next invocation request.
+        """
+        self.aws_request_id = headers["Lambda-Runtime-Aws-Request-Id"]
+        self.invoked_function_arn = headers.get("Lambda-Runtime-Invoked-Function-Arn", "")
+        self.trace_id: str | None = headers.get("Lambda-Runtime-Trace-Id")
+        self.function_name = os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "")
+        self.function_version = os.environ.get("AWS_LAMBDA_FUNCTION_VERSION", "$LATEST")
+        self.memory_limit_in_mb = int(os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "0"))
+        self.log_group_name = os.environ.get("AWS_LAMBDA_LOG_GROUP_NAME", "")
+        self.log_stream_name = os.environ.get("AWS_LAMBDA_LOG_STREAM_NAME", "")
+        self._deadline_ms = int(headers.get("Lambda-Runtime-Deadline-Ms", "0"))
+
+    def get_remaining_time_in_millis(self) -> int:
+        """Return the number of milliseconds left before the invocation times out."""
+        return max(self._deadline_ms - int(time.time() * 1000), 0)
+
+
+def _error_payload(error: BaseException) -> bytes:
+    return json.dumps(
+        {
+            "errorMessage": str(error),
+            "errorType": type(error).__name__,
+            "stackTrace": traceback.format_tb(error.__traceback__),
+        }
+    ).encode()
+
+
+class RuntimeClient:
+    """Client of the Lambda Runtime API."""
+
+    def __init__(self, address: str) -> None:
+        """Initialize the client.
+
+        Args:
+            address: The host and port of the Runtime API, from `AWS_LAMBDA_RUNTIME_API`.
+        """
+        self._address = address
+
+    def next_invocation(self) -> tuple[dict[str, Any], InvocationContext]:
+        """Wait for the next invocation.
+
+        Returns:
+            The event and the context of the invocation.
+        """
+        connection = http.client.HTTPConnection(self._address)
+        try:
+            connection.request("GET", f"/{RUNTIME_API_VERSION}/runtime/invocation/next")
+            response = connection.getresponse()
+            event = json.loads(response.read())
+        finally:
+            connection.close()
+        return event, InvocationContext(response.headers)
+
+    def stream_response(self, request_id: str, chunks: Iterable[bytes]) -> None:
+        """Send the response of an invocation chunk by chunk, as the chunks are produced.
+
+        Args:
+            request_id: The ID of the invocation.
+            chunks: The chunks of the response, in the HTTP integration response format.
+        """
+        connection = http.client.HTTPConnection(self._address)
+        try:
+            connection.putrequest("POST", f"/{RUNTIME_API_VERSION}/runtime/invocation/{request_id}/response")
+            connection.putheader("Lambda-Runtime-Function-Response-Mode", "streaming")
+            connection.putheader("Transfer-Encoding", "chunked")
+            connection.putheader("Content-Type", CONTENT_TYPE)
+            connection.putheader("Trailer", f"{ERROR_TYPE_TRAILER}, {ERROR_BODY_TRAILER}")
+            connection.endheaders()
+
+            trailers = b""
+            try:
+                for chunk in chunks:
+                    if chunk:
+                        connection.send(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            except Exception as e:
+                logger.exception("The response stream failed", extra={"request_id": request_id})
+                error_body = base64.b64encode(_error_payload(e))
+                trailers = b"%s: %s\r\n%s: %s\r\n" % (
+                    ERROR_TYPE_TRAILER.encode(),
+                    type(e).__name__.encode(),
+                    ERROR_BODY_TRAILER.encode(),
+                    error_body,
+                )
+            connection.send(b"0\r\n" + trailers + b"\r\n")
+            connection.getresponse().read()
+        finally:
+            connection.close()
+
+    def report_error(self, request_id: str, error: BaseException) -> None:
+        """Report the error of an invocation that produced no response.
+
+        Args:
+            request_id: The ID of the invocation.
+            error: The error raised by the handler.
+        """
+        self._post_error(f"/{RUNTIME_API_VERSION}/runtime/invocation/{request_id}/error", error)
+
+    def report_init_error(self, error: BaseException) -> None:
+        """Report the error that prevented the handler from being loaded.
+
+        Args:
+            error: The error raised while loading the handler.
+        """
+        self._post_error(f"/{RUNTIME_API_VERSION}/runtime/init/error", error)
+
+    def _post_error(self, path: str, error: BaseException) -> None:
+        connection = http.client.HTTPConnection(self._address)
+        try:
+            connection.request(
+                "POST",
+                path,
+                body=_error_payload(error),
+                headers={"Content-Type": "application/json", ERROR_TYPE_TRAILER: type(error).__name__},
+            )
+            connection.getresponse().read()
+        finally:
+            connection.close()
+
+
+def load_handler(name: str) -> StreamHandler:
+    """Import the handler named like the handler setting of the function, e.g. "index.stream_handler".
+
+    Args:
+        name: The module and the name of the handler, separated by a dot.
+
+    Returns:
+        The handler.
+    """
+    module_name, _, handler_name = name.rpartition(".")
+    handler: StreamHandler = getattr(importlib.import_module(module_name), handler_name)
+    return handler
+
+
+def serve(client: RuntimeClient, handler: StreamHandler) -> None:
+    """Serve the next invocation.
+
+    Args:
+        client: The client of the Runtime API.
+        handler: The handler, which returns the chunks of the response.
+    """
+    event, context = client.next_invocation()
+    if context.trace_id:
+        os.environ["_X_AMZN_TRACE_ID"] = context.trace_id
+    else:
+        os.environ.pop("_X_AMZN_TRACE_ID", None)
+
+    try:
+        chunks: Iterator[bytes] = iter(handler(event, context))
+        first = next(chunks, None)
+    except Exception as e:
+        logger.exception("The invocation failed", extra={"request_id": context.aws_request_id})
+        client.report_error(context.aws_request_id, e)
+        return
+    client.stream_response(context.aws_request_id, chunks if first is None else itertools.chain([first], chunks))
+
+
+def main() -> None:
+    """Load the handler of the function, then serve its invocations until the instance is shut down."""
+    client = RuntimeClient(os.environ["AWS_LAMBDA_RUNTIME_API"])
+    try:
+        handler = load_handler(os.environ["_HANDLER"])
+    except Exception as e:
+        client.report_init_error(e)
+        raise
+    while True:
+        serve(client, handler)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+#!/bin/sh
+# Exec wrapper of the response streaming function: replaces the runtime interface client of the
+# managed Python runtime, which cannot stream responses, with streaming_runtime.py.
+exec python3 "${LAMBDA_TASK_ROOT}/streaming_runtime.py"
@@ -0,0 +1,97 @@
+"""Tests for the benchmark runner."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from benchmarks.__main__ import main
+from benchmarks.runner import Result, compare, load, run, save, to_baseline
+from benchmarks.scenarios import WORKLOADS, Scale
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+TINY = Scale(threads=2, posts_per_thread=2, message_size=10)
+
+
+def _result(p50_ms: float, allocated_kib: float) -> Result:
+    return Result(ops_per_second=1.0, p50_ms=p50_ms, p95_ms=1.0, p99_ms=1.0, allocated_kib=allocated_kib)
+
+
+def test_run() -> None:
+    """Test that every workload runs and is measured."""
+    results = run(["memory"], {"tiny": TINY}, iterations=2)
+
+    assert list(results) == [
+        "memory/tiny/CreateThread",
+        "memory/tiny/ListThreads",
+        "memory/tiny/CreatePost",
+        "memory/tiny/ListPosts",
+    ]
+    assert all(result.ops_per_second > 0 for result in results.values())
+    assert results["memory/tiny/ListPosts"].allocated_per_item_bytes > 0
+    assert results["memory/tiny/CreateThread"].allocated_per_item_bytes == 0
+
+
+def test_compare() -> None:
+    """Test that only the metrics grown beyond the tolerance are regressions."""
+    baseline = to_baseline({"memory/tiny/a": _result(1.0, 10.0), "memory/tiny/b": _result(1.0, 10.0)})
+    results = {
+        "memory/tiny/a": _result(1.4, 20.0),
+        "memory/tiny/b": _result(0.5, 10.0),
+        "memory/tiny/c": _result(100.0, 100.0),
+    }
+
+    assert compare(results, baseline, tolerance=0.5) == ["memory/tiny/a allocated_kib: 10.0 -> 20.0 (+100%)"]
+
+
+def test_compare_latencies() -> None:
+    """Test that the latencies are stored and compared only if asked for."""
+    results = {"memory/tiny/a": _result(2.0, 10.0)}
+    baseline = {"memory/tiny/a": _result(1.0, 10.0)}
+
+    assert "p50_ms" not in to_baseline(baseline)["memory/tiny/a"]
+    assert compare(results, to_baseline(baseline), tolerance=0.5, latencies=True) == []
+    assert compare(results, to_baseline(baseline, latencies=True), tolerance=0.5) == []
+    assert compare(results, to_baseline(baseline, latencies=True), tolerance=0.5, latencies=True) == [
+        "memory/tiny/a p50_ms: 1.0 -> 2.0 (+100%)"
+    ]
+
+
+def test_unmeasured() -> None:
+    """Test that the metrics that the backend cannot measure are neither stored nor compared."""
+    baseline = to_baseline({"dynamodb/tiny/CreateThread": _result(1.0, 10.0)})
+
+    assert "write_capacity" not in baseline["dynamodb/tiny/CreateThread"]
+    assert "write_capacity" in to_baseline({"dynamodb/tiny/CreatePost": _result(1.0, 10.0)})["dynamodb/tiny/CreatePost"]
+
+
+def test_main(tmp_path: Path) -> None:
+    """Test that the baseline is updated, and the regressions fail the run."""
+    baseline = tmp_path / "baseline.json"
+
+    assert (
+        main(
+            [
+                "--backend",
+                "memory",
+                "--custom",
+                "2",
+                "2",
+                "10",
+                "--iterations",
+                "2",
+                "--baseline",
+                str(baseline),
+                "--update",
+            ]
+        )
+        == 0
+    )
+
+    results = load(baseline)
+    assert len(results) == len(WORKLOADS)
+    save(baseline, to_baseline({key: _result(0.0001, 0.0001) for key in results}))
+    assert (
+        main(["--backend", "memory", "--custom", "2", "2", "10", "--iterations", "2", "--baseline", str(baseline)]) == 1
+    )
@@ -0,0 +1,234 @@
+"""Integration tests for the batch router."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from boto3.dynamodb.conditions import Attr
+from chat.config.container import Container
+from chat.infrastructure import dynamodb
+from chat.shared.exceptions import ServiceUnavailableError
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from src import index
+
+THREAD_ID = "01DXF6DT000000000000000000"
+
+
+def _event(requests: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "path": "/batch",
+        "httpMethod": "POST",
+        "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        "body": json.dumps({"requests": requests}),
+    }
+
+
+@pytest.fixture()
+def _thread(table: Table) -> None:
+    """Put a thread with a post into the table."""
+    table.put_item(
+        Item={
+            "thread_id": THREAD_ID,
+            "post_id": "-",
+            "category": "Thread",
+            "name": "Thread1",
+            "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+        }
+    )
+    table.put_item(
+        Item={
+            "thread_id": THREAD_ID,
+            "post_id": "01DXHRTH000000000000000001",
+            "category": "Post",
+            "message": "Message1",
+            "created_at": int(datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+        }
+    )
+
+
+class TestBatch:
+    """Test the batch router."""
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_batch(self, context: LambdaContext) -> None:
+        """Test POST /batch handler with reads and a write."""
+        event = _event(
+            [
+                {"method": "GET", "path": f"/threads/{THREAD_ID}"},
+                {"method": "GET", "path": f"/threads/{THREAD_ID}/posts", "query": {"limit": "10"}},
+                {"method": "POST", "path": f"/threads/{THREAD_ID}/posts", "body": {"message": "Message2"}},
+                {"method": "GET", "path": f"/threads/{THREAD_ID}/posts"},
+            ]
+        )
+
+        actual = index.handler(event, context)
+
+        body = json.loads(actual["body"])
+        responses = body["responses"]
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [response["status_code"] for response in responses] == [200, 200, 201, 200]
+        assert responses[0]["body"]["name"] == "Thread1"
+        assert [post["message"] for post in responses[1]["body"]["posts"]] == ["Message1"]
+        assert responses[2]["body"]["message"] == "Message2"
+        assert [post["message"] for post in responses[3]["body"]["posts"]] == ["Message1", "Message2"]
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_batch_buffered(self, context: LambdaContext, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test POST /batch handler writes the posts of the sub-requests in one batch when the saves are buffered."""
+        batches = []
+
+        def batch_write_items(table: Table, items: list[dict[str, Any]]) -> None:
+            batches.append(items)
+            dynamodb.batch_write_items(table, items)
+
+        monkeypatch.setattr("chat.infrastructure.post.batch_write_items", batch_write_items)
+        monkeypatch.setattr(index, "container", Container(os.environ["TABLE_NAME"], post_buffer_size=10))
+        event = _event(
+            [
+                {"method": "POST", "path": f"/threads/{THREAD_ID}/posts", "body": {"message": f"Message{i}"}}
+                for i in (2, 3)
+            ]
+        )
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [item["message"] for batch in batches for item in batch] == ["Message2", "Message3"]
+        assert len(batches) == 1
+        posts = index.container.post_repository.list_by_thread_id(ULID.from_str(THREAD_ID))
+        assert [post.message for post in posts] == ["Message1", "Message2", "Message3"]
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_batch_buffered_write_fails(
+        self, context: LambdaContext, table: Table, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test POST /batch handler fails and leaves no trace of the posts if the buffered posts cannot be written."""
+
+        def batch_write_items(table: Table, items: list[dict[str, Any]]) -> None:  # noqa: ARG001
+            raise ServiceUnavailableError(2)
+
+        monkeypatch.setattr("chat.infrastructure.post.batch_write_items", batch_write_items)
+        monkeypatch.setattr(index, "container", Container(os.environ["TABLE_NAME"], post_buffer_size=10))
+        event = _event([{"method": "POST", "path": f"/threads/{THREAD_ID}/posts", "body": {"message": "Message2"}}])
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.SERVICE_UNAVAILABLE.value
+        assert actual["multiValueHeaders"]["Retry-After"] == ["2"]
+        assert index.container.post_repository.pending == 0  # type: ignore[attr-defined]
+        thread = table.get_item(Key={"thread_id": THREAD_ID, "post_id": "-"})["Item"]
+        assert "post_count" not in thread
+        assert "last_post_at" not in thread
+        assert table.scan(FilterExpression=Attr("thread_id").begins_with("Term#"))["Items"] == []
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_batch_idempotent(self, context: LambdaContext, table: Table) -> None:
+        """Test POST /batch handler runs the sub-requests once per idempotency key of the batch request."""
+        event = _event(
+            [
+                {"method": "POST", "path": "/threads", "body": {"name": "Thread2"}},
+                {"method": "POST", "path": f"/threads/{THREAD_ID}/posts", "body": {"message": "Message2"}},
+            ]
+        )
+        event["headers"] = {"Idempotency-Key": "key1"}
+        first = index.handler(event, context)
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert actual["body"] == first["body"]
+        assert actual["multiValueHeaders"]["Idempotent-Replayed"] == ["true"]
+        assert [response["status_code"] for response in json.loads(actual["body"])["responses"]] == [201, 201]
+        thread = table.get_item(Key={"thread_id": THREAD_ID, "post_id": "-"})["Item"]
+        assert thread["post_count"] == 1
+        threads = table.scan(FilterExpression=Attr("category").eq("Thread"))["Items"]
+        assert sorted(thread["name"] for thread in threads) == ["Thread1", "Thread2"]
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_batch_usage(self, context: LambdaContext, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test POST /batch handler attributes the DynamoDB usage of the sub-requests to their endpoints."""
+        event = _event(
+            [
+                {"method": "GET", "path": f"/threads/{THREAD_ID}"},
+                {"method": "GET", "path": f"/threads/{THREAD_ID}/posts"},
+            ]
+        )
+        capsys.readouterr()
+
+        index.handler(event, context)
+
+        blobs = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+        assert sorted(blob["Endpoint"] for blob in blobs if "Endpoint" in blob) == [
+            "GET /threads/{thread_id}",
+            "GET /threads/{thread_id}/posts",
+        ]
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_batch_errors(self, context: LambdaContext) -> None:
+        """Test POST /batch handler with failing sub-requests."""
+        event = _event(
+            [
+                {"method": "GET", "path": f"/threads/{THREAD_ID}"},
+                {"method": "GET", "path": "/threads/invalid"},
+                {"method": "GET", "path": "/unknown"},
+                {"method": "POST", "path": "/threads", "body": {}},
+                {"method": "DELETE", "path": f"/threads/{THREAD_ID}"},
+            ]
+        )
+
+        actual = index.handler(event, context)
+
+        body = json.loads(actual["body"])
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [response["status_code"] for response in body["responses"]] == [404, 400, 404, 422, 404]
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_batch_sub_request_fails(self, context: LambdaContext, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test POST /batch handler responds to the sub-requests that fail with 503 or 500, and runs the others."""
+
+        def search_posts(query: dict[str, str]) -> None:  # noqa: ARG001
+            raise ServiceUnavailableError(2)
+
+        def search_threads(query: dict[str, str]) -> None:  # noqa: ARG001
+            error_message = "failed"
+            raise ValueError(error_message)
+
+        monkeypatch.setattr("routers.search.search_posts", search_posts)
+        monkeypatch.setattr("routers.search.search_threads", search_threads)
+        event = _event(
+            [
+                {"method": "GET", "path": "/search/posts", "query": {"q": "python"}},
+                {"method": "GET", "path": "/search/threads", "query": {"q": "python"}},
+                {"method": "GET", "path": "/threads"},
+            ]
+        )
+
+        actual = index.handler(event, context)
+
+        responses = json.loads(actual["body"])["responses"]
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [response["status_code"] for response in responses] == [503, 500, 200]
+        assert responses[0]["body"]["message"] == HTTPStatus.SERVICE_UNAVAILABLE.phrase
+        assert responses[1]["body"]["message"] == "Internal Server Error"
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_batch_too_many_requests(self, context: LambdaContext) -> None:
+        """Test POST /batch handler with too many sub-requests."""
+        event = _event([{"method": "GET", "path": "/threads"}] * 26)
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.UNPROCESSABLE_ENTITY.value
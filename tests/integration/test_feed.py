@@ -0,0 +1,100 @@
+"""Integration tests for the read views maintained from the change stream, run offline."""
+
+from __future__ import annotations
+
+import json
+import os
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+from chat.config.container import Container
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from src import index
+
+
+def _request(context: LambdaContext, method: str, path: str, **kwargs: Any) -> dict[str, Any]:  # noqa: ANN401
+    event = {"path": path, "httpMethod": method, "requestContext": {"requestId": "227b78aa"}, **kwargs}
+    return index.handler(event, context)
+
+
+@pytest.fixture()
+def _local_change_stream(table: Table, monkeypatch: pytest.MonkeyPatch) -> None:  # noqa: ARG001
+    """Serve the threads from the read views, maintained by the local change stream."""
+    container = Container(os.environ["TABLE_NAME"], list_threads_from_views=True, local_change_stream=True)
+    monkeypatch.setattr(index, "container", container)
+
+
+@pytest.mark.usefixtures("_local_change_stream")
+class TestFeed:
+    """Test the read views, through the API handler and the replayed change stream."""
+
+    def test_views_follow_writes(self, context: LambdaContext) -> None:
+        """Test GET /threads and GET /feed follow the created and deleted threads and posts."""
+        thread = json.loads(_request(context, "POST", "/threads", body=json.dumps({"name": "Thread1"}))["body"])
+        path = f"/threads/{thread['id']}/posts"
+        created = [
+            json.loads(_request(context, "POST", path, body=json.dumps({"message": m}))["body"])
+            for m in ["Message1", "Message2", "Message3"]
+        ]
+        _request(context, "DELETE", f"{path}/{created[1]['id']}")
+
+        threads = json.loads(_request(context, "GET", "/threads")["body"])["threads"]
+        feed = _request(context, "GET", "/feed", queryStringParameters={"limit": "5"})
+
+        assert [(t["id"], t["post_count"]) for t in threads] == [(thread["id"], 2)]
+        assert feed["statusCode"] == HTTPStatus.OK.value
+        assert [post["id"] for post in json.loads(feed["body"])["posts"]] == [created[2]["id"], created[0]["id"]]
+        assert index.container.change_stream is not None
+        assert index.container.change_stream.pending == 0
+        assert index.container.change_stream.discarded == []
+
+        _request(context, "DELETE", f"/threads/{thread['id']}")
+
+        assert json.loads(_request(context, "GET", "/threads")["body"])["threads"] == []
+        assert json.loads(_request(context, "GET", "/feed")["body"])["posts"] == []
+
+    def test_feed_invalid_limit(self, context: LambdaContext) -> None:
+        """Test GET /feed handler rejects a limit over the maximum."""
+        actual = _request(context, "GET", "/feed", queryStringParameters={"limit": "101"})
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
+    def test_change_stream_handler(self, context: LambdaContext) -> None:
+        """Test the change stream handler reports the first record it fails to project."""
+        _request(context, "POST", "/threads", body=json.dumps({"name": "Thread1"}))
+        record = {
+            "eventName": "INSERT",
+            "dynamodb": {
+                "SequenceNumber": "1",
+                "NewImage": {"thread_id": {"S": "invalid"}, "post_id": {"S": "-"}, "category": {"S": "Thread"}},
+            },
+        }
+
+        actual = index.change_stream_handler({"Records": [record]}, context)
+
+        assert actual == {"batchItemFailures": [{"itemIdentifier": "1"}]}
+
+    def test_change_stream_handler_collects(self, context: LambdaContext, table: Table) -> None:
+        """Test the change stream handler collects the diagnostics and the usage of its invocation."""
+        thread = json.loads(_request(context, "POST", "/threads", body=json.dumps({"name": "Thread1"}))["body"])
+        item = table.get_item(Key={"thread_id": thread["id"], "post_id": "-"})["Item"]
+        serializer = TypeSerializer()
+        record = {
+            "eventName": "REMOVE",
+            "dynamodb": {
+                "SequenceNumber": "1",
+                "OldImage": {key: serializer.serialize(value) for key, value in item.items()},
+            },
+        }
+
+        actual = index.change_stream_handler({"Records": [record]}, context)
+
+        assert actual == {"batchItemFailures": []}
+        assert index.container.query_inspector.collect() == []
+        assert index.container.capacity_meter.collect_usage() == {}
@@ -0,0 +1,308 @@
+"""Integration tests for the post router."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from chat.config.container import Container
+from chat.shared.exceptions import ServiceUnavailableError
+from chat.shared.memory import MemoryTracker
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from src import index
+
+THREAD_ID = "01DXF6DT000000000000000000"
+
+
+@pytest.fixture()
+def _thread(table: Table) -> None:
+    """Put a thread into the table."""
+    table.put_item(
+        Item={
+            "thread_id": THREAD_ID,
+            "post_id": "-",
+            "category": "Thread",
+            "name": "Thread1",
+            "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+        }
+    )
+
+
+@pytest.fixture()
+def _posts(table: Table) -> None:
+    """Put three posts into the table."""
+    for i in range(1, 4):
+        table.put_item(
+            Item={
+                "thread_id": THREAD_ID,
+                "post_id": f"01DXHRTH00000000000000000{i}",
+                "category": "Post",
+                "message": f"Message{i}",
+                "created_at": int(datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC).timestamp() * 1000000),
+            }
+        )
+
+
+class TestPost:
+    """Test the post router."""
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_post(self, context: LambdaContext, table: Table) -> None:
+        """Test POST /threads/{thread_id}/posts handler."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "POST",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"message": "Message1"}',
+        }
+
+        actual = index.handler(event, context)
+
+        body = json.loads(actual["body"])
+
+        assert actual["statusCode"] == HTTPStatus.CREATED.value
+        assert "id" in body
+        assert body["thread_id"] == THREAD_ID
+        assert body["message"] == "Message1"
+        assert "created_at" in body
+
+        thread = table.get_item(Key={"thread_id": THREAD_ID, "post_id": "-"})["Item"]
+        assert thread["post_count"] == 1
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_post_idempotent(self, context: LambdaContext, table: Table) -> None:
+        """Test POST /threads/{thread_id}/posts handler creates the post once per idempotency key."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "POST",
+            "headers": {"Idempotency-Key": "key1"},
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"message": "Message1"}',
+        }
+        first = index.handler(event, context)
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.CREATED.value
+        assert actual["body"] == first["body"]
+        thread = table.get_item(Key={"thread_id": THREAD_ID, "post_id": "-"})["Item"]
+        assert thread["post_count"] == 1
+
+        event["headers"] = {"Idempotency-Key": "key2"}
+        actual = index.handler(event, context)
+
+        assert actual["body"] != first["body"]
+        thread = table.get_item(Key={"thread_id": THREAD_ID, "post_id": "-"})["Item"]
+        # One post for each key.
+        keys = 2
+        assert thread["post_count"] == keys
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_post_idempotent_buffered(
+        self, context: LambdaContext, table: Table, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test POST /threads/{thread_id}/posts handler records the response only once the buffered post is written."""
+        failures = [ServiceUnavailableError(1)]
+
+        def batch_write_items(table: Table, items: list[dict[str, Any]]) -> None:
+            if failures:
+                raise failures.pop()
+            for item in items:
+                table.put_item(Item=item)
+
+        monkeypatch.setattr("chat.infrastructure.post.batch_write_items", batch_write_items)
+        monkeypatch.setattr(index, "container", Container(os.environ["TABLE_NAME"], post_buffer_size=10))
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "POST",
+            "headers": {"Idempotency-Key": "key1"},
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"message": "Message1"}',
+        }
+        failed = index.handler(event, context)
+
+        actual = index.handler(event, context)
+
+        assert failed["statusCode"] == HTTPStatus.SERVICE_UNAVAILABLE.value
+        assert actual["statusCode"] == HTTPStatus.CREATED.value
+        assert "Idempotent-Replayed" not in actual["multiValueHeaders"]
+        post_id = json.loads(actual["body"])["id"]
+        assert table.get_item(Key={"thread_id": THREAD_ID, "post_id": post_id}).get("Item") is not None
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_post_invalid_idempotency_key(self, context: LambdaContext) -> None:
+        """Test POST /threads/{thread_id}/posts handler with an empty idempotency key."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "POST",
+            "headers": {"Idempotency-Key": ""},
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"message": "Message1"}',
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
+    @pytest.mark.usefixtures("_thread")
+    def test_post_post_empty_message(self, context: LambdaContext) -> None:
+        """Test POST /threads/{thread_id}/posts handler with an empty message."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "POST",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"message": ""}',
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_post_thread_not_found(self, context: LambdaContext) -> None:
+        """Test POST /threads/{thread_id}/posts handler with a nonexistent thread."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "POST",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"message": "Message1"}',
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NOT_FOUND.value
+
+    @pytest.mark.usefixtures("_posts")
+    def test_get_posts(self, context: LambdaContext) -> None:
+        """Test GET /threads/{thread_id}/posts handler."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        body = json.loads(actual["body"])
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert body["posts"] == [
+            {
+                "id": f"01DXHRTH00000000000000000{i}",
+                "thread_id": THREAD_ID,
+                "message": f"Message{i}",
+                "created_at": f"2020-01-02T01:01:01.00000{i}Z",
+            }
+            for i in range(1, 4)
+        ]
+        assert body["next_cursor"] is None
+
+    @pytest.mark.usefixtures("_posts")
+    def test_get_posts_memory(
+        self,
+        context: LambdaContext,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Test GET /threads/{thread_id}/posts handler reports its memory in the log and as metrics by endpoint."""
+        event = {
+            "resource": "/threads/{thread_id}/posts",
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+        monkeypatch.setattr(index, "memory_tracker", MemoryTracker(1, on_report=index._report_memory))
+        capsys.readouterr()
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        [memory] = [record.memory for record in caplog.records if record.getMessage().startswith("Tracked the memory")]
+        assert memory["name"] == "GET /threads/{thread_id}/posts"
+        assert memory["peak_kib"] > 0
+        assert memory["top_sites"]
+        blobs = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"PeakMemory"' in line]
+        by_endpoint = next(blob for blob in blobs if blob.get("Endpoint") == "GET /threads/{thread_id}/posts")
+        assert by_endpoint["PeakMemory"] == [memory["peak_kib"]]
+        assert by_endpoint["_aws"]["CloudWatchMetrics"][0]["Metrics"][0]["Unit"] == "Kilobytes"
+
+    @pytest.mark.usefixtures("_posts")
+    def test_get_posts_paginated(self, context: LambdaContext) -> None:
+        """Test GET /threads/{thread_id}/posts handler with limit and cursor."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "queryStringParameters": {"limit": "2"},
+        }
+
+        first = json.loads(index.handler(event, context)["body"])
+        event["queryStringParameters"] = {"limit": "2", "cursor": first["next_cursor"]}
+        second = json.loads(index.handler(event, context)["body"])
+
+        assert [post["message"] for post in first["posts"]] == ["Message1", "Message2"]
+        assert first["next_cursor"] == "01DXHRTH000000000000000002"
+        assert [post["message"] for post in second["posts"]] == ["Message3"]
+        assert second["next_cursor"] is None
+
+    @pytest.mark.usefixtures("_create_table")
+    @pytest.mark.parametrize(
+        "query",
+        [
+            {"limit": "0"},
+            {"limit": "a"},
+            {"limit": "²"},
+            {"limit": "①"},
+            {"cursor": "invalid"},
+            {"start_time": "invalid"},
+            {"end_time": "invalid"},
+        ],
+    )
+    def test_get_posts_invalid_query(self, context: LambdaContext, query: dict[str, str]) -> None:
+        """Test GET /threads/{thread_id}/posts handler with invalid query parameters."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "queryStringParameters": query,
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
+    @pytest.mark.usefixtures("_posts")
+    def test_delete_post(self, context: LambdaContext, table: Table) -> None:
+        """Test DELETE /threads/{thread_id}/posts/{post_id} handler."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts/01DXHRTH000000000000000001",
+            "httpMethod": "DELETE",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NO_CONTENT.value
+        assert "Item" not in table.get_item(Key={"thread_id": THREAD_ID, "post_id": "01DXHRTH000000000000000001"})
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_delete_post_not_found(self, context: LambdaContext) -> None:
+        """Test DELETE /threads/{thread_id}/posts/{post_id} handler with a nonexistent post."""
+        event = {
+            "path": f"/threads/{THREAD_ID}/posts/01DXHRTH000000000000000001",
+            "httpMethod": "DELETE",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NOT_FOUND.value
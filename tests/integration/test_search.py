@@ -0,0 +1,90 @@
+"""Integration tests for the search router."""
+
+from __future__ import annotations
+
+import json
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from src import index
+
+THREAD_ID = "01DXF6DT000000000000000000"
+
+
+@pytest.fixture()
+def _thread(table: Table) -> None:
+    """Put a thread into the table."""
+    table.put_item(
+        Item={
+            "thread_id": THREAD_ID,
+            "post_id": "-",
+            "category": "Thread",
+            "name": "Thread1",
+            "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+        }
+    )
+
+
+def _request(context: LambdaContext, method: str, path: str, **kwargs: Any) -> dict[str, Any]:  # noqa: ANN401
+    event = {"path": path, "httpMethod": method, "requestContext": {"requestId": "227b78aa"}, **kwargs}
+    return index.handler(event, context)
+
+
+class TestSearch:
+    """Test the search router."""
+
+    @pytest.mark.usefixtures("_thread")
+    def test_search_posts(self, context: LambdaContext) -> None:
+        """Test GET /search/posts handler follows the created and deleted posts."""
+        created = [
+            json.loads(
+                _request(context, "POST", f"/threads/{THREAD_ID}/posts", body=json.dumps({"message": m}))["body"]
+            )
+            for m in ["Hello world", "hello again", "goodbye"]
+        ]
+        _request(context, "DELETE", f"/threads/{THREAD_ID}/posts/{created[1]['id']}")
+
+        actual = _request(context, "GET", "/search/posts", queryStringParameters={"q": "HELLO"})
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [post["id"] for post in json.loads(actual["body"])["posts"]] == [created[0]["id"]]
+
+        actual = _request(
+            context, "GET", "/search/posts", queryStringParameters={"q": "hello", "thread_id": created[0]["id"]}
+        )
+
+        assert json.loads(actual["body"])["posts"] == []
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_search_threads(self, context: LambdaContext) -> None:
+        """Test GET /search/threads handler."""
+        for name in ["Python tips", "python news", "Rust", "Pythonista"]:
+            _request(context, "POST", "/threads", body=json.dumps({"name": name}))
+
+        actual = _request(context, "GET", "/search/threads", queryStringParameters={"prefix": "PYTHON", "limit": "2"})
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [thread["name"] for thread in json.loads(actual["body"])["threads"]] == ["python news", "Python tips"]
+
+    @pytest.mark.usefixtures("_create_table")
+    @pytest.mark.parametrize("query", [{}, {"prefix": "a", "limit": "0"}, {"prefix": "a", "limit": "101"}])
+    def test_search_threads_invalid_query(self, context: LambdaContext, query: dict[str, str]) -> None:
+        """Test GET /search/threads handler with invalid query parameters."""
+        actual = _request(context, "GET", "/search/threads", queryStringParameters=query)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
+    @pytest.mark.usefixtures("_create_table")
+    @pytest.mark.parametrize("query", [{}, {"q": " "}, {"q": "a", "limit": "0"}, {"q": "a", "thread_id": "x"}])
+    def test_search_posts_invalid_query(self, context: LambdaContext, query: dict[str, str]) -> None:
+        """Test GET /search/posts handler with invalid query parameters."""
+        actual = _request(context, "GET", "/search/posts", queryStringParameters=query)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
@@ -0,0 +1,130 @@
+"""Integration tests for the response streaming handler."""
+
+from __future__ import annotations
+
+import json
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from chat.domain.post import Post
+from chat.use_case.list_posts import ListPosts
+from routers.streaming import CHUNK_SIZE
+from ulid import ULID
+
+from src import index
+
+
+def _event(path: str, query: dict[str, str] | None = None) -> dict[str, Any]:
+    return {
+        "rawPath": path,
+        "queryStringParameters": query,
+        "requestContext": {
+            "requestId": "227b78aa-779d-47d4-a48e-ce62120393b8",
+            "stage": "$default",
+            "http": {"method": "GET"},
+        },
+    }
+
+
+class _LazyPostRepository:
+    """Repository that generates the posts of a thread as they are read, counting them."""
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.read = 0
+
+    def iter_by_thread_id(self, thread_id: ULID, **_kwargs: Any) -> Iterator[Post]:  # noqa: ANN401
+        for _ in range(self.count):
+            self.read += 1
+            yield Post(id_=ULID(), thread_id=thread_id, message="a" * 1024, created_at=datetime.now(UTC))
+
+
+def _read(chunks: list[bytes]) -> tuple[dict[str, Any], Any]:
+    metadata, body = b"".join(chunks).split(b"\x00" * 8, 1)
+    return json.loads(metadata), json.loads(body)
+
+
+class TestStreaming:
+    """Test the response streaming handler."""
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_stream_posts(self, context: LambdaContext, table: Table) -> None:
+        """Test GET /threads/{thread_id}/posts in streaming mode."""
+        thread_id = "01DXF6DT000000000000000000"
+        for i in range(1, 4):
+            table.put_item(
+                Item={
+                    "thread_id": thread_id,
+                    "post_id": f"01DXHRTH00000000000000000{i}",
+                    "category": "Post",
+                    "message": f"Message{i}",
+                    "created_at": int(datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC).timestamp() * 1000000),
+                }
+            )
+
+        chunks = list(index.stream_handler(_event(f"/threads/{thread_id}/posts"), context))
+        metadata, body = _read(chunks)
+
+        assert metadata["statusCode"] == HTTPStatus.OK.value
+        assert body["posts"] == [
+            {
+                "id": f"01DXHRTH00000000000000000{i}",
+                "thread_id": thread_id,
+                "message": f"Message{i}",
+                "created_at": f"2020-01-02T01:01:01.00000{i}Z",
+            }
+            for i in range(1, 4)
+        ]
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_stream_posts_empty(self, context: LambdaContext) -> None:
+        """Test GET /threads/{thread_id}/posts in streaming mode with no posts."""
+        chunks = list(index.stream_handler(_event("/threads/01DXF6DT000000000000000000/posts"), context))
+        metadata, body = _read(chunks)
+
+        assert metadata["statusCode"] == HTTPStatus.OK.value
+        assert body == {"posts": []}
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_stream_posts_invalid_start_time(self, context: LambdaContext) -> None:
+        """Test GET /threads/{thread_id}/posts in streaming mode with an invalid start time."""
+        event = _event("/threads/01DXF6DT000000000000000000/posts", {"start_time": "invalid"})
+
+        chunks = list(index.stream_handler(event, context))
+        metadata, body = _read(chunks)
+
+        assert metadata["statusCode"] == HTTPStatus.BAD_REQUEST.value
+        assert "message" in body
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_stream_unknown_path(self, context: LambdaContext) -> None:
+        """Test the streaming handler with an unsupported path."""
+        chunks = list(index.stream_handler(_event("/threads"), context))
+        metadata, _ = _read(chunks)
+
+        assert metadata["statusCode"] == HTTPStatus.NOT_FOUND.value
+
+    def test_stream_posts_lazily(self, context: LambdaContext, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the posts are read as the stream is consumed, so the chunks stay bounded in size."""
+        repository = _LazyPostRepository(1000)
+        monkeypatch.setattr(index.container, "_list_posts", ListPosts(repository))  # type: ignore[arg-type]
+
+        chunks = index.stream_handler(_event(f"/threads/{ULID()}/posts"), context)
+        next(chunks)
+        first = next(chunks)
+
+        assert repository.read < repository.count
+        rest = list(chunks)
+        assert repository.read == repository.count
+        assert all(len(chunk) < CHUNK_SIZE + 2048 for chunk in [first, *rest])
+        _, body = _read([b"{}" + b"\x00" * 8, first, *rest])
+        assert len(body["posts"]) == repository.count
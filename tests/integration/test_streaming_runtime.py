@@ -0,0 +1,176 @@
+"""Integration tests for the runtime of the response streaming function."""
+
+from __future__ import annotations
+
+import base64
+import json
+import threading
+from datetime import UTC, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from src import index
+from src.streaming_runtime import InvocationContext, RuntimeClient, load_handler, serve
+
+REQUEST_ID = "227b78aa-779d-47d4-a48e-ce62120393b8"
+
+
+class FakeRuntimeAPI(ThreadingHTTPServer):
+    """Stand-in for the Lambda Runtime API, which records what the runtime sends."""
+
+    def __init__(self) -> None:
+        """Start the server on a free port."""
+        super().__init__(("127.0.0.1", 0), _RuntimeAPIHandler)
+        self.events: list[dict[str, Any]] = []
+        self.headers: dict[str, str] = {}
+        self.chunks: list[bytes] = []
+        self.trailers: dict[str, str] = {}
+        self.errors: list[tuple[str, dict[str, Any]]] = []
+
+    @property
+    def address(self) -> str:
+        """The host and port of the server."""
+        host, port = self.server_address[:2]
+        return f"{host!s}:{port}"
+
+
+class _RuntimeAPIHandler(BaseHTTPRequestHandler):
+    server: FakeRuntimeAPI
+
+    def do_GET(self) -> None:  # noqa: N802
+        body = json.dumps(self.server.events.pop(0)).encode()
+        self.send_response(HTTPStatus.OK.value)
+        self.send_header("Lambda-Runtime-Aws-Request-Id", REQUEST_ID)
+        self.send_header("Lambda-Runtime-Deadline-Ms", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # noqa: N802
+        if self.path.endswith("/response"):
+            self.server.headers = dict(self.headers.items())
+            self._read_chunks()
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            self.server.errors.append((self.path, json.loads(body)))
+        self.send_response(HTTPStatus.ACCEPTED.value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _read_chunks(self) -> None:
+        while size := int(self.rfile.readline().strip(), 16):
+            self.server.chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+        while line := self.rfile.readline().strip():
+            name, _, value = line.decode().partition(": ")
+            self.server.trailers[name] = value
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        """Do not log the requests."""
+
+
+@pytest.fixture()
+def runtime_api() -> Iterator[FakeRuntimeAPI]:
+    """The Runtime API, serving in a background thread."""
+    server = FakeRuntimeAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestStreamingRuntime:
+    """Test the runtime of the response streaming function."""
+
+    def test_serve_streams_chunks(self, runtime_api: FakeRuntimeAPI) -> None:
+        """Test that the chunks are sent one by one, in the streaming response mode."""
+        runtime_api.events.append({"rawPath": "/"})
+        received: list[tuple[dict[str, Any], str]] = []
+
+        def handler(event: dict[str, Any], context: InvocationContext) -> Iterator[bytes]:
+            received.append((event, context.aws_request_id))
+            yield b"prelude"
+            yield b""
+            yield b"body"
+
+        serve(RuntimeClient(runtime_api.address), handler)
+
+        assert received == [({"rawPath": "/"}, REQUEST_ID)]
+        assert runtime_api.chunks == [b"prelude", b"body"]
+        assert runtime_api.headers["Lambda-Runtime-Function-Response-Mode"] == "streaming"
+        assert runtime_api.headers["Content-Type"] == "application/vnd.awslambda.http-integration-response"
+        assert runtime_api.trailers == {}
+
+    def test_serve_error_before_stream(self, runtime_api: FakeRuntimeAPI) -> None:
+        """Test that an error raised before the first chunk is reported as the error of the invocation."""
+        runtime_api.events.append({})
+
+        def handler(event: dict[str, Any], context: InvocationContext) -> Iterator[bytes]:  # noqa: ARG001
+            error_message = "failed"
+            raise ValueError(error_message)
+            yield b""
+
+        serve(RuntimeClient(runtime_api.address), handler)
+
+        assert runtime_api.chunks == []
+        [(path, error)] = runtime_api.errors
+        assert path == f"/2018-06-01/runtime/invocation/{REQUEST_ID}/error"
+        assert (error["errorType"], error["errorMessage"]) == ("ValueError", "failed")
+
+    def test_serve_error_during_stream(self, runtime_api: FakeRuntimeAPI) -> None:
+        """Test that an error raised once the stream has started is reported in its trailers."""
+        runtime_api.events.append({})
+
+        def handler(event: dict[str, Any], context: InvocationContext) -> Iterator[bytes]:  # noqa: ARG001
+            yield b"prelude"
+            error_message = "failed"
+            raise ValueError(error_message)
+
+        serve(RuntimeClient(runtime_api.address), handler)
+
+        assert runtime_api.chunks == [b"prelude"]
+        assert runtime_api.trailers["Lambda-Runtime-Function-Error-Type"] == "ValueError"
+        error = json.loads(base64.b64decode(runtime_api.trailers["Lambda-Runtime-Function-Error-Body"]))
+        assert error["errorMessage"] == "failed"
+        assert runtime_api.errors == []
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_serve_stream_handler(self, runtime_api: FakeRuntimeAPI, table: Table) -> None:
+        """Test that the response of the stream handler is streamed through the runtime."""
+        thread_id = "01DXF6DT000000000000000000"
+        table.put_item(
+            Item={
+                "thread_id": thread_id,
+                "post_id": "01DXHRTH000000000000000001",
+                "category": "Post",
+                "message": "Message1",
+                "created_at": int(datetime(2020, 1, 2, tzinfo=UTC).timestamp() * 1000000),
+            }
+        )
+        runtime_api.events.append(
+            {
+                "rawPath": f"/threads/{thread_id}/posts",
+                "requestContext": {"requestId": REQUEST_ID, "stage": "$default", "http": {"method": "GET"}},
+            }
+        )
+
+        serve(RuntimeClient(runtime_api.address), index.stream_handler)
+
+        metadata, body = b"".join(runtime_api.chunks).split(b"\x00" * 8, 1)
+        assert json.loads(metadata)["statusCode"] == HTTPStatus.OK.value
+        assert [post["message"] for post in json.loads(body)["posts"]] == ["Message1"]
+
+    def test_load_handler(self) -> None:
+        """Test that the handler is loaded from the handler setting of the function."""
+        handler = load_handler("routers.streaming.stream_posts")
+
+        assert (handler.__module__, handler.__name__) == ("routers.streaming", "stream_posts")
@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 import json
+import logging
 from datetime import UTC, datetime
 from http import HTTPStatus
 from typing import TYPE_CHECKING
 
 import pytest
+from boto3.dynamodb.conditions import Key
+from chat.shared.profiling import Profiler
+from chat.shared.tracing import InMemoryExporter, local_tracer
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from aws_lambda_powertools.utilities.typing import LambdaContext
     from mypy_boto3_dynamodb.service_resource import Table
 
@@ -38,6 +44,66 @@ class TestThread:
         assert body["name"] == "Thread1"
         assert "created_at" in body
 
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_thread_duplicate_name(self, context: LambdaContext) -> None:
+        """Test POST /threads handler with a name that differs from an existing one only in case and width."""
+        event = {
+            "path": "/threads",
+            "httpMethod": "POST",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"name": "Thread1"}',
+        }
+        index.handler(event, context)
+
+        event["body"] = '{"name": "ＴＨＲＥＡＤ１"}'  # noqa: RUF001
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.CONFLICT.value
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_thread_idempotent(self, context: LambdaContext, table: Table) -> None:
+        """Test POST /threads handler replays the response of a request retried with the same idempotency key."""
+        event = {
+            "path": "/threads",
+            "httpMethod": "POST",
+            "headers": {"Idempotency-Key": "c4b5a6f0-1c7e-4f3b-9a53-8d6c0f1f6a11"},
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"name": "Thread1"}',
+        }
+        first = index.handler(event, context)
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.CREATED.value
+        assert actual["body"] == first["body"]
+        assert actual["multiValueHeaders"]["Idempotent-Replayed"] == ["true"]
+        threads = table.query(IndexName="by_category", KeyConditionExpression=Key("category").eq("Thread"))["Items"]
+        assert len(threads) == 1
+
+        event["body"] = '{"name": "Thread2"}'
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.UNPROCESSABLE_ENTITY.value
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_post_thread_idempotent_after_error(self, context: LambdaContext) -> None:
+        """Test POST /threads handler does not record the failed requests, so their key can be used again."""
+        event = {
+            "path": "/threads",
+            "httpMethod": "POST",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"name": "Thread1"}',
+        }
+        index.handler(event, context)
+        event["headers"] = {"idempotency-key": "key1"}
+        assert index.handler(event, context)["statusCode"] == HTTPStatus.CONFLICT.value
+
+        event["body"] = '{"name": "Thread2"}'
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.CREATED.value
+        assert "Idempotent-Replayed" not in actual["multiValueHeaders"]
+
     @pytest.mark.usefixtures("_create_table")
     def test_post_thread_invalid(self, context: LambdaContext) -> None:
         """Test POST /threads handler with invalid input."""
@@ -53,6 +119,134 @@ class TestThread:
         assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
         assert "message" in actual["body"]
 
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_threads_throttled(self, context: LambdaContext) -> None:
+        """Test GET /threads handler fails fast with 503 while the circuit breaker is open."""
+        event = {
+            "path": "/threads",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+        breaker = index.container.resilience.breaker
+        try:
+            for _ in range(5):
+                breaker.record_throttling()
+
+            actual = index.handler(event, context)
+        finally:
+            breaker.record_success()
+
+        assert actual["statusCode"] == HTTPStatus.SERVICE_UNAVAILABLE.value
+        assert int(actual["multiValueHeaders"]["Retry-After"][0]) >= 1
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_threads_usage(self, context: LambdaContext, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test GET /threads handler publishes its DynamoDB usage as EMF metrics, in total and by endpoint."""
+        event = {
+            "resource": "/threads",
+            "path": "/threads",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+        capsys.readouterr()
+
+        index.handler(event, context)
+
+        blobs = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+        by_endpoint = next(blob for blob in blobs if "Endpoint" in blob)
+        total = next(blob for blob in blobs if "Endpoint" not in blob)
+        assert by_endpoint["Endpoint"] == "GET /threads"
+        assert by_endpoint["DynamoDBCalls"] == [1]
+        assert by_endpoint["PagesFetched"] == [1]
+        assert by_endpoint["ConsumedReadCapacity"][0] > 0
+        assert total["DynamoDBCalls"] == [1]
+        assert "DynamoDBLatency" in total
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_threads_traced(self, context: LambdaContext) -> None:
+        """Test GET /threads handler is traced from the resolver down to the DynamoDB requests."""
+        event = {
+            "resource": "/threads",
+            "path": "/threads",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+        exporter = InMemoryExporter()
+        local_tracer.exporter = exporter
+        try:
+            index.handler(event, context)
+        finally:
+            local_tracer.exporter = None
+
+        [root] = exporter.spans
+        assert root.name == "## app.resolve"
+        assert root.annotations == {"endpoint": "GET /threads", "status_code": 200}
+        [use_case] = root.subsegments
+        assert use_case.name == "## chat.use_case.list_threads.ListThreads.execute"
+        [repository] = use_case.subsegments
+        assert repository.name == "## chat.infrastructure.thread.DynamoDBThreadRepository.list_all"
+        assert [request.name for request in repository.subsegments] == ["## dynamodb.query"]
+
+    @pytest.mark.usefixtures("_create_table")
+    @pytest.mark.parametrize(("allowed", "expected"), [("true", 1), ("", 0)])
+    def test_get_threads_profiled(  # noqa: PLR0913
+        self,
+        context: LambdaContext,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+        tmp_path: Path,
+        allowed: str,
+        expected: int,
+    ) -> None:
+        """Test GET /threads handler is profiled when the header asks for it, if allowed, and the profile is logged."""
+        event = {
+            "resource": "/threads",
+            "path": "/threads",
+            "httpMethod": "GET",
+            "headers": {"X-Profile": "1"},
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+        monkeypatch.setenv("PROFILE_ALLOW_HEADER", allowed)
+        monkeypatch.setattr(index, "profiler", Profiler(output_dir=tmp_path))
+        caplog.set_level(logging.INFO, logger="chat.shared.profiling")
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        profiles = [record.profile for record in caplog.records if record.getMessage() == "Profiled the invocation"]
+        assert len(profiles) == expected
+        assert len(list(tmp_path.glob("*.pstats"))) == expected
+        if profiles:
+            assert profiles[0]["path"] == str(next(tmp_path.glob("*.pstats")))
+            assert "botocore" in profiles[0]["packages"]
+
+    @pytest.mark.usefixtures("_create_table")
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_get_threads_query_diagnostics(
+        self,
+        context: LambdaContext,
+        monkeypatch: pytest.MonkeyPatch,
+        enabled: bool,  # noqa: FBT001
+    ) -> None:
+        """Test GET /threads handler explains its queries in a debug header, only if enabled."""
+        event = {
+            "resource": "/threads",
+            "path": "/threads",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+        monkeypatch.setenv("QUERY_DIAGNOSTICS_HEADER", str(enabled).lower())
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        if enabled:
+            [header] = actual["multiValueHeaders"]["X-Query-Diagnostics"]
+            assert header.startswith("thread.list_all(index=by_category pages=1 returned=0 scanned=0 ")
+        else:
+            assert "X-Query-Diagnostics" not in actual["multiValueHeaders"]
+        assert index.container.query_inspector.collect() == []
+
     @pytest.mark.usefixtures("_create_table")
     def test_get_threads(self, context: LambdaContext, table: Table) -> None:
         """Test GET /threads handler."""
@@ -91,14 +285,60 @@ class TestThread:
                 "id": "01DXF6DT000000000000000000",
                 "name": "Thread1",
                 "created_at": "2020-01-01T01:01:01.000001Z",
+                "post_count": 0,
+                "last_post_at": None,
             },
             {
                 "id": "01DXHRTH000000000000000000",
                 "name": "Thread2",
                 "created_at": "2020-01-02T01:01:01.000001Z",
+                "post_count": 0,
+                "last_post_at": None,
             },
         ]
 
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_threads_by_ids(self, context: LambdaContext, table: Table) -> None:
+        """Test GET /threads handler with thread IDs."""
+        for i in range(1, 4):
+            table.put_item(
+                Item={
+                    "thread_id": f"01DXF6DT00000000000000000{i}",
+                    "post_id": "-",
+                    "category": "Thread",
+                    "name": f"Thread{i}",
+                    "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+                }
+            )
+
+        event = {
+            "path": "/threads",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "queryStringParameters": {"ids": "01DXF6DT000000000000000003,01DXF6DT000000000000000001"},
+        }
+
+        actual = index.handler(event, context)
+
+        body = json.loads(actual["body"])
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert [thread["name"] for thread in body["threads"]] == ["Thread3", "Thread1"]
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_threads_by_invalid_ids(self, context: LambdaContext) -> None:
+        """Test GET /threads handler with invalid thread IDs."""
+        event = {
+            "path": "/threads",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "queryStringParameters": {"ids": "01DXF6DT000000000000000003,invalid"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
     @pytest.mark.usefixtures("_create_table")
     def test_get_threads_empty(self, context: LambdaContext) -> None:
         """Test GET /threads handler with no threads."""
@@ -114,3 +354,138 @@ class TestThread:
 
         assert actual["statusCode"] == HTTPStatus.OK.value
         assert body["threads"] == []
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_thread(self, context: LambdaContext, table: Table) -> None:
+        """Test GET /threads/{thread_id} handler."""
+        table.put_item(
+            Item={
+                "thread_id": "01DXF6DT000000000000000000",
+                "post_id": "-",
+                "category": "Thread",
+                "name": "Thread1",
+                "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+            }
+        )
+        event = {
+            "path": "/threads/01DXF6DT000000000000000000",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert json.loads(actual["body"]) == {
+            "id": "01DXF6DT000000000000000000",
+            "name": "Thread1",
+            "created_at": "2020-01-01T01:01:01.000001Z",
+            "post_count": 0,
+            "last_post_at": None,
+        }
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_thread_not_found(self, context: LambdaContext) -> None:
+        """Test GET /threads/{thread_id} handler with a nonexistent thread."""
+        event = {
+            "path": "/threads/01DXF6DT000000000000000000",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NOT_FOUND.value
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_get_thread_invalid_id(self, context: LambdaContext) -> None:
+        """Test GET /threads/{thread_id} handler with an invalid thread ID."""
+        event = {
+            "path": "/threads/invalid",
+            "httpMethod": "GET",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.BAD_REQUEST.value
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_patch_thread(self, context: LambdaContext, table: Table) -> None:
+        """Test PATCH /threads/{thread_id} handler."""
+        post_count = 3
+        table.put_item(
+            Item={
+                "thread_id": "01DXF6DT000000000000000000",
+                "post_id": "-",
+                "category": "Thread",
+                "name": "Thread1",
+                "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+                "post_count": post_count,
+            }
+        )
+        event = {
+            "path": "/threads/01DXF6DT000000000000000000",
+            "httpMethod": "PATCH",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"name": "Thread2"}',
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.OK.value
+        assert json.loads(actual["body"])["name"] == "Thread2"
+        item = table.get_item(Key={"thread_id": "01DXF6DT000000000000000000", "post_id": "-"})["Item"]
+        assert item["name"] == "Thread2"
+        assert item["post_count"] == post_count
+        assert item["version"] == 1
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_patch_thread_not_found(self, context: LambdaContext) -> None:
+        """Test PATCH /threads/{thread_id} handler with a nonexistent thread."""
+        event = {
+            "path": "/threads/01DXF6DT000000000000000000",
+            "httpMethod": "PATCH",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+            "body": '{"name": "Thread2"}',
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NOT_FOUND.value
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_delete_thread(self, context: LambdaContext, table: Table) -> None:
+        """Test DELETE /threads/{thread_id} handler."""
+        table.put_item(
+            Item={
+                "thread_id": "01DXF6DT000000000000000000",
+                "post_id": "-",
+                "category": "Thread",
+                "name": "Thread1",
+                "created_at": int(datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC).timestamp() * 1000000),
+            }
+        )
+        event = {
+            "path": "/threads/01DXF6DT000000000000000000",
+            "httpMethod": "DELETE",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NO_CONTENT.value
+        assert "Item" not in table.get_item(Key={"thread_id": "01DXF6DT000000000000000000", "post_id": "-"})
+
+    @pytest.mark.usefixtures("_create_table")
+    def test_delete_thread_not_found(self, context: LambdaContext) -> None:
+        """Test DELETE /threads/{thread_id} handler with a nonexistent thread."""
+        event = {
+            "path": "/threads/01DXF6DT000000000000000000",
+            "httpMethod": "DELETE",
+            "requestContext": {"requestId": "227b78aa-779d-47d4-a48e-ce62120393b8"},
+        }
+
+        actual = index.handler(event, context)
+
+        assert actual["statusCode"] == HTTPStatus.NOT_FOUND.value
@@ -2,9 +2,53 @@
 
 from __future__ import annotations
 
-from chat.config.container import Container
-from chat.infrastructure import DynamoDBPostRepository, DynamoDBThreadRepository
-from chat.use_case import CreatePost, CreateThread, DeletePost, DeleteThread, GetThread, ListPosts, ListThreads
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.config.container import Container, parse_hot_threads
+from chat.infrastructure import (
+    BufferedPostRepository,
+    DynamoDBIdempotencyStore,
+    DynamoDBPostRepository,
+    DynamoDBPostSearchIndex,
+    DynamoDBReadViews,
+    DynamoDBThreadRepository,
+    InMemoryIdempotencyStore,
+    InMemoryPostRepository,
+    InMemoryPostSearchIndex,
+    InMemoryReadViews,
+    InMemoryThreadRepository,
+    SQLiteIdempotencyStore,
+    SQLitePostRepository,
+    SQLitePostSearchIndex,
+    SQLiteThreadRepository,
+)
+from chat.infrastructure.change_stream import ChangeStreamSimulator
+from chat.infrastructure.diagnostics import DiagnosedTable
+from chat.infrastructure.metering import MeteredTable
+from chat.infrastructure.resilience import ResiliencePolicy, ResilientTable
+from chat.shared.concurrency import SingleFlight
+from chat.use_case import (
+    CreatePost,
+    CreateThread,
+    DeletePost,
+    DeleteThread,
+    GetThread,
+    GetThreads,
+    ListPosts,
+    ListRecentPosts,
+    ListThreads,
+    ProjectChanges,
+    RenameThread,
+    SearchPosts,
+    SearchThreads,
+)
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 class TestConatiner:
@@ -24,6 +68,63 @@ class TestConatiner:
         table2 = container.table
         assert table1 is table2
 
+    def test_table_resilient(self) -> None:
+        """Test that the requests of the table are retried by the resilience policy only."""
+        container = Container("table_name")
+        table = container.table
+
+        assert isinstance(table, ResilientTable)
+        assert table._handler is container.resilience
+        assert table.meta.client.meta.config.retries == {"mode": "standard", "total_max_attempts": 1}
+
+    def test_table_metered(self, tmp_path: Path) -> None:
+        """Test that every attempt of the requests of the table is recorded by the capacity meter."""
+        container = Container("table_name", usage_dump_path=tmp_path / "usage.jsonl")
+        table = container.table
+
+        assert isinstance(table._table, MeteredTable)
+        assert table._table._handler is container.capacity_meter
+        assert container.capacity_meter._dump_path == tmp_path / "usage.jsonl"
+        assert container.capacity_meter is container.capacity_meter
+
+    def test_table_diagnosed(self) -> None:
+        """Test that the queries of the table are added up by the query inspector."""
+        container = Container("table_name")
+        table = container.table
+
+        assert isinstance(table._table._table._table, DiagnosedTable)
+        assert table._table._table._table._handler is container.query_inspector
+        assert container.query_inspector is container.query_inspector
+
+    def test_resilience(self) -> None:
+        """Test that it returns the same ResiliencePolicy instance when called multiple times."""
+        container = Container("table_name")
+
+        assert isinstance(container.resilience, ResiliencePolicy)
+        assert container.resilience is container.resilience
+
+    def test_executor(self) -> None:
+        """Test that it returns an executor with a worker per connection of the DynamoDB client."""
+        container = Container("table_name")
+        executor = container.executor
+
+        assert isinstance(executor, ThreadPoolExecutor)
+        assert executor._max_workers == container.table.meta.client.meta.config.max_pool_connections
+        assert container.executor is executor
+        assert container.thread_repository._executor is executor
+        assert container.post_repository._executor is executor
+        assert container.post_search_index._executor is executor
+
+    def test_single_flight(self) -> None:
+        """Test that it returns a single flight shared by the repositories."""
+        container = Container("table_name")
+        single_flight = container.single_flight
+
+        assert isinstance(single_flight, SingleFlight)
+        assert container.single_flight is single_flight
+        assert container.thread_repository._single_flight is single_flight
+        assert container.post_repository._single_flight is single_flight
+
     def test_thread_repository(self) -> None:
         """Test that it returns a DynamoDBThreadRepository instance."""
         container = Container("table_name")
@@ -40,6 +141,15 @@ class TestConatiner:
         assert isinstance(repository, DynamoDBPostRepository)
         assert repository._table.name == "table_name"
 
+    def test_idempotency_store(self) -> None:
+        """Test that it returns a DynamoDBIdempotencyStore instance."""
+        container = Container("table_name")
+        store = container.idempotency_store
+
+        assert isinstance(store, DynamoDBIdempotencyStore)
+        assert store._table.name == "table_name"
+        assert container.idempotency_store is store
+
     def test_create_thread(self) -> None:
         """Test that it returns a CreateThread instance."""
         container = Container("table_name")
@@ -48,6 +158,14 @@ class TestConatiner:
         assert isinstance(use_case, CreateThread)
         assert isinstance(use_case._repository, DynamoDBThreadRepository)
 
+    def test_rename_thread(self) -> None:
+        """Test that it returns a RenameThread instance."""
+        container = Container("table_name")
+        use_case = container.rename_thread
+
+        assert isinstance(use_case, RenameThread)
+        assert isinstance(use_case._repository, DynamoDBThreadRepository)
+
     def test_get_thread(self) -> None:
         """Test that it returns a GetThread instance."""
         container = Container("table_name")
@@ -56,6 +174,14 @@ class TestConatiner:
         assert isinstance(use_case, GetThread)
         assert isinstance(use_case._repository, DynamoDBThreadRepository)
 
+    def test_get_threads(self) -> None:
+        """Test that it returns a GetThreads instance."""
+        container = Container("table_name")
+        use_case = container.get_threads
+
+        assert isinstance(use_case, GetThreads)
+        assert isinstance(use_case._repository, DynamoDBThreadRepository)
+
     def test_list_threads(self) -> None:
         """Test that it returns a ListThreads instance."""
         container = Container("table_name")
@@ -95,4 +221,134 @@ class TestConatiner:
         use_case = container.delete_post
 
         assert isinstance(use_case, DeletePost)
-        assert isinstance(use_case._repository, DynamoDBPostRepository)
+        assert isinstance(use_case._thread_repository, DynamoDBThreadRepository)
+        assert isinstance(use_case._post_repository, DynamoDBPostRepository)
+
+    def test_search_posts(self) -> None:
+        """Test that it returns a SearchPosts instance sharing the search index with the post use cases."""
+        container = Container("table_name")
+        use_case = container.search_posts
+
+        assert isinstance(use_case, SearchPosts)
+        assert isinstance(use_case._search_index, DynamoDBPostSearchIndex)
+        assert container.create_post._search_index is use_case._search_index
+        assert container.delete_post._search_index is use_case._search_index
+
+    def test_search_threads(self) -> None:
+        """Test that it returns a SearchThreads instance."""
+        container = Container("table_name")
+        use_case = container.search_threads
+
+        assert isinstance(use_case, SearchThreads)
+        assert isinstance(use_case._repository, DynamoDBThreadRepository)
+
+    def test_memory_backend(self) -> None:
+        """Test that the in-memory repositories are selected by the memory backend, and shared by the use cases."""
+        container = Container("table_name", backend="memory")
+
+        assert isinstance(container.thread_repository, InMemoryThreadRepository)
+        assert isinstance(container.post_repository, InMemoryPostRepository)
+        assert isinstance(container.post_search_index, InMemoryPostSearchIndex)
+        assert isinstance(container.idempotency_store, InMemoryIdempotencyStore)
+        assert container.create_post._thread_repository is container.thread_repository
+        assert not hasattr(container, "_table")
+
+    def test_sqlite_backend(self, tmp_path: Path) -> None:
+        """Test that the SQLite repositories are selected by the sqlite backend, and share the database."""
+        container = Container("table_name", backend="sqlite", sqlite_path=tmp_path / "chat.db")
+
+        assert isinstance(container.thread_repository, SQLiteThreadRepository)
+        assert isinstance(container.post_repository, SQLitePostRepository)
+        assert isinstance(container.post_search_index, SQLitePostSearchIndex)
+        assert isinstance(container.idempotency_store, SQLiteIdempotencyStore)
+        assert container.thread_repository._database is container.post_repository._database
+        assert not hasattr(container, "_table")
+
+    def test_sqlite_backend_without_path(self) -> None:
+        """Test that the sqlite backend requires a database path."""
+        with pytest.raises(ValueError, match="requires a database path"):
+            Container("table_name", backend="sqlite")
+
+    def test_post_buffer_size(self) -> None:
+        """Test that the post repository of the backend is buffered, and flushed by the container."""
+        buffer_size = 10
+        container = Container("table_name", backend="memory", post_buffer_size=buffer_size)
+        container.flush()
+        assert not hasattr(container, "_post_repository")
+
+        repository = container.post_repository
+
+        assert isinstance(repository, BufferedPostRepository)
+        assert isinstance(repository._repository, InMemoryPostRepository)
+        assert repository._max_size == buffer_size
+        assert container.create_post._post_repository is repository
+
+    def test_read_views(self) -> None:
+        """Test that the read views are in the table with the dynamodb backend, and in memory otherwise."""
+        container = Container("table_name")
+
+        assert isinstance(container.read_views, DynamoDBReadViews)
+        assert isinstance(Container("table_name", backend="memory").read_views, InMemoryReadViews)
+        assert isinstance(container.list_recent_posts, ListRecentPosts)
+        assert container.list_recent_posts._views is container.read_views
+        assert isinstance(container.project_changes, ProjectChanges)
+        assert container.project_changes._views is container.read_views
+
+    def test_list_threads_from_views(self) -> None:
+        """Test that the threads are listed from the read views only if enabled."""
+        assert Container("table_name").list_threads._views is None
+
+        container = Container("table_name", list_threads_from_views=True)
+
+        assert container.list_threads._views is container.read_views
+
+    def test_local_change_stream(self) -> None:
+        """Test that the table is recorded by the local change stream only if enabled."""
+        assert Container("table_name").change_stream is None
+
+        container = Container("table_name", local_change_stream=True)
+        change_stream = container.change_stream
+
+        assert isinstance(change_stream, ChangeStreamSimulator)
+        assert container.change_stream is change_stream
+        assert container.table._table._table._table._table._handler is change_stream
+
+    def test_unknown_backend(self) -> None:
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError, match="Unknown repository backend: redis"):
+            Container("table_name", backend="redis")  # type: ignore[arg-type]
+
+    def test_post_repository_hot_threads(self) -> None:
+        """Test that the hot threads are passed to the post repository."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        container = Container("table_name", hot_threads={thread_id: 4})
+
+        assert container.post_repository._hot_threads == {thread_id: 4}
+
+    def test_post_repository_bucket_period(self) -> None:
+        """Test that the bucket period is passed to the post repository."""
+        container = Container("table_name", post_bucket_period=timedelta(days=1))
+
+        assert container.post_repository._bucket_ms == timedelta(days=1) // timedelta(milliseconds=1)
+
+
+class TestParseHotThreads:
+    """Tests for the parse_hot_threads function."""
+
+    def test_parse(self) -> None:
+        """Test that it parses the thread IDs and their shard counts."""
+        actual = parse_hot_threads("01DXF6DT000000000000000000:8, 01DXHRTH000000000000000000:4")
+
+        assert actual == {
+            ULID.from_str("01DXF6DT000000000000000000"): 8,
+            ULID.from_str("01DXHRTH000000000000000000"): 4,
+        }
+
+    def test_parse_empty(self) -> None:
+        """Test that an empty value means no hot threads."""
+        assert parse_hot_threads("") == {}
+
+    def test_parse_malformed(self) -> None:
+        """Test that a malformed value raises ValueError."""
+        with pytest.raises(ValueError):  # noqa: PT011
+            parse_hot_threads("01DXF6DT000000000000000000")
@@ -13,7 +13,7 @@ from freezegun import freeze_time
 from ulid import ULID
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryThreadRepository
+    from chat.infrastructure import InMemoryThreadRepository
 
 
 class TestThreadBuilder:
@@ -54,6 +54,20 @@ class TestThreadBuilder:
         with pytest.raises(ThreadExistsError, match="Thread1"):
             builder.build(name=name)
 
+    def test_build_with_existing_thread_name_in_other_case(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test building a thread with an existing name in a different case."""
+        thread = Thread(
+            id_="01DXF6DT000000000000000000",
+            name="Thread1",
+            created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC),
+        )
+        thread_repository.save(thread)
+
+        builder = ThreadBuilder(thread_repository)
+
+        with pytest.raises(ThreadExistsError, match="thread1"):
+            builder.build(name="thread1")
+
 
 class TestPostBuilder:
     """Unit tests for the PostBuilder."""
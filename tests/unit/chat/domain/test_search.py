@@ -0,0 +1,39 @@
+"""Tests for the search module."""
+
+from __future__ import annotations
+
+from chat.domain.search import MAX_TERM_LENGTH, tokenize
+
+
+class TestTokenize:
+    """Tests for the tokenize function."""
+
+    def test_words(self) -> None:
+        """Test that words are split on non-word characters and counted."""
+        actual = tokenize("Hello, world! hello")
+
+        assert actual == {"hello": 2, "world": 1}
+
+    def test_normalized(self) -> None:
+        """Test that full-width forms and letter cases are normalized."""
+        actual = tokenize("ＨＥＬＬＯ Straße")  # noqa: RUF001
+
+        assert actual == {"hello": 1, "strasse": 1}
+
+    def test_bigrams(self) -> None:
+        """Test that runs of scripts written without spaces are split into bigrams."""
+        actual = tokenize("東京タワー と 空")
+
+        assert actual == {"東京": 1, "京タ": 1, "タワ": 1, "ワー": 1, "と": 1, "空": 1}
+
+    def test_mixed_scripts(self) -> None:
+        """Test that runs of different scripts are separate tokens."""
+        actual = tokenize("Python入門")
+
+        assert actual == {"python": 1, "入門": 1}
+
+    def test_long_word_truncated(self) -> None:
+        """Test that long words are truncated."""
+        actual = tokenize("a" * (MAX_TERM_LENGTH + 1))
+
+        assert actual == {"a" * MAX_TERM_LENGTH: 1}
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 
 import pytest
-from chat.domain.thread import Thread
+from chat.domain.thread import Thread, normalize_name
 
 
 class TestThread:
@@ -30,3 +30,15 @@ class TestThread:
         created_at = datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC)
         with pytest.raises(ValueError, match=r".*empty.*"):
             Thread(id_=id_, name=name, created_at=created_at)
+
+
+class TestNormalizeName:
+    """Tests for the normalize_name function."""
+
+    @pytest.mark.parametrize(
+        ("name", "expected"),
+        [("Thread1", "thread1"), ("ＴＨＲＥＡＤ１", "thread1"), ("Straße", "strasse")],  # noqa: RUF001
+    )
+    def test_normalize_name(self, name: str, expected: str) -> None:
+        """Test that case and width are normalized."""
+        assert normalize_name(name) == expected
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
 
 import boto3
 import pytest
+from botocore.exceptions import ClientError
 from moto import mock_aws
 
 if TYPE_CHECKING:
@@ -62,3 +65,82 @@ def _create_table(aws: Iterator[DynamoDBClient]) -> None:  # noqa: ARG001
 def table(aws: Iterator[DynamoDBClient], _create_table: None) -> Table:  # noqa: ARG001
     """Fixture for the DynamoDB table."""
     return boto3.resource("dynamodb").Table(os.environ["TABLE_NAME"])
+
+
+def throttling_error(operation: str) -> ClientError:
+    """Create the error of a throttled request."""
+    return ClientError(
+        {
+            "Error": {"Code": "ProvisionedThroughputExceededException", "Message": "Throughput exceeded"},
+            "ResponseMetadata": {"HTTPStatusCode": 400},
+        },
+        operation,
+    )
+
+
+def internal_server_error(operation: str) -> ClientError:
+    """Create the error of a request that failed on the server side."""
+    return ClientError(
+        {
+            "Error": {"Code": "InternalServerError", "Message": "Internal server error"},
+            "ResponseMetadata": {"HTTPStatusCode": 500},
+        },
+        operation,
+    )
+
+
+class _FaultInjector:
+    """Proxy that raises the injected errors of an operation before sending its requests."""
+
+    def __init__(self, target: Any, faults: dict[str, list[Exception]], calls: Counter[str]) -> None:  # noqa: ANN401
+        self._target = target
+        self._faults = faults
+        self._calls = calls
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        attribute = getattr(self._target, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        def call(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            self._calls[name] += 1
+            if self._faults.get(name):
+                raise self._faults[name].pop(0)
+            return attribute(*args, **kwargs)
+
+        return call
+
+
+class FaultInjectingTable(_FaultInjector):
+    """Stand-in of a DynamoDB table that fails its requests with injected errors.
+
+    The errors injected for an operation are raised by its next requests, one per request; the
+    requests after them are sent to the table. The requests sent through `meta.client` are
+    covered as well.
+    """
+
+    def __init__(self, table: Table) -> None:
+        """Initialize the stand-in.
+
+        Args:
+            table: The table to send the requests to.
+        """
+        self.faults: dict[str, list[Exception]] = defaultdict(list)
+        self.calls: Counter[str] = Counter()
+        super().__init__(table, self.faults, self.calls)
+        self.meta = SimpleNamespace(client=_FaultInjector(table.meta.client, self.faults, self.calls))
+
+    def inject(self, operation: str, *errors: Exception) -> None:
+        """Inject errors into the next requests of an operation.
+
+        Args:
+            operation: The name of the operation, e.g. "get_item".
+            *errors: The errors to raise.
+        """
+        self.faults[operation].extend(errors)
+
+
+@pytest.fixture()
+def faulty_table(table: Table) -> FaultInjectingTable:
+    """Fixture for a fault-injecting stand-in of the DynamoDB table."""
+    return FaultInjectingTable(table)
@@ -0,0 +1,188 @@
+"""Unit tests for the BufferedPostRepository class."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.post import Post
+from chat.infrastructure import BufferedPostRepository, InMemoryPostRepository
+from chat.shared.exceptions import PostNotFoundError, ServiceUnavailableError
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+CREATED_AT = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+def post(thread_id: ULID, seconds: int, message: str = "Message") -> Post:
+    """Create a post of the thread, created the given number of seconds after CREATED_AT."""
+    created_at = CREATED_AT + timedelta(seconds=seconds)
+    return Post(id_=ULID.from_datetime(created_at), thread_id=thread_id, message=message, created_at=created_at)
+
+
+class RecordingPostRepository(InMemoryPostRepository):
+    """In-memory post repository that records its batch writes, and fails them on demand."""
+
+    def __init__(self) -> None:
+        """Initialize the repository."""
+        super().__init__()
+        self.batches: list[list[Post]] = []
+        self.error: Exception | None = None
+
+    def save_all(self, posts: Iterable[Post]) -> None:
+        """Record the batch, then save it or raise the error."""
+        batch = list(posts)
+        self.batches.append(batch)
+        if self.error:
+            raise self.error
+        super().save_all(batch)
+
+
+@pytest.fixture()
+def inner() -> RecordingPostRepository:
+    """The repository that the buffer writes to."""
+    return RecordingPostRepository()
+
+
+class TestBufferedPostRepository:
+    """Unit tests for the BufferedPostRepository class."""
+
+    def test_save_deferred(self, inner: RecordingPostRepository) -> None:
+        """Test that the saves are written in a single batch when flushed, once per post."""
+        repository = BufferedPostRepository(inner)
+        thread_id = ULID()
+        posts = [post(thread_id, seconds) for seconds in range(3)]
+
+        for saved in posts:
+            repository.save(saved)
+        posts[0].message = "Changed"
+        repository.save(posts[0])
+
+        assert repository.pending == len(posts)
+        assert inner.list_by_thread_id(thread_id) == []
+        repository.flush()
+        repository.flush()
+        assert repository.pending == 0
+        assert inner.batches == [posts]
+
+    def test_save_full(self, inner: RecordingPostRepository) -> None:
+        """Test that the buffer is written when it is full."""
+        repository = BufferedPostRepository(inner, max_size=2)
+        thread_id = ULID()
+
+        repository.save(post(thread_id, 0))
+        repository.save_all([post(thread_id, 1), post(thread_id, 2)])
+        repository.save(post(thread_id, 3))
+
+        assert [len(batch) for batch in inner.batches] == [3]
+        assert repository.pending == 1
+
+    def test_save_copy(self, inner: RecordingPostRepository) -> None:
+        """Test that a post changed after it was saved is written as it was saved."""
+        repository = BufferedPostRepository(inner)
+        saved = post(ULID(), 0)
+
+        repository.save(saved)
+        saved.message = "Changed"
+        repository.flush()
+
+        assert inner.batches[0][0].message == "Message"
+
+    def test_read_flushes_thread(self, inner: RecordingPostRepository) -> None:
+        """Test that the reads of a thread see its buffered posts, and the reads of the others leave them buffered."""
+        repository = BufferedPostRepository(inner)
+        thread_id = ULID()
+        posts = [post(thread_id, seconds) for seconds in range(2)]
+        repository.save_all(posts)
+
+        assert repository.list_by_thread_id(ULID()) == []
+        assert repository.pending == len(posts)
+        assert repository.list_by_thread_id(thread_id, limit=1) == posts[:1]
+        repository.save(post(thread_id, 2))
+        assert len(list(repository.iter_by_thread_id(thread_id))) == len(posts) + 1
+        assert repository.pending == 0
+
+    def test_delete_buffered(self, inner: RecordingPostRepository) -> None:
+        """Test that a buffered post can be deleted."""
+        repository = BufferedPostRepository(inner)
+        deleted = post(ULID(), 0)
+        repository.save(deleted)
+
+        repository.delete(deleted.thread_id, deleted.id_)
+
+        assert repository.list_by_thread_id(deleted.thread_id) == []
+        with pytest.raises(PostNotFoundError):
+            repository.delete(deleted.thread_id, deleted.id_)
+
+    def test_flush_error(self, inner: RecordingPostRepository) -> None:
+        """Test that the error of a write is raised, and its posts are not written by the next flush."""
+        repository = BufferedPostRepository(inner)
+        thread_id = ULID()
+        repository.save(post(thread_id, 0))
+        inner.error = ServiceUnavailableError(1)
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.flush()
+
+        inner.error = None
+        written = post(thread_id, 1)
+        repository.save(written)
+        repository.flush()
+        assert [len(batch) for batch in inner.batches] == [1, 1]
+        assert repository.list_by_thread_id(thread_id) == [written]
+
+    def test_save_with_deferred(self, inner: RecordingPostRepository) -> None:
+        """Test that the writes that go with a post are made once it is written, in order."""
+        repository = BufferedPostRepository(inner)
+        saved = post(ULID(), 0)
+        calls: list[str] = []
+
+        repository.save_with(
+            saved,
+            before=lambda: calls.append(f"before {len(inner.batches)}"),
+            after=lambda: calls.append("after"),
+        )
+
+        assert calls == []
+        repository.flush()
+        repository.flush()
+        assert calls == ["before 1", "after"]
+
+    def test_save_with_flush_error(self, inner: RecordingPostRepository) -> None:
+        """Test that the writes that go with the posts are dropped if the posts cannot be written."""
+        repository = BufferedPostRepository(inner)
+        calls: list[str] = []
+        repository.save_with(post(ULID(), 0), after=lambda: calls.append("dropped"))
+        inner.error = ServiceUnavailableError(1)
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.flush()
+
+        inner.error = None
+        repository.save_with(post(ULID(), 1), after=lambda: calls.append("made"))
+        repository.flush()
+        assert calls == ["made"]
+
+    def test_save_with_write_error(self, inner: RecordingPostRepository) -> None:
+        """Test that a failing write that goes with a post does not prevent the others, and is raised."""
+        repository = BufferedPostRepository(inner)
+        calls: list[str] = []
+
+        def fail() -> None:
+            raise ServiceUnavailableError(1)
+
+        repository.save_with(post(ULID(), 0), after=fail)
+        repository.save_with(post(ULID(), 1), after=lambda: calls.append("made"))
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.flush()
+        assert calls == ["made"]
+        assert [len(batch) for batch in inner.batches] == [2]
+
+    def test_invalid_max_size(self, inner: RecordingPostRepository) -> None:
+        """Test that the buffer must hold at least one post."""
+        with pytest.raises(ValueError, match="must be positive"):
+            BufferedPostRepository(inner, max_size=0)
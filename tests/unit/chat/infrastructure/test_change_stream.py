@@ -0,0 +1,167 @@
+"""Unit tests for the change stream and its local stand-in."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aws_lambda_powertools.utilities.data_classes import DynamoDBStreamEvent
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.domain.views import Change
+from chat.infrastructure import DynamoDBPostRepository, DynamoDBThreadRepository
+from chat.infrastructure.change_stream import ChangeStreamSimulator, to_change
+from chat.infrastructure.post import PostData
+from chat.infrastructure.thread import ThreadData
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+CREATED_AT = datetime(2020, 1, 1, 0, 0, 0, 123456, tzinfo=UTC)
+
+
+class RecordingHandler:
+    """Change stream handler that records the changes of the batches, and fails them on demand."""
+
+    def __init__(self, *failing: str) -> None:
+        """Initialize the handler, failing the records whose event names are given, once each."""
+        self.batches: list[list[tuple[str, Change | None]]] = []
+        self.failing = list(failing)
+
+    def __call__(self, event: dict[str, Any], _context: Any) -> dict[str, Any]:  # noqa: ANN401
+        """Record the batch, and report the first failing record."""
+        batch: list[tuple[str, Change | None]] = []
+        self.batches.append(batch)
+        for record in DynamoDBStreamEvent(event).records:
+            stream_record = record.dynamodb
+            assert stream_record is not None
+            if self.failing and record.raw_event["eventName"] == self.failing[0]:
+                self.failing.pop(0)
+                return {"batchItemFailures": [{"itemIdentifier": stream_record.sequence_number}]}
+            batch.append((record.raw_event["eventName"], to_change(stream_record.old_image, stream_record.new_image)))
+        return {"batchItemFailures": []}
+
+
+@pytest.fixture()
+def simulator() -> ChangeStreamSimulator:
+    """The local change stream."""
+    return ChangeStreamSimulator()
+
+
+@pytest.fixture()
+def recorded(simulator: ChangeStreamSimulator, table: Table) -> Table:
+    """The table whose writes are recorded by the simulator."""
+    return simulator.wrap(table)
+
+
+class TestToChange:
+    """Unit tests for the to_change function."""
+
+    def test_thread(self) -> None:
+        """Test that the images of a thread record are converted into the thread."""
+        thread = Thread(id_=ULID(), name="Thread", created_at=CREATED_AT, post_count=1, version=1)
+        image = ThreadData.from_model(thread).model_dump(exclude_none=True)
+
+        assert to_change(None, image) == Change(new=thread)
+        assert to_change(image, None) == Change(old=thread)
+
+    def test_post(self) -> None:
+        """Test that the images of a post record are converted into the post."""
+        post = Post(id_=ULID(), thread_id=ULID(), message="Message", created_at=CREATED_AT)
+        image = PostData.from_model(post).model_dump(exclude_none=True)
+
+        assert to_change(image, image) == Change(old=post, new=post)
+
+    def test_other(self) -> None:
+        """Test that the records of other items are not changes."""
+        assert to_change(None, {"thread_id": "View#threads", "post_id": str(ULID())}) is None
+        assert to_change(None, None) is None
+
+
+class TestChangeStreamSimulator:
+    """Unit tests for the ChangeStreamSimulator class."""
+
+    def test_record_writes(self, simulator: ChangeStreamSimulator, recorded: Table) -> None:
+        """Test that the transactions, puts, updates and deletes of the repositories are recorded in order."""
+        threads, posts = DynamoDBThreadRepository(recorded), DynamoDBPostRepository(recorded)
+        thread = Thread(id_=ULID(), name="Thread", created_at=CREATED_AT)
+        post = Post(id_=ULID(), thread_id=thread.id_, message="Message", created_at=CREATED_AT)
+        threads.save(thread)
+        posts.save(post)
+        threads.increment_post_count(thread.id_, CREATED_AT)
+        posts.delete(thread.id_, post.id_)
+        handler = RecordingHandler()
+
+        # The thread and its name record, the post, the counter update and the deletion.
+        names = ["INSERT", "INSERT", "INSERT", "MODIFY", "REMOVE"]
+        assert simulator.replay(handler) == len(names)
+        assert simulator.replay(handler) == 0
+        changes = [change for batch in handler.batches for change in batch]
+        assert [name for name, _ in changes] == names
+        assert [change for _, change in changes if change] == [
+            Change(new=thread),
+            Change(new=post),
+            Change(
+                old=thread,
+                new=thread.model_copy(
+                    update={"post_count": 1, "last_post_at": CREATED_AT, "version": thread.version + 1}
+                ),
+            ),
+            Change(old=post),
+        ]
+
+    def test_record_batch_write(self, simulator: ChangeStreamSimulator, recorded: Table) -> None:
+        """Test that the items of a batch write are recorded, and the unchanged items are not."""
+        posts = DynamoDBPostRepository(recorded)
+        batch = [Post(id_=ULID(), thread_id=ULID(), message="Message", created_at=CREATED_AT) for _ in range(3)]
+        posts.save_all(batch)
+        posts.save_all(batch)
+        handler = RecordingHandler()
+
+        assert simulator.replay(handler) == len(batch)
+        assert [change for _, change in handler.batches[0]] == [Change(new=post) for post in batch]
+
+    def test_reads_not_recorded(self, simulator: ChangeStreamSimulator, recorded: Table) -> None:
+        """Test that the reads are sent without being recorded."""
+        DynamoDBThreadRepository(recorded).list_all()
+
+        assert simulator.pending == 0
+
+    def test_replay_batches(self, simulator: ChangeStreamSimulator, recorded: Table) -> None:
+        """Test that the records are delivered in batches of the given size."""
+        count = 5
+        DynamoDBPostRepository(recorded).save_all(
+            Post(id_=ULID(), thread_id=ULID(), message="Message", created_at=CREATED_AT) for _ in range(count)
+        )
+        handler = RecordingHandler()
+
+        assert simulator.replay(handler, batch_size=2) == count
+        assert [len(batch) for batch in handler.batches] == [2, 2, 1]
+
+    def test_replay_failure(self, simulator: ChangeStreamSimulator, recorded: Table) -> None:
+        """Test that a batch is retried from the failed record on, so no record is skipped."""
+        posts = DynamoDBPostRepository(recorded)
+        post = Post(id_=ULID(), thread_id=ULID(), message="Message", created_at=CREATED_AT)
+        posts.save(post)
+        posts.delete(post.thread_id, post.id_)
+        handler = RecordingHandler("REMOVE")
+
+        batches = [["INSERT"], ["REMOVE"]]
+        assert simulator.replay(handler) == len(batches)
+        assert [[name for name, _ in batch] for batch in handler.batches] == batches
+        assert simulator.discarded == []
+
+    def test_replay_discard(self, simulator: ChangeStreamSimulator, recorded: Table) -> None:
+        """Test that a record failing every attempt is discarded, and the records after it are delivered."""
+        posts = DynamoDBPostRepository(recorded)
+        post = Post(id_=ULID(), thread_id=ULID(), message="Message", created_at=CREATED_AT)
+        posts.save(post)
+        posts.delete(post.thread_id, post.id_)
+        handler = RecordingHandler("INSERT", "INSERT")
+
+        assert simulator.replay(handler, max_attempts=2) == 1
+        assert [record["eventName"] for record in simulator.discarded] == ["INSERT"]
+        assert [name for name, _ in handler.batches[-1]] == ["REMOVE"]
+        assert simulator.pending == 0
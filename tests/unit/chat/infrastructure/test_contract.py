@@ -0,0 +1,309 @@
+"""Contract tests that every backend of the repositories must pass.
+
+The same tests run against the DynamoDB repositories on a table mocked by moto, the in-memory
+repositories and the SQLite repositories, so the backends stay interchangeable.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.post import Post
+from chat.domain.search import tokenize
+from chat.domain.thread import Thread
+from chat.infrastructure import (
+    DynamoDBPostRepository,
+    DynamoDBPostSearchIndex,
+    DynamoDBThreadRepository,
+    InMemoryPostRepository,
+    InMemoryPostSearchIndex,
+    InMemoryThreadRepository,
+    SQLiteDatabase,
+    SQLitePostRepository,
+    SQLitePostSearchIndex,
+    SQLiteThreadRepository,
+)
+from chat.shared.exceptions import (
+    PostNotFoundError,
+    ThreadExistsError,
+    ThreadNotFoundError,
+    ThreadVersionConflictError,
+)
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from chat.domain.post import AbstractPostRepository
+    from chat.domain.search import AbstractPostSearchIndex
+    from chat.domain.thread import AbstractThreadRepository
+
+CREATED_AT = datetime(2020, 1, 1, 0, 0, 0, 123456, tzinfo=UTC)
+
+
+@dataclass
+class Repositories:
+    """The repositories of a backend."""
+
+    threads: AbstractThreadRepository
+    posts: AbstractPostRepository
+    search_index: AbstractPostSearchIndex
+
+
+@pytest.fixture(params=["dynamodb", "memory", "sqlite"])
+def repositories(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[Repositories]:
+    """The repositories of each backend."""
+    if request.param == "dynamodb":
+        table = request.getfixturevalue("table")
+        yield Repositories(
+            DynamoDBThreadRepository(table), DynamoDBPostRepository(table), DynamoDBPostSearchIndex(table)
+        )
+    elif request.param == "memory":
+        yield Repositories(InMemoryThreadRepository(), InMemoryPostRepository(), InMemoryPostSearchIndex())
+    else:
+        database = SQLiteDatabase(tmp_path / "chat.db")
+        yield Repositories(
+            SQLiteThreadRepository(database), SQLitePostRepository(database), SQLitePostSearchIndex(database)
+        )
+        database.close()
+
+
+def thread(name: str, minutes: int = 0) -> Thread:
+    """Create a thread that has never been saved, created the given number of minutes after CREATED_AT."""
+    created_at = CREATED_AT + timedelta(minutes=minutes)
+    return Thread(id_=ULID.from_datetime(created_at), name=name, created_at=created_at)
+
+
+def post(thread_id: ULID, seconds: int, message: str = "Message") -> Post:
+    """Create a post of the thread, created the given number of seconds after CREATED_AT."""
+    created_at = CREATED_AT + timedelta(seconds=seconds)
+    return Post(id_=ULID.from_datetime(created_at), thread_id=thread_id, message=message, created_at=created_at)
+
+
+class TestThreadRepositoryContract:
+    """Contract tests of the thread repositories."""
+
+    def test_save_and_find(self, repositories: Repositories) -> None:
+        """Test that a saved thread is found by its ID, its IDs and its name, with the next version."""
+        saved = thread("Thread")
+
+        repositories.threads.save(saved)
+
+        assert saved.version == 1
+        assert repositories.threads.find_by_id(saved.id_) == saved
+        assert repositories.threads.find_by_id(ULID()) is None
+        assert repositories.threads.find_by_ids([ULID(), saved.id_]) == [saved]
+        assert repositories.threads.find_by_name("ＴＨＲＥＡＤ") == saved  # noqa: RUF001
+        assert repositories.threads.find_by_name("Other") is None
+
+    def test_save_version_conflict(self, repositories: Repositories) -> None:
+        """Test that a thread written since it was read cannot be saved."""
+        saved = thread("Thread")
+        repositories.threads.save(saved)
+        stale = repositories.threads.find_by_id(saved.id_)
+        assert stale is not None
+        repositories.threads.increment_post_count(saved.id_, CREATED_AT)
+
+        with pytest.raises(ThreadVersionConflictError):
+            repositories.threads.save(stale)
+        with pytest.raises(ThreadVersionConflictError):
+            repositories.threads.save(thread("Thread", 1).model_copy(update={"version": 1}))
+
+    def test_save_existing_name(self, repositories: Repositories) -> None:
+        """Test that another thread cannot take a name that differs in case only, and the owner is kept."""
+        owner = thread("Thread")
+        repositories.threads.save(owner)
+
+        with pytest.raises(ThreadExistsError):
+            repositories.threads.save(thread("THREAD", 1))
+
+        assert repositories.threads.find_by_name("thread") == owner
+        assert repositories.threads.list_all() == [owner]
+
+    def test_rename(self, repositories: Repositories) -> None:
+        """Test that a renamed thread releases its previous name."""
+        renamed = thread("Before")
+        repositories.threads.save(renamed)
+
+        renamed.name = "After"
+        repositories.threads.save(renamed)
+        other = thread("Before", 1)
+        repositories.threads.save(other)
+
+        assert repositories.threads.find_by_name("After") == renamed
+        assert repositories.threads.find_by_name("Before") == other
+
+    def test_search_by_name(self, repositories: Repositories) -> None:
+        """Test that the threads with the prefix are found in the order of their names, up to the limit."""
+        for i, name in enumerate(["Python", "Go", "pytest", "PyPI", "Rust"]):
+            repositories.threads.save(thread(name, i))
+
+        def search(prefix: str, limit: int) -> list[str]:
+            return [found.name for found in repositories.threads.search_by_name(prefix, limit=limit)]
+
+        assert search("py", 10) == ["PyPI", "pytest", "Python"]
+        assert search("PY", 2) == ["PyPI", "pytest"]
+        assert search("java", 10) == []
+        assert search("", 10) == []
+
+    def test_list_all(self, repositories: Repositories) -> None:
+        """Test that every thread is listed."""
+        threads = [thread(f"Thread{i}", i) for i in range(3)]
+        for saved in threads:
+            repositories.threads.save(saved)
+
+        assert sorted(repositories.threads.list_all(), key=lambda found: found.id_) == threads
+
+    def test_post_count(self, repositories: Repositories) -> None:
+        """Test that the counters are updated and the version is advanced, but the count never goes below zero."""
+        saved = thread("Thread")
+        repositories.threads.save(saved)
+        last_post_at = CREATED_AT + timedelta(seconds=1)
+
+        repositories.threads.increment_post_count(saved.id_, last_post_at)
+        repositories.threads.increment_post_count(saved.id_, last_post_at)
+        repositories.threads.decrement_post_count(saved.id_)
+        found = repositories.threads.find_by_id(saved.id_)
+        repositories.threads.decrement_post_count(saved.id_)
+        repositories.threads.decrement_post_count(saved.id_)
+        repositories.threads.decrement_post_count(ULID())
+
+        assert found is not None
+        assert (found.post_count, found.last_post_at, found.version) == (1, last_post_at, 4)
+        found = repositories.threads.find_by_id(saved.id_)
+        assert found is not None
+        assert found.post_count == 0
+        with pytest.raises(ThreadNotFoundError):
+            repositories.threads.increment_post_count(ULID(), CREATED_AT)
+
+    def test_post_count_out_of_order(self, repositories: Repositories) -> None:
+        """Test that a post recorded after a later one is counted, but does not move the last post time back."""
+        saved = thread("Thread")
+        repositories.threads.save(saved)
+        later = CREATED_AT + timedelta(seconds=2)
+
+        repositories.threads.increment_post_count(saved.id_, later)
+        repositories.threads.increment_post_count(saved.id_, CREATED_AT + timedelta(seconds=1))
+        found = repositories.threads.find_by_id(saved.id_)
+
+        assert found is not None
+        assert (found.post_count, found.last_post_at, found.version) == (2, later, 3)
+
+    def test_delete(self, repositories: Repositories) -> None:
+        """Test that a deleted thread is gone, and releases its name."""
+        deleted = thread("Thread")
+        repositories.threads.save(deleted)
+
+        repositories.threads.delete(deleted.id_)
+
+        assert repositories.threads.find_by_id(deleted.id_) is None
+        assert repositories.threads.find_by_name("Thread") is None
+        repositories.threads.save(thread("Thread", 1))
+        with pytest.raises(ThreadNotFoundError):
+            repositories.threads.delete(deleted.id_)
+
+
+class TestPostRepositoryContract:
+    """Contract tests of the post repositories."""
+
+    @pytest.fixture()
+    def thread_id(self) -> ULID:
+        """The ID of the thread of the posts."""
+        return ULID.from_datetime(CREATED_AT)
+
+    @pytest.fixture()
+    def posts(self, repositories: Repositories, thread_id: ULID) -> list[Post]:
+        """Posts of the thread, one per second, saved out of order, and a post of another thread."""
+        posts = [post(thread_id, seconds) for seconds in range(10)]
+        for saved in reversed(posts):
+            repositories.posts.save(saved)
+        repositories.posts.save(post(ULID(), 0))
+        return posts
+
+    def test_list_by_thread_id(self, repositories: Repositories, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that the posts of the thread are listed in the order of their IDs."""
+        assert repositories.posts.list_by_thread_id(thread_id) == posts
+        assert repositories.posts.list_by_thread_id(ULID()) == []
+
+    def test_list_by_thread_id_range(self, repositories: Repositories, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that the start is inclusive, the end exclusive, and the posts after the cursor are limited."""
+        start, end = CREATED_AT + timedelta(seconds=2), CREATED_AT + timedelta(seconds=8)
+
+        def list_posts(**kwargs: object) -> list[Post]:
+            return repositories.posts.list_by_thread_id(thread_id, **kwargs)  # type: ignore[arg-type]
+
+        assert list_posts(start=start, end=end) == posts[2:8]
+        assert list_posts(start=start, limit=3) == posts[2:5]
+        assert list_posts(start=start, after=posts[5].id_, limit=2) == posts[6:8]
+        assert list_posts(after=posts[0].id_, end=end, limit=100) == posts[1:8]
+        assert list_posts(start=end, end=start) == []
+
+    def test_iter_by_thread_id(self, repositories: Repositories, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that the posts of the thread are iterated in the order of their IDs."""
+        assert list(repositories.posts.iter_by_thread_id(thread_id)) == posts
+        assert (
+            list(repositories.posts.iter_by_thread_id(thread_id, start=CREATED_AT + timedelta(seconds=7))) == posts[7:]
+        )
+
+    def test_save_overwrites(self, repositories: Repositories, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that saving a post again overwrites it."""
+        changed = posts[0].model_copy(update={"message": "Changed"})
+
+        repositories.posts.save(changed)
+
+        assert repositories.posts.list_by_thread_id(thread_id, limit=2) == [changed, posts[1]]
+
+    def test_save_all(self, repositories: Repositories, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that the posts saved at once are listed with the others, and a post saved twice is saved once."""
+        changed = posts[0].model_copy(update={"message": "Changed"})
+        saved = [post(thread_id, seconds) for seconds in range(10, 40)]
+
+        repositories.posts.save_all([*saved, changed, changed])
+
+        assert repositories.posts.list_by_thread_id(thread_id) == [changed, *posts[1:], *saved]
+
+    def test_delete(self, repositories: Repositories, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that a deleted post is no longer listed."""
+        repositories.posts.delete(thread_id, posts[3].id_)
+
+        assert repositories.posts.list_by_thread_id(thread_id) == posts[:3] + posts[4:]
+        with pytest.raises(PostNotFoundError):
+            repositories.posts.delete(thread_id, posts[3].id_)
+
+
+class TestPostSearchIndexContract:
+    """Contract tests of the post search indexes."""
+
+    def test_search(self, repositories: Repositories) -> None:
+        """Test that the posts with all of the terms are ranked by occurrences, then by recency."""
+        thread_id = ULID()
+        posts = [
+            post(thread_id, 0, "python rust"),
+            post(thread_id, 1, "python python rust"),
+            post(thread_id, 2, "python rust"),
+            post(ULID(), 3, "python rust"),
+            post(thread_id, 4, "python"),
+        ]
+        for indexed in posts:
+            repositories.search_index.add(indexed)
+
+        terms = list(tokenize("Python Rust"))
+        assert repositories.search_index.search(terms, limit=10) == [posts[1], posts[3], posts[2], posts[0]]
+        assert repositories.search_index.search(terms, thread_id=thread_id, limit=2) == [posts[1], posts[2]]
+        assert repositories.search_index.search(["go"], limit=10) == []
+        assert repositories.search_index.search([], limit=10) == []
+
+    def test_remove(self, repositories: Repositories) -> None:
+        """Test that a removed post is no longer found, and removing it again does nothing."""
+        removed, kept = post(ULID(), 0, "python"), post(ULID(), 1, "python")
+        repositories.search_index.add(removed)
+        repositories.search_index.add(kept)
+
+        repositories.search_index.remove(removed.thread_id, removed.id_)
+        repositories.search_index.remove(removed.thread_id, removed.id_)
+
+        assert repositories.search_index.search(["python"], limit=10) == [kept]
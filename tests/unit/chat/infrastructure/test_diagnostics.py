@@ -0,0 +1,161 @@
+"""Unit tests for the diagnostics of the queries."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.infrastructure import DynamoDBPostRepository, DynamoDBThreadRepository
+from chat.infrastructure.diagnostics import DiagnosedTable, QueryInspector, diagnose
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+
+def respond(response: dict[str, Any]) -> Any:  # noqa: ANN401
+    """Create a request function that returns the given response."""
+    return lambda **_: response
+
+
+def save_posts(table: Table, thread_id: ULID, count: int) -> None:
+    """Save posts into a thread."""
+    created_at = datetime(2020, 1, 1, tzinfo=UTC)
+    repository = DynamoDBPostRepository(table)
+    for i in range(count):
+        posted_at = created_at + timedelta(seconds=i)
+        repository.save(Post(id_=ULID.from_datetime(posted_at), thread_id=thread_id, message="a", created_at=posted_at))
+
+
+class TestQueryInspector:
+    """Unit tests for the QueryInspector class."""
+
+    def test_call(self) -> None:
+        """Test that the pages of the queries sent within a call are added up, and the call is collected."""
+        inspector = QueryInspector()
+        last_key = {"thread_id": "1", "post_id": "2"}
+        pages: list[dict[str, Any]] = [
+            {"Count": 2, "ScannedCount": 2, "LastEvaluatedKey": last_key},
+            {"Count": 1, "ScannedCount": 3},
+        ]
+
+        with diagnose("post.list_by_thread_id") as diagnostics:
+            inspector.call("query", respond(pages[0]))
+            inspector.call("query", respond(pages[1]), IndexName="by_category", ExclusiveStartKey=last_key)
+            inspector.call("get_item", respond({"Item": {}}))
+
+        assert inspector.collect() == [diagnostics]
+        assert inspector.collect() == []
+        assert diagnostics.pages == len(pages)
+        assert diagnostics.items_returned == sum(page["Count"] for page in pages)
+        assert diagnostics.items_scanned == sum(page["ScannedCount"] for page in pages)
+        assert diagnostics.index == "by_category"
+        assert not diagnostics.truncated
+        assert diagnostics.explain().startswith(
+            "post.list_by_thread_id(index=by_category pages=2 returned=3 scanned=5 "
+        )
+
+    def test_call_outside_diagnose(self) -> None:
+        """Test that the queries sent outside of a call of a repository method are not recorded."""
+        inspector = QueryInspector()
+
+        inspector.call("query", respond({"Count": 1, "ScannedCount": 1}))
+
+        assert inspector.collect() == []
+
+    @pytest.mark.parametrize(("limit", "warned"), [(None, True), (5, True), (2, False)])
+    def test_truncated(self, caplog: pytest.LogCaptureFixture, limit: int | None, warned: bool) -> None:  # noqa: FBT001
+        """Test that a truncated result is warned about, unless the call reached its limit."""
+        inspector = QueryInspector()
+
+        with caplog.at_level(logging.WARNING), diagnose("thread.list_all", limit=limit) as diagnostics:
+            inspector.call("query", respond({"Count": 2, "ScannedCount": 2, "LastEvaluatedKey": {"thread_id": "1"}}))
+
+        assert diagnostics.truncated
+        assert "truncated" in diagnostics.explain()
+        assert [record.getMessage() == "Query result truncated" for record in caplog.records] == [True] * warned
+
+    def test_scan_ratio(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that a call that reads many more items than it returns is warned about."""
+        inspector = QueryInspector(scan_ratio=4, min_scanned=100)
+
+        with caplog.at_level(logging.WARNING):
+            with diagnose("few"):
+                inspector.call("query", respond({"Count": 1, "ScannedCount": 50}))
+            with diagnose("poor"):
+                inspector.call("query", respond({"Count": 10, "ScannedCount": 100}))
+            with diagnose("fair"):
+                inspector.call("query", respond({"Count": 50, "ScannedCount": 100}))
+
+        assert [(record.getMessage(), record.query["name"]) for record in caplog.records] == [
+            ("Query read more items than it returned", "poor")
+        ]
+
+
+class TestDiagnosedTable:
+    """Unit tests for the DiagnosedTable class."""
+
+    def test_list_all(self, table: Table) -> None:
+        """Test that the query of the threads is diagnosed."""
+        DynamoDBThreadRepository(table).save(
+            Thread(id_=ULID(), name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        )
+        inspector = QueryInspector()
+        repository = DynamoDBThreadRepository(DiagnosedTable(table, inspector))  # type: ignore[arg-type]
+
+        repository.list_all()
+
+        [diagnostics] = inspector.collect()
+        assert diagnostics.to_dict() | {"duration_ms": 0} == {
+            "name": "thread.list_all",
+            "limit": None,
+            "index": "by_category",
+            "pages": 1,
+            "items_returned": 1,
+            "items_scanned": 1,
+            "truncated": False,
+            "duration_ms": 0,
+        }
+
+    def test_list_by_thread_id(self, table: Table, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that a listing stopped at its limit is truncated, but not warned about."""
+        thread_id = ULID()
+        save_posts(table, thread_id, 5)
+        inspector = QueryInspector()
+        repository = DynamoDBPostRepository(DiagnosedTable(table, inspector), page_size=2)  # type: ignore[arg-type]
+
+        with caplog.at_level(logging.WARNING):
+            repository.list_by_thread_id(thread_id, limit=3)
+            repository.list_by_thread_id(thread_id)
+
+        limited, complete = inspector.collect()
+        assert (limited.pages, limited.items_returned, limited.truncated) == (2, 4, True)
+        assert (complete.pages, complete.items_returned, complete.truncated) == (3, 5, False)
+        assert caplog.records == []
+
+    def test_list_by_thread_id_partitions(self, table: Table) -> None:
+        """Test that the pages of the partitions queried on the executor are added up on the call."""
+        thread_id = ULID()
+        inspector = QueryInspector()
+        diagnosed = DiagnosedTable(table, inspector)
+        count = 4
+        save_posts(table, thread_id, count)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            repository = DynamoDBPostRepository(
+                diagnosed,  # type: ignore[arg-type]
+                page_size=1,
+                hot_threads={thread_id: 2},
+                executor=executor,
+            )
+            posts = repository.list_by_thread_id(thread_id)
+
+        [diagnostics] = inspector.collect()
+        assert diagnostics.items_returned == len(posts) == count
+        assert diagnostics.pages > len(posts)
+        assert not diagnostics.truncated
@@ -0,0 +1,68 @@
+"""Unit tests for the DynamoDBIdempotencyStore class."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from chat.domain.idempotency import IdempotencyRecord
+from chat.infrastructure import DynamoDBIdempotencyStore
+from freezegun import freeze_time
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+
+class TestDynamoDBIdempotencyStore:
+    """Unit tests for the DynamoDBIdempotencyStore class."""
+
+    @freeze_time("2020-01-01")
+    def test_start(self, table: Table) -> None:
+        """Test the start method puts an in-progress record that expires soon."""
+        store = DynamoDBIdempotencyStore(table, in_progress_ttl=timedelta(seconds=30))
+
+        assert store.start("key1", "fingerprint1") is None
+
+        item = table.get_item(Key={"thread_id": "Idempotency#key1", "post_id": "-"}).get("Item")
+        assert item == {
+            "thread_id": "Idempotency#key1",
+            "post_id": "-",
+            "fingerprint": "fingerprint1",
+            "expires_at": 1577836830,
+        }
+
+    def test_start_with_existing_record(self, table: Table) -> None:
+        """Test the start method returns the record of a key already started or completed."""
+        store = DynamoDBIdempotencyStore(table)
+        store.start("key1", "fingerprint1")
+
+        assert store.start("key1", "fingerprint2") == IdempotencyRecord(fingerprint="fingerprint1")
+
+        store.complete("key1", "fingerprint1", 201, '{"id": "1"}')
+
+        actual = store.start("key1", "fingerprint1")
+
+        assert actual == IdempotencyRecord(fingerprint="fingerprint1", status_code=201, body='{"id": "1"}')
+        assert actual.completed
+
+    def test_start_with_expired_record(self, table: Table) -> None:
+        """Test the start method overwrites an expired record not deleted yet."""
+        store = DynamoDBIdempotencyStore(table, ttl=timedelta(minutes=5))
+        with freeze_time("2020-01-01"):
+            store.start("key1", "fingerprint1")
+            store.complete("key1", "fingerprint1", 201, None)
+
+        with freeze_time("2020-01-01 00:04:59"):
+            assert store.start("key1", "fingerprint1") is not None
+        with freeze_time("2020-01-01 00:05:01"):
+            assert store.start("key1", "fingerprint2") is None
+
+    def test_release(self, table: Table) -> None:
+        """Test the release method deletes the record, so the key can be started again."""
+        store = DynamoDBIdempotencyStore(table)
+        store.start("key1", "fingerprint1")
+
+        store.release("key1")
+
+        assert table.get_item(Key={"thread_id": "Idempotency#key1", "post_id": "-"}).get("Item") is None
+        assert store.start("key1", "fingerprint2") is None
@@ -0,0 +1,145 @@
+"""Unit tests for the in-memory repositories, beyond the contract tests of every backend."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.infrastructure import (
+    InMemoryIdempotencyStore,
+    InMemoryPostRepository,
+    InMemoryPostSearchIndex,
+    InMemoryThreadRepository,
+)
+from ulid import ULID
+
+CREATED_AT = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+def thread(name: str) -> Thread:
+    """Create a thread that has never been saved."""
+    return Thread(id_=ULID(), name=name, created_at=CREATED_AT)
+
+
+def post(thread_id: ULID, seconds: int, message: str = "Message") -> Post:
+    """Create a post of the thread, created the given number of seconds after CREATED_AT."""
+    created_at = CREATED_AT + timedelta(seconds=seconds)
+    return Post(id_=ULID.from_datetime(created_at), thread_id=thread_id, message=message, created_at=created_at)
+
+
+class TestInMemoryThreadRepository:
+    """Unit tests for the InMemoryThreadRepository class."""
+
+    def test_save(self) -> None:
+        """Test that a saved thread is found by its ID and name, as a copy with the next version."""
+        repository = InMemoryThreadRepository()
+        saved = thread("Thread")
+
+        repository.save(saved)
+        found = repository.find_by_id(saved.id_)
+
+        assert saved.version == 1
+        assert found == saved
+        assert found is not saved
+        assert repository.find_by_name("THREAD") == saved
+        assert repository.find_by_ids([ULID(), saved.id_]) == [saved]
+
+    def test_list_all(self) -> None:
+        """Test that the threads are listed in the order of their IDs."""
+        repository = InMemoryThreadRepository()
+        threads = [
+            Thread(id_=ULID.from_datetime(CREATED_AT + timedelta(seconds=i)), name=f"Thread{i}", created_at=CREATED_AT)
+            for i in range(3)
+        ]
+        for saved in reversed(threads):
+            repository.save(saved)
+
+        assert repository.list_all() == threads
+
+
+class TestInMemoryPostRepository:
+    """Unit tests for the InMemoryPostRepository class."""
+
+    @pytest.fixture()
+    def thread_id(self) -> ULID:
+        """The ID of the thread of the posts."""
+        return ULID()
+
+    @pytest.fixture()
+    def posts(self, thread_id: ULID) -> list[Post]:
+        """Posts of the thread, one per second."""
+        return [post(thread_id, seconds) for seconds in range(10)]
+
+    @pytest.fixture()
+    def repository(self, posts: list[Post]) -> InMemoryPostRepository:
+        """A repository of the posts, saved out of order, and of a post of another thread."""
+        repository = InMemoryPostRepository()
+        for saved in reversed(posts):
+            repository.save(saved)
+        repository.save(post(ULID(), 0))
+        return repository
+
+    def test_iter_by_thread_id(self, thread_id: ULID) -> None:
+        """Test that the posts are iterated across pages."""
+        repository = InMemoryPostRepository()
+        posts = [post(thread_id, seconds) for seconds in range(250)]
+        for saved in posts:
+            repository.save(saved)
+
+        assert list(repository.iter_by_thread_id(thread_id)) == posts
+        assert list(repository.iter_by_thread_id(thread_id, start=CREATED_AT + timedelta(seconds=240))) == posts[240:]
+
+    def test_save_copy(self, repository: InMemoryPostRepository, thread_id: ULID, posts: list[Post]) -> None:
+        """Test that the stored posts are not changed through the saved or returned ones."""
+        posts[0].message = "Changed"
+        repository.list_by_thread_id(thread_id)[1].message = "Changed"
+
+        assert [found.message for found in repository.list_by_thread_id(thread_id, limit=2)] == ["Message"] * 2
+
+
+class TestInMemoryPostSearchIndex:
+    """Unit tests for the InMemoryPostSearchIndex class."""
+
+    def test_remove(self) -> None:
+        """Test that a removed or re-indexed post is no longer found by its former terms."""
+        index = InMemoryPostSearchIndex()
+        removed, changed = post(ULID(), 0, "python"), post(ULID(), 1, "python")
+        index.add(removed)
+        index.add(changed)
+
+        index.remove(removed.thread_id, removed.id_)
+        index.remove(removed.thread_id, removed.id_)
+        changed.message = "rust"
+        index.add(changed)
+
+        assert index.search(["python"], limit=10) == []
+        assert index.search(["rust"], limit=10) == [changed]
+
+
+class TestInMemoryIdempotencyStore:
+    """Unit tests for the InMemoryIdempotencyStore class."""
+
+    def test_start(self) -> None:
+        """Test that a key is started once, then replays its response until it is released."""
+        store = InMemoryIdempotencyStore()
+
+        assert store.start("key", "fingerprint") is None
+        in_progress = store.start("key", "fingerprint")
+        store.complete("key", "fingerprint", 201, "{}")
+        completed = store.start("key", "fingerprint")
+        store.release("key")
+
+        assert in_progress is not None
+        assert not in_progress.completed
+        assert completed is not None
+        assert (completed.status_code, completed.body) == (201, "{}")
+        assert store.start("key", "fingerprint") is None
+
+    def test_start_expired(self) -> None:
+        """Test that an expired record is started again."""
+        store = InMemoryIdempotencyStore(in_progress_ttl=timedelta(seconds=-1))
+
+        assert store.start("key", "fingerprint") is None
+        assert store.start("key", "fingerprint") is None
@@ -0,0 +1,166 @@
+"""Unit tests for the metering of the DynamoDB requests."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.thread import Thread
+from chat.infrastructure import DynamoDBPostRepository, DynamoDBThreadRepository
+from chat.infrastructure.metering import DEFAULT_SCOPE, CapacityMeter, MeteredTable, Usage
+from ulid import ULID
+
+from tests.unit.chat.infrastructure.conftest import throttling_error
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from mypy_boto3_dynamodb.service_resource import Table
+
+    from tests.unit.chat.infrastructure.conftest import FaultInjectingTable
+
+
+TICK_MS = 10
+
+
+class FakeClock:
+    """Clock that advances by 10 ms on every reading."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time, and advance it."""
+        self.now += TICK_MS / 1000
+        return self.now
+
+
+@pytest.fixture()
+def meter() -> CapacityMeter:
+    """Fixture for a meter on the fake clock."""
+    return CapacityMeter(clock=FakeClock())
+
+
+def _thread(name: str) -> Thread:
+    return Thread(id_=ULID(), name=name, created_at=datetime(2020, 1, 1, tzinfo=UTC))
+
+
+class TestCapacityMeter:
+    """Unit tests for the CapacityMeter class."""
+
+    def test_call(self, table: Table, meter: CapacityMeter) -> None:
+        """Test that the capacity, items and latency of the requests are recorded."""
+        repository = DynamoDBThreadRepository(MeteredTable(table, meter))  # type: ignore[arg-type]
+
+        thread = _thread("Thread1")
+        with meter.scope("POST /threads"):
+            repository.save(thread)
+            repository.increment_post_count(thread.id_, datetime(2020, 1, 2, tzinfo=UTC))
+        with meter.scope("GET /threads"):
+            repository.save(_thread("Thread2"))
+            threads = repository.list_all()
+
+        usage = meter.collect_usage()
+        assert set(usage) == {"POST /threads", "GET /threads"}
+        # The save writes the thread with its name in a transaction, then the counter is updated.
+        post_calls = 2
+        assert usage["POST /threads"].calls == post_calls
+        assert usage["POST /threads"].read_capacity == 0
+        assert usage["POST /threads"].write_capacity > 0
+        # Each call lasts a tick of the clock.
+        assert usage["POST /threads"].latency_ms == pytest.approx(post_calls * TICK_MS)
+        # The save, then a single page of the category index.
+        get_calls = 2
+        assert usage["GET /threads"].calls == get_calls
+        assert usage["GET /threads"].pages == 1
+        assert usage["GET /threads"].items_returned == len(threads)
+        assert usage["GET /threads"].items_scanned == len(threads)
+        assert {found.name for found in threads} == {"Thread1", "Thread2"}
+        assert meter.collect_usage() == {}
+
+    def test_call_failed(self, faulty_table: FaultInjectingTable, meter: CapacityMeter) -> None:
+        """Test that a failed request is counted, without capacity."""
+        repository = DynamoDBThreadRepository(MeteredTable(faulty_table, meter))  # type: ignore[arg-type]
+        faulty_table.inject("get_item", throttling_error("GetItem"))
+
+        with pytest.raises(Exception, match="Throughput exceeded"):
+            repository.find_by_id(ULID())
+
+        assert meter.collect_usage() == {DEFAULT_SCOPE: Usage(calls=1, latency_ms=pytest.approx(10))}
+
+    def test_call_batch(self, table: Table, meter: CapacityMeter) -> None:
+        """Test that the batch requests sent through the client are recorded."""
+        repository = DynamoDBThreadRepository(table)
+        threads = [_thread("Thread1"), _thread("Thread2")]
+        for thread in threads:
+            repository.save(thread)
+        repository = DynamoDBThreadRepository(MeteredTable(table, meter))  # type: ignore[arg-type]
+
+        repository.find_by_ids([thread.id_ for thread in threads])
+
+        usage = meter.collect_usage()[DEFAULT_SCOPE]
+        assert usage.calls == 1
+        assert usage.items_returned == len(threads)
+        assert usage.read_capacity > 0
+
+    def test_scope_follows_executor(self, table: Table, meter: CapacityMeter) -> None:
+        """Test that the requests submitted to the executor are attributed to the scope of the submitter."""
+        shards = 2
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            repository = DynamoDBPostRepository(
+                MeteredTable(table, meter),  # type: ignore[arg-type]
+                hot_threads={ULID.from_str("01DXF6DT000000000000000000"): shards},
+                executor=executor,
+            )
+            with meter.scope("GET /threads/{thread_id}/posts"):
+                repository.list_by_thread_id(ULID.from_str("01DXF6DT000000000000000000"))
+
+        usage = meter.collect_usage()
+        assert list(usage) == ["GET /threads/{thread_id}/posts"]
+        # The unsharded partition and the two shards.
+        assert usage["GET /threads/{thread_id}/posts"].pages == 1 + shards
+
+    def test_collect_usage_dumped(self, table: Table, tmp_path: Path) -> None:
+        """Test that the collected usage is appended to the dump file."""
+        dump_path = tmp_path / "usage.jsonl"
+        meter = CapacityMeter(dump_path=dump_path)
+        repository = DynamoDBThreadRepository(MeteredTable(table, meter))  # type: ignore[arg-type]
+
+        meter.collect_usage()
+        with meter.scope("GET /threads"):
+            repository.list_all()
+        meter.collect_usage()
+        repository.list_all()
+        meter.collect_usage()
+
+        lines = [json.loads(line) for line in dump_path.read_text().splitlines()]
+        assert [list(line["usage"]) for line in lines] == [["GET /threads"], [DEFAULT_SCOPE]]
+        assert lines[0]["usage"]["GET /threads"]["pages"] == 1
+
+
+class TestUsage:
+    """Unit tests for the Usage class."""
+
+    def test_add(self) -> None:
+        """Test that the usages are summed field by field."""
+        actual = Usage(calls=1, read_capacity=0.5, latency_ms=1.0) + Usage(calls=2, write_capacity=1.0, pages=1)
+
+        assert actual == Usage(calls=3, read_capacity=0.5, write_capacity=1.0, pages=1, latency_ms=1.0)
+
+    def test_to_metrics(self) -> None:
+        """Test that the usage is converted to the published metrics."""
+        actual = Usage(calls=2, read_capacity=1.5, items_returned=3, items_scanned=4, pages=1, latency_ms=12.3456)
+
+        assert actual.to_metrics() == {
+            "DynamoDBCalls": 2,
+            "ConsumedReadCapacity": 1.5,
+            "ConsumedWriteCapacity": 0.0,
+            "ItemsReturned": 3,
+            "ItemsScanned": 4,
+            "PagesFetched": 1,
+            "DynamoDBLatency": 12.346,
+        }
@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pytest
 from chat.domain.post import Post
 from chat.infrastructure import DynamoDBPostRepository
-from chat.shared.exceptions import PostNotFoundError
+from chat.shared.exceptions import PostNotFoundError, UnprocessedItemsError
+from freezegun import freeze_time
 from ulid import ULID
 
 if TYPE_CHECKING:
@@ -205,6 +207,392 @@ class TestDynamoDBPostRepository:
         ]
         assert actual == expected
 
+    def test_list_by_thread_id_excludes_thread(self, table: Table) -> None:
+        """Test the list_by_thread_id method does not return the thread record."""
+        thread_id = "01DXF6DT000000000000000000"
+        table.put_item(
+            Item={
+                "thread_id": thread_id,
+                "post_id": "-",
+                "category": "Thread",
+                "name": "Thread1",
+                "created_at": Decimal("1577840461000001"),
+            }
+        )
+
+        repository = DynamoDBPostRepository(table)
+
+        actual = repository.list_by_thread_id(ULID.from_str(thread_id))
+
+        assert actual == []
+
+    def test_list_by_thread_id_with_after_and_limit(self, table: Table) -> None:
+        """Test the list_by_thread_id method with a cursor and a limit."""
+        thread_id = "01DXF6DT000000000000000000"
+        for i in range(1, 4):
+            table.put_item(
+                Item={
+                    "thread_id": thread_id,
+                    "post_id": f"01DXHRTH00000000000000000{i}",
+                    "category": "Post",
+                    "message": f"Message{i}",
+                    "created_at": Decimal("1577926861000001"),
+                }
+            )
+
+        repository = DynamoDBPostRepository(table)
+
+        actual = repository.list_by_thread_id(
+            ULID.from_str(thread_id), after=ULID.from_str("01DXHRTH000000000000000001"), limit=1
+        )
+
+        assert [post.message for post in actual] == ["Message2"]
+
+    def test_iter_by_thread_id_paginated(self, table: Table) -> None:
+        """Test the iter_by_thread_id method across multiple query pages."""
+        thread_id = "01DXF6DT000000000000000000"
+        items = [
+            {
+                "thread_id": thread_id,
+                "post_id": "01DXHRTH000000000000000000",
+                "category": "Post",
+                "message": "Message1",
+                "created_at": Decimal("1577926861000001"),
+            },
+            {
+                "thread_id": thread_id,
+                "post_id": "01DXMB78000000000000000000",
+                "category": "Post",
+                "message": "Message2",
+                "created_at": Decimal("1578013261000001"),
+            },
+            {
+                "thread_id": thread_id,
+                "post_id": "01DXPXMZ000000000000000000",
+                "category": "Post",
+                "message": "Message3",
+                "created_at": Decimal("1578099661000001"),
+            },
+        ]
+        for item in items:
+            table.put_item(Item=item)  # type: ignore[arg-type]
+
+        repository = DynamoDBPostRepository(table, page_size=2)
+
+        actual = repository.iter_by_thread_id(ULID.from_str(thread_id))
+
+        assert [post.message for post in actual] == ["Message1", "Message2", "Message3"]
+
+    def test_save_sharded(self, table: Table) -> None:
+        """Test the save method with a hot thread."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        post_id = ULID.from_str("01DXHRTH000000000000000003")
+        post = Post(
+            id_=post_id,
+            thread_id=thread_id,
+            message="Message1",
+            created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+        )
+
+        repository = DynamoDBPostRepository(table, hot_threads={thread_id: 2})
+
+        repository.save(post)
+
+        actual = table.get_item(Key={"thread_id": f"{thread_id}#1", "post_id": str(post_id)}).get("Item")
+        assert actual is not None
+        assert repository.list_by_thread_id(thread_id) == [post]
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_save_all(self, table: Table, concurrent: bool) -> None:  # noqa: FBT001
+        """Test the save_all method writes the posts in chunks, in their partitions, and only once each."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        created_at = datetime(2020, 1, 2, tzinfo=UTC)
+        posts = [
+            Post(
+                id_=ULID.from_datetime(created_at + timedelta(seconds=i)),
+                thread_id=thread_id,
+                message=f"Message{i}",
+                created_at=created_at + timedelta(seconds=i),
+            )
+            for i in range(60)
+        ]
+        client = table.meta.client
+        batch_write_item = client.batch_write_item
+        sizes = []
+
+        def counted_batch_write_item(**kwargs: Any) -> Any:  # noqa: ANN401
+            sizes.append(len(kwargs["RequestItems"][table.name]))
+            return batch_write_item(**kwargs)
+
+        executor = ThreadPoolExecutor(max_workers=2) if concurrent else None
+        repository = DynamoDBPostRepository(table, hot_threads={thread_id: 2}, executor=executor)
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(client, "batch_write_item", counted_batch_write_item)
+            repository.save_all([*posts, posts[0].model_copy(update={"message": "Changed"})])
+
+        assert sorted(sizes) == [10, 25, 25]
+        assert repository.list_by_thread_id(thread_id) == [
+            posts[0].model_copy(update={"message": "Changed"}),
+            *posts[1:],
+        ]
+
+    def test_save_all_retries_unprocessed_items(self, table: Table, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the save_all method retries the unprocessed items, and gives up after the last attempt."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        posts = [
+            Post(
+                id_=ULID.from_str(f"01DXHRTH00000000000000000{i}"),
+                thread_id=thread_id,
+                message=f"Message{i}",
+                created_at=datetime(2020, 1, 2, tzinfo=UTC),
+            )
+            for i in range(2)
+        ]
+        client = table.meta.client
+        batch_write_item = client.batch_write_item
+        calls = []
+
+        def partial_batch_write_item(**kwargs: Any) -> Any:  # noqa: ANN401
+            calls.append(kwargs)
+            request = kwargs["RequestItems"][table.name]
+            response = batch_write_item(RequestItems={table.name: request[:1]})
+            if len(request) > 1:
+                response["UnprocessedItems"] = {table.name: request[1:]}
+            return response
+
+        monkeypatch.setattr(client, "batch_write_item", partial_batch_write_item)
+        monkeypatch.setattr("chat.infrastructure.dynamodb.BATCH_WRITE_BACKOFF", 0)
+        repository = DynamoDBPostRepository(table)
+
+        repository.save_all(posts)
+
+        assert repository.list_by_thread_id(thread_id) == posts
+        assert len(calls) == len(posts)
+
+        monkeypatch.setattr("chat.infrastructure.dynamodb.BATCH_WRITE_MAX_ATTEMPTS", 1)
+        with pytest.raises(UnprocessedItemsError):
+            repository.save_all(posts)
+
+    def test_list_by_thread_id_sharded(self, table: Table) -> None:
+        """Test the list_by_thread_id method merges the shards and the unsharded partition in ID order."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        repository = DynamoDBPostRepository(table, page_size=1, hot_threads={thread_id: 4})
+        posts = [
+            Post(
+                id_=ULID.from_str(f"01DXHRTH00000000000000000{i}"),
+                thread_id=thread_id,
+                message=f"Message{i}",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC),
+            )
+            for i in range(1, 8)
+        ]
+        for post in posts[1:]:
+            repository.save(post)
+        DynamoDBPostRepository(table).save(posts[0])
+
+        assert repository.list_by_thread_id(thread_id) == posts
+        assert repository.list_by_thread_id(thread_id, after=posts[2].id_, limit=3) == posts[3:6]
+        assert list(repository.iter_by_thread_id(thread_id)) == posts
+
+    def test_list_by_thread_id_sharded_with_executor(self, table: Table) -> None:
+        """Test the list_by_thread_id method reads the shards on the given executor."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        posts = [
+            Post(
+                id_=ULID.from_str(f"01DXHRTH00000000000000000{i}"),
+                thread_id=thread_id,
+                message=f"Message{i}",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC),
+            )
+            for i in range(1, 8)
+        ]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            repository = DynamoDBPostRepository(table, page_size=1, hot_threads={thread_id: 4}, executor=executor)
+            for post in posts:
+                repository.save(post)
+
+            assert repository.list_by_thread_id(thread_id) == posts
+            assert list(repository.iter_by_thread_id(thread_id)) == posts
+            # The executor is shared and stays usable.
+            assert executor.submit(lambda: 1).result() == 1
+
+    def test_delete_sharded(self, table: Table) -> None:
+        """Test the delete method with a hot thread, including a post written before it was sharded."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        posts = [
+            Post(
+                id_=ULID.from_str(f"01DXHRTH00000000000000000{i}"),
+                thread_id=thread_id,
+                message=f"Message{i}",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC),
+            )
+            for i in range(1, 3)
+        ]
+        DynamoDBPostRepository(table).save(posts[0])
+        repository = DynamoDBPostRepository(table, hot_threads={thread_id: 2})
+        repository.save(posts[1])
+
+        for post in posts:
+            repository.delete(thread_id, post.id_)
+
+        assert repository.list_by_thread_id(thread_id) == []
+        with pytest.raises(PostNotFoundError):
+            repository.delete(thread_id, posts[0].id_)
+
+    def test_delete_sharded_grown(self, table: Table) -> None:
+        """Test the delete method finds the posts written before the number of shards of the thread grew."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        posts = [
+            Post(
+                id_=ULID.from_str(f"01DXHRTH00000000000000000{i}"),
+                thread_id=thread_id,
+                message=f"Message{i}",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC),
+            )
+            for i in range(1, 9)
+        ]
+        for post in posts:
+            DynamoDBPostRepository(table, hot_threads={thread_id: 2}).save(post)
+        repository = DynamoDBPostRepository(table, hot_threads={thread_id: 8})
+
+        assert repository.list_by_thread_id(thread_id) == posts
+        for post in posts:
+            repository.delete(thread_id, post.id_)
+
+        assert repository.list_by_thread_id(thread_id) == []
+
+    def test_shards_not_power_of_two(self, table: Table) -> None:
+        """Test that a number of shards that is not a power of two is rejected."""
+        with pytest.raises(ValueError, match="power of two"):
+            DynamoDBPostRepository(table, hot_threads={ULID(): 3})
+
+    def test_list_by_thread_id_with_end(self, table: Table) -> None:
+        """Test the list_by_thread_id method with an end time."""
+        thread_id = "01DXF6DT000000000000000000"
+        for post_id, message in [
+            ("01DXHRTH000000000000000000", "Message1"),
+            ("01DXMB78000000000000000000", "Message2"),
+        ]:
+            table.put_item(
+                Item={
+                    "thread_id": thread_id,
+                    "post_id": post_id,
+                    "category": "Post",
+                    "message": message,
+                    "created_at": Decimal("1577926861000001"),
+                }
+            )
+
+        repository = DynamoDBPostRepository(table)
+
+        actual = repository.list_by_thread_id(
+            ULID.from_str(thread_id),
+            after=ULID.from_str("01DXHRTH000000000000000000"),
+            end=datetime(2020, 1, 3, 0, 0, 1, tzinfo=UTC),
+        )
+        assert [post.message for post in actual] == ["Message2"]
+
+        actual = repository.list_by_thread_id(ULID.from_str(thread_id), end=datetime(2020, 1, 3, tzinfo=UTC))
+        assert [post.message for post in actual] == ["Message1"]
+
+    @freeze_time("2020-01-10")
+    def test_save_bucketed(self, table: Table) -> None:
+        """Test the save method with time buckets."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        post_id = ULID.from_str("01DXHRTH000000000000000000")
+        post = Post(
+            id_=post_id,
+            thread_id=thread_id,
+            message="Message1",
+            created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+        )
+
+        repository = DynamoDBPostRepository(table, bucket_period=timedelta(days=1))
+
+        repository.save(post)
+
+        actual = table.get_item(Key={"thread_id": f"{thread_id}#18263", "post_id": str(post_id)}).get("Item")
+        assert actual is not None
+        assert repository.list_by_thread_id(thread_id) == [post]
+
+    @freeze_time("2020-01-10")
+    def test_list_by_thread_id_bucketed(self, table: Table) -> None:
+        """Test the list_by_thread_id method reads the buckets of the time range in order."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        repository = DynamoDBPostRepository(
+            table, page_size=1, hot_threads={thread_id: 2}, bucket_period=timedelta(days=1)
+        )
+        posts = [
+            Post(
+                id_=ULID.from_datetime(datetime(2020, 1, day, hour, tzinfo=UTC)),
+                thread_id=thread_id,
+                message=f"Message{day}-{hour}",
+                created_at=datetime(2020, 1, day, hour, tzinfo=UTC),
+            )
+            for day in range(2, 9)
+            for hour in (1, 2)
+        ]
+        for post in posts:
+            repository.save(post)
+
+        assert repository.list_by_thread_id(thread_id) == posts
+        assert list(repository.iter_by_thread_id(thread_id)) == posts
+        assert (
+            repository.list_by_thread_id(
+                thread_id, start=datetime(2020, 1, 3, 2, tzinfo=UTC), end=datetime(2020, 1, 5, 2, tzinfo=UTC)
+            )
+            == posts[3:7]
+        )
+        assert repository.list_by_thread_id(thread_id, after=posts[4].id_, limit=5) == posts[5:10]
+        assert repository.list_by_thread_id(thread_id, start=datetime(2020, 1, 11, tzinfo=UTC)) == []
+
+    @freeze_time("2020-03-01")
+    def test_list_by_thread_id_bucketed_skips_empty(self, table: Table, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the list_by_thread_id method only queries the buckets that hold posts."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        repository = DynamoDBPostRepository(table, bucket_period=timedelta(days=1))
+        posts = [
+            Post(
+                id_=ULID.from_datetime(datetime(2020, 2, day, tzinfo=UTC)),
+                thread_id=thread_id,
+                message=f"Message{day}",
+                created_at=datetime(2020, 2, day, tzinfo=UTC),
+            )
+            for day in (10, 20)
+        ]
+        repository.save(posts[0])
+        repository.save_all(posts[1:])
+        query = table.query
+        queries = []
+
+        def counted_query(**kwargs: Any) -> Any:  # noqa: ANN401
+            queries.append(kwargs)
+            return query(**kwargs)
+
+        monkeypatch.setattr(table, "query", counted_query)
+
+        assert repository.list_by_thread_id(thread_id) == posts
+        assert len(queries) == len(posts)
+        assert DynamoDBPostRepository(table, bucket_period=timedelta(days=1)).list_by_thread_id(thread_id) == posts
+
+    @freeze_time("2020-01-10")
+    def test_delete_bucketed(self, table: Table) -> None:
+        """Test the delete method with time buckets."""
+        thread_id = ULID.from_str("01DXF6DT000000000000000000")
+        post = Post(
+            id_=ULID.from_str("01DXHRTH000000000000000000"),
+            thread_id=thread_id,
+            message="Message1",
+            created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+        )
+        repository = DynamoDBPostRepository(table, bucket_period=timedelta(days=1))
+        repository.save(post)
+
+        repository.delete(thread_id, post.id_)
+
+        assert repository.list_by_thread_id(thread_id) == []
+
     def test_delete_successful(self, table: Table) -> None:
         """Test the delete method."""
         thread_id = "01DXF6DT000000000000000000"
@@ -0,0 +1,295 @@
+"""Unit tests for the resilience of the DynamoDB requests."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.infrastructure import DynamoDBPostSearchIndex, DynamoDBThreadRepository
+from chat.infrastructure.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    ErrorKind,
+    ResiliencePolicy,
+    ResilientTable,
+    classify,
+)
+from chat.shared.exceptions import ServiceUnavailableError, ThreadExistsError
+from ulid import ULID
+
+from tests.unit.chat.infrastructure.conftest import internal_server_error, throttling_error
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+    from tests.unit.chat.infrastructure.conftest import FaultInjectingTable
+
+THREAD_ID = ULID.from_str("01DXF6DT000000000000000000")
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 5.0
+BASE_DELAY = 0.025
+# The number of calls of a request that succeeds on its first retry.
+RETRIED_ONCE = 2
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock instead of waiting."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    """Fixture for the fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture()
+def policy(clock: FakeClock) -> ResiliencePolicy:
+    """Fixture for a policy on the fake clock."""
+    breaker = CircuitBreaker(failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, clock=clock)
+    return ResiliencePolicy(max_attempts=4, base_delay=BASE_DELAY, breaker=breaker, clock=clock, sleep=clock.sleep)
+
+
+@pytest.fixture()
+def repository(faulty_table: FaultInjectingTable, policy: ResiliencePolicy, table: Table) -> DynamoDBThreadRepository:
+    """Fixture for a thread repository on the fault-injecting table, with a thread in it."""
+    table.put_item(
+        Item={
+            "thread_id": str(THREAD_ID),
+            "post_id": "-",
+            "category": "Thread",
+            "name": "Thread1",
+            "created_at": Decimal("1577840461000001"),
+            "version": 1,
+        }
+    )
+    return DynamoDBThreadRepository(ResilientTable(faulty_table, policy))  # type: ignore[arg-type]
+
+
+def _transaction_error(*codes: str) -> ClientError:
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": "Transaction cancelled"},
+            "CancellationReasons": [{"Code": code} for code in codes],
+        },
+        "TransactWriteItems",
+    )
+
+
+class TestClassify:
+    """Unit tests for the classify function."""
+
+    @pytest.mark.parametrize(
+        ("error", "expected"),
+        [
+            (throttling_error("GetItem"), ErrorKind.THROTTLING),
+            (internal_server_error("GetItem"), ErrorKind.TRANSIENT),
+            (EndpointConnectionError(endpoint_url="https://dynamodb.us-east-1.amazonaws.com"), ErrorKind.TRANSIENT),
+            (_transaction_error("ThrottlingError", "None"), ErrorKind.THROTTLING),
+            (_transaction_error("ThrottlingError", "ConditionalCheckFailed"), None),
+            (
+                ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"),
+                None,
+            ),
+            (ValueError(), None),
+        ],
+    )
+    def test_classify(self, error: Exception, expected: ErrorKind | None) -> None:
+        """Test that the errors are classified by their code."""
+        assert classify(error) == expected
+
+
+class TestResiliencePolicy:
+    """Unit tests for the ResiliencePolicy class."""
+
+    def test_throttled_read_retried(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable, clock: FakeClock
+    ) -> None:
+        """Test that a throttled read is retried with growing backoff delays."""
+        errors = [throttling_error("GetItem"), throttling_error("GetItem")]
+        faulty_table.inject("get_item", *errors)
+
+        actual = repository.find_by_id(THREAD_ID)
+
+        assert actual
+        assert actual.name == "Thread1"
+        assert faulty_table.calls["get_item"] == len(errors) + 1
+        assert len(clock.sleeps) == len(errors)
+        assert clock.sleeps[0] <= BASE_DELAY
+        assert clock.sleeps[1] <= BASE_DELAY * 2
+
+    def test_throttled_write_retried(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable, table: Table
+    ) -> None:
+        """Test that a throttled write is retried, since it was not applied."""
+        faulty_table.inject("update_item", throttling_error("UpdateItem"))
+
+        repository.increment_post_count(THREAD_ID, datetime(2020, 1, 2, tzinfo=UTC))
+
+        assert faulty_table.calls["update_item"] == RETRIED_ONCE
+        item = table.get_item(Key={"thread_id": str(THREAD_ID), "post_id": "-"})["Item"]
+        assert item["post_count"] == 1
+
+    def test_transient_write_not_retried(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable
+    ) -> None:
+        """Test that a write failing transiently is not repeated, since it may have been applied."""
+        faulty_table.inject("update_item", internal_server_error("UpdateItem"))
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.increment_post_count(THREAD_ID, datetime(2020, 1, 2, tzinfo=UTC))
+
+        assert faulty_table.calls["update_item"] == 1
+
+    def test_transient_read_retried(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable
+    ) -> None:
+        """Test that a read failing transiently is retried."""
+        faulty_table.inject("batch_get_item", internal_server_error("BatchGetItem"))
+
+        actual = repository.find_by_ids([THREAD_ID])
+
+        assert [thread.id_ for thread in actual] == [THREAD_ID]
+        assert faulty_table.calls["batch_get_item"] == RETRIED_ONCE
+
+    def test_throttled_transaction_retried(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable
+    ) -> None:
+        """Test that a throttled transaction is retried, and a conflict is not."""
+        thread = repository.find_by_id(THREAD_ID)
+        assert thread
+        thread.name = "Thread2"
+        faulty_table.inject("transact_write_items", _transaction_error("ThrottlingError", "None"))
+
+        repository.save(thread)
+
+        assert faulty_table.calls["transact_write_items"] == RETRIED_ONCE
+        assert repository.find_by_name("Thread2") == thread
+
+    def test_batch_writer_retried(self, faulty_table: FaultInjectingTable, policy: ResiliencePolicy) -> None:
+        """Test that the requests of the batch writer run under the policy."""
+        index = DynamoDBPostSearchIndex(ResilientTable(faulty_table, policy))  # type: ignore[arg-type]
+        post = Post(
+            id_=ULID.from_str("01DXHRTH000000000000000001"),
+            thread_id=THREAD_ID,
+            message="hello world",
+            created_at=datetime(2020, 1, 2, tzinfo=UTC),
+        )
+        faulty_table.inject("batch_write_item", throttling_error("BatchWriteItem"))
+
+        index.add(post)
+
+        assert faulty_table.calls["batch_write_item"] == RETRIED_ONCE
+        assert index.search(["hello"], limit=10) == [post]
+
+    def test_attempts_exhausted(self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable) -> None:
+        """Test that ServiceUnavailableError is raised when every attempt is throttled."""
+        max_attempts = 2
+        policy = ResiliencePolicy(max_attempts=max_attempts, base_delay=0)
+        repository = DynamoDBThreadRepository(ResilientTable(faulty_table, policy))  # type: ignore[arg-type]
+        faulty_table.inject("get_item", *(throttling_error("GetItem") for _ in range(max_attempts)))
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.find_by_id(THREAD_ID)
+
+        assert faulty_table.calls["get_item"] == max_attempts
+
+    def test_deadline(
+        self,
+        repository: DynamoDBThreadRepository,
+        faulty_table: FaultInjectingTable,
+        policy: ResiliencePolicy,
+        clock: FakeClock,
+    ) -> None:
+        """Test that no retry is started past the deadline of the invocation."""
+        policy.set_deadline(0)
+        faulty_table.inject("get_item", throttling_error("GetItem"))
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.find_by_id(THREAD_ID)
+
+        assert faulty_table.calls["get_item"] == 1
+        assert clock.sleeps == []
+
+        policy.set_deadline(None)
+        faulty_table.inject("get_item", throttling_error("GetItem"))
+        assert repository.find_by_id(THREAD_ID)
+
+    def test_circuit_breaker(
+        self,
+        repository: DynamoDBThreadRepository,
+        faulty_table: FaultInjectingTable,
+        policy: ResiliencePolicy,
+        clock: FakeClock,
+    ) -> None:
+        """Test that sustained throttling opens the breaker, which fails fast until a probe succeeds."""
+        faulty_table.inject("get_item", *(throttling_error("GetItem") for _ in range(FAILURE_THRESHOLD)))
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.find_by_id(THREAD_ID)
+
+        assert policy.breaker.state == CircuitState.OPEN
+        calls = faulty_table.calls["get_item"]
+        with pytest.raises(ServiceUnavailableError) as e:
+            repository.find_by_ids([THREAD_ID])
+        assert 0 < e.value.retry_after <= RESET_TIMEOUT
+        assert faulty_table.calls["batch_get_item"] == 0
+        assert policy.collect_metrics() == {
+            "ThrottledRequests": 3,
+            "TransientErrors": 0,
+            "Retries": 2,
+            "RejectedRequests": 1,
+            "CircuitOpen": 1,
+        }
+
+        clock.now += RESET_TIMEOUT
+        assert policy.breaker.state == CircuitState.HALF_OPEN
+        assert repository.find_by_id(THREAD_ID)
+        assert faulty_table.calls["get_item"] == calls + 1
+        assert policy.breaker.state == CircuitState.CLOSED
+        assert policy.collect_metrics()["CircuitOpen"] == 0
+
+    def test_circuit_breaker_probe_throttled(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable, policy: ResiliencePolicy
+    ) -> None:
+        """Test that a throttled probe opens the breaker again."""
+        for _ in range(FAILURE_THRESHOLD):
+            policy.breaker.record_throttling()
+        policy.breaker._opened_at -= RESET_TIMEOUT
+        faulty_table.inject("get_item", throttling_error("GetItem"))
+
+        with pytest.raises(ServiceUnavailableError):
+            repository.find_by_id(THREAD_ID)
+
+        assert faulty_table.calls["get_item"] == 1
+        assert policy.breaker.state == CircuitState.OPEN
+
+    def test_other_errors_not_retried(
+        self, repository: DynamoDBThreadRepository, faulty_table: FaultInjectingTable
+    ) -> None:
+        """Test that the errors of the requests themselves are raised as they are."""
+        repository.save(Thread(id_=ULID(), name="Thread2", created_at=datetime.now(tz=UTC)))
+        calls = faulty_table.calls["transact_write_items"]
+
+        with pytest.raises(ThreadExistsError):
+            repository.save(Thread(id_=ULID(), name="thread2", created_at=datetime.now(tz=UTC)))
+
+        assert faulty_table.calls["transact_write_items"] == calls + 1
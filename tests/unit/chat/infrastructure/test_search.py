@@ -0,0 +1,103 @@
+"""Tests for the DynamoDBPostSearchIndex class."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from boto3.dynamodb.conditions import Key
+from chat.domain.post import Post
+from chat.infrastructure import DynamoDBPostSearchIndex
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+THREAD_ID = ULID.from_str("01DXF6DT000000000000000000")
+OTHER_THREAD_ID = ULID.from_str("01DXHRTH000000000000000000")
+
+
+def _post(post_id: str, message: str, thread_id: ULID = THREAD_ID) -> Post:
+    return Post(
+        id_=ULID.from_str(post_id),
+        thread_id=thread_id,
+        message=message,
+        created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+    )
+
+
+class TestDynamoDBPostSearchIndex:
+    """Tests for the DynamoDBPostSearchIndex class."""
+
+    def test_add(self, table: Table) -> None:
+        """Test that adding a post writes its postings and document."""
+        index = DynamoDBPostSearchIndex(table)
+
+        index.add(_post("01DXMB78000000000000000001", "Hello hello world"))
+
+        posting = table.get_item(
+            Key={"thread_id": "Term#hello", "post_id": f"{THREAD_ID}#01DXMB78000000000000000001"}
+        ).get("Item")
+        assert posting == {
+            "thread_id": "Term#hello",
+            "post_id": f"{THREAD_ID}#01DXMB78000000000000000001",
+            "count": Decimal(2),
+        }
+        document = table.get_item(Key={"thread_id": "Document#01DXMB78000000000000000001", "post_id": "-"}).get("Item")
+        assert document
+        assert sorted(document["terms"]) == ["hello", "world"]
+        assert "category" not in document
+
+    def test_search(self, table: Table) -> None:
+        """Test that the posts containing all terms are ranked by occurrences and then by recency."""
+        index = DynamoDBPostSearchIndex(table)
+        posts = [
+            _post("01DXMB78000000000000000001", "hello world"),
+            _post("01DXMB78000000000000000002", "hello hello world"),
+            _post("01DXMB78000000000000000003", "hello world"),
+            _post("01DXMB78000000000000000004", "hello"),
+            _post("01DXMB78000000000000000005", "hello world", OTHER_THREAD_ID),
+        ]
+        for post in posts:
+            index.add(post)
+
+        assert index.search(["hello", "world"], limit=10) == [posts[1], posts[4], posts[2], posts[0]]
+        assert index.search(["hello", "world"], limit=2) == [posts[1], posts[4]]
+        assert index.search(["hello", "world"], thread_id=THREAD_ID, limit=10) == [posts[1], posts[2], posts[0]]
+        assert index.search(["hello", "nothing"], limit=10) == []
+        assert index.search([], limit=10) == []
+
+    def test_search_with_executor(self, table: Table) -> None:
+        """Test that the postings of the terms can be queried on an executor."""
+        posts = [
+            _post("01DXMB78000000000000000001", "hello world"),
+            _post("01DXMB78000000000000000002", "hello hello world"),
+            _post("01DXMB78000000000000000003", "hello"),
+        ]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            index = DynamoDBPostSearchIndex(table, executor=executor)
+            for post in posts:
+                index.add(post)
+
+            assert index.search(["hello", "world"], limit=10) == [posts[1], posts[0]]
+            assert index.search(["hello", "nothing"], limit=10) == []
+
+    def test_remove(self, table: Table) -> None:
+        """Test that removing a post deletes its postings and document."""
+        index = DynamoDBPostSearchIndex(table)
+        post = _post("01DXMB78000000000000000001", "hello world")
+        index.add(post)
+
+        index.remove(post.thread_id, post.id_)
+
+        assert index.search(["hello"], limit=10) == []
+        assert table.query(KeyConditionExpression=Key("thread_id").eq("Term#world"))["Items"] == []
+        assert "Item" not in table.get_item(Key={"thread_id": f"Document#{post.id_}", "post_id": "-"})
+
+    def test_remove_not_indexed(self, table: Table) -> None:
+        """Test that removing a post that is not indexed does nothing."""
+        index = DynamoDBPostSearchIndex(table)
+
+        index.remove(THREAD_ID, ULID.from_str("01DXMB78000000000000000001"))
@@ -0,0 +1,189 @@
+"""Unit tests for the SQLite repositories, beyond the contract tests of every backend."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.infrastructure import (
+    SQLiteDatabase,
+    SQLiteIdempotencyStore,
+    SQLitePostRepository,
+    SQLitePostSearchIndex,
+    SQLiteThreadRepository,
+)
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+CREATED_AT = datetime(2020, 1, 1, tzinfo=UTC)
+# The number of concurrent post count increments.
+INCREMENTS = 100
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> Iterator[SQLiteDatabase]:
+    """Fixture for an SQLite database in a temporary file."""
+    database = SQLiteDatabase(tmp_path / "chat.db")
+    yield database
+    database.close()
+
+
+def posts(thread_id: ULID, count: int) -> list[Post]:
+    """Create posts of the thread, one per second."""
+    return [
+        Post(
+            id_=ULID.from_datetime(CREATED_AT + timedelta(seconds=i)),
+            thread_id=thread_id,
+            message=f"Message {i}",
+            created_at=CREATED_AT + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+class TestSQLiteDatabase:
+    """Unit tests for the SQLiteDatabase class."""
+
+    def test_wal(self, database: SQLiteDatabase) -> None:
+        """Test that the database is in write-ahead log mode."""
+        assert database.connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+    def test_reopen(self, tmp_path: Path) -> None:
+        """Test that the records outlive the connections."""
+        thread = Thread(id_=ULID(), name="Thread", created_at=CREATED_AT)
+        database = SQLiteDatabase(tmp_path / "chat.db")
+        SQLiteThreadRepository(database).save(thread)
+        database.close()
+
+        database = SQLiteDatabase(tmp_path / "chat.db")
+        try:
+            assert SQLiteThreadRepository(database).find_by_id(thread.id_) == thread
+        finally:
+            database.close()
+
+    def test_connection_per_thread(self, database: SQLiteDatabase) -> None:
+        """Test that the workers of an executor get their own connections, and their writes are all applied."""
+        repository = SQLiteThreadRepository(database)
+        thread = Thread(id_=ULID(), name="Thread", created_at=CREATED_AT)
+        repository.save(thread)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            connections = set(executor.map(lambda _: id(database.connection), range(8)))
+            list(executor.map(lambda _: repository.increment_post_count(thread.id_, CREATED_AT), range(INCREMENTS)))
+
+        found = repository.find_by_id(thread.id_)
+        assert found is not None
+        assert found.post_count == INCREMENTS
+        assert id(database.connection) not in connections
+
+    def test_transaction_rollback(self, database: SQLiteDatabase) -> None:
+        """Test that the writes of a failed transaction are rolled back."""
+        thread_id = ULID()
+
+        def save_and_fail() -> None:
+            with database.transaction() as connection:
+                SQLitePostRepository(database).save(posts(thread_id, 1)[0])
+                connection.execute("SELECT 1")
+                raise ValueError("failed")  # noqa: EM101
+
+        with pytest.raises(ValueError, match="failed"):
+            save_and_fail()
+
+        assert SQLitePostRepository(database).list_by_thread_id(thread_id) == []
+
+
+class TestSQLiteThreadRepository:
+    """Unit tests for the SQLiteThreadRepository class."""
+
+    def test_search_by_name_index(self, database: SQLiteDatabase) -> None:
+        """Test that the search by name is a range scan of the index of the names."""
+        SQLiteThreadRepository(database).search_by_name("py", limit=10)
+
+        [(_, _, _, plan)] = database.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT thread_id FROM threads"
+            " WHERE normalized_name >= ? AND normalized_name < ? ORDER BY normalized_name LIMIT ?",
+            ("py", "pz", 10),
+        ).fetchall()
+        assert plan.startswith("SEARCH threads USING COVERING INDEX threads_by_name")
+
+
+class TestSQLitePostRepository:
+    """Unit tests for the SQLitePostRepository class."""
+
+    def test_save_all(self, database: SQLiteDatabase) -> None:
+        """Test that the posts are saved in bulk."""
+        repository = SQLitePostRepository(database)
+        thread_id = ULID()
+        saved = posts(thread_id, 1_000)
+
+        repository.save_all(saved)
+
+        assert repository.list_by_thread_id(thread_id) == saved
+
+    def test_iter_by_thread_id(self, database: SQLiteDatabase) -> None:
+        """Test that the posts are iterated across pages."""
+        repository = SQLitePostRepository(database, page_size=3)
+        thread_id = ULID()
+        saved = posts(thread_id, 10)
+        repository.save_all(saved)
+
+        assert list(repository.iter_by_thread_id(thread_id)) == saved
+
+    def test_list_by_thread_id_index(self, database: SQLiteDatabase) -> None:
+        """Test that a listing is a range scan of the primary key, without sorting."""
+        [(_, _, _, plan)] = database.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT thread_id, post_id, message, created_at FROM posts"
+            " WHERE thread_id = ? AND post_id >= ? AND post_id > ? AND post_id < ? ORDER BY post_id LIMIT ?",
+            ("thread", "", "", "~", 10),
+        ).fetchall()
+        assert plan.startswith("SEARCH posts USING PRIMARY KEY (thread_id=? AND post_id>? AND post_id<?)")
+
+
+class TestSQLitePostSearchIndex:
+    """Unit tests for the SQLitePostSearchIndex class."""
+
+    def test_add_again(self, database: SQLiteDatabase) -> None:
+        """Test that a post indexed again is no longer found by the terms of its previous message."""
+        index = SQLitePostSearchIndex(database)
+        post = Post(id_=ULID(), thread_id=ULID(), message="python", created_at=CREATED_AT)
+        index.add(post)
+
+        post.message = "rust"
+        index.add(post)
+
+        assert index.search(["python"], limit=10) == []
+        assert index.search(["rust"], limit=10) == [post]
+
+
+class TestSQLiteIdempotencyStore:
+    """Unit tests for the SQLiteIdempotencyStore class."""
+
+    def test_start(self, database: SQLiteDatabase) -> None:
+        """Test that a key is started once, then replays its response until it is released."""
+        store = SQLiteIdempotencyStore(database)
+
+        assert store.start("key", "fingerprint") is None
+        in_progress = store.start("key", "other")
+        store.complete("key", "fingerprint", 201, "{}")
+        completed = store.start("key", "fingerprint")
+        store.release("key")
+
+        assert in_progress is not None
+        assert (in_progress.fingerprint, in_progress.completed) == ("fingerprint", False)
+        assert completed is not None
+        assert (completed.status_code, completed.body) == (201, "{}")
+        assert store.start("key", "fingerprint") is None
+
+    def test_start_expired(self, database: SQLiteDatabase) -> None:
+        """Test that an expired record is started again."""
+        store = SQLiteIdempotencyStore(database, in_progress_ttl=timedelta(seconds=-2))
+
+        assert store.start("key", "fingerprint") is None
+        assert store.start("key", "fingerprint") is None
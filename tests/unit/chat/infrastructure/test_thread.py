@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from decimal import Decimal
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pytest
 from chat.domain.thread import Thread
 from chat.infrastructure import DynamoDBThreadRepository
-from chat.shared.exceptions import ThreadNotFoundError
+from chat.shared.concurrency import SingleFlight
+from chat.shared.exceptions import ThreadExistsError, ThreadNotFoundError, ThreadVersionConflictError
 from ulid import ULID
 
+from tests.unit.chat.shared.test_concurrency import wait_for_waiters
+
 if TYPE_CHECKING:
     from mypy_boto3_dynamodb.service_resource import Table
 
@@ -38,12 +43,15 @@ class TestDynamoDBThreadRepository:
             "category": "Thread",
             "name": "Test Thread",
             "created_at": Decimal("1577840461000001"),
+            "post_count": Decimal(0),
+            "version": Decimal(1),
         }
 
         assert actual == expected
+        assert thread.version == 1
 
     def test_save_with_existing_thread_id(self, table: Table) -> None:
-        """Test the save method with an existing thread."""
+        """Test the save method with an existing thread written before versioning, once read."""
         thread_id = "01DXF6DT000000000000000000"
         table.put_item(
             Item={
@@ -57,7 +65,12 @@ class TestDynamoDBThreadRepository:
 
         repository = DynamoDBThreadRepository(table)
 
-        thread = Thread(id_=thread_id, name="Thread2", created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC))
+        with pytest.raises(ThreadVersionConflictError):
+            repository.save(Thread(id_=thread_id, name="Thread2", created_at=datetime(2020, 1, 1, tzinfo=UTC)))
+        thread = repository.find_by_id(ULID.from_str(thread_id))
+        assert thread
+        thread.name = "Thread2"
+        thread.created_at = datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC)
 
         repository.save(thread)
 
@@ -68,9 +81,133 @@ class TestDynamoDBThreadRepository:
             "category": "Thread",
             "name": "Thread2",
             "created_at": Decimal("1577840461000001"),
+            "post_count": Decimal(0),
+            "version": Decimal(1),
         }
 
         assert actual == expected
+        assert thread.version == 1
+
+    def test_save_writes_name(self, table: Table) -> None:
+        """Test that the save method writes the normalized name record."""
+        repository = DynamoDBThreadRepository(table)
+        thread = Thread(
+            id_="01DXF6DT000000000000000000",
+            name="Ｔest Thread",  # noqa: RUF001
+            created_at=datetime(2020, 1, 1, tzinfo=UTC),
+        )
+
+        repository.save(thread)
+
+        actual = table.get_item(Key={"thread_id": "ThreadName#t", "post_id": "test thread"})["Item"]
+        assert actual == {
+            "thread_id": "ThreadName#t",
+            "post_id": "test thread",
+            "name_thread_id": "01DXF6DT000000000000000000",
+        }
+
+    def test_save_with_existing_name(self, table: Table) -> None:
+        """Test that the save method rejects a name taken by another thread, ignoring case."""
+        repository = DynamoDBThreadRepository(table)
+        repository.save(Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime.now(tz=UTC)))
+
+        thread = Thread(id_="01DXHRTH000000000000000000", name="THREAD1", created_at=datetime.now(tz=UTC))
+        with pytest.raises(ThreadExistsError, match="THREAD1"):
+            repository.save(thread)
+
+        assert "Item" not in table.get_item(Key={"thread_id": "01DXHRTH000000000000000000", "post_id": "-"})
+
+    def test_save_renamed(self, table: Table) -> None:
+        """Test that renaming a thread releases its previous name."""
+        repository = DynamoDBThreadRepository(table)
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime.now(tz=UTC))
+        repository.save(thread)
+        thread.name = "thread1"
+        repository.save(thread)
+
+        thread.name = "Thread2"
+        repository.save(thread)
+
+        assert repository.find_by_name("Thread1") is None
+        assert repository.find_by_name("thread2")
+        repository.save(Thread(id_="01DXHRTH000000000000000000", name="Thread1", created_at=datetime.now(tz=UTC)))
+
+    def test_save_with_stale_version(self, table: Table) -> None:
+        """Test that a thread written since it was read is not overwritten."""
+        repository = DynamoDBThreadRepository(table)
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime.now(tz=UTC))
+        repository.save(thread)
+        stale = thread.model_copy()
+        thread.name = "Thread2"
+        repository.save(thread)
+        version = thread.version
+
+        stale.name = "Thread3"
+        with pytest.raises(ThreadVersionConflictError):
+            repository.save(stale)
+
+        actual = repository.find_by_id(thread.id_)
+        assert actual
+        assert actual.name == "Thread2"
+        assert actual.version == version
+        assert repository.find_by_name("Thread3") is None
+
+    def test_save_after_post_count_update(self, table: Table) -> None:
+        """Test that updating the post count invalidates the copies of the thread read before."""
+        repository = DynamoDBThreadRepository(table)
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime.now(tz=UTC))
+        repository.save(thread)
+
+        repository.increment_post_count(thread.id_, datetime.now(tz=UTC))
+
+        thread.name = "Thread2"
+        with pytest.raises(ThreadVersionConflictError):
+            repository.save(thread)
+        actual = repository.find_by_id(thread.id_)
+        assert actual
+        assert actual.post_count == 1
+        actual.name = "Thread2"
+        repository.save(actual)
+        assert repository.find_by_name("Thread2") == actual
+
+    def test_find_by_name(self, table: Table) -> None:
+        """Test the find_by_name method ignores case and width."""
+        repository = DynamoDBThreadRepository(table)
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        repository.save(thread)
+
+        assert repository.find_by_name("ｔｈｒｅａｄ1") == thread  # noqa: RUF001
+        assert repository.find_by_name("Thread") is None
+        assert repository.find_by_name("") is None
+
+    def test_search_by_name(self, table: Table) -> None:
+        """Test the search_by_name method returns the threads with the prefix in name order."""
+        repository = DynamoDBThreadRepository(table)
+        names = ["Python tips", "python news", "Rust", "Pythonista"]
+        for i, name in enumerate(names):
+            repository.save(Thread(id_=f"01DXF6DT00000000000000000{i}", name=name, created_at=datetime.now(tz=UTC)))
+
+        actual = repository.search_by_name("PYTHON", limit=10)
+        assert [thread.name for thread in actual] == ["python news", "Python tips", "Pythonista"]
+
+        actual = repository.search_by_name("python", limit=1)
+        assert [thread.name for thread in actual] == ["python news"]
+
+        assert repository.search_by_name("Go", limit=10) == []
+
+    def test_search_by_name_skips_stale_records(self, table: Table) -> None:
+        """Test that the search_by_name method continues the query past the stale name records."""
+        repository = DynamoDBThreadRepository(table)
+        names = ["Python news", "Python tips"]
+        for i, name in enumerate(names):
+            repository.save(Thread(id_=f"01DXF6DT00000000000000000{i}", name=name, created_at=datetime.now(tz=UTC)))
+        # A record of a deleted thread, and an old name of a thread that was renamed since.
+        for name, thread_id in [("python a", "01DXF6DT000000000000000009"), ("python b", "01DXF6DT000000000000000001")]:
+            table.put_item(Item={"thread_id": "ThreadName#p", "post_id": name, "name_thread_id": thread_id})
+
+        actual = repository.search_by_name("python", limit=len(names))
+
+        assert [thread.name for thread in actual] == names
 
     def test_find_by_id_successful(self, table: Table) -> None:
         """Test the find_by_id method."""
@@ -106,6 +243,122 @@ class TestDynamoDBThreadRepository:
 
         assert actual is None
 
+    def test_find_by_id_coalesced(self, table: Table, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that concurrent finds of the same thread share a single request, but not the instance."""
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        DynamoDBThreadRepository(table).save(thread)
+        single_flight = SingleFlight()
+        repository = DynamoDBThreadRepository(table, single_flight=single_flight)
+        release = threading.Event()
+        get_item = table.get_item
+        calls = []
+
+        def blocking_get_item(**kwargs: Any) -> Any:  # noqa: ANN401
+            calls.append(kwargs)
+            release.wait(5)
+            return get_item(**kwargs)
+
+        monkeypatch.setattr(table, "get_item", blocking_get_item)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(repository.find_by_id, thread.id_) for _ in range(2)]
+            wait_for_waiters(single_flight, 1)
+            release.set()
+            actual = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert actual == [thread, thread]
+        assert actual[0] is not actual[1]
+
+    def test_find_by_ids(self, table: Table) -> None:
+        """Test the find_by_ids method keeps the order of the IDs and skips missing threads."""
+        for i in range(1, 4):
+            table.put_item(
+                Item={
+                    "thread_id": f"01DXF6DT00000000000000000{i}",
+                    "post_id": "-",
+                    "category": "Thread",
+                    "name": f"Thread{i}",
+                    "created_at": Decimal("1577840461000001"),
+                }
+            )
+
+        repository = DynamoDBThreadRepository(table)
+
+        thread_ids = [
+            ULID.from_str("01DXF6DT000000000000000003"),
+            ULID.from_str("01DXF6DT000000000000000009"),
+            ULID.from_str("01DXF6DT000000000000000001"),
+        ]
+        actual = repository.find_by_ids(thread_ids)
+
+        assert [thread.name for thread in actual] == ["Thread3", "Thread1"]
+
+    def test_find_by_ids_chunked(self, table: Table) -> None:
+        """Test the find_by_ids method with more IDs than a single BatchGetItem call accepts."""
+        thread_ids = [ULID() for _ in range(150)]
+        for i, thread_id in enumerate(thread_ids):
+            table.put_item(
+                Item={
+                    "thread_id": str(thread_id),
+                    "post_id": "-",
+                    "category": "Thread",
+                    "name": f"Thread{i}",
+                    "created_at": Decimal("1577840461000001"),
+                }
+            )
+
+        repository = DynamoDBThreadRepository(table)
+
+        actual = repository.find_by_ids(thread_ids)
+
+        assert [thread.id_ for thread in actual] == thread_ids
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            repository = DynamoDBThreadRepository(table, executor=executor)
+
+            actual = repository.find_by_ids(thread_ids)
+
+        assert [thread.id_ for thread in actual] == thread_ids
+
+    def test_find_by_ids_retries_unprocessed_keys(self, table: Table, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the find_by_ids method retries the unprocessed keys."""
+        for i in range(1, 3):
+            table.put_item(
+                Item={
+                    "thread_id": f"01DXF6DT00000000000000000{i}",
+                    "post_id": "-",
+                    "category": "Thread",
+                    "name": f"Thread{i}",
+                    "created_at": Decimal("1577840461000001"),
+                }
+            )
+
+        client = table.meta.client
+        batch_get_item = client.batch_get_item
+        calls = []
+
+        def partial_batch_get_item(**kwargs: Any) -> Any:  # noqa: ANN401
+            calls.append(kwargs)
+            request = kwargs["RequestItems"][table.name]
+            if len(calls) > 1:
+                return batch_get_item(**kwargs)
+            response = batch_get_item(RequestItems={table.name: {"Keys": request["Keys"][:1]}})
+            response["UnprocessedKeys"] = {table.name: {"Keys": request["Keys"][1:]}}
+            return response
+
+        monkeypatch.setattr(client, "batch_get_item", partial_batch_get_item)
+        monkeypatch.setattr("chat.infrastructure.dynamodb.BATCH_GET_BACKOFF", 0)
+
+        repository = DynamoDBThreadRepository(table)
+
+        actual = repository.find_by_ids(
+            [ULID.from_str("01DXF6DT000000000000000001"), ULID.from_str("01DXF6DT000000000000000002")]
+        )
+
+        assert [thread.name for thread in actual] == ["Thread1", "Thread2"]
+        # The unprocessed key is requested again.
+        assert [len(call["RequestItems"][table.name]["Keys"]) for call in calls] == [2, 1]
+
     def test_list_all(self, table: Table) -> None:
         """Test the list_all method."""
         items = [
@@ -152,6 +405,72 @@ class TestDynamoDBThreadRepository:
 
         assert actual == []
 
+    def test_increment_post_count(self, table: Table) -> None:
+        """Test the increment_post_count method."""
+        thread_id = "01DXF6DT000000000000000000"
+        table.put_item(
+            Item={
+                "thread_id": thread_id,
+                "post_id": "-",
+                "category": "Thread",
+                "name": "Thread1",
+                "created_at": Decimal("1577840461000001"),
+            }
+        )
+
+        repository = DynamoDBThreadRepository(table)
+        posted_at = [datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC), datetime(2020, 1, 3, 1, 1, 1, 1, tzinfo=UTC)]
+        for last_post_at in posted_at:
+            repository.increment_post_count(ULID.from_str(thread_id), last_post_at)
+
+        actual = repository.find_by_id(ULID.from_str(thread_id))
+
+        assert actual
+        assert actual.post_count == len(posted_at)
+        assert actual.last_post_at == datetime(2020, 1, 3, 1, 1, 1, 1, tzinfo=UTC)
+
+    def test_increment_post_count_with_nonexistent_thread(self, table: Table) -> None:
+        """Test the increment_post_count method with a nonexistent thread."""
+        repository = DynamoDBThreadRepository(table)
+
+        with pytest.raises(ThreadNotFoundError, match="01DXF6DT000000000000000000"):
+            repository.increment_post_count(
+                ULID.from_str("01DXF6DT000000000000000000"), datetime(2020, 1, 2, tzinfo=UTC)
+            )
+
+        assert "Item" not in table.get_item(Key={"thread_id": "01DXF6DT000000000000000000", "post_id": "-"})
+
+    def test_decrement_post_count(self, table: Table) -> None:
+        """Test the decrement_post_count method does not go below zero."""
+        thread_id = "01DXF6DT000000000000000000"
+        table.put_item(
+            Item={
+                "thread_id": thread_id,
+                "post_id": "-",
+                "category": "Thread",
+                "name": "Thread1",
+                "created_at": Decimal("1577840461000001"),
+                "post_count": Decimal(1),
+            }
+        )
+
+        repository = DynamoDBThreadRepository(table)
+        repository.decrement_post_count(ULID.from_str(thread_id))
+        repository.decrement_post_count(ULID.from_str(thread_id))
+
+        actual = repository.find_by_id(ULID.from_str(thread_id))
+
+        assert actual
+        assert actual.post_count == 0
+
+    def test_decrement_post_count_with_nonexistent_thread(self, table: Table) -> None:
+        """Test the decrement_post_count method with a nonexistent thread."""
+        repository = DynamoDBThreadRepository(table)
+
+        repository.decrement_post_count(ULID.from_str("01DXF6DT000000000000000000"))
+
+        assert "Item" not in table.get_item(Key={"thread_id": "01DXF6DT000000000000000000", "post_id": "-"})
+
     def test_delete_successful(self, table: Table) -> None:
         """Test the delete method."""
         thread_id = "01DXF6DT000000000000000000"
@@ -171,6 +490,17 @@ class TestDynamoDBThreadRepository:
         actual = table.get_item(Key={"thread_id": thread_id, "post_id": "-"}).get("Item")
         assert actual is None
 
+    def test_delete_releases_name(self, table: Table) -> None:
+        """Test that the delete method releases the name of the thread."""
+        repository = DynamoDBThreadRepository(table)
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime.now(tz=UTC))
+        repository.save(thread)
+
+        repository.delete(thread.id_)
+
+        assert repository.find_by_name("Thread1") is None
+        assert "Item" not in table.get_item(Key={"thread_id": "ThreadName#t", "post_id": "thread1"})
+
     def test_delete_with_nonexistent_thread(self, table: Table) -> None:
         """Test the delete method with a nonexistent thread."""
         repository = DynamoDBThreadRepository(table)
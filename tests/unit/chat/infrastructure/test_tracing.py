@@ -0,0 +1,122 @@
+"""Unit tests for the tracing of the DynamoDB requests."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from aws_lambda_powertools.tracing.base import BaseProvider
+from chat.domain.thread import Thread
+from chat.infrastructure import DynamoDBThreadRepository
+from chat.infrastructure.tracing import TracedTable
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from chat.shared.tracing import InMemoryExporter
+    from mypy_boto3_dynamodb.service_resource import Table
+
+
+class FakeSubsegment:
+    """Stand-in for an X-Ray subsegment."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize the subsegment."""
+        self.name = name
+        self.annotations: dict[str, Any] = {}
+        self.subsegments: list[FakeSubsegment] = []
+
+    def put_annotation(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Annotate the subsegment."""
+        self.annotations[key] = value
+
+
+class FakeRecorder(BaseProvider):
+    """Stand-in for the X-Ray recorder, the tracing provider of Powertools in Lambda."""
+
+    def __init__(self) -> None:
+        """Initialize the recorder with a subsegment of the invocation."""
+        self.root = FakeSubsegment("## handler")
+        self._stack = [self.root]
+
+    @contextmanager
+    def in_subsegment(self, name: str | None = None, **kwargs: Any) -> Iterator[FakeSubsegment]:  # type: ignore[override]  # noqa: ANN401, ARG002
+        """Record the block as a subsegment of the current one."""
+        subsegment = FakeSubsegment(name or "anonymous")
+        self._stack[-1].subsegments.append(subsegment)
+        self._stack.append(subsegment)
+        try:
+            yield subsegment
+        finally:
+            self._stack.pop()
+
+    def in_subsegment_async(self, name: str | None = None, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Not used."""
+        raise NotImplementedError
+
+    def current_subsegment(self) -> FakeSubsegment:
+        """Return the current subsegment."""
+        return self._stack[-1]
+
+    def put_annotation(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Annotate the current subsegment."""
+        self._stack[-1].put_annotation(key, value)
+
+    def put_metadata(self, key: str, value: Any, namespace: str = "default") -> None:  # noqa: ANN401
+        """Not used."""
+
+    def patch(self, modules: Sequence[str]) -> None:
+        """Not used."""
+
+    def patch_all(self) -> None:
+        """Not used."""
+
+
+class TestTracedTable:
+    """Unit tests for the TracedTable class."""
+
+    def test_query(self, table: Table, exporter: InMemoryExporter) -> None:
+        """Test that a query is recorded under the repository method, with its table, index and counts."""
+        DynamoDBThreadRepository(table).save(
+            Thread(id_=ULID(), name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        )
+        exporter.clear()
+        repository = DynamoDBThreadRepository(TracedTable(table))  # type: ignore[arg-type]
+
+        repository.list_all()
+
+        [root] = exporter.spans
+        assert root.name == "## chat.infrastructure.thread.DynamoDBThreadRepository.list_all"
+        assert root.annotations == {"item_count": 1, "page_count": 1}
+        [request] = root.subsegments
+        assert request.name == "## dynamodb.query"
+        assert request.annotations == {"table": "chat", "index": "by_category", "item_count": 1, "page_count": 1}
+
+    def test_batch_get_item(self, table: Table, exporter: InMemoryExporter) -> None:
+        """Test that the requests sent through the client of the table are recorded."""
+        repository = DynamoDBThreadRepository(TracedTable(table))  # type: ignore[arg-type]
+
+        repository.find_by_ids([ULID(), ULID()])
+
+        [root] = exporter.spans
+        assert [request.name for request in root.subsegments] == ["## dynamodb.batch_get_item"]
+        assert root.annotations == {"item_count": 0, "page_count": 0}
+
+    def test_xray_provider(self, table: Table) -> None:
+        """Test that the requests are recorded as subsegments of the X-Ray recorder in Lambda."""
+        recorder = FakeRecorder()
+        repository = DynamoDBThreadRepository(TracedTable(table, provider=recorder))  # type: ignore[arg-type]
+
+        repository.list_all()
+        repository.list_all()
+
+        assert [request.name for request in recorder.root.subsegments] == ["## dynamodb.query"] * 2
+        assert recorder.root.subsegments[0].annotations == {
+            "table": "chat",
+            "index": "by_category",
+            "item_count": 0,
+            "page_count": 1,
+        }
+        assert recorder.root.annotations == {"item_count": 0, "page_count": 2}
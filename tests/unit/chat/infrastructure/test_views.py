@@ -0,0 +1,165 @@
+"""Contract tests that every implementation of the read views must pass."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from boto3.dynamodb.conditions import Attr
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.infrastructure import DynamoDBReadViews, InMemoryReadViews
+from chat.infrastructure.views import RECENT_POST_TTL, THREAD_LIST_KEY, THREAD_POSTS_KEY, VIEW_SHARDS
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from chat.domain.views import AbstractReadViews
+    from mypy_boto3_dynamodb.service_resource import Table
+
+
+def thread(created_at: datetime, *, version: int = 0, post_count: int = 0) -> Thread:
+    """Create a thread created at the given time."""
+    return Thread(
+        id_=ULID.from_datetime(created_at),
+        name="Thread",
+        created_at=created_at,
+        post_count=post_count,
+        version=version,
+    )
+
+
+def post(thread_id: ULID, created_at: datetime) -> Post:
+    """Create a post of the thread created at the given time."""
+    return Post(id_=ULID.from_datetime(created_at), thread_id=thread_id, message="Message", created_at=created_at)
+
+
+@pytest.fixture(params=["dynamodb", "dynamodb_concurrent", "memory"])
+def views(request: pytest.FixtureRequest) -> Iterator[AbstractReadViews]:
+    """The read views of each implementation."""
+    if request.param == "dynamodb":
+        yield DynamoDBReadViews(request.getfixturevalue("table"))
+    elif request.param == "dynamodb_concurrent":
+        with ThreadPoolExecutor() as executor:
+            yield DynamoDBReadViews(request.getfixturevalue("table"), executor=executor)
+    else:
+        yield InMemoryReadViews()
+
+
+class TestReadViews:
+    """Contract tests for the read views."""
+
+    def test_save_thread(self, views: AbstractReadViews) -> None:
+        """Test that the threads are listed in the order of their IDs, with their latest counters."""
+        now = datetime.now(UTC)
+        second, first = thread(now), thread(now - timedelta(days=1))
+        views.save_thread(second)
+        views.save_thread(first)
+        views.save_thread(first.model_copy(update={"post_count": 2, "last_post_at": now, "version": 1}))
+
+        actual = views.list_threads()
+
+        assert [t.id_ for t in actual] == [first.id_, second.id_]
+        assert (actual[0].post_count, actual[0].last_post_at, actual[0].version) == (2, now, 1)
+
+    def test_save_thread_older_version(self, views: AbstractReadViews) -> None:
+        """Test that an older version of a thread, delivered late, does not replace the later one."""
+        saved = thread(datetime.now(UTC), version=2, post_count=2)
+        views.save_thread(saved)
+        views.save_thread(saved.model_copy(update={"version": 1, "post_count": 1}))
+        views.save_thread(saved)
+
+        assert views.list_threads() == [saved]
+
+    def test_delete_thread(self, views: AbstractReadViews) -> None:
+        """Test that a deleted thread is removed along with its posts in the feed, and the others are kept."""
+        now = datetime.now(UTC)
+        deleted, kept = thread(now - timedelta(days=1)), thread(now)
+        views.save_thread(deleted)
+        views.save_thread(kept)
+        kept_post = post(kept.id_, now)
+        for saved in [post(deleted.id_, now - timedelta(seconds=1)), kept_post, post(deleted.id_, now)]:
+            views.save_recent_post(saved)
+
+        views.delete_thread(deleted.id_)
+        views.delete_thread(deleted.id_)
+
+        assert views.list_threads() == [kept]
+        assert views.list_recent_posts(limit=10) == [kept_post]
+
+    def test_recent_posts(self, views: AbstractReadViews) -> None:
+        """Test that the latest posts are listed newest first, up to the limit."""
+        now = datetime.now(UTC)
+        thread_id = ULID()
+        posts = [post(thread_id, now - timedelta(minutes=minutes)) for minutes in range(5)]
+        for saved in reversed(posts):
+            views.save_recent_post(saved)
+        views.save_recent_post(posts[0])
+
+        assert views.list_recent_posts(limit=3) == posts[:3]
+        assert views.list_recent_posts(limit=10) == posts
+
+    def test_recent_posts_expired(self, views: AbstractReadViews) -> None:
+        """Test that the posts past the TTL of the feed are not listed."""
+        now = datetime.now(UTC)
+        thread_id = ULID()
+        recent = post(thread_id, now)
+        views.save_recent_post(post(thread_id, now - RECENT_POST_TTL - timedelta(minutes=1)))
+        views.save_recent_post(recent)
+
+        assert views.list_recent_posts(limit=10) == [recent]
+
+    def test_delete_recent_post(self, views: AbstractReadViews) -> None:
+        """Test that a deleted post is removed from the feed, and deleting it again does nothing."""
+        now = datetime.now(UTC)
+        thread_id = ULID()
+        deleted, kept = post(thread_id, now), post(thread_id, now - timedelta(seconds=1))
+        views.save_recent_post(deleted)
+        views.save_recent_post(kept)
+
+        views.delete_recent_post(deleted)
+        views.delete_recent_post(deleted)
+
+        assert views.list_recent_posts(limit=10) == [kept]
+
+    def test_empty(self, views: AbstractReadViews) -> None:
+        """Test that the views are empty initially."""
+        assert views.list_threads() == []
+        assert views.list_recent_posts(limit=10) == []
+
+
+class TestDynamoDBReadViews:
+    """Tests for the layout of the read views in DynamoDB."""
+
+    def test_threads_sharded(self, table: Table) -> None:
+        """Test that the thread list is spread over the shards, and listed in the order of the IDs."""
+        views = DynamoDBReadViews(table)
+        now = datetime.now(UTC)
+        threads = [thread(now - timedelta(minutes=minutes)) for minutes in range(64)]
+        for saved in threads:
+            views.save_thread(saved)
+
+        items = table.scan(FilterExpression=Attr("thread_id").begins_with(THREAD_LIST_KEY))["Items"]
+
+        assert {item["thread_id"] for item in items} == {f"{THREAD_LIST_KEY}#{shard}" for shard in range(VIEW_SHARDS)}
+        assert views.list_threads() == sorted(threads, key=lambda t: t.id_)
+
+    def test_delete_thread_entries(self, table: Table) -> None:
+        """Test that the feed entries of a thread are found from its own partition, which is emptied too."""
+        views = DynamoDBReadViews(table)
+        now = datetime.now(UTC)
+        deleted = thread(now)
+        posts = [post(deleted.id_, now - timedelta(seconds=seconds)) for seconds in range(3)]
+        for saved in posts:
+            views.save_recent_post(saved)
+        partition = f"{THREAD_POSTS_KEY}#{deleted.id_}"
+
+        items = table.scan(FilterExpression=Attr("thread_id").eq(partition))["Items"]
+        assert sorted(item["post_id"] for item in items) == sorted(str(p.id_) for p in posts)
+
+        views.delete_thread(deleted.id_)
+
+        assert table.scan(FilterExpression=Attr("thread_id").begins_with("View#"))["Items"] == []
@@ -0,0 +1,199 @@
+"""Tests for the concurrency helpers."""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from chat.shared.concurrency import SingleFlight, run_concurrently, submit
+
+
+def wait_for_waiters(single_flight: SingleFlight, count: int) -> None:
+    """Wait until the given number of callers wait for a call in flight."""
+    deadline = time.monotonic() + 5
+    while single_flight._saved < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestSubmit:
+    """Tests for the submit function."""
+
+    def test_submit(self) -> None:
+        """Test that the call runs on a worker of the executor."""
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="test") as executor:
+            future = submit(executor, "test", lambda: threading.current_thread().name)
+
+            assert future.result().startswith("test")
+
+    def test_submit_with_context(self) -> None:
+        """Test that the call runs in the context of the submitter."""
+        variable: contextvars.ContextVar[str] = contextvars.ContextVar("variable", default="default")
+        token = variable.set("submitter")
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = submit(executor, "test", variable.get)
+
+                assert future.result() == "submitter"
+        finally:
+            variable.reset(token)
+
+    def test_submit_from_worker(self) -> None:
+        """Test that a call submitted from a worker of the same executor runs inline."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+
+            def outer() -> list[int]:
+                # With a single worker, queueing the inner calls would deadlock.
+                return run_concurrently(executor, [lambda: 1, lambda: 2], name="inner")
+
+            assert submit(executor, "outer", outer).result(timeout=5) == [1, 2]
+
+    def test_submit_from_worker_with_exception(self) -> None:
+        """Test that the exception of an inline call is set on its future."""
+        error_message = "failed"
+
+        def fail() -> None:
+            raise ValueError(error_message)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = submit(executor, "outer", lambda: submit(executor, "inner", fail)).result()
+
+            assert isinstance(future.exception(), ValueError)
+
+
+class TestRunConcurrently:
+    """Tests for the run_concurrently function."""
+
+    def test_run_concurrently(self) -> None:
+        """Test that the results are returned in the order of the calls."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            calls = [lambda i=i: i * 2 for i in range(10)]
+
+            assert run_concurrently(executor, calls, name="test") == [i * 2 for i in range(10)]
+
+    def test_run_concurrently_with_exception(self) -> None:
+        """Test that the exception of a failed call is raised and the calls not started are cancelled."""
+        error_message = "failed"
+        started = threading.Event()
+        release = threading.Event()
+        ran: list[int] = []
+
+        def block() -> None:
+            started.set()
+            release.wait(5)
+
+        def fail() -> None:
+            started.wait(5)
+            raise ValueError(error_message)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with pytest.raises(ValueError, match=error_message):
+                run_concurrently(executor, [block, fail, lambda: ran.append(1)], name="test")
+            release.set()
+
+        assert ran == []
+
+    def test_run_concurrently_with_timeout(self) -> None:
+        """Test that TimeoutError is raised when the calls do not finish before the deadline."""
+        release = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(TimeoutError):
+                run_concurrently(executor, [lambda: release.wait(5)], name="test", timeout=0.01)
+            release.set()
+
+
+class TestSingleFlight:
+    """Tests for the SingleFlight class."""
+
+    def test_do(self) -> None:
+        """Test that the concurrent calls with the same key share a single call."""
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls: list[int] = []
+
+        def call() -> list[int]:
+            calls.append(1)
+            release.wait(5)
+            return [1, 2]
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(single_flight.do, "key", call)
+            followers = [executor.submit(single_flight.do, "key", call, share=list) for _ in range(2)]
+            wait_for_waiters(single_flight, 2)
+            release.set()
+
+            result = leader.result()
+            shared = [follower.result() for follower in followers]
+
+        assert calls == [1]
+        assert shared == [result, result]
+        assert all(copy is not result for copy in shared)
+        assert single_flight.collect_metrics() == {"CoalescedCalls": 2}
+        assert single_flight.collect_metrics() == {"CoalescedCalls": 0}
+
+    def test_do_leader_mutates_result(self) -> None:
+        """Test that the changes the leader makes to its result are not seen by the waiting callers."""
+        single_flight = SingleFlight()
+        release, mutated = threading.Event(), threading.Event()
+        leader_thread: list[threading.Thread] = []
+
+        def call() -> list[int]:
+            leader_thread.append(threading.current_thread())
+            release.wait(5)
+            return [1, 2]
+
+        def share(result: list[int]) -> list[int]:
+            if threading.current_thread() not in leader_thread:
+                mutated.wait(5)
+            return list(result)
+
+        def lead() -> list[int]:
+            result = single_flight.do("key", call, share=share)
+            result.append(3)
+            mutated.set()
+            return result
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(lead)
+            while not leader_thread:
+                time.sleep(0.001)
+            followers = [executor.submit(single_flight.do, "key", call, share=share) for _ in range(2)]
+            wait_for_waiters(single_flight, 2)
+            release.set()
+
+            assert leader.result() == [1, 2, 3]
+            assert [follower.result() for follower in followers] == [[1, 2], [1, 2]]
+
+    def test_do_with_exception(self) -> None:
+        """Test that the exception of the call is raised to every caller."""
+        single_flight = SingleFlight()
+        release = threading.Event()
+        error_message = "failed"
+
+        def call() -> None:
+            release.wait(5)
+            raise ValueError(error_message)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(single_flight.do, "key", call) for _ in range(2)]
+            wait_for_waiters(single_flight, 1)
+            release.set()
+
+            for future in futures:
+                with pytest.raises(ValueError, match=error_message):
+                    future.result()
+
+    def test_do_not_cached(self) -> None:
+        """Test that the calls with different keys, or after the previous call, run again."""
+        single_flight = SingleFlight()
+        calls: list[str] = []
+
+        assert single_flight.do("key1", lambda: calls.append("key1")) is None
+        assert single_flight.do("key1", lambda: calls.append("key1")) is None
+        assert single_flight.do("key2", lambda: calls.append("key2")) is None
+
+        assert calls == ["key1", "key1", "key2"]
+        assert single_flight.collect_metrics() == {"CoalescedCalls": 0}
@@ -0,0 +1,102 @@
+"""Tests for the memory tracking helpers."""
+
+from __future__ import annotations
+
+import json
+import tracemalloc
+from datetime import UTC, datetime
+
+import pytest
+from chat.domain.post import Post
+from chat.shared.memory import MemoryReport, MemoryTracker
+from chat.use_case import PostDTO
+from ulid import ULID
+
+
+def posts(count: int) -> list[Post]:
+    """Create posts of a thread."""
+    thread_id = ULID()
+    return [
+        Post(id_=ULID(), thread_id=thread_id, message="a" * 100, created_at=datetime.now(UTC)) for _ in range(count)
+    ]
+
+
+class TestMemoryTracker:
+    """Tests for the MemoryTracker class."""
+
+    def test_track(self) -> None:
+        """Test that the peak, the allocation sites and the objects at the peak are reported."""
+        reports: list[MemoryReport] = []
+        top = 3
+        tracker = MemoryTracker(1, top=top, on_report=reports.append)
+
+        with tracker.track("GET /threads/{thread_id}/posts"):
+            listed = posts(1_000)
+            dtos = [PostDTO.from_model(post) for post in listed]
+
+        [report] = reports
+        assert report.name == "GET /threads/{thread_id}/posts"
+        assert report.peak_kib >= report.retained_kib > 0
+        assert len(report.top_sites) == top
+        assert all(site.size_kib > 0 for site in report.top_sites)
+        assert report.objects["chat.domain.post.Post"] == len(listed)
+        assert report.objects["chat.use_case.dto.PostDTO"] == len(dtos)
+        assert not any(name.startswith("chat.shared.memory") for name in report.objects)
+        assert not tracemalloc.is_tracing()
+        assert json.dumps(report.to_dict())
+        assert report.to_metrics() == {"PeakMemory": report.peak_kib, "RetainedMemory": report.retained_kib}
+
+    def test_track_peak(self) -> None:
+        """Test that the objects freed before the end of the block still count at the peak."""
+        reports: list[MemoryReport] = []
+        tracker = MemoryTracker(1, interval=0.001, on_report=reports.append)
+
+        with tracker.track("request"):
+            listed = posts(5_000)
+            del listed
+
+        [report] = reports
+        assert report.peak_kib > report.retained_kib
+        assert report.objects.get("chat.domain.post.Post", 0) > 0
+
+    def test_track_already_tracing(self) -> None:
+        """Test that the tracing started by someone else is left running, and only the block counts."""
+        reports: list[MemoryReport] = []
+        tracker = MemoryTracker(1, on_report=reports.append)
+        before = posts(1_000)
+
+        tracemalloc.start()
+        try:
+            with tracker.track("request"):
+                listed = posts(10)
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+        # Only the few posts listed in the block are retained, not the ones listed before.
+        max_retained_kib = 100
+        [report] = reports
+        assert report.objects["chat.domain.post.Post"] == len(before) + len(listed)
+        assert 0 < report.retained_kib < max_retained_kib
+
+    def test_track_not_picked(self) -> None:
+        """Test that nothing is reported for the invocations that are not picked."""
+        reports: list[MemoryReport] = []
+        tracker = MemoryTracker(0, on_report=reports.append)
+
+        with tracker.track("request"):
+            posts(10)
+
+        assert reports == []
+        assert not tracemalloc.is_tracing()
+
+    def test_track_with_exception(self) -> None:
+        """Test that the invocations that fail are still reported."""
+        reports: list[MemoryReport] = []
+        tracker = MemoryTracker(1, on_report=reports.append)
+
+        with pytest.raises(ValueError, match="failed"), tracker.track("request"):
+            raise ValueError("failed")  # noqa: EM101
+
+        assert len(reports) == 1
+        assert not tracemalloc.is_tracing()
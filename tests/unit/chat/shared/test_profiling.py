@@ -0,0 +1,118 @@
+"""Tests for the profiling helpers."""
+
+from __future__ import annotations
+
+import json
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.shared.concurrency import run_concurrently
+from chat.shared.profiling import Profiler, ProfileReport
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def busy() -> int:
+    """Keep the interpreter busy in pure Python code, so it is sampled."""
+    total = 0
+    for i in range(1_000_000):
+        total += i % 7
+    return total
+
+
+class TestProfiler:
+    """Tests for the Profiler class."""
+
+    @pytest.mark.parametrize(
+        ("sample_rate", "force", "expected"), [(0, False, False), (0, True, True), (1, False, True)]
+    )
+    def test_should_profile(self, sample_rate: float, force: bool, expected: bool) -> None:  # noqa: FBT001
+        """Test that the invocations are profiled when forced or picked by the sample rate."""
+        assert Profiler(sample_rate).should_profile(force=force) is expected
+
+    def test_profile_deterministic(self, tmp_path: Path) -> None:
+        """Test that the deterministic profile is written as a pstats file and summarized."""
+        reports: list[ProfileReport] = []
+        top = 3
+        profiler = Profiler(1, output_dir=tmp_path, top=top, on_report=reports.append)
+
+        with profiler.profile("request/1"):
+            busy()
+            json.dumps({"value": 1})
+
+        [report] = reports
+        assert report.mode == "deterministic"
+        assert report.path.parent == tmp_path
+        assert report.path.name.endswith("-request_1.pstats")
+        assert len(report.hot_spots) == top
+        assert any("busy" in spot.function for spot in report.hot_spots)
+        assert "json" in report.packages
+        stats = pstats.Stats(str(report.path))
+        assert any(function == "busy" for _, _, function in stats.stats)  # type: ignore[attr-defined]
+        assert json.dumps(report.to_dict())
+
+    def test_profile_sampling(self, tmp_path: Path) -> None:
+        """Test that the sampled stacks of the invoking thread and the busy workers are written as collapsed stacks."""
+        reports: list[ProfileReport] = []
+        profiler = Profiler(1, mode="sampling", output_dir=tmp_path, on_report=reports.append)
+
+        with ThreadPoolExecutor(max_workers=2) as executor, profiler.profile("request"):
+            run_concurrently(executor, [busy, busy], name="test")
+
+        [report] = reports
+        assert report.mode == "sampling"
+        assert report.path.suffix == ".collapsed"
+        stacks = [line.rsplit(" ", 1) for line in report.path.read_text().splitlines()]
+        assert stacks
+        assert all(int(count) > 0 for _, count in stacks)
+        assert any(stack.endswith(f"{__name__}.busy") for stack, _ in stacks)
+        assert any(stack.startswith("ThreadPoolExecutor") for stack, _ in stacks)
+        assert report.hot_spots[0].calls is None
+
+    def test_profile_keeps_latest(self, tmp_path: Path) -> None:
+        """Test that only the latest profiles are kept in the output directory."""
+        reports: list[ProfileReport] = []
+        profiler = Profiler(1, output_dir=tmp_path, keep=2, on_report=reports.append)
+
+        for i in range(3):
+            with profiler.profile(f"request{i}"):
+                json.dumps({"value": i})
+
+        assert sorted(tmp_path.iterdir()) == sorted(report.path for report in reports[1:])
+
+    def test_profile_not_picked(self, tmp_path: Path) -> None:
+        """Test that nothing is written for the invocations that are not picked."""
+        reports: list[ProfileReport] = []
+        profiler = Profiler(0, output_dir=tmp_path, on_report=reports.append)
+
+        with profiler.profile("request"):
+            busy()
+
+        assert reports == []
+        assert list(tmp_path.iterdir()) == []
+
+    def test_profile_with_exception(self, tmp_path: Path) -> None:
+        """Test that the invocations that fail are still profiled."""
+        reports: list[ProfileReport] = []
+        profiler = Profiler(1, output_dir=tmp_path, on_report=reports.append)
+
+        with pytest.raises(ValueError, match="failed"), profiler.profile("request"):
+            raise ValueError("failed")  # noqa: EM101
+
+        assert len(reports) == 1
+        assert reports[0].path.exists()
+
+    def test_profile_unwritable(self, tmp_path: Path) -> None:
+        """Test that the invocation succeeds when the profile cannot be written."""
+        reports: list[ProfileReport] = []
+        output_dir = tmp_path / "file"
+        output_dir.touch()
+        profiler = Profiler(1, output_dir=output_dir, on_report=reports.append)
+
+        with profiler.profile("request"):
+            busy()
+
+        assert reports == []
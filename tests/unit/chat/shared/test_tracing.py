@@ -0,0 +1,175 @@
+"""Tests for the tracing helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.shared.concurrency import run_concurrently
+from chat.shared.tracing import (
+    FileExporter,
+    InMemoryExporter,
+    LocalTracer,
+    Span,
+    _traced_by_xray,
+    current_span,
+    local_tracer,
+    tracer,
+)
+from chat.use_case import CreateThread, CreateThreadCommand
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from chat.infrastructure import InMemoryThreadRepository
+
+
+@tracer.capture_method(capture_response=False)
+def traced(value: int) -> int:
+    """Function traced with the shared tracer."""
+    current_span().put_annotation("value", value)
+    return value
+
+
+class TestLocalTracer:
+    """Tests for the LocalTracer class."""
+
+    def test_in_subsegment(self) -> None:
+        """Test that the nested spans are exported as a single trace."""
+        exporter = InMemoryExporter()
+        provider = LocalTracer(exporter)
+
+        with provider.in_subsegment("root") as root:
+            provider.put_annotation("endpoint", "GET /threads")
+            with provider.in_subsegment("child") as child:
+                child.add_annotation("item_count", 2)
+                root.add_annotation("item_count", 2)
+                root.add_annotation("item_count", 3)
+
+        assert exporter.spans == [root]
+        assert root.subsegments == [child]
+        assert root.annotations == {"endpoint": "GET /threads", "item_count": 5}
+        assert child.annotations == {"item_count": 2}
+        assert root.duration_ms is not None
+        assert child.duration_ms is not None
+        assert root.duration_ms >= child.duration_ms
+
+    def test_in_subsegment_with_exception(self) -> None:
+        """Test that the exception raised in a span is recorded, and the trace is still exported."""
+        exporter = InMemoryExporter()
+        provider = LocalTracer(exporter)
+
+        with pytest.raises(ValueError, match="failed"), provider.in_subsegment("root"):
+            raise ValueError("failed")  # noqa: EM101
+
+        assert exporter.spans[0].error == "ValueError: failed"
+
+    def test_in_subsegment_without_exporter(self) -> None:
+        """Test that nothing is recorded without an exporter."""
+        provider = LocalTracer()
+
+        with provider.in_subsegment("root") as span:
+            span.put_annotation("endpoint", "GET /threads")
+
+        assert span.annotations == {}
+        assert current_span() is span
+
+    def test_in_subsegment_across_threads(self) -> None:
+        """Test that the calls submitted to an executor are recorded under the span that submitted them."""
+        exporter = InMemoryExporter()
+        provider = LocalTracer(exporter)
+
+        def call(name: str) -> None:
+            with provider.in_subsegment(name):
+                pass
+
+        with ThreadPoolExecutor(max_workers=2) as executor, provider.in_subsegment("root") as root:
+            run_concurrently(executor, [lambda: call("a"), lambda: call("b")], name="test")
+
+        assert exporter.spans == [root]
+        assert sorted(span.name for span in root.subsegments) == ["a", "b"]
+
+    def test_in_subsegment_async(self) -> None:
+        """Test that the async spans are recorded like the others."""
+        exporter = InMemoryExporter()
+        provider = LocalTracer(exporter)
+
+        def child() -> None:
+            with provider.in_subsegment("child"):
+                pass
+
+        async def run() -> None:
+            async with provider.in_subsegment_async("root"):
+                await asyncio.to_thread(child)
+
+        asyncio.run(run())
+
+        assert [span.name for span in exporter.spans] == ["root"]
+        assert [span.name for span in exporter.spans[0].subsegments] == ["child"]
+
+
+class TestTracer:
+    """Tests for the shared tracer."""
+
+    def test_capture_method(self, exporter: InMemoryExporter) -> None:
+        """Test that the methods captured with the Powertools decorator are recorded."""
+        assert traced(1) == 1
+
+        assert [span.name for span in exporter.spans] == [f"## {__name__}.traced"]
+        assert exporter.spans[0].annotations == {"value": 1}
+
+    def test_capture_method_use_case(
+        self, exporter: InMemoryExporter, thread_repository: InMemoryThreadRepository
+    ) -> None:
+        """Test that the use cases are traced."""
+        CreateThread(thread_repository).execute(CreateThreadCommand(name="Thread1"))
+
+        assert [span.name for span in exporter.spans] == ["## chat.use_case.create_thread.CreateThread.execute"]
+
+    def test_local_provider(self) -> None:
+        """Test that the spans are recorded in process outside Lambda."""
+        assert tracer.provider is local_tracer
+
+    @pytest.mark.parametrize(
+        ("environ", "expected"),
+        [
+            ({}, False),
+            ({"AWS_LAMBDA_FUNCTION_NAME": "chat"}, True),
+            ({"AWS_LAMBDA_FUNCTION_NAME": "chat", "TRACE_EXPORT_FILE": "/tmp/traces.jsonl"}, False),  # noqa: S108
+        ],
+    )
+    def test_traced_by_xray(self, monkeypatch: pytest.MonkeyPatch, environ: dict[str, str], expected: bool) -> None:  # noqa: FBT001
+        """Test that the traces are sent to X-Ray in Lambda, unless they are exported to a file."""
+        monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+        monkeypatch.delenv("TRACE_EXPORT_FILE", raising=False)
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+
+        assert _traced_by_xray() is expected
+
+
+class TestFileExporter:
+    """Tests for the FileExporter class."""
+
+    def test_export(self, tmp_path: Path) -> None:
+        """Test that every trace is appended to the file as a JSON line."""
+        path = tmp_path / "traces.jsonl"
+        exporter = FileExporter(path)
+        root = Span("root")
+        root.put_annotation("endpoint", "GET /threads")
+        root.put_metadata("response", {"id": 1})
+        root.add_subsegment(Span("child"))
+        root.close()
+
+        exporter.export(root)
+        exporter.export(Span("another"))
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["root", "another"]
+        assert lines[0]["annotations"] == {"endpoint": "GET /threads"}
+        assert lines[0]["metadata"] == {"default": {"response": "{'id': 1}"}}
+        assert [child["name"] for child in lines[0]["subsegments"]] == ["child"]
+        assert lines[0]["duration_ms"] >= 0
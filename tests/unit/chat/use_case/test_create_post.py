@@ -7,11 +7,27 @@ from typing import TYPE_CHECKING
 
 import pytest
 from chat.domain.thread import Thread
-from chat.shared.exceptions import ThreadNotFoundError
+from chat.infrastructure import BufferedPostRepository, InMemoryPostRepository
+from chat.shared.exceptions import ServiceUnavailableError, ThreadNotFoundError
 from chat.use_case import CreatePost, CreatePostCommand, PostDTO
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryPostRepository, InMemoryThreadRepository
+    from collections.abc import Iterable
+
+    from chat.domain.post import Post
+    from chat.infrastructure import InMemoryPostSearchIndex, InMemoryThreadRepository
+
+
+class UnavailablePostRepository(InMemoryPostRepository):
+    """In-memory post repository whose writes fail."""
+
+    def save(self, post: Post) -> None:  # noqa: ARG002
+        """Fail the write."""
+        raise ServiceUnavailableError(1)
+
+    def save_all(self, posts: Iterable[Post]) -> None:  # noqa: ARG002
+        """Fail the write."""
+        raise ServiceUnavailableError(1)
 
 
 class TestCreatePost:
@@ -34,6 +50,43 @@ class TestCreatePost:
         assert actual.thread_id == thread_id
         assert actual.message == "New Message"
 
+        updated = thread_repository.find_by_id(thread.id_)
+        assert updated
+        assert updated.post_count == 1
+        assert updated.last_post_at == actual.created_at
+
+    def test_execute_indexes_post(
+        self,
+        thread_repository: InMemoryThreadRepository,
+        post_repository: InMemoryPostRepository,
+        post_search_index: InMemoryPostSearchIndex,
+    ) -> None:
+        """Test that the new post is added to the search index."""
+        thread_id = "01DXF6DT000000000000000000"
+        thread = Thread(id_=thread_id, name="Thread1", created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC))
+        thread_repository.save(thread)
+
+        command = CreatePostCommand(thread_id=thread_id, message="New Message")
+        use_case = CreatePost(thread_repository, post_repository, post_search_index)
+
+        actual = use_case.execute(command)
+
+        assert [post.id_ for post in post_search_index.search(["message"], limit=10)] == [actual.id_]
+
+    def test_execute_save_fails(
+        self, thread_repository: InMemoryThreadRepository, post_search_index: InMemoryPostSearchIndex
+    ) -> None:
+        """Test that the counters and the search index are left as they are if the post cannot be saved."""
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        thread_repository.save(thread)
+        use_case = CreatePost(thread_repository, UnavailablePostRepository(), post_search_index)
+
+        with pytest.raises(ServiceUnavailableError):
+            use_case.execute(CreatePostCommand(thread_id=thread.id_, message="New Message"))
+
+        assert thread_repository.find_by_id(thread.id_) == thread
+        assert post_search_index.search(["message"], limit=10) == []
+
     def test_execute_with_nonexistent_thread(
         self, thread_repository: InMemoryThreadRepository, post_repository: InMemoryPostRepository
     ) -> None:
@@ -57,3 +110,40 @@ class TestCreatePost:
 
         with pytest.raises(ValueError, match=r".*empty.*"):
             use_case.execute(command)
+
+    def test_execute_buffered(
+        self, thread_repository: InMemoryThreadRepository, post_search_index: InMemoryPostSearchIndex
+    ) -> None:
+        """Test that the counters and the search index are written with the buffered post."""
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        thread_repository.save(thread)
+        post_repository = BufferedPostRepository(InMemoryPostRepository())
+        use_case = CreatePost(thread_repository, post_repository, post_search_index)
+
+        actual = use_case.execute(CreatePostCommand(thread_id=thread.id_, message="New Message"))
+
+        assert thread_repository.find_by_id(thread.id_) == thread
+        assert post_search_index.search(["message"], limit=10) == []
+        post_repository.flush()
+        updated = thread_repository.find_by_id(thread.id_)
+        assert updated
+        assert (updated.post_count, updated.last_post_at) == (1, actual.created_at)
+        assert [post.id_ for post in post_search_index.search(["message"], limit=10)] == [actual.id_]
+
+    def test_execute_buffered_flush_fails(
+        self, thread_repository: InMemoryThreadRepository, post_search_index: InMemoryPostSearchIndex
+    ) -> None:
+        """Test that neither the counters nor the search index record a buffered post that is never written."""
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        thread_repository.save(thread)
+        post_repository = BufferedPostRepository(UnavailablePostRepository())
+        use_case = CreatePost(thread_repository, post_repository, post_search_index)
+        use_case.execute(CreatePostCommand(thread_id=thread.id_, message="New Message"))
+
+        with pytest.raises(ServiceUnavailableError):
+            post_repository.flush()
+
+        updated = thread_repository.find_by_id(thread.id_)
+        assert updated
+        assert (updated.post_count, updated.last_post_at) == (0, None)
+        assert post_search_index.search(["message"], limit=10) == []
@@ -11,7 +11,7 @@ from chat.shared.exceptions import ThreadExistsError
 from chat.use_case import CreateThread, CreateThreadCommand, ThreadDTO
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryThreadRepository
+    from chat.infrastructure import InMemoryThreadRepository
 
 
 class TestCreateThread:
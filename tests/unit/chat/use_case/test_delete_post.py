@@ -7,19 +7,30 @@ from typing import TYPE_CHECKING
 
 import pytest
 from chat.domain.post import Post
+from chat.domain.thread import Thread
 from chat.shared.exceptions import PostNotFoundError
 from chat.use_case import DeletePost, DeletePostCommand
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryPostRepository
+    from chat.infrastructure import InMemoryPostRepository, InMemoryPostSearchIndex, InMemoryThreadRepository
 
 
 class TestDeletePost:
     """Unit tests for the DeletePost use case."""
 
-    def test_execute_successful(self, post_repository: InMemoryPostRepository) -> None:
+    def test_execute_successful(
+        self, thread_repository: InMemoryThreadRepository, post_repository: InMemoryPostRepository
+    ) -> None:
         """Test the execution of the use case."""
         thread_id = "01DXF6DT000000000000000000"
+        thread = Thread(
+            id_=thread_id,
+            name="Thread1",
+            created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC),
+            post_count=1,
+            last_post_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+        )
+        thread_repository.save(thread)
         post = Post(
             id_="01DXHRTH000000000000000000",
             thread_id=thread_id,
@@ -29,16 +40,49 @@ class TestDeletePost:
         post_repository.save(post)
 
         command = DeletePostCommand(thread_id=thread_id, post_id="01DXHRTH000000000000000000")
-        use_case = DeletePost(post_repository)
+        use_case = DeletePost(thread_repository, post_repository)
+
+        use_case.execute(command)
+
+        actual = thread_repository.find_by_id(thread.id_)
+        assert actual
+        assert actual.post_count == 0
+
+    def test_execute_removes_post_from_index(
+        self,
+        thread_repository: InMemoryThreadRepository,
+        post_repository: InMemoryPostRepository,
+        post_search_index: InMemoryPostSearchIndex,
+    ) -> None:
+        """Test that the deleted post is removed from the search index."""
+        thread_id = "01DXF6DT000000000000000000"
+        thread_repository.save(
+            Thread(id_=thread_id, name="Thread1", created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC))
+        )
+        post = Post(
+            id_="01DXHRTH000000000000000000",
+            thread_id=thread_id,
+            message="Message1",
+            created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+        )
+        post_repository.save(post)
+        post_search_index.add(post)
+
+        command = DeletePostCommand(thread_id=thread_id, post_id=post.id_)
+        use_case = DeletePost(thread_repository, post_repository, post_search_index)
 
         use_case.execute(command)
 
-    def test_execute_with_nonexistent_post(self, post_repository: InMemoryPostRepository) -> None:
+        assert post_search_index.search(["message1"], limit=10) == []
+
+    def test_execute_with_nonexistent_post(
+        self, thread_repository: InMemoryThreadRepository, post_repository: InMemoryPostRepository
+    ) -> None:
         """Test the execution of the use case with a non-existent post."""
         thread_id = "01DXF6DT000000000000000000"
         post_id = "01DXHRTH000000000000000000"
         command = DeletePostCommand(thread_id=thread_id, post_id=post_id)
-        use_case = DeletePost(post_repository)
+        use_case = DeletePost(thread_repository, post_repository)
 
         with pytest.raises(PostNotFoundError):
             use_case.execute(command)
@@ -11,7 +11,7 @@ from chat.shared.exceptions import ThreadNotFoundError
 from chat.use_case import DeleteThread, DeleteThreadCommand
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryThreadRepository
+    from chat.infrastructure import InMemoryThreadRepository
 
 
 class TestDeleteThread:
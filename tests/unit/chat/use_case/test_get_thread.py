@@ -9,7 +9,7 @@ from chat.domain.thread import Thread
 from chat.use_case import GetThread, GetThreadCommand, ThreadDTO
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryThreadRepository
+    from chat.infrastructure import InMemoryThreadRepository
 
 
 class TestGetThread:
@@ -0,0 +1,61 @@
+"""Unit tests for the GetThreads use case."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from chat.domain.thread import Thread
+from chat.use_case import GetThreads, GetThreadsCommand, ThreadDTO
+
+if TYPE_CHECKING:
+    from chat.infrastructure import InMemoryThreadRepository
+
+
+class TestGetThreads:
+    """Unit tests for the GetThreads use case."""
+
+    def test_execute_successful(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test the execution of the use case to get threads in the order of the IDs."""
+        threads = [
+            Thread(
+                id_="01DXF6DT000000000000000000",
+                name="Thread1",
+                created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+            Thread(
+                id_="01DXHRTH000000000000000000",
+                name="Thread2",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+        ]
+        for thread in threads:
+            thread_repository.save(thread)
+
+        command = GetThreadsCommand(thread_ids=["01DXHRTH000000000000000000", "01DXF6DT000000000000000000"])
+        use_case = GetThreads(thread_repository)
+
+        actual = use_case.execute(command)
+
+        expected = [
+            ThreadDTO(
+                id_="01DXHRTH000000000000000000",
+                name="Thread2",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+            ThreadDTO(
+                id_="01DXF6DT000000000000000000",
+                name="Thread1",
+                created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+        ]
+        assert actual == expected
+
+    def test_execute_with_no_threads(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test the execution of the use case with nonexistent thread IDs."""
+        command = GetThreadsCommand(thread_ids=["01DXF6DT000000000000000000"])
+        use_case = GetThreads(thread_repository)
+
+        actual = use_case.execute(command)
+
+        assert actual == []
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
@@ -9,7 +10,7 @@ from chat.domain.post import Post
 from chat.use_case import ListPosts, ListPostsCommand, PostDTO
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryPostRepository
+    from chat.infrastructure import InMemoryPostRepository
 
 
 class TestListPosts:
@@ -144,6 +145,42 @@ class TestListPosts:
 
         assert actual == expected
 
+    def test_execute_with_end_time(self, post_repository: InMemoryPostRepository) -> None:
+        """Test the execution of the use case with an end time."""
+        thread_id = "01DXF6DT000000000000000000"
+        posts = [
+            Post(
+                id_="01DXHRTH000000000000000000",
+                thread_id=thread_id,
+                message="Message1",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+            Post(
+                id_="01DXMB78000000000000000000",
+                thread_id=thread_id,
+                message="Message2",
+                created_at=datetime(2020, 1, 3, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+        ]
+        for post in posts:
+            post_repository.save(post)
+
+        command = ListPostsCommand(thread_id=thread_id, end_time=datetime(2020, 1, 3, tzinfo=UTC))
+        use_case = ListPosts(post_repository)
+
+        actual = use_case.execute(command)
+
+        expected = [
+            PostDTO(
+                id_="01DXHRTH000000000000000000",
+                thread_id=thread_id,
+                message="Message1",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+        ]
+
+        assert actual == expected
+
     def test_execute_with_start_time_no_posts(self, post_repository: InMemoryPostRepository) -> None:
         """Test the execution of the use case with a start time and no posts."""
         thread_id = "01DXF6DT000000000000000000"
@@ -170,3 +207,64 @@ class TestListPosts:
         actual = use_case.execute(command)
 
         assert actual == []
+
+    def test_execute_with_limit_and_cursor(self, post_repository: InMemoryPostRepository) -> None:
+        """Test the execution of the use case with a limit and a cursor."""
+        thread_id = "01DXF6DT000000000000000000"
+        for i in range(1, 4):
+            post_repository.save(
+                Post(
+                    id_=f"01DXHRTH00000000000000000{i}",
+                    thread_id=thread_id,
+                    message=f"Message{i}",
+                    created_at=datetime(2020, 1, 2, 1, 1, 1, i, tzinfo=UTC),
+                )
+            )
+
+        command = ListPostsCommand(thread_id=thread_id, limit=1, cursor="01DXHRTH000000000000000001")
+        use_case = ListPosts(post_repository)
+
+        actual = use_case.execute(command)
+
+        assert [post.message for post in actual] == ["Message2"]
+
+    def test_stream(self, post_repository: InMemoryPostRepository) -> None:
+        """Test the lazy execution of the use case."""
+        thread_id = "01DXF6DT000000000000000000"
+        posts = [
+            Post(
+                id_="01DXMB78000000000000000000",
+                thread_id=thread_id,
+                message="Message2",
+                created_at=datetime(2020, 1, 3, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+            Post(
+                id_="01DXHRTH000000000000000000",
+                thread_id=thread_id,
+                message="Message1",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+        ]
+        for post in posts:
+            post_repository.save(post)
+
+        command = ListPostsCommand(thread_id=thread_id)
+        use_case = ListPosts(post_repository)
+
+        actual = use_case.stream(command)
+
+        assert isinstance(actual, Iterator)
+        assert list(actual) == [
+            PostDTO(
+                id_="01DXHRTH000000000000000000",
+                thread_id=thread_id,
+                message="Message1",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+            PostDTO(
+                id_="01DXMB78000000000000000000",
+                thread_id=thread_id,
+                message="Message2",
+                created_at=datetime(2020, 1, 3, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+        ]
@@ -0,0 +1,39 @@
+"""Unit tests for the ListRecentPosts use case."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from chat.domain.post import Post
+from chat.infrastructure import InMemoryReadViews
+from chat.use_case import ListRecentPosts, ListRecentPostsCommand, PostDTO
+from pydantic import ValidationError
+from ulid import ULID
+
+
+class TestListRecentPosts:
+    """Unit tests for the ListRecentPosts use case."""
+
+    def test_execute_successful(self) -> None:
+        """Test that the latest posts of all threads are listed newest first, up to the limit."""
+        views = InMemoryReadViews()
+        now = datetime.now(UTC)
+        posts = [
+            Post(id_=ULID.from_datetime(created_at), thread_id=ULID(), message="Message", created_at=created_at)
+            for created_at in (now - timedelta(seconds=seconds) for seconds in range(3))
+        ]
+        for post in posts:
+            views.save_recent_post(post)
+        use_case = ListRecentPosts(views)
+
+        actual = use_case.execute(ListRecentPostsCommand(limit=2))
+
+        assert actual == [PostDTO.from_model(post) for post in posts[:2]]
+        assert use_case.execute(ListRecentPostsCommand()) == [PostDTO.from_model(post) for post in posts]
+
+    @pytest.mark.parametrize("limit", [0, 101])
+    def test_invalid_limit(self, limit: int) -> None:
+        """Test that the limit must be between 1 and 100."""
+        with pytest.raises(ValidationError):
+            ListRecentPostsCommand(limit=limit)
@@ -6,10 +6,11 @@ from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 from chat.domain.thread import Thread
+from chat.infrastructure import InMemoryReadViews
 from chat.use_case import ListThreads, ThreadDTO
 
 if TYPE_CHECKING:
-    from tests.unit.chat.conftest import InMemoryThreadRepository
+    from chat.infrastructure import InMemoryThreadRepository
 
 
 class TestListThreads:
@@ -54,3 +55,16 @@ class TestListThreads:
         actual = ListThreads(thread_repository).execute()
 
         assert actual == []
+
+    def test_execute_from_views(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test that the threads are listed from the thread list of the read views, with their counters."""
+        thread = Thread(id_="01DXF6DT000000000000000000", name="Thread1", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        thread_repository.save(thread)
+        views = InMemoryReadViews()
+        use_case = ListThreads(thread_repository, views)
+
+        assert use_case.execute() == []
+
+        views.save_thread(thread.model_copy(update={"post_count": 3}))
+
+        assert [(dto.id_, dto.post_count) for dto in use_case.execute()] == [(thread.id_, 3)]
@@ -0,0 +1,65 @@
+"""Unit tests for the ProjectChanges use case."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+from chat.domain.post import Post
+from chat.domain.thread import Thread
+from chat.domain.views import Change
+from chat.infrastructure import InMemoryReadViews
+from chat.use_case import ProjectChanges
+from ulid import ULID
+
+
+@pytest.fixture()
+def views() -> InMemoryReadViews:
+    """Fixture for in-memory read views."""
+    return InMemoryReadViews()
+
+
+class TestProjectChanges:
+    """Unit tests for the ProjectChanges use case."""
+
+    def test_thread_changes(self, views: InMemoryReadViews) -> None:
+        """Test that the thread list follows the creation, update and deletion of a thread."""
+        use_case = ProjectChanges(views)
+        thread = Thread(id_=ULID(), name="Thread", created_at=datetime.now(UTC), version=1)
+        updated = thread.model_copy(update={"post_count": 1, "last_post_at": datetime.now(UTC), "version": 2})
+
+        use_case.execute(Change(new=thread))
+        use_case.execute(Change(old=thread, new=updated))
+        assert views.list_threads() == [updated]
+
+        use_case.execute(Change(old=thread, new=updated))
+        use_case.execute(Change(new=thread))
+        assert views.list_threads() == [updated]
+
+        use_case.execute(Change(old=updated))
+        assert views.list_threads() == []
+
+    def test_post_changes(self, views: InMemoryReadViews) -> None:
+        """Test that the recent post feed follows the creation and deletion of a post."""
+        use_case = ProjectChanges(views)
+        post = Post(id_=ULID(), thread_id=ULID(), message="Message", created_at=datetime.now(UTC))
+
+        use_case.execute(Change(new=post))
+        use_case.execute(Change(new=post))
+        assert views.list_recent_posts(limit=10) == [post]
+
+        use_case.execute(Change(old=post))
+        assert views.list_recent_posts(limit=10) == []
+
+    def test_thread_deleted_with_posts(self, views: InMemoryReadViews) -> None:
+        """Test that the posts of a deleted thread leave the recent post feed."""
+        use_case = ProjectChanges(views)
+        thread = Thread(id_=ULID(), name="Thread", created_at=datetime.now(UTC))
+        use_case.execute(Change(new=thread))
+        use_case.execute(
+            Change(new=Post(id_=ULID(), thread_id=thread.id_, message="Message", created_at=datetime.now(UTC)))
+        )
+
+        use_case.execute(Change(old=thread))
+
+        assert views.list_recent_posts(limit=10) == []
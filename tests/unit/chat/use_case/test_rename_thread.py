@@ -0,0 +1,105 @@
+"""Unit tests for the RenameThread use case."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.thread import Thread
+from chat.shared.exceptions import ThreadExistsError, ThreadNotFoundError, ThreadVersionConflictError
+from chat.use_case import RenameThread, RenameThreadCommand, ThreadDTO
+from ulid import ULID
+
+if TYPE_CHECKING:
+    from chat.infrastructure import InMemoryThreadRepository
+
+THREAD_ID = ULID.from_str("01DXF6DT000000000000000000")
+
+
+@pytest.fixture()
+def thread(thread_repository: InMemoryThreadRepository) -> Thread:
+    """Fixture for a saved thread."""
+    thread = Thread(id_=THREAD_ID, name="Thread1", created_at=datetime(2020, 1, 1, 1, 1, 1, 1, tzinfo=UTC))
+    thread_repository.save(thread)
+    return thread
+
+
+class TestRenameThread:
+    """Unit tests for the RenameThread use case."""
+
+    @pytest.mark.usefixtures("thread")
+    def test_execute_successful(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test the successful execution of the use case."""
+        use_case = RenameThread(thread_repository)
+
+        actual = use_case.execute(RenameThreadCommand(thread_id=THREAD_ID, name="Thread2"))
+
+        assert isinstance(actual, ThreadDTO)
+        assert actual.name == "Thread2"
+        stored = thread_repository.find_by_id(THREAD_ID)
+        assert stored
+        assert stored.name == "Thread2"
+
+    @pytest.mark.usefixtures("thread")
+    def test_execute_with_concurrent_write(
+        self, thread_repository: InMemoryThreadRepository, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the thread is read again when it is written between the read and the save."""
+        save = thread_repository.save
+        calls = []
+
+        def save_after_post(thread: Thread) -> None:
+            calls.append(thread.version)
+            if len(calls) == 1:
+                thread_repository.increment_post_count(THREAD_ID, datetime(2020, 1, 2, tzinfo=UTC))
+            save(thread)
+
+        monkeypatch.setattr(thread_repository, "save", save_after_post)
+        use_case = RenameThread(thread_repository)
+
+        actual = use_case.execute(RenameThreadCommand(thread_id=THREAD_ID, name="Thread2"))
+
+        assert calls == [1, 2]
+        assert actual.name == "Thread2"
+        assert actual.post_count == 1
+
+    @pytest.mark.usefixtures("thread")
+    def test_execute_with_persistent_conflict(
+        self, thread_repository: InMemoryThreadRepository, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the conflict is raised when every attempt conflicts."""
+
+        def conflict(thread: Thread) -> None:
+            raise ThreadVersionConflictError(thread.id_)
+
+        monkeypatch.setattr(thread_repository, "save", conflict)
+        use_case = RenameThread(thread_repository)
+
+        with pytest.raises(ThreadVersionConflictError):
+            use_case.execute(RenameThreadCommand(thread_id=THREAD_ID, name="Thread2"))
+
+    def test_execute_with_nonexistent_thread(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test the execution of the use case with a nonexistent thread."""
+        use_case = RenameThread(thread_repository)
+
+        with pytest.raises(ThreadNotFoundError):
+            use_case.execute(RenameThreadCommand(thread_id=THREAD_ID, name="Thread2"))
+
+    @pytest.mark.usefixtures("thread")
+    def test_execute_with_existent_thread_name(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test the execution of the use case with the name of another thread."""
+        other = Thread(id_=ULID(), name="Thread2", created_at=datetime(2020, 1, 1, tzinfo=UTC))
+        thread_repository.save(other)
+        use_case = RenameThread(thread_repository)
+
+        with pytest.raises(ThreadExistsError):
+            use_case.execute(RenameThreadCommand(thread_id=THREAD_ID, name="thread2"))
+
+    @pytest.mark.usefixtures("thread")
+    def test_execute_with_empty_thread_name(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test the execution of the use case with an empty thread name."""
+        use_case = RenameThread(thread_repository)
+
+        with pytest.raises(ValueError, match=r".*empty.*"):
+            use_case.execute(RenameThreadCommand(thread_id=THREAD_ID, name=""))
@@ -0,0 +1,49 @@
+"""Unit tests for the retry_on_conflict function."""
+
+from __future__ import annotations
+
+import pytest
+from chat.shared.exceptions import ThreadVersionConflictError
+from chat.use_case import retry_on_conflict
+
+
+class TestRetryOnConflict:
+    """Unit tests for the retry_on_conflict function."""
+
+    def test_retry_on_conflict(self) -> None:
+        """Test that the operation runs again after a conflict."""
+        attempts = []
+        conflicts = 2
+
+        def operation() -> int:
+            attempts.append(1)
+            if len(attempts) <= conflicts:
+                raise ThreadVersionConflictError
+            return len(attempts)
+
+        assert retry_on_conflict(operation) == conflicts + 1
+
+    def test_retry_on_conflict_exhausted(self) -> None:
+        """Test that the conflict of the last attempt is raised."""
+        attempts = []
+
+        def operation() -> None:
+            attempts.append(1)
+            raise ThreadVersionConflictError
+
+        max_attempts = 2
+        with pytest.raises(ThreadVersionConflictError):
+            retry_on_conflict(operation, max_attempts=max_attempts)
+        assert len(attempts) == max_attempts
+
+    def test_retry_on_conflict_other_error(self) -> None:
+        """Test that other errors are not retried."""
+        attempts = []
+
+        def operation() -> None:
+            attempts.append(1)
+            raise ValueError
+
+        with pytest.raises(ValueError):  # noqa: PT011
+            retry_on_conflict(operation)
+        assert len(attempts) == 1
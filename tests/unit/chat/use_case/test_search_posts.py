@@ -0,0 +1,70 @@
+"""Unit tests for the SearchPosts use case."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.post import Post
+from chat.use_case import PostDTO, SearchPosts, SearchPostsCommand
+from pydantic import ValidationError
+
+if TYPE_CHECKING:
+    from chat.infrastructure import InMemoryPostSearchIndex
+
+
+class TestSearchPosts:
+    """Unit tests for the SearchPosts use case."""
+
+    @pytest.fixture()
+    def posts(self, post_search_index: InMemoryPostSearchIndex) -> list[Post]:
+        """Fixture for indexed posts."""
+        posts = [
+            Post(
+                id_="01DXHRTH000000000000000001",
+                thread_id="01DXF6DT000000000000000000",
+                message="Hello World",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 1, tzinfo=UTC),
+            ),
+            Post(
+                id_="01DXHRTH000000000000000002",
+                thread_id="01DXF6DT000000000000000001",
+                message="hello, hello world!",
+                created_at=datetime(2020, 1, 2, 1, 1, 1, 2, tzinfo=UTC),
+            ),
+        ]
+        for post in posts:
+            post_search_index.add(post)
+        return posts
+
+    def test_execute(self, post_search_index: InMemoryPostSearchIndex, posts: list[Post]) -> None:
+        """Test that the query is tokenized and the matches are returned best first."""
+        command = SearchPostsCommand(query="WORLD hello")
+        use_case = SearchPosts(post_search_index)
+
+        actual = use_case.execute(command)
+
+        assert actual == [PostDTO.from_model(posts[1]), PostDTO.from_model(posts[0])]
+
+    def test_execute_in_thread(self, post_search_index: InMemoryPostSearchIndex, posts: list[Post]) -> None:
+        """Test that the search is narrowed down to the given thread."""
+        command = SearchPostsCommand(query="hello", thread_id="01DXF6DT000000000000000000")
+        use_case = SearchPosts(post_search_index)
+
+        actual = use_case.execute(command)
+
+        assert actual == [PostDTO.from_model(posts[0])]
+
+    @pytest.mark.usefixtures("posts")
+    def test_execute_without_terms(self, post_search_index: InMemoryPostSearchIndex) -> None:
+        """Test that a query without any terms matches nothing."""
+        command = SearchPostsCommand(query="!?")
+        use_case = SearchPosts(post_search_index)
+
+        assert use_case.execute(command) == []
+
+    def test_command_with_invalid_limit(self) -> None:
+        """Test that the limit is bounded."""
+        with pytest.raises(ValidationError):
+            SearchPostsCommand(query="hello", limit=101)
@@ -0,0 +1,40 @@
+"""Unit tests for the SearchThreads use case."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from chat.domain.thread import Thread
+from chat.use_case import SearchThreads, SearchThreadsCommand, ThreadDTO
+from pydantic import ValidationError
+
+if TYPE_CHECKING:
+    from chat.infrastructure import InMemoryThreadRepository
+
+
+class TestSearchThreads:
+    """Unit tests for the SearchThreads use case."""
+
+    def test_execute(self, thread_repository: InMemoryThreadRepository) -> None:
+        """Test that the threads with the prefix are returned in name order, up to the limit."""
+        threads = [
+            Thread(id_=f"01DXF6DT00000000000000000{i}", name=name, created_at=datetime(2020, 1, 1, tzinfo=UTC))
+            for i, name in enumerate(["Python tips", "python news", "Rust", "Pythonista"])
+        ]
+        for thread in threads:
+            thread_repository.save(thread)
+
+        command = SearchThreadsCommand(prefix="PYTHON", limit=2)
+        use_case = SearchThreads(thread_repository)
+
+        actual = use_case.execute(command)
+
+        assert actual == [ThreadDTO.from_model(threads[1]), ThreadDTO.from_model(threads[0])]
+
+    @pytest.mark.parametrize("kwargs", [{"prefix": ""}, {"prefix": "a", "limit": 0}, {"prefix": "a", "limit": 101}])
+    def test_command_invalid(self, kwargs: dict[str, object]) -> None:
+        """Test that an empty prefix and out of range limits are rejected."""
+        with pytest.raises(ValidationError):
+            SearchThreadsCommand(**kwargs)  # type: ignore[arg-type]